@@ -9,6 +9,10 @@
 
 核心组件:
     PowerAnalyzer: 面向对象的数据分析器，提供完整的分析功能
+    TrendEngine: 基于前缀和的时间窗口趋势计算（最小二乘 / Theil–Sen）
+    segment_consumption: 充值感知的消耗分段
+    IncrementalAnalytics: 每条记录 O(1) 更新的增量分析状态
+    lttb / min_max_envelope: 图表降采样
     validate_power_value: 电量值验证
     时间工具: format_timestamp, get_date_range, parse_timestamp
 
@@ -23,11 +27,23 @@
 """
 
 from .datetime_utils import format_timestamp, get_date_range, parse_timestamp
+from .downsample import histogram_bins, lttb, min_max_envelope
+from .incremental import IncrementalAnalytics
 from .power_analyzer import PowerAnalyzer
+from .segments import segment_consumption, split_step
+from .trend import RegressionSums, TrendEngine
 from .validators import validate_power_value
 
 __all__ = [
+    "IncrementalAnalytics",
     "PowerAnalyzer",
+    "RegressionSums",
+    "TrendEngine",
+    "histogram_bins",
+    "lttb",
+    "min_max_envelope",
+    "segment_consumption",
+    "split_step",
     "validate_power_value",
     "format_timestamp",
     "get_date_range",
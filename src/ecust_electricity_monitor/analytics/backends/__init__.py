@@ -0,0 +1,64 @@
+"""分析后端
+
+- PythonBackend: 纯 Python 参考实现（始终可用）
+- NumpyBackend: NumPy 向量化实现（安装 NumPy 后自动启用）
+
+使用示例:
+    backend = get_backend()          # 自动选择
+    backend = get_backend("python")  # 指定后端
+"""
+
+from .base import AnalyticsBackend, DailyColumns
+from .python_backend import PythonBackend
+
+try:
+    from .numpy_backend import NumpyBackend
+
+    NUMPY_AVAILABLE = True
+except ImportError:  # NumPy 未安装
+    NUMPY_AVAILABLE = False
+
+
+def available_backends() -> list[str]:
+    """当前环境可用的后端名称"""
+    names = [PythonBackend.name]
+    if NUMPY_AVAILABLE:
+        names.append(NumpyBackend.name)
+    return names
+
+
+def get_backend(name: str = "auto") -> AnalyticsBackend:
+    """获取分析后端
+
+    Args:
+        name: "auto"（有 NumPy 时用 NumPy）、"numpy" 或 "python"
+
+    Returns:
+        分析后端实例
+
+    Raises:
+        ValueError: 未知后端或后端不可用
+    """
+    if name == "auto":
+        name = "numpy" if NUMPY_AVAILABLE else "python"
+
+    if name == "python":
+        return PythonBackend()
+    if name == "numpy":
+        if not NUMPY_AVAILABLE:
+            raise ValueError("NumPy 后端不可用，请安装 numpy")
+        return NumpyBackend()
+    raise ValueError(f"未知的分析后端: {name}")
+
+
+__all__ = [
+    "AnalyticsBackend",
+    "DailyColumns",
+    "NUMPY_AVAILABLE",
+    "PythonBackend",
+    "available_backends",
+    "get_backend",
+]
+
+if NUMPY_AVAILABLE:
+    __all__ += ["NumpyBackend"]
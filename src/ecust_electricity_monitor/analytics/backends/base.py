@@ -0,0 +1,128 @@
+"""分析后端抽象接口
+
+分析后端把记录一次性转换为列式数据，再在列上计算统计量、差分、
+消耗速率、分位数和按天重采样。
+
+为保证不同后端结果完全一致：
+- 时间用相对首条记录的整数微秒表示
+- 电量差分和消耗累加使用整数“分”（0.01 度），求和没有舍入误差
+- 浮点运算只做逐元素的四则运算，顺序在各后端中保持一致
+"""
+
+from abc import ABC, abstractmethod
+from datetime import datetime, time, timedelta
+from typing import Any, NamedTuple
+
+from ...models import ElectricityRecord
+
+# 时间单位换算
+ONE_MICROSECOND = timedelta(microseconds=1)
+MICROSECONDS_PER_DAY = 86_400_000_000
+
+# 统计信息中包含的分位数
+STATISTICS_PERCENTILES = {"p10_power": 0.1, "median_power": 0.5, "p90_power": 0.9}
+
+
+def to_cents(power: float) -> int:
+    """电量（度）转换为整数“分”（0.01 度）"""
+    return round(power * 100)
+
+
+def ordered_records(records: list[ElectricityRecord]) -> list[ElectricityRecord]:
+    """按时间正序排列记录（已是降序时只需反转）"""
+    if len(records) > 1 and records[0].timestamp > records[-1].timestamp:
+        records = records[::-1]
+    return sorted(records, key=lambda r: r.timestamp)
+
+
+def day_origin(origin: datetime) -> tuple[datetime, int]:
+    """首条记录所在日的零点，及首条记录距零点的微秒数"""
+    midnight = datetime.combine(origin.date(), time())
+    return midnight, (origin - midnight) // ONE_MICROSECOND
+
+
+class DailyColumns(NamedTuple):
+    """按天重采样结果（列式）"""
+
+    days: list[int]  # 距首条记录所在日的天数
+    first: list[float]
+    last: list[float]
+    minimum: list[float]
+    consumed_cents: list[int]
+    counts: list[int]
+
+
+class AnalyticsBackend(ABC):
+    """分析后端抽象基类
+
+    prepare() 返回的列式数据由后端自行定义，只能传回同一后端使用。
+    所有方法的返回值都是普通 Python 对象，便于跨后端比较。
+    """
+
+    name: str = ""
+
+    @abstractmethod
+    def prepare(self, records: list[ElectricityRecord]) -> Any:
+        """把记录一次性转换为列式数据
+
+        Args:
+            records: 电量记录列表（任意顺序，非空）
+
+        Returns:
+            后端专用的列式数据（时间正序）
+        """
+
+    @abstractmethod
+    def statistics(self, columns: Any) -> dict:
+        """计算统计信息（最小、最大、平均、当前电量及分位数）"""
+
+    @abstractmethod
+    def percentiles(self, columns: Any, quantiles: list[float]) -> list[float]:
+        """计算电量分位数（线性插值）
+
+        Args:
+            columns: 列式数据
+            quantiles: 分位点列表，取值 [0, 1]
+        """
+
+    @abstractmethod
+    def step_rates(
+        self, columns: Any, recharge_threshold: float
+    ) -> tuple[list[int], list[float]]:
+        """相邻记录之间的消耗速率（跳过充值和零间隔）
+
+        Returns:
+            (区间终点记录的下标, 消耗速率（度/天）)
+        """
+
+    @abstractmethod
+    def step_totals(
+        self, columns: Any, recharge_threshold: float
+    ) -> tuple[int, int, int]:
+        """全部相邻区间的汇总
+
+        Returns:
+            (总消耗（分）, 总充值（分）, 充值次数)
+        """
+
+    @abstractmethod
+    def consumption_rate(
+        self, columns: Any, since: timedelta, recharge_threshold: float
+    ) -> float | None:
+        """最近一段时间内的日均消耗（只计消耗区间）
+
+        Args:
+            columns: 列式数据
+            since: 以最新记录为终点的时间窗口
+            recharge_threshold: 充值识别阈值（度）
+
+        Returns:
+            日均消耗（度/天），数据不足时返回 None
+        """
+
+    @abstractmethod
+    def resample_daily(self, columns: Any, recharge_threshold: float) -> DailyColumns:
+        """按自然日重采样
+
+        区间消耗计入区间终点记录所在的日期。
+        """
@@ -0,0 +1,152 @@
+"""纯 Python 分析后端
+
+无第三方依赖的参考实现，NumPy 后端的结果必须与其完全一致。
+"""
+
+import math
+from bisect import bisect_left
+from datetime import datetime, timedelta
+
+from ...models import ElectricityRecord
+from .base import (
+    MICROSECONDS_PER_DAY,
+    ONE_MICROSECOND,
+    STATISTICS_PERCENTILES,
+    AnalyticsBackend,
+    DailyColumns,
+    day_origin,
+    ordered_records,
+    to_cents,
+)
+
+
+class PythonColumns:
+    """纯 Python 列式数据（时间正序）"""
+
+    __slots__ = ("records", "origin", "offsets", "powers", "cents")
+
+    def __init__(self, records: list[ElectricityRecord]):
+        self.records = ordered_records(records)
+        self.origin: datetime = self.records[0].timestamp
+        self.offsets = [
+            (r.timestamp - self.origin) // ONE_MICROSECOND for r in self.records
+        ]
+        self.powers = [r.power for r in self.records]
+        self.cents = [to_cents(p) for p in self.powers]
+
+
+class PythonBackend(AnalyticsBackend):
+    """纯 Python 分析后端"""
+
+    name = "python"
+
+    def prepare(self, records: list[ElectricityRecord]) -> PythonColumns:
+        return PythonColumns(records)
+
+    def statistics(self, columns: PythonColumns) -> dict:
+        count = len(columns.powers)
+        stats = {
+            "total_records": count,
+            "min_power": min(columns.powers),
+            "max_power": max(columns.powers),
+            "average_power": sum(columns.cents) / count / 100,
+            "current_power": columns.powers[-1],
+        }
+        values = self.percentiles(columns, list(STATISTICS_PERCENTILES.values()))
+        stats.update(zip(STATISTICS_PERCENTILES, values, strict=True))
+        return stats
+
+    def percentiles(
+        self, columns: PythonColumns, quantiles: list[float]
+    ) -> list[float]:
+        values = sorted(columns.powers)
+        last = len(values) - 1
+        result = []
+        for q in quantiles:
+            position = q * last
+            lower = math.floor(position)
+            upper = min(lower + 1, last)
+            fraction = position - lower
+            result.append(values[lower] + (values[upper] - values[lower]) * fraction)
+        return result
+
+    def step_rates(
+        self, columns: PythonColumns, recharge_threshold: float
+    ) -> tuple[list[int], list[float]]:
+        threshold = to_cents(recharge_threshold)
+        offsets, cents = columns.offsets, columns.cents
+        indices = []
+        rates = []
+        for i in range(1, len(offsets)):
+            elapsed = offsets[i] - offsets[i - 1]
+            delta = cents[i] - cents[i - 1]
+            if elapsed > 0 and delta <= threshold:
+                indices.append(i)
+                rates.append((-delta / 100) / (elapsed / MICROSECONDS_PER_DAY))
+        return indices, rates
+
+    def step_totals(
+        self, columns: PythonColumns, recharge_threshold: float
+    ) -> tuple[int, int, int]:
+        threshold = to_cents(recharge_threshold)
+        cents = columns.cents
+        consumed = purchased = recharges = 0
+        for i in range(1, len(cents)):
+            delta = cents[i] - cents[i - 1]
+            if delta > threshold:
+                purchased += delta
+                recharges += 1
+            else:
+                consumed -= delta
+        return consumed, purchased, recharges
+
+    def consumption_rate(
+        self, columns: PythonColumns, since: timedelta, recharge_threshold: float
+    ) -> float | None:
+        threshold = to_cents(recharge_threshold)
+        offsets, cents = columns.offsets, columns.cents
+        start = bisect_left(offsets, offsets[-1] - since // ONE_MICROSECOND)
+        if len(offsets) - start < 2:
+            return None
+
+        consumed = 0
+        covered = 0
+        for i in range(start + 1, len(offsets)):
+            delta = cents[i] - cents[i - 1]
+            if delta <= threshold:
+                consumed -= delta
+                covered += offsets[i] - offsets[i - 1]
+
+        if covered == 0:
+            return None
+        return (consumed / 100) / (covered / MICROSECONDS_PER_DAY)
+
+    def resample_daily(
+        self, columns: PythonColumns, recharge_threshold: float
+    ) -> DailyColumns:
+        threshold = to_cents(recharge_threshold)
+        _, shift = day_origin(columns.origin)
+        daily = DailyColumns([], [], [], [], [], [])
+
+        for i, (offset, power) in enumerate(
+            zip(columns.offsets, columns.powers, strict=True)
+        ):
+            day = (offset + shift) // MICROSECONDS_PER_DAY
+            if not daily.days or daily.days[-1] != day:
+                daily.days.append(day)
+                daily.first.append(power)
+                daily.last.append(power)
+                daily.minimum.append(power)
+                daily.consumed_cents.append(0)
+                daily.counts.append(0)
+
+            if i > 0:
+                delta = columns.cents[i] - columns.cents[i - 1]
+                if delta <= threshold:
+                    daily.consumed_cents[-1] -= delta
+
+            daily.last[-1] = power
+            daily.minimum[-1] = min(daily.minimum[-1], power)
+            daily.counts[-1] += 1
+
+        return daily
@@ -0,0 +1,106 @@
+"""图表降采样模块
+
+长时间范围的高频数据直接绘图会生成巨大的 HTML，浏览器也会卡顿。
+本模块提供：
+- LTTB（Largest-Triangle-Three-Buckets）降采样，保留曲线的视觉形状
+- 分桶最小/最大值包络，保留被降采样略去的极值
+- 预先分箱的直方图，避免把全部原始值写入图表
+"""
+
+# 默认目标点数
+DEFAULT_MAX_POINTS = 2000
+
+
+def lttb(xs: list[float], ys: list[float], threshold: int) -> list[int]:
+    """LTTB 降采样
+
+    首尾两点固定保留；中间按下标均分为 threshold - 2 个桶，每个桶选出
+    与“上一个选中点”和“下一个桶平均点”构成三角形面积最大的点。
+
+    Args:
+        xs: 横坐标（单调递增，如时间戳秒数）
+        ys: 纵坐标
+        threshold: 目标点数，小于 3 或不小于数据量时不降采样
+
+    Returns:
+        选中点的下标列表（递增）
+    """
+    n = len(xs)
+    if threshold < 3 or threshold >= n:
+        return list(range(n))
+
+    every = (n - 2) / (threshold - 2)
+    selected = [0]
+    a = 0
+
+    for i in range(threshold - 2):
+        # 下一个桶的平均点（最后一个桶使用末点）
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        count = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / count
+        avg_y = sum(ys[next_start:next_end]) / count
+
+        # 当前桶中三角形面积最大的点
+        ax, ay = xs[a], ys[a]
+        dx, dy = ax - avg_x, avg_y - ay
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        best_area = -1.0
+        for j in range(start, end):
+            area = abs(dx * (ys[j] - ay) - (ax - xs[j]) * dy)
+            if area > best_area:
+                best_area = area
+                a = j
+        selected.append(a)
+
+    selected.append(n - 1)
+    return selected
+
+
+def min_max_envelope(
+    ys: list[float], buckets: int
+) -> tuple[list[int], list[float], list[float]]:
+    """按下标均分的最小/最大值包络
+
+    Args:
+        ys: 纵坐标
+        buckets: 桶数，不小于数据量时每个点单独成桶
+
+    Returns:
+        (各桶起点下标, 各桶最小值, 各桶最大值)
+    """
+    n = len(ys)
+    buckets = max(1, min(buckets, n))
+    starts, lows, highs = [], [], []
+    for b in range(buckets):
+        start = b * n // buckets
+        end = (b + 1) * n // buckets
+        if start == end:
+            continue
+        chunk = ys[start:end]
+        starts.append(start)
+        lows.append(min(chunk))
+        highs.append(max(chunk))
+    return starts, lows, highs
+
+
+def histogram_bins(
+    values: list[float], bins: int = 20
+) -> tuple[list[float], list[int], float]:
+    """等宽分箱
+
+    Args:
+        values: 数据（非空）
+        bins: 箱数
+
+    Returns:
+        (各箱中心, 各箱计数, 箱宽)
+    """
+    low, high = min(values), max(values)
+    width = (high - low) / bins or 1.0
+    counts = [0] * bins
+    for v in values:
+        counts[min(int((v - low) / width), bins - 1)] += 1
+    centers = [low + (i + 0.5) * width for i in range(bins)]
+    return centers, counts, width
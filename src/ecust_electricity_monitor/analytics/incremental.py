@@ -0,0 +1,266 @@
+"""增量分析模块
+
+每条新记录 O(1) 更新的分析状态，可序列化后随存储持久化，
+告警时无需重新扫描历史。
+
+维护的状态：
+- 指数遗忘的加权回归累积量（趋势，充值后重置）
+- 时间感知的 EWMA 消耗速率（日均消耗）
+- 最小/最大电量、总消耗/总充值
+- 最近若干条记录（告警上下文的历史）
+"""
+
+import math
+from collections import deque
+from datetime import datetime
+
+from ..constants import RECHARGE_THRESHOLD_KWH
+from ..models import AlertContext, ElectricityRecord, RechargeEvent
+from .segments import split_step
+from .trend import SECONDS_PER_DAY, RegressionSums
+
+# 状态格式版本，格式变化时递增以触发重建
+STATE_VERSION = 1
+
+# 默认时间常数（天）：与 PowerAnalyzer 默认 7 天窗口相当
+DEFAULT_TAU_DAYS = 7.0
+
+# 保留的最近记录条数
+DEFAULT_RECENT_SIZE = 10
+
+
+class IncrementalAnalytics:
+    """增量分析状态
+
+    使用方式:
+        state = IncrementalAnalytics()
+        for record in records:  # 按时间正序
+            state.update(record)
+        context = state.build_alert_context(threshold=10.0)
+    """
+
+    def __init__(
+        self,
+        tau_days: float = DEFAULT_TAU_DAYS,
+        recharge_threshold: float = RECHARGE_THRESHOLD_KWH,
+        recent_size: int = DEFAULT_RECENT_SIZE,
+    ):
+        """初始化增量分析状态
+
+        Args:
+            tau_days: 趋势回归与 EWMA 的时间常数（天）
+            recharge_threshold: 充值识别阈值（度）
+            recent_size: 保留的最近记录条数
+        """
+        self.tau_days = tau_days
+        self.recharge_threshold = recharge_threshold
+
+        self.count = 0
+        self.min_power: float | None = None
+        self.max_power: float | None = None
+        self.total_consumed_kwh = 0.0
+        self.total_purchased_kwh = 0.0
+        self.ewma_rate: float | None = None
+        self.last_recharge: RechargeEvent | None = None
+
+        # 回归的时间原点（当前消耗区段的开始时间）
+        self.segment_start: datetime | None = None
+        self.regression = RegressionSums()
+
+        # 最近记录（时间降序）
+        self.recent: deque[ElectricityRecord] = deque(maxlen=recent_size)
+
+    @property
+    def latest(self) -> ElectricityRecord | None:
+        """最新记录"""
+        return self.recent[0] if self.recent else None
+
+    def update(self, record: ElectricityRecord) -> None:
+        """加入一条新记录（O(1)）
+
+        Args:
+            record: 电量记录，时间必须晚于已有的最新记录
+
+        Raises:
+            ValueError: 记录时间早于或等于最新记录（需要全量重建）
+        """
+        latest = self.latest
+        if latest is not None and record.timestamp <= latest.timestamp:
+            raise ValueError(
+                f"记录时间 {record.timestamp} 不晚于最新记录 {latest.timestamp}"
+            )
+
+        self.count += 1
+        self.min_power = (
+            record.power
+            if self.min_power is None
+            else min(self.min_power, record.power)
+        )
+        self.max_power = (
+            record.power
+            if self.max_power is None
+            else max(self.max_power, record.power)
+        )
+
+        if latest is None:
+            self._start_segment(record)
+        else:
+            dt_days = (record.timestamp - latest.timestamp).total_seconds() / (
+                SECONDS_PER_DAY
+            )
+            consumed, purchased = split_step(
+                latest.power, record.power, self.recharge_threshold
+            )
+            if purchased:
+                self.total_purchased_kwh += purchased
+                self.last_recharge = RechargeEvent(
+                    timestamp=record.timestamp,
+                    power_before=latest.power,
+                    power_after=record.power,
+                )
+                self._start_segment(record)
+            else:
+                self.total_consumed_kwh += consumed
+                self._update_rate(consumed / dt_days, dt_days)
+                self.regression.decay(math.exp(-dt_days / self.tau_days))
+                self.regression.add(self._segment_days(record), record.power)
+
+        self.recent.appendleft(record)
+
+    def _start_segment(self, record: ElectricityRecord) -> None:
+        """开始新的消耗区段（重置回归）"""
+        self.segment_start = record.timestamp
+        self.regression = RegressionSums()
+        self.regression.add(0.0, record.power)
+
+    def _segment_days(self, record: ElectricityRecord) -> float:
+        """记录距当前区段开始的天数（尚无区段时为 0）"""
+        if self.segment_start is None:
+            return 0.0
+        return (record.timestamp - self.segment_start).total_seconds() / SECONDS_PER_DAY
+
+    def _update_rate(self, rate: float, dt_days: float) -> None:
+        """时间感知的 EWMA：间隔越长，新样本权重越大"""
+        if self.ewma_rate is None:
+            self.ewma_rate = rate
+            return
+        alpha = 1 - math.exp(-dt_days / self.tau_days)
+        self.ewma_rate += alpha * (rate - self.ewma_rate)
+
+    @property
+    def trend(self) -> float | None:
+        """电量趋势（度/天），当前消耗区段内的指数加权回归斜率"""
+        return self.regression.slope
+
+    @property
+    def daily_consumption(self) -> float | None:
+        """日均消耗（度/天）"""
+        return self.ewma_rate
+
+    def estimate_remaining_days(self, current_power: float | None = None) -> int | None:
+        """估算剩余可用天数
+
+        Args:
+            current_power: 当前剩余电量（不提供则使用最新记录）
+
+        Returns:
+            估算剩余天数，如果无法估算则返回 None
+        """
+        if current_power is None:
+            if self.latest is None:
+                return None
+            current_power = self.latest.power
+
+        if self.ewma_rate is None or self.ewma_rate <= 0:
+            return None
+
+        return int(current_power / self.ewma_rate)
+
+    def build_alert_context(
+        self, threshold: float, current_record: ElectricityRecord | None = None
+    ) -> AlertContext:
+        """构造告警上下文
+
+        Args:
+            threshold: 告警阈值
+            current_record: 当前电量记录（不提供则使用最新记录）
+
+        Returns:
+            告警上下文
+
+        Raises:
+            ValueError: 没有任何记录
+        """
+        current_record = current_record or self.latest
+        if current_record is None:
+            raise ValueError("没有记录，无法构造告警上下文")
+
+        return AlertContext(
+            current_record=current_record,
+            threshold=threshold,
+            trend=self.trend,
+            history=list(self.recent),
+            daily_consumption=self.daily_consumption,
+            estimated_days_remaining=self.estimate_remaining_days(current_record.power),
+            last_recharge=self.last_recharge,
+        )
+
+    def to_dict(self) -> dict:
+        """序列化为字典（可写入 JSON）"""
+        return {
+            "version": STATE_VERSION,
+            "tau_days": self.tau_days,
+            "recharge_threshold": self.recharge_threshold,
+            "recent_size": self.recent.maxlen,
+            "count": self.count,
+            "min_power": self.min_power,
+            "max_power": self.max_power,
+            "total_consumed_kwh": self.total_consumed_kwh,
+            "total_purchased_kwh": self.total_purchased_kwh,
+            "ewma_rate": self.ewma_rate,
+            "last_recharge": self.last_recharge.model_dump(mode="json")
+            if self.last_recharge
+            else None,
+            "segment_start": self.segment_start.isoformat()
+            if self.segment_start
+            else None,
+            "regression": self.regression.to_dict(),
+            "recent": [r.model_dump(mode="json") for r in self.recent],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "IncrementalAnalytics":
+        """从字典恢复
+
+        Raises:
+            ValueError: 状态版本不匹配或字段缺失
+        """
+        if data.get("version") != STATE_VERSION:
+            raise ValueError(f"不支持的分析状态版本: {data.get('version')}")
+
+        try:
+            state = cls(
+                tau_days=data["tau_days"],
+                recharge_threshold=data["recharge_threshold"],
+                recent_size=data["recent_size"],
+            )
+            state.count = data["count"]
+            state.min_power = data["min_power"]
+            state.max_power = data["max_power"]
+            state.total_consumed_kwh = data["total_consumed_kwh"]
+            state.total_purchased_kwh = data["total_purchased_kwh"]
+            state.ewma_rate = data["ewma_rate"]
+            if data["last_recharge"]:
+                state.last_recharge = RechargeEvent.model_validate(
+                    data["last_recharge"]
+                )
+            if data["segment_start"]:
+                state.segment_start = datetime.fromisoformat(data["segment_start"])
+            state.regression = RegressionSums.from_dict(data["regression"])
+            state.recent.extend(
+                ElectricityRecord.model_validate(r) for r in data["recent"]
+            )
+        except KeyError as e:
+            raise ValueError(f"分析状态缺少字段: {e}") from e
+
+        return state
@@ -7,9 +7,22 @@
 - 剩余天数估算
 """
 
-from datetime import timedelta
+from datetime import datetime, timedelta
+from functools import cached_property
+from typing import Any, Literal
 
-from ..models import ElectricityRecord
+from ..constants import RECHARGE_THRESHOLD_KWH
+from ..models import ElectricityRecord, PowerRollup, SegmentationResult
+from ..timing import span, timed
+from .backends import AnalyticsBackend, get_backend
+from .backends.base import day_origin
+from .segments import segment_consumption
+from .trend import TrendEngine
+
+# 趋势计算默认时间窗口（天）
+DEFAULT_TREND_WINDOW_DAYS = 7.0
+
+TrendMethod = Literal["least_squares", "theil_sen"]
 
 
 class PowerAnalyzer:
@@ -24,47 +37,83 @@ class PowerAnalyzer:
         stats = analyzer.get_statistics()
     """
 
-    def __init__(self, records: list[ElectricityRecord]):
+    def __init__(
+        self,
+        records: list[ElectricityRecord],
+        backend: str | AnalyticsBackend = "auto",
+    ):
         """初始化分析器
 
         Args:
             records: 电量记录列表（按时间降序排序）
+            backend: 分析后端，"auto"（安装 NumPy 时使用向量化后端）、
+                "numpy"、"python" 或后端实例
+
+        Note:
+            列式数据、趋势引擎和分段结果在首次使用时缓存，
+            构造后请勿再修改 records。
         """
         self.records = records
-
-    def calculate_trend(self, window_size: int = 5) -> float | None:
+        self.backend = get_backend(backend) if isinstance(backend, str) else backend
+
+    @cached_property
+    def columns(self) -> Any:
+        """后端列式数据（首次访问时由记录一次性转换）"""
+        with span("analyzer.prepare"):
+            return self.backend.prepare(self.records)
+
+    @cached_property
+    def trend_engine(self) -> TrendEngine:
+        """趋势引擎（首次访问时构建并缓存前缀和）"""
+        return TrendEngine(self.records)
+
+    @cached_property
+    def segmentation(self) -> SegmentationResult:
+        """充值感知的消耗分段（首次访问时计算并缓存）"""
+        with span("analyzer.segmentation"):
+            return segment_consumption(self.records)
+
+    @timed("analyzer.trend")
+    def calculate_trend(
+        self,
+        window_days: float = DEFAULT_TREND_WINDOW_DAYS,
+        method: TrendMethod = "least_squares",
+    ) -> float | None:
         """计算电量变化趋势（单位：度/天）
 
-        使用简单线性回归计算趋势。正值表示增加，负值表示减少。
+        以最新记录为终点，取最近 window_days 天内的全部记录做线性回归。
+        窗口不会跨越最近一次充值，避免充值跳变干扰趋势。
+        正值表示增加，负值表示减少。
 
         Args:
-            window_size: 用于计算趋势的记录数量
+            window_days: 时间窗口（天）
+            method: 回归方法，"least_squares"（最小二乘）或
+                "theil_sen"（稳健估计，对异常读数不敏感）
 
         Returns:
             电量变化趋势（度/天），如果数据不足则返回 None
         """
-        if len(self.records) < 2:
-            return None
+        window = timedelta(days=window_days)
 
-        # 取最近的 N 条记录
-        recent = self.records[:window_size]
-        if len(recent) < 2:
-            return None
+        last_recharge = self.segmentation.last_recharge
+        latest_time = self.trend_engine.latest_time
+        if last_recharge is not None and latest_time is not None:
+            since_recharge = latest_time - last_recharge.timestamp
+            window = min(window, since_recharge)
 
-        # 计算时间跨度（天）
-        time_span = (recent[0].timestamp - recent[-1].timestamp).total_seconds() / 86400
-        if time_span == 0:
-            return None
-
-        # 计算电量变化
-        power_change = recent[0].power - recent[-1].power
-
-        # 返回每天的变化率
-        return power_change / time_span
+        if method == "least_squares":
+            return self.trend_engine.least_squares(window)
+        if method == "theil_sen":
+            return self.trend_engine.theil_sen(window)
+        raise ValueError(f"不支持的趋势计算方法: {method}")
 
+    @timed("analyzer.daily_consumption")
     def calculate_daily_consumption(self, days: int = 7) -> float | None:
         """计算日均电量消耗
 
+        只统计消耗区段内的电量下降，充值不计入消耗，
+        充值间隔的时长也不计入统计时长。
+
         Args:
             days: 统计天数
 
@@ -74,26 +123,9 @@ class PowerAnalyzer:
         if not self.records:
             return None
 
-        # 找到 N 天前的记录
-        cutoff_time = self.records[0].timestamp - timedelta(days=days)
-
-        # 过滤出时间范围内的记录
-        period_records = [r for r in self.records if r.timestamp >= cutoff_time]
-
-        if len(period_records) < 2:
-            return None
-
-        # 计算实际时间跨度
-        time_span = (
-            period_records[0].timestamp - period_records[-1].timestamp
-        ).total_seconds() / 86400
-        if time_span == 0:
-            return None
-
-        # 计算消耗
-        consumption = period_records[-1].power - period_records[0].power
-
-        return abs(consumption) / time_span
+        return self.backend.consumption_rate(
+            self.columns, timedelta(days=days), RECHARGE_THRESHOLD_KWH
+        )
 
     def estimate_remaining_days(self, current_power: float | None = None) -> int | None:
         """估算剩余可用天数
@@ -118,6 +150,7 @@ class PowerAnalyzer:
 
         return int(current_power / daily_consumption)
 
+    @timed("analyzer.statistics")
     def get_statistics(self) -> dict:
         """计算电量统计信息
 
@@ -131,14 +164,58 @@ class PowerAnalyzer:
                 "max_power": None,
                 "average_power": None,
                 "current_power": None,
+                "p10_power": None,
+                "median_power": None,
+                "p90_power": None,
+                "total_consumed_kwh": None,
+                "total_purchased_kwh": None,
+                "recharge_count": 0,
             }
 
-        powers = [r.power for r in self.records]
-
+        consumed, purchased, recharges = self.backend.step_totals(
+            self.columns, RECHARGE_THRESHOLD_KWH
+        )
         return {
-            "total_records": len(self.records),
-            "min_power": min(powers),
-            "max_power": max(powers),
-            "average_power": sum(powers) / len(powers),
-            "current_power": self.records[0].power,
+            **self.backend.statistics(self.columns),
+            "total_consumed_kwh": consumed / 100,
+            "total_purchased_kwh": purchased / 100,
+            "recharge_count": recharges,
         }
+
+    @timed("analyzer.step_rates")
+    def calculate_step_rates(self) -> tuple[list[datetime], list[float]]:
+        """计算相邻记录之间的消耗速率（跳过充值区间）
+
+        Returns:
+            (区间终点时间, 消耗速率（度/天）)，按时间正序
+        """
+        if len(self.records) < 2:
+            return [], []
+
+        indices, rates = self.backend.step_rates(self.columns, RECHARGE_THRESHOLD_KWH)
+        records = self.columns.records
+        return [records[i].timestamp for i in indices], rates
+
+    @timed("analyzer.resample_daily")
+    def resample_daily(self) -> list[PowerRollup]:
+        """按自然日重采样
+
+        Returns:
+            每日汇总列表（按日期正序），区间消耗计入区间终点所在日期
+        """
+        if not self.records:
+            return []
+
+        daily = self.backend.resample_daily(self.columns, RECHARGE_THRESHOLD_KWH)
+        midnight, _ = day_origin(self.columns.origin)
+        return [
+            PowerRollup(
+                period_start=midnight + timedelta(days=day),
+                first_power=first,
+                last_power=last,
+                min_power=minimum,
+                consumed_kwh=consumed / 100,
+                sample_count=count,
+            )
+            for day, first, last, minimum, consumed, count in zip(*daily, strict=True)
+        ]
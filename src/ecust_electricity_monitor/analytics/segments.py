@@ -0,0 +1,92 @@
+"""消耗分段模块
+
+单次遍历识别充值事件（电量正跳变），并把历史切分为若干消耗区段，
+避免把充值误算为“消耗”。
+"""
+
+from ..constants import RECHARGE_THRESHOLD_KWH
+from ..models import (
+    ConsumptionSegment,
+    ElectricityRecord,
+    RechargeEvent,
+    SegmentationResult,
+)
+
+
+def split_step(
+    prev_power: float,
+    curr_power: float,
+    recharge_threshold: float = RECHARGE_THRESHOLD_KWH,
+) -> tuple[float, float]:
+    """拆分相邻两次读数之间的电量变化
+
+    电量上升超过 recharge_threshold 视为充值；否则视为消耗
+    （小幅回升按负消耗处理，使区段内逐步消耗之和等于净下降量）。
+
+    Args:
+        prev_power: 前一次读数（度）
+        curr_power: 当前读数（度）
+        recharge_threshold: 充值识别阈值（度）
+
+    Returns:
+        (消耗电量, 充值电量)
+    """
+    # 电量精确到 0.01 度，先取整避免浮点误差影响阈值判断
+    delta = round(curr_power - prev_power, 2)
+    if delta > recharge_threshold:
+        return 0.0, delta
+    return -delta, 0.0
+
+
+def segment_consumption(
+    records: list[ElectricityRecord],
+    recharge_threshold: float = RECHARGE_THRESHOLD_KWH,
+) -> SegmentationResult:
+    """按充值事件切分消耗区段
+
+    Args:
+        records: 电量记录列表（任意顺序）
+        recharge_threshold: 充值识别阈值（度）
+
+    Returns:
+        分段结果，包含各区段、充值事件及汇总电量
+    """
+    ordered = sorted(records, key=lambda r: r.timestamp)
+    result = SegmentationResult()
+    if not ordered:
+        return result
+
+    start = prev = ordered[0]
+    count = 1
+
+    for curr in ordered[1:]:
+        _, purchased = split_step(prev.power, curr.power, recharge_threshold)
+        if purchased:
+            result.segments.append(_make_segment(start, prev, count))
+            result.recharges.append(
+                RechargeEvent(
+                    timestamp=curr.timestamp,
+                    power_before=prev.power,
+                    power_after=curr.power,
+                )
+            )
+            start = curr
+            count = 0
+        prev = curr
+        count += 1
+
+    result.segments.append(_make_segment(start, prev, count))
+    return result
+
+
+def _make_segment(
+    start: ElectricityRecord, end: ElectricityRecord, count: int
+) -> ConsumptionSegment:
+    """由区段首尾记录构造 ConsumptionSegment"""
+    return ConsumptionSegment(
+        start_time=start.timestamp,
+        end_time=end.timestamp,
+        start_power=start.power,
+        end_power=end.power,
+        sample_count=count,
+    )
@@ -0,0 +1,197 @@
+"""趋势计算模块
+
+提供基于时间窗口的电量趋势计算：
+- 流式最小二乘（RegressionSums，O(1) 增删样本）
+- 前缀和缓存（TrendEngine，一次 O(n) 预处理，任意窗口 O(log n) 查询）
+- Theil–Sen 稳健估计（对噪声读数不敏感，采样数有上限）
+"""
+
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from itertools import accumulate
+from statistics import median
+
+from ..models import ElectricityRecord
+
+# 一天的秒数
+SECONDS_PER_DAY = 86400
+
+# Theil–Sen 默认最大采样点数（两两配对，复杂度 O(k²)）
+DEFAULT_THEIL_SEN_SAMPLES = 200
+
+
+class RegressionSums:
+    """最小二乘回归的累积量
+
+    维护 n、Σx、Σy、Σx²、Σxy 五个累积量，支持 O(1) 增加/移除样本，
+    随时可以求出回归斜率。n 可以是加权样本数（见 decay）。
+    """
+
+    __slots__ = ("n", "sum_x", "sum_y", "sum_xx", "sum_xy")
+
+    def __init__(
+        self,
+        n: float = 0,
+        sum_x: float = 0.0,
+        sum_y: float = 0.0,
+        sum_xx: float = 0.0,
+        sum_xy: float = 0.0,
+    ):
+        self.n = n
+        self.sum_x = sum_x
+        self.sum_y = sum_y
+        self.sum_xx = sum_xx
+        self.sum_xy = sum_xy
+
+    def add(self, x: float, y: float) -> None:
+        """加入一个样本"""
+        self.n += 1
+        self.sum_x += x
+        self.sum_y += y
+        self.sum_xx += x * x
+        self.sum_xy += x * y
+
+    def remove(self, x: float, y: float) -> None:
+        """移除一个样本（滑动窗口使用）"""
+        self.n -= 1
+        self.sum_x -= x
+        self.sum_y -= y
+        self.sum_xx -= x * x
+        self.sum_xy -= x * y
+
+    def decay(self, factor: float) -> None:
+        """按比例衰减全部累积量（指数遗忘的加权回归使用）"""
+        self.n *= factor
+        self.sum_x *= factor
+        self.sum_y *= factor
+        self.sum_xx *= factor
+        self.sum_xy *= factor
+
+    @property
+    def slope(self) -> float | None:
+        """回归斜率，样本不足或 x 无变化时返回 None"""
+        if self.n <= 0:
+            return None
+        spread = self.n * self.sum_xx
+        denominator = spread - self.sum_x * self.sum_x
+        if denominator <= spread * 1e-12:
+            return None
+        return (self.n * self.sum_xy - self.sum_x * self.sum_y) / denominator
+
+    def to_dict(self) -> dict:
+        """序列化为字典"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RegressionSums":
+        """从字典恢复"""
+        return cls(**{name: data[name] for name in cls.__slots__})
+
+
+class TrendEngine:
+    """电量趋势计算引擎
+
+    构造时按时间正序整理记录，并计算一次前缀和；之后任意时间窗口的
+    最小二乘斜率都只需二分查找 + 前缀和相减，重复调用几乎没有开销。
+
+    时间以“距最新记录的天数”表示（均为非正数），避免大数相减损失精度。
+    """
+
+    def __init__(self, records: list[ElectricityRecord]):
+        """初始化趋势引擎
+
+        Args:
+            records: 电量记录列表（任意顺序）
+        """
+        ordered = sorted(records, key=lambda r: r.timestamp)
+        self.latest_time: datetime | None = ordered[-1].timestamp if ordered else None
+
+        self.times: list[float] = [
+            (r.timestamp - ordered[-1].timestamp).total_seconds() / SECONDS_PER_DAY
+            for r in ordered
+        ]
+        self.powers: list[float] = [r.power for r in ordered]
+
+        # 前缀和，下标 i 表示前 i 个样本的累积量
+        self._prefix_x = list(accumulate(self.times, initial=0.0))
+        self._prefix_y = list(accumulate(self.powers, initial=0.0))
+        self._prefix_xx = list(accumulate((t * t for t in self.times), initial=0.0))
+        self._prefix_xy = list(
+            accumulate(
+                (t * p for t, p in zip(self.times, self.powers, strict=True)),
+                initial=0.0,
+            )
+        )
+
+    def _window_start(self, window: timedelta | None) -> int:
+        """时间窗口起点对应的样本下标"""
+        if window is None:
+            return 0
+        return bisect_left(self.times, -window.total_seconds() / SECONDS_PER_DAY)
+
+    def window_sums(self, window: timedelta | None = None) -> RegressionSums:
+        """获取时间窗口内的回归累积量
+
+        Args:
+            window: 时间窗口（以最新记录为终点），None 表示全部记录
+
+        Returns:
+            窗口内的 RegressionSums
+        """
+        start = self._window_start(window)
+        end = len(self.times)
+        return RegressionSums(
+            n=end - start,
+            sum_x=self._prefix_x[end] - self._prefix_x[start],
+            sum_y=self._prefix_y[end] - self._prefix_y[start],
+            sum_xx=self._prefix_xx[end] - self._prefix_xx[start],
+            sum_xy=self._prefix_xy[end] - self._prefix_xy[start],
+        )
+
+    def least_squares(self, window: timedelta | None = None) -> float | None:
+        """最小二乘趋势（度/天）
+
+        Args:
+            window: 时间窗口，None 表示全部记录
+
+        Returns:
+            回归斜率，数据不足时返回 None
+        """
+        return self.window_sums(window).slope
+
+    def theil_sen(
+        self,
+        window: timedelta | None = None,
+        max_samples: int = DEFAULT_THEIL_SEN_SAMPLES,
+    ) -> float | None:
+        """Theil–Sen 稳健趋势（度/天）
+
+        取所有样本对斜率的中位数，单个异常读数几乎不影响结果。
+        窗口内样本超过 max_samples 时等间隔抽样，保证计算量有上限。
+
+        Args:
+            window: 时间窗口，None 表示全部记录
+            max_samples: 最大采样点数
+
+        Returns:
+            斜率中位数，数据不足时返回 None
+        """
+        start = self._window_start(window)
+        count = len(self.times) - start
+        if count < 2:
+            return None
+
+        step = max(1, -(-count // max(2, max_samples)))
+        indices = range(start, len(self.times), step)
+        times = [self.times[i] for i in indices]
+        powers = [self.powers[i] for i in indices]
+
+        slopes = [
+            (powers[j] - powers[i]) / (times[j] - times[i])
+            for i in range(len(times))
+            for j in range(i + 1, len(times))
+            if times[j] != times[i]
+        ]
+        if not slopes:
+            return None
+        return median(slopes)
@@ -0,0 +1,277 @@
+"""原始响应归档模块
+
+职责：
+- 追加保存接口返回的完整页面（FetchResult.raw_response 只保留前 500 字符）
+- 分段压缩存储，按大小轮换，总大小超出上限时删除最旧的分段
+- 流式读回归档，供 emon reparse 在页面版式变化后重新解析历史
+
+存储格式：
+    <归档目录>/responses-<创建时间>.jsonl.zst（或 .jsonl.gz）
+
+每条响应单独压缩为一个帧（zstd 帧或 gzip 成员）追加到当前分段，
+帧内是一行 JSON：{"room", "timestamp", "url", "status", "body"}。
+多个帧首尾相接仍是合法的压缩流，可直接流式解压逐行读取（也可用 zstdcat / zcat
+查看）；分段中损坏的帧及其之后的内容在读取时跳过。
+"""
+
+import gzip
+import io
+import json
+import os
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Literal
+
+from .logger import logger
+
+try:  # Python 3.14+ 标准库
+    from compression import zstd as _stdlib_zstd
+except ImportError:
+    _stdlib_zstd = None  # type: ignore[assignment]
+
+try:
+    import zstandard
+except ImportError:  # zstandard 未安装
+    zstandard = None  # type: ignore[assignment]
+
+Compression = Literal["zstd", "gzip"]
+
+# 解压损坏数据时可能抛出的异常
+_DECOMPRESS_ERRORS: tuple[type[Exception], ...] = (EOFError, OSError, ValueError)
+if _stdlib_zstd is not None:
+    _DECOMPRESS_ERRORS += (_stdlib_zstd.ZstdError,)
+if zstandard is not None:
+    _DECOMPRESS_ERRORS += (zstandard.ZstdError,)
+
+# 各压缩格式的分段文件扩展名
+EXTENSIONS: dict[Compression, str] = {"zstd": ".jsonl.zst", "gzip": ".jsonl.gz"}
+
+SEGMENT_PREFIX = "responses-"
+_SEGMENT_TIME_FORMAT = "%Y%m%dT%H%M%S-%f"
+
+
+def available_compressions() -> list[Compression]:
+    """当前环境可用的压缩格式（zstd 需要 Python 3.14+ 或 zstandard）"""
+    if _stdlib_zstd is not None or zstandard is not None:
+        return ["zstd", "gzip"]
+    return ["gzip"]
+
+
+def _compress(data: bytes, compression: Compression) -> bytes:
+    """把一条响应压缩为独立的帧"""
+    if compression == "gzip":
+        return gzip.compress(data, compresslevel=6)
+    if _stdlib_zstd is not None:
+        return _stdlib_zstd.compress(data)
+    return zstandard.ZstdCompressor().compress(data)
+
+
+def _open_decompressed(path: Path) -> gzip.GzipFile | BinaryIO:
+    """流式解压分段文件（跨帧读取）"""
+    if path.name.endswith(EXTENSIONS["gzip"]):
+        return gzip.open(path, "rb")
+    if _stdlib_zstd is not None:
+        return _stdlib_zstd.open(path, "rb")
+    if zstandard is not None:
+        return zstandard.ZstdDecompressor().stream_reader(
+            open(path, "rb"),  # noqa: SIM115 - 由 stream_reader 关闭
+            read_across_frames=True,
+            closefd=True,
+        )
+    raise ValueError(f"读取 {path.name} 需要 zstd 支持（Python 3.14+ 或 zstandard）")
+
+
+@dataclass
+class ArchivedResponse:
+    """一条归档的接口响应"""
+
+    room: str
+    timestamp: datetime
+    url: str
+    status: int
+    body: str
+
+
+class ResponseArchive:
+    """原始响应归档（追加写入，按大小轮换）"""
+
+    def __init__(
+        self,
+        archive_dir: Path,
+        compression: Compression | None = None,
+        max_segment_bytes: int = 16 * 1024 * 1024,
+        max_total_bytes: int = 512 * 1024 * 1024,
+    ):
+        """初始化归档
+
+        Args:
+            archive_dir: 归档目录
+            compression: 压缩格式（默认有 zstd 时用 zstd，否则 gzip）
+            max_segment_bytes: 单个分段的大小上限，超出后开始新分段
+            max_total_bytes: 归档总大小上限，超出后删除最旧的分段
+
+        Raises:
+            ValueError: 指定的压缩格式不可用
+        """
+        if compression is None:
+            compression = available_compressions()[0]
+        if compression not in available_compressions():
+            raise ValueError(
+                f"压缩格式 {compression} 不可用（可用: "
+                f"{', '.join(available_compressions())}）"
+            )
+        self.archive_dir = Path(archive_dir)
+        self.compression: Compression = compression
+        self.max_segment_bytes = max_segment_bytes
+        self.max_total_bytes = max_total_bytes
+
+    def segments(self) -> list[Path]:
+        """全部分段文件（按创建时间正序，包括其他压缩格式的旧分段）"""
+        if not self.archive_dir.is_dir():
+            return []
+        return sorted(
+            path
+            for path in self.archive_dir.iterdir()
+            if path.name.startswith(SEGMENT_PREFIX)
+            and path.name.endswith(tuple(EXTENSIONS.values()))
+        )
+
+    def append(
+        self,
+        room: str,
+        timestamp: datetime,
+        body: str,
+        url: str = "",
+        status: int = 200,
+    ) -> None:
+        """追加一条响应
+
+        整帧一次 write() 以追加模式写入，多个进程同时追加时帧不会交错。
+
+        Raises:
+            OSError: 写入失败
+        """
+        line = json.dumps(
+            {
+                "room": room,
+                "timestamp": timestamp.isoformat(),
+                "url": url,
+                "status": status,
+                "body": body,
+            },
+            ensure_ascii=False,
+        )
+        frame = _compress(line.encode("utf-8") + b"\n", self.compression)
+
+        segment = self._active_segment(len(frame))
+        fd = os.open(segment, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, frame)
+        finally:
+            os.close(fd)
+
+    def iter_responses(
+        self,
+        room: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> Iterator[ArchivedResponse]:
+        """按写入顺序流式读取归档
+
+        Args:
+            room: 只读取该房间
+            since: 开始时间（包含）
+            until: 结束时间（包含）
+
+        Yields:
+            归档的响应
+        """
+        segments = self.segments()
+        for index, segment in enumerate(segments):
+            # 分段内的响应都写入于下一个分段创建之前，可按文件名整段跳过
+            if since is not None and index + 1 < len(segments):
+                next_start = _segment_start(segments[index + 1])
+                if next_start is not None and next_start < since:
+                    continue
+
+            for entry in self._read_segment(segment):
+                if room is not None and entry.room != room:
+                    continue
+                if since is not None and entry.timestamp < since:
+                    continue
+                if until is not None and entry.timestamp > until:
+                    continue
+                yield entry
+
+    def total_bytes(self) -> int:
+        """归档总大小（字节）"""
+        return sum(_size(path) for path in self.segments())
+
+    def _active_segment(self, incoming: int) -> Path:
+        """当前写入的分段（超出大小上限时新建，并按总大小上限清理）"""
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        extension = EXTENSIONS[self.compression]
+        segments = self.segments()
+
+        if segments and segments[-1].name.endswith(extension):
+            current = segments[-1]
+            if _size(current) + incoming <= self.max_segment_bytes:
+                return current
+
+        name = f"{SEGMENT_PREFIX}{datetime.now().strftime(_SEGMENT_TIME_FORMAT)}"
+        segment = self.archive_dir / f"{name}{extension}"
+        self._prune([*segments, segment], incoming)
+        return segment
+
+    def _prune(self, segments: list[Path], incoming: int) -> None:
+        """删除最旧的分段，直到总大小（含即将写入的帧）不超过上限"""
+        total = sum(_size(path) for path in segments) + incoming
+        for old in segments[:-1]:
+            if total <= self.max_total_bytes:
+                break
+            total -= _size(old)
+            old.unlink(missing_ok=True)
+            logger.info(f"归档超出大小上限，已删除旧分段: {old.name}")
+
+    def _read_segment(self, segment: Path) -> Iterator[ArchivedResponse]:
+        """逐行读取一个分段（末尾不完整的帧和无效行跳过）"""
+        try:
+            with io.TextIOWrapper(
+                _open_decompressed(segment), encoding="utf-8"
+            ) as stream:
+                for line in stream:
+                    try:
+                        data = json.loads(line)
+                        yield ArchivedResponse(
+                            room=str(data["room"]),
+                            timestamp=datetime.fromisoformat(data["timestamp"]),
+                            url=data.get("url", ""),
+                            status=int(data.get("status", 200)),
+                            body=data["body"],
+                        )
+                    except (ValueError, KeyError, TypeError) as e:
+                        logger.warning(f"跳过无效的归档条目 ({segment.name}): {e}")
+        except FileNotFoundError:
+            # 读取期间被清理
+            return
+        except _DECOMPRESS_ERRORS as e:
+            logger.warning(f"归档分段已损坏，跳过剩余内容 ({segment.name}): {e}")
+
+
+def _segment_start(segment: Path) -> datetime | None:
+    """由文件名得到分段的创建时间"""
+    stem = segment.name.removeprefix(SEGMENT_PREFIX).split(".", 1)[0]
+    try:
+        return datetime.strptime(stem, _SEGMENT_TIME_FORMAT)
+    except ValueError:
+        return None
+
+
+def _size(path: Path) -> int:
+    """文件大小（不存在时为 0）"""
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return 0
@@ -0,0 +1,11 @@
+"""性能基准模块
+
+提供基准测试所需的工具：
+- generate_history: 生成可复现的合成电量历史
+- run_suite / compare_results: 基准测试套件及结果对比（emon bench）
+"""
+
+from .suite import compare_results, run_suite
+from .synthetic import generate_history
+
+__all__ = ["compare_results", "generate_history", "run_suite"]
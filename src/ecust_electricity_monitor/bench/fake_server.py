@@ -0,0 +1,297 @@
+"""模拟 ECUST 电费查询服务器
+
+在本地提供与真实接口相同路径的 eleresult 页面（含 input#roomdef 的 left-degree
+属性），用于离线测试抓取、重试和调度以及压力测试：
+
+- 任意数量的合成房间，房间号为 ROOM_ID_BASE 起的连续整数；未知房间返回不含电量的页面
+- 电量由无状态的消耗模型按请求时刻计算：白天/夜间不同用电速率，低于下限时充值
+- 可配置响应延迟与抖动、HTTP 错误率、页面缺失电量的比例以及多种 HTML 版式
+
+示例：
+    with FakeECUSTServer(FakeServerOptions(rooms=5000, latency_ms=50)) as server:
+        client = ElectricityClient(..., roomid="10001", base_url=server.url)
+"""
+
+import hashlib
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Literal
+from urllib.parse import parse_qs, urlsplit
+
+from ..constants import ELECTRICITY_API_URL
+from ..logger import logger
+
+# 与真实接口一致的路径
+API_PATH = urlsplit(ELECTRICITY_API_URL).path
+
+# 合成房间号起点
+ROOM_ID_BASE = 10001
+
+Layout = Literal["classic", "reordered", "nested", "minified"]
+LAYOUTS: tuple[Layout, ...] = ("classic", "reordered", "nested", "minified")
+
+# 各版式的页面模板：{power} 为电量，{filler} 为无关标记
+_PAGES: dict[Layout, str] = {
+    "classic": """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>电费查询</title></head>
+<body>
+{filler}
+<div class="room">
+    <input type="hidden" id="roomdef" left-degree="{power}" />
+    <p>剩余电量：{power} 度</p>
+</div>
+</body>
+</html>""",
+    "reordered": """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>电费查询</title></head>
+<body>
+<div class='room'>
+    <INPUT left-degree='{power}' name='roomdef' ID='roomdef' type='hidden'>
+</div>
+{filler}
+</body>
+</html>""",
+    "nested": """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>电费查询</title></head>
+<body>
+<table><tr><td>
+    {filler}
+    <table><tr><td><form action="#">
+        <input type="hidden" id="roomdef" left-degree="{power}" data-unit="kWh">
+    </form></td></tr></table>
+</td></tr></table>
+</body>
+</html>""",
+    "minified": (
+        '<!DOCTYPE html><html><head><meta charset="utf-8"><title>电费查询</title>'
+        '</head><body>{filler}<input type="hidden" id="roomdef" '
+        'left-degree="{power}"/></body></html>'
+    ),
+}
+
+# 未知房间或注入"页面异常"时返回的页面
+_EMPTY_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>电费查询</title></head>
+<body><p>未查询到房间信息</p>{filler}</body></html>"""
+
+_FILLER = "\n".join(
+    f'<div class="item"><span>通知 {i}</span><a href="#n{i}">查看</a></div>'
+    for i in range(40)
+)
+
+
+@dataclass
+class FakeServerOptions:
+    """模拟服务器选项"""
+
+    rooms: int = 1000
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    malformed_rate: float = 0.0
+    layouts: tuple[Layout, ...] = LAYOUTS
+    seed: int = 0
+
+
+@dataclass
+class _RoomModel:
+    """单个房间的消耗模型参数"""
+
+    daily_kwh: float
+    low_kwh: float
+    recharge_kwh: float
+    phase_kwh: float
+    layout: Layout
+
+
+def _consumed_kwh(daily_kwh: float, hours: float) -> float:
+    """从纪元零点起累计消耗（度）
+
+    用电速率 = 日均速率 × (1 + 0.6·sin((h - 14) / 24 · 2π))，与合成历史一致，
+    这里取其积分的解析式，因此任意时刻都可直接计算。
+    """
+    amplitude = 0.6 * 24 / (2 * math.pi)
+    angle = 2 * math.pi / 24
+    diurnal = amplitude * (math.cos(-14 * angle) - math.cos((hours - 14) * angle))
+    return daily_kwh / 24 * (hours + diurnal)
+
+
+class FakeECUSTServer:
+    """模拟 ECUST 电费查询服务器"""
+
+    def __init__(
+        self,
+        options: FakeServerOptions | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        """初始化服务器（立即绑定端口，start() 后开始响应）
+
+        Args:
+            options: 服务器选项
+            host: 监听地址
+            port: 监听端口（0 表示随机端口）
+        """
+        self.options = options or FakeServerOptions()
+        self.requests_served = 0
+        self.errors_injected = 0
+        self.connections_accepted = 0
+        self._stats_lock = threading.Lock()
+        self._rng = random.Random(self.options.seed)
+        self._rng_lock = threading.Lock()
+        self._models: dict[str, _RoomModel] = {}
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        """查询接口地址（可直接作为客户端的 base_url）"""
+        host, port = self._server.server_address[:2]
+        if isinstance(host, bytes):
+            host = host.decode()
+        return f"http://{host}:{port}{API_PATH}"
+
+    def room_ids(self) -> list[str]:
+        """全部合成房间号"""
+        return [str(ROOM_ID_BASE + i) for i in range(self.options.rooms)]
+
+    def power_at(self, roomid: str, when: datetime) -> float | None:
+        """房间在指定时刻的剩余电量
+
+        Args:
+            roomid: 房间号
+            when: 时刻
+
+        Returns:
+            剩余电量（度，保留两位小数），未知房间返回 None
+        """
+        model = self._model(roomid)
+        if model is None:
+            return None
+
+        hours = when.timestamp() / 3600
+        remaining = (model.phase_kwh - _consumed_kwh(model.daily_kwh, hours)) % (
+            model.recharge_kwh
+        )
+        return round(model.low_kwh + remaining, 2)
+
+    def start(self) -> "FakeECUSTServer":
+        """在后台线程中开始响应请求"""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"模拟服务器已启动: {self.url}（{self.options.rooms} 个房间）")
+        return self
+
+    def serve_forever(self) -> None:
+        """在当前线程中响应请求（阻塞，直到 KeyboardInterrupt）"""
+        logger.info(f"模拟服务器已启动: {self.url}（{self.options.rooms} 个房间）")
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        """停止服务器并释放端口"""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeECUSTServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _model(self, roomid: str) -> _RoomModel | None:
+        """房间模型（由种子和房间号确定，首次访问时生成）"""
+        model = self._models.get(roomid)
+        if model is not None:
+            return model
+
+        if not roomid.isdigit():
+            return None
+        index = int(roomid) - ROOM_ID_BASE
+        if not 0 <= index < self.options.rooms:
+            return None
+
+        digest = hashlib.sha256(f"{self.options.seed}:{roomid}".encode()).digest()
+        rng = random.Random(digest)
+        recharge_kwh = rng.choice((50.0, 100.0, 150.0, 200.0))
+        model = _RoomModel(
+            daily_kwh=rng.uniform(2.0, 12.0),
+            low_kwh=rng.uniform(1.0, 15.0),
+            recharge_kwh=recharge_kwh,
+            phase_kwh=rng.uniform(0, recharge_kwh),
+            layout=self.options.layouts[index % len(self.options.layouts)],
+        )
+        self._models[roomid] = model
+        return model
+
+    def _respond(self, query: dict[str, list[str]]) -> tuple[int, str]:
+        """生成响应 (状态码, 页面)"""
+        options = self.options
+        with self._rng_lock:
+            delay = options.latency_ms + self._rng.uniform(0, options.jitter_ms)
+            roll = self._rng.random()
+
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+        if roll < options.error_rate:
+            with self._stats_lock:
+                self.errors_injected += 1
+            status = 503 if roll < options.error_rate / 2 else 500
+            return status, "Service Unavailable"
+
+        roomid = query.get("roomid", [""])[0]
+        power = self.power_at(roomid, datetime.now())
+        if power is None or roll < options.error_rate + options.malformed_rate:
+            if power is not None:
+                with self._stats_lock:
+                    self.errors_injected += 1
+            return 200, _EMPTY_PAGE.format(filler=_FILLER)
+
+        page = _PAGES[self._models[roomid].layout]
+        return 200, page.format(power=f"{power:.2f}", filler=_FILLER)
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class FakeECUSTHandler(BaseHTTPRequestHandler):
+            # 支持 keep-alive，客户端复用会话时不必每次重新建立连接
+            protocol_version = "HTTP/1.1"
+
+            def setup(self) -> None:
+                super().setup()
+                with server._stats_lock:
+                    server.connections_accepted += 1
+
+            def do_GET(self) -> None:  # noqa: N802 - http.server 约定的方法名
+                parts = urlsplit(self.path)
+                if parts.path != API_PATH:
+                    self.send_error(404)
+                    return
+
+                status, page = server._respond(parse_qs(parts.query))
+                with server._stats_lock:
+                    server.requests_served += 1
+
+                body = page.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:
+                logger.trace(f"fake-server: {format % args}")
+
+        return FakeECUSTHandler
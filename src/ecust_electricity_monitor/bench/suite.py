@@ -0,0 +1,447 @@
+"""基准测试套件
+
+在合成历史上测量存储、分析（含各分析后端对比）、报告图表、HTML 解析和抓取的
+耗时（抓取经由本地模拟服务器，无需网络）。结果为可序列化为 JSON 的字典，
+便于保存基线并对比两次运行。
+
+每个用例重复 repeat 次，准备工作（复制数据文件、构造分析器等）不计时，
+报告最小值、中位数和平均值；对比时使用中位数。运行期间屏蔽本包日志，
+避免日志输出影响测量。
+"""
+
+import platform
+import shutil
+import statistics
+import tempfile
+import time
+from collections import deque
+from collections.abc import Callable, Iterable
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from .. import __version__
+from ..analytics import PowerAnalyzer
+from ..analytics.backends import available_backends, get_backend
+from ..client import ElectricityClient
+from ..constants import TIMESTAMP_FORMAT
+from ..logger import logger
+from ..models import ElectricityRecord, ReportData, RoomQuery
+from ..reporter import HTMLReporter
+from ..storage import CSVRepository
+from .fake_server import FakeECUSTServer, FakeServerOptions
+from .synthetic import generate_history
+
+# 运行期间屏蔽日志的包名
+_PACKAGE = __name__.split(".")[0]
+
+# JSON 结果格式版本（结构变化时递增）
+SCHEMA_VERSION = 2
+
+# 默认数据规模与重复次数
+DEFAULT_ROWS = (1_000, 10_000)
+DEFAULT_REPEAT = 5
+
+# 完整规模（emon bench --full）：覆盖多年高频采集的历史，单轮耗时较长
+FULL_ROWS = (10_000, 100_000, 1_000_000)
+
+# 报告用例额外测量的数据规模（大历史下的 HTML 体积和生成耗时）
+REPORT_ROWS = 100_000
+
+# save 用例每轮追加的记录数
+SAVE_BATCH = 50
+
+# 全量读取用例：结果表中额外显示吞吐量（行/秒）
+THROUGHPUT_CASES = frozenset(
+    {"storage.find_all", "storage.scan_rows", "storage.scan_columns"}
+)
+
+# 模拟查询页面：目标元素前后填充无关标记，接近真实页面的解析量
+_HTML_TEMPLATE = """<!DOCTYPE html>
+<html><head><title>电费查询</title></head><body>
+{filler}
+<form><input type="hidden" id="roomdef" left-degree="{power}" /></form>
+{filler}
+</body></html>"""
+_HTML_FILLER = "\n".join(
+    f'<div class="row"><span>item {i}</span><a href="#{i}">link</a></div>'
+    for i in range(200)
+)
+
+
+@dataclass
+class BenchResult:
+    """单个用例的测量结果（秒）
+
+    output_bytes 为产出文件大小（字节），仅报告用例记录。
+    """
+
+    name: str
+    rows: int
+    repeat: int
+    min: float
+    median: float
+    mean: float
+    output_bytes: int | None = None
+
+
+def _measure(
+    name: str,
+    rows: int,
+    repeat: int,
+    func: Callable[[Any], object],
+    setup: Callable[[], Any] = lambda: None,
+) -> BenchResult:
+    """重复执行并统计耗时
+
+    Args:
+        name: 用例名称
+        rows: 数据规模
+        repeat: 重复次数
+        func: 被测函数，参数为 setup 的返回值
+        setup: 每轮执行前的准备函数（不计时）
+
+    Returns:
+        测量结果
+    """
+    samples = []
+    for _ in range(repeat):
+        arg = setup()
+        start = time.perf_counter()
+        func(arg)
+        samples.append(time.perf_counter() - start)
+    return BenchResult(
+        name=name,
+        rows=rows,
+        repeat=repeat,
+        min=min(samples),
+        median=statistics.median(samples),
+        mean=statistics.fmean(samples),
+    )
+
+
+def _write_csv(path: Path, records: list[ElectricityRecord]) -> None:
+    """按仓储格式直接写入 CSV（时间正序）"""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("timestamp,power,alert_sent\n")
+        for r in reversed(records):
+            f.write(f"{r.timestamp.strftime(TIMESTAMP_FORMAT)},{r.power},False\n")
+
+
+def _storage_cases(
+    rows: int, repeat: int, records: list[ElectricityRecord], workdir: Path
+) -> list[BenchResult]:
+    """存储用例（每轮使用原始数据文件的新副本）"""
+    source = workdir / f"source_{rows}.csv"
+    _write_csv(source, records)
+    newest = records[0].timestamp
+    cutoff = records[len(records) // 2].timestamp
+
+    def fresh_repo() -> CSVRepository:
+        path = workdir / f"bench_{rows}.csv"
+        for sidecar in workdir.glob(f"bench_{rows}.*"):
+            sidecar.unlink()
+        shutil.copyfile(source, path)
+        repo = CSVRepository(path)
+        # 预热派生数据，save 只测量增量更新
+        repo.analytics()
+        repo.find_rollups("day")
+        return repo
+
+    def save_batch(repo: CSVRepository) -> None:
+        for i in range(1, SAVE_BATCH + 1):
+            repo.save(
+                ElectricityRecord(
+                    timestamp=newest + timedelta(minutes=i), power=100.0 - i * 0.01
+                )
+            )
+
+    save = _measure("storage.save", rows, repeat, save_batch, fresh_repo)
+    # 换算为单条记录的耗时
+    save.min, save.median, save.mean = (
+        v / SAVE_BATCH for v in (save.min, save.median, save.mean)
+    )
+
+    repo = fresh_repo()
+    return [
+        save,
+        _measure("storage.find_latest", rows, repeat, lambda _: repo.find_latest()),
+        _measure(
+            "storage.find_recent", rows, repeat, lambda _: repo.find_recent(days=7)
+        ),
+        _measure("storage.count", rows, repeat, lambda _: repo.count()),
+        _measure("storage.find_all", rows, repeat, lambda _: repo.find_all()),
+        _measure(
+            "storage.scan_rows", rows, repeat, lambda _: deque(repo.scan_rows(), 0)
+        ),
+        _measure(
+            "storage.scan_columns",
+            rows,
+            repeat,
+            lambda _: deque(repo.scan_columns(), 0),
+        ),
+        _measure(
+            "storage.delete_before",
+            rows,
+            repeat,
+            lambda r: r.delete_before(cutoff),
+            fresh_repo,
+        ),
+    ]
+
+
+def _analyzer_cases(
+    rows: int, repeat: int, records: list[ElectricityRecord]
+) -> list[BenchResult]:
+    """分析器用例（每轮新建分析器，包含列式转换等首次计算）"""
+
+    def analyzer() -> PowerAnalyzer:
+        return PowerAnalyzer(records)
+
+    methods: dict[str, Callable[[PowerAnalyzer], object]] = {
+        "analyzer.get_statistics": lambda a: a.get_statistics(),
+        "analyzer.calculate_trend": lambda a: a.calculate_trend(),
+        "analyzer.calculate_daily_consumption": lambda a: (
+            a.calculate_daily_consumption()
+        ),
+        "analyzer.estimate_remaining_days": lambda a: a.estimate_remaining_days(),
+        "analyzer.calculate_step_rates": lambda a: a.calculate_step_rates(),
+        "analyzer.resample_daily": lambda a: a.resample_daily(),
+    }
+    results = [
+        _measure(name, rows, repeat, func, analyzer) for name, func in methods.items()
+    ]
+
+    def warmed() -> PowerAnalyzer:
+        # 首次计算趋势时构建前缀和，之后的查询只做二分查找
+        a = PowerAnalyzer(records)
+        a.calculate_trend()
+        return a
+
+    results += [
+        _measure(
+            "analyzer.calculate_trend_cached",
+            rows,
+            repeat,
+            lambda a: a.calculate_trend(window_days=30),
+            warmed,
+        ),
+        _measure(
+            "analyzer.calculate_trend_theil_sen",
+            rows,
+            repeat,
+            lambda a: a.calculate_trend(window_days=30, method="theil_sen"),
+            warmed,
+        ),
+    ]
+    return results
+
+
+def _backend_cases(
+    rows: int, repeat: int, records: list[ElectricityRecord]
+) -> list[BenchResult]:
+    """分析后端对比用例（当前环境可用的每个后端，名称为 backend.<后端>.<操作>）"""
+    operations: dict[str, Callable[[PowerAnalyzer], object]] = {
+        "prepare": lambda a: a.columns,
+        "statistics": lambda a: a.get_statistics(),
+        "daily_consumption": lambda a: a.calculate_daily_consumption(days=30),
+        "step_rates": lambda a: a.calculate_step_rates(),
+        "resample_daily": lambda a: a.resample_daily(),
+    }
+    results = []
+    for backend in available_backends():
+
+        def analyzer(backend: str = backend) -> PowerAnalyzer:
+            return PowerAnalyzer(records, backend=backend)
+
+        results += [
+            _measure(f"backend.{backend}.{name}", rows, repeat, func, analyzer)
+            for name, func in operations.items()
+        ]
+    return results
+
+
+def _report_cases(
+    rows: int, repeat: int, records: list[ElectricityRecord], workdir: Path
+) -> list[BenchResult]:
+    """报告生成用例（HTMLReporter.generate 全流程，含模板渲染和写文件）
+
+    默认配置（LTTB 降采样 + 包络）之外，对比不降采样和不绘制包络的情况。
+    plotly.js 使用 CDN 引用，记录的文件大小不含约 3.5MB 的库本身。
+    """
+    data = ReportData(
+        records=records,
+        statistics=PowerAnalyzer(records).get_statistics(),
+        metadata={"threshold": "10"},
+    )
+    reporters = {
+        "report.generate": HTMLReporter(workdir, plotlyjs="cdn"),
+        "report.generate_raw": HTMLReporter(
+            workdir, plotlyjs="cdn", max_points=0, webgl_threshold=10**9
+        ),
+        "report.generate_no_envelope": HTMLReporter(
+            workdir, plotlyjs="cdn", show_envelope=False
+        ),
+    }
+
+    results = []
+    for name, reporter in reporters.items():
+        filename = f"{name}-{rows}.html"
+
+        def render(
+            _: object, reporter: HTMLReporter = reporter, filename: str = filename
+        ) -> None:
+            reporter.generate(data, filename=filename)
+
+        result = _measure(name, rows, repeat, render)
+        result.output_bytes = (workdir / filename).stat().st_size
+        results.append(result)
+    return results
+
+
+def _parse_case(repeat: int) -> BenchResult:
+    """查询页面 HTML 解析用例（与数据规模无关）"""
+    client = ElectricityClient(sysid="", roomid="", areaid="", buildid="")
+    html = _HTML_TEMPLATE.format(filler=_HTML_FILLER, power="123.45")
+    return _measure(
+        "client.parse_html", 0, repeat, lambda _: client._parse_power_from_html(html)
+    )
+
+
+def _fetch_case(repeat: int) -> BenchResult:
+    """完整抓取用例：经本地模拟服务器的 HTTP 往返 + 解析 + 校验"""
+    with FakeECUSTServer(FakeServerOptions(rooms=1)) as server:
+        client = ElectricityClient(
+            sysid="",
+            roomid=server.room_ids()[0],
+            areaid="",
+            buildid="",
+            max_retries=0,
+            base_url=server.url,
+        )
+        return _measure("client.fetch", 0, repeat, lambda _: client.fetch())
+
+
+def _fetch_many_case(repeat: int, rooms: int = 50) -> BenchResult:
+    """批量抓取用例：多个楼栋的房间经本地模拟服务器（每次 2 毫秒延迟）"""
+    options = FakeServerOptions(rooms=rooms, latency_ms=2)
+    with FakeECUSTServer(options) as server:
+        client = ElectricityClient(
+            sysid="",
+            roomid="",
+            areaid="",
+            buildid="",
+            max_retries=0,
+            base_url=server.url,
+        )
+        queries = [
+            RoomQuery(roomid=roomid, areaid="", buildid=str(i % 5))
+            for i, roomid in enumerate(server.room_ids())
+        ]
+        return _measure(
+            "client.fetch_many", rooms, repeat, lambda _: client.fetch_many(queries)
+        )
+
+
+def _wants(group: str, only: str | None) -> bool:
+    """用例组是否可能包含匹配 only 前缀的用例"""
+    return not only or group.startswith(only) or only.startswith(group)
+
+
+def run_suite(
+    rows: Iterable[int] = DEFAULT_ROWS,
+    repeat: int = DEFAULT_REPEAT,
+    only: str | None = None,
+    seed: int = 0,
+    report_rows: int | None = REPORT_ROWS,
+) -> dict:
+    """运行基准测试套件
+
+    Args:
+        rows: 各轮合成历史的记录数
+        repeat: 每个用例的重复次数
+        only: 只运行名称以此前缀开头的用例（如 "storage"）
+        seed: 合成数据随机种子
+        report_rows: 报告用例额外运行的数据规模（已在 rows 中或为 None 时跳过）
+
+    Returns:
+        可 JSON 序列化的结果（含运行环境信息）
+    """
+    # 数据终点取当天零点：读数序列只由种子决定，find_recent 等相对当前时间的
+    # 查询也能命中数据
+    end_time = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    sizes = tuple(rows)
+
+    results: list[BenchResult] = []
+    logger.disable(_PACKAGE)
+    try:
+        with tempfile.TemporaryDirectory(prefix="emon-bench-") as tmp:
+            workdir = Path(tmp)
+            for size in sizes:
+                records = generate_history(size, end_time=end_time, seed=seed)
+                if _wants("storage", only):
+                    results += _storage_cases(size, repeat, records, workdir)
+                if _wants("analyzer", only):
+                    results += _analyzer_cases(size, repeat, records)
+                if _wants("backend", only):
+                    results += _backend_cases(size, repeat, records)
+                if _wants("report", only):
+                    results += _report_cases(size, repeat, records, workdir)
+            if report_rows and report_rows not in sizes and _wants("report", only):
+                records = generate_history(report_rows, end_time=end_time, seed=seed)
+                results += _report_cases(report_rows, repeat, records, workdir)
+            if _wants("client", only):
+                results.append(_parse_case(repeat))
+                results.append(_fetch_case(repeat))
+                results.append(_fetch_many_case(repeat))
+    finally:
+        logger.enable(_PACKAGE)
+
+    if only:
+        results = [r for r in results if r.name.startswith(only)]
+
+    return {
+        "schema": SCHEMA_VERSION,
+        "version": __version__,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "analytics_backend": get_backend("auto").name,
+        "seed": seed,
+        "results": [asdict(r) for r in results],
+    }
+
+
+def compare_results(
+    baseline: dict, current: dict, threshold: float = 0.2
+) -> list[dict]:
+    """对比两次运行的中位数耗时
+
+    Args:
+        baseline: 基线结果（run_suite 的返回值）
+        current: 本次结果
+        threshold: 判定为性能回退的相对变慢比例（0.2 表示慢 20%）
+
+    Returns:
+        两次都包含的用例对比，每项含 name、rows、baseline、current、
+        change（相对变化）和 regression（是否回退）
+    """
+    previous = {(r["name"], r["rows"]): r["median"] for r in baseline["results"]}
+    comparisons = []
+    for r in current["results"]:
+        before = previous.get((r["name"], r["rows"]))
+        if before is None:
+            continue
+        change = (r["median"] - before) / before if before > 0 else 0.0
+        comparisons.append(
+            {
+                "name": r["name"],
+                "rows": r["rows"],
+                "baseline": before,
+                "current": r["median"],
+                "change": change,
+                "regression": change > threshold,
+            }
+        )
+    return comparisons
@@ -0,0 +1,68 @@
+"""合成数据生成
+
+生成可复现的合成电量历史，用于基准测试和压力测试。
+消耗模型：白天/夜间不同的用电速率 + 随机噪声，电量过低时自动充值。
+"""
+
+import math
+import random
+from datetime import datetime, timedelta
+
+from ..constants import MAX_POWER_VALUE, MIN_POWER_VALUE
+from ..models import ElectricityRecord
+
+
+def generate_history(
+    rows: int,
+    interval_minutes: float = 60.0,
+    end_time: datetime | None = None,
+    start_power: float = 200.0,
+    daily_kwh: float = 6.0,
+    noise_kwh: float = 0.05,
+    recharge_below: float = 15.0,
+    recharge_kwh: float = 150.0,
+    seed: int = 0,
+) -> list[ElectricityRecord]:
+    """生成合成电量历史
+
+    Args:
+        rows: 记录条数
+        interval_minutes: 采样间隔（分钟）
+        end_time: 最后一条记录的时间（默认当前整秒时间）
+        start_power: 初始电量（度）
+        daily_kwh: 平均日消耗（度）
+        noise_kwh: 读数噪声幅度（度）
+        recharge_below: 电量低于此值时充值
+        recharge_kwh: 每次充值量（度）
+        seed: 随机种子
+
+    Returns:
+        电量记录列表（按时间降序，与仓储查询结果一致）
+    """
+    rng = random.Random(seed)
+    end_time = end_time or datetime.now().replace(microsecond=0)
+    step = timedelta(minutes=interval_minutes)
+    start_time = end_time - step * max(rows - 1, 0)
+    per_step = daily_kwh * interval_minutes / 1440
+
+    records = []
+    power = start_power
+    for i in range(rows):
+        timestamp = start_time + step * i
+        # 晚间用电高峰：按一天中的时刻调制消耗速率
+        hour = timestamp.hour + timestamp.minute / 60
+        load = 1 + 0.6 * math.sin((hour - 14) / 24 * 2 * math.pi)
+        power -= per_step * load
+        if power < recharge_below:
+            power += recharge_kwh
+        reading = power + rng.uniform(-noise_kwh, noise_kwh)
+        records.append(
+            ElectricityRecord(
+                timestamp=timestamp,
+                power=min(max(reading, MIN_POWER_VALUE), MAX_POWER_VALUE),
+                alert_sent=False,
+            )
+        )
+
+    records.reverse()
+    return records
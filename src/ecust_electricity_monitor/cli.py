@@ -8,19 +8,27 @@
 由 commands 包提供所有命令实现，遵循模块化和单一职责原则。
 """
 
+import time
 from typing import Annotated
 
 import typer
 
+from . import timing
 from .commands import (
     alert_command,
+    bench_command,
+    export_command,
+    fake_server_command,
     fetch_command,
     info_command,
     init_command,
+    reparse_command,
     report_command,
     schedule_command,
+    status_command,
     version_callback,
 )
+from .commands.display import display_timings
 from .config import ROOT_DIR, config
 from .logger import setup_logging
 
@@ -34,6 +42,7 @@ app = typer.Typer(
 
 @app.callback()
 def main(
+    ctx: typer.Context,
     version: Annotated[
         bool,
         typer.Option(
@@ -44,6 +53,9 @@ def main(
             is_eager=True,
         ),
     ] = None,
+    timings: Annotated[
+        bool, typer.Option("--timings", help="退出时输出各阶段耗时表")
+    ] = False,
 ) -> None:
     """⚡ ECUST 宿舍电量监控系统"""
     # 初始化日志
@@ -52,14 +64,27 @@ def main(
         log_dir=ROOT_DIR / config.storage.data_dir / "logs",
     )
 
+    # 耗时统计：命令结束（含异常退出）时输出
+    if timings:
+        timing.enable()
+        start = time.perf_counter()
+        ctx.call_on_close(
+            lambda: display_timings(timing.snapshot(), time.perf_counter() - start)
+        )
+
 
 # 注册命令
 app.command(name="fetch")(fetch_command)
 app.command(name="alert")(alert_command)
 app.command(name="report")(report_command)
+app.command(name="export")(export_command)
+app.command(name="reparse")(reparse_command)
+app.command(name="bench")(bench_command)
+app.command(name="fake-server")(fake_server_command)
 app.command(name="schedule")(schedule_command)
 app.command(name="init")(init_command)
 app.command(name="info")(info_command)
+app.command(name="status")(status_command)
 
 
 if __name__ == "__main__":
@@ -1,9 +1,10 @@
 """电量客户端模块
 
 职责：
-- 从 ECUST API 获取电量数据
+- 从 ECUST API 获取电量数据（单个房间或按楼栋批量）
 - 解析 HTML 响应
-- 重试机制和错误处理
+- 重试机制和错误处理（共享熔断器与重试预算）
+- 复用 HTTP 会话，合并重复的查询请求，可选的磁盘结果缓存
 
 遵循 SOLID 原则：
 - 单一职责：只负责数据获取
@@ -11,12 +12,19 @@
 - 依赖倒置：返回 FetchResult 抽象模型
 """
 
+import threading
 import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AbstractContextManager, nullcontext
 from datetime import datetime
+from urllib.parse import urlsplit
 
 import requests
 from bs4 import BeautifulSoup
 
+from .archive import ResponseArchive
+from .coalesce import RequestCoalescer
 from .constants import (
     ELECTRICITY_API_URL,
 )
@@ -26,9 +34,24 @@ from .constants import (
 from .constants import (
     RETRY_BACKOFF_FACTOR as DEFAULT_RETRY_BACKOFF_FACTOR,
 )
-from .exceptions import ClientError, ValidationError
+from .exceptions import CircuitOpenError, ClientError, ValidationError
+from .fetch_cache import FetchCache
 from .logger import logger
-from .models import FetchResult
+from .metrics import (
+    FETCH_ATTEMPTS,
+    FETCH_CACHE_HITS,
+    FETCH_FAILURES,
+    FETCH_LATENCY,
+    FETCH_RETRIES,
+    FETCH_SHORT_CIRCUITED,
+    FETCH_SUCCESSES,
+    PARSE_TIME,
+    RETRY_BUDGET_EXHAUSTED,
+)
+from .models import FetchResult, RoomQuery
+from .ratelimit import RateLimiter
+from .resilience import CircuitBreaker, RetryBudget
+from .timing import span, timed
 
 
 class ElectricityClient:
@@ -36,6 +59,9 @@ class ElectricityClient:
 
     从 ECUST 电费查询系统获取宿舍剩余电量。
     支持重试和指数退避策略。
+
+    构造参数中的 roomid / areaid / buildid 是 fetch() 查询的房间；
+    fetch_many() 使用同一 sysid 与接口地址批量查询其他房间。
     """
 
     def __init__(
@@ -47,6 +73,13 @@ class ElectricityClient:
         timeout: int = 10,
         max_retries: int = DEFAULT_MAX_RETRIES,
         backoff_factor: float = DEFAULT_RETRY_BACKOFF_FACTOR,
+        base_url: str = ELECTRICITY_API_URL,
+        breaker: CircuitBreaker | None = None,
+        retry_budget: RetryBudget | None = None,
+        limiter: RateLimiter | None = None,
+        coalescer: RequestCoalescer | None = None,
+        cache: FetchCache | None = None,
+        archive: ResponseArchive | None = None,
     ):
         """初始化电量客户端
 
@@ -58,6 +91,13 @@ class ElectricityClient:
             timeout: 请求超时时间（秒）
             max_retries: 最大重试次数
             backoff_factor: 指数退避因子
+            base_url: 查询接口地址（可指向本地模拟服务器）
+            breaker: 熔断器（多个房间的客户端应共享同一实例）
+            retry_budget: 重试预算（多个房间的客户端应共享同一实例）
+            limiter: 限流器（多个房间的客户端应共享同一实例）
+            coalescer: 请求合并器（多个任务的客户端应共享同一实例）
+            cache: 查询结果的磁盘缓存（多个进程之间共享）
+            archive: 原始响应归档（保存完整页面，供重新解析）
         """
         self.sysid = sysid
         self.roomid = roomid
@@ -66,87 +106,293 @@ class ElectricityClient:
         self.timeout = timeout
         self.max_retries = max_retries
         self.backoff_factor = backoff_factor
+        self.base_url = base_url
+        self.breaker = breaker
+        self.retry_budget = retry_budget
+        self.limiter = limiter
+        self.coalescer = coalescer
+        self.cache = cache
+        self.archive = archive
+        # 每个线程按主机各持有一个会话（requests.Session 不保证线程安全）
+        self._local = threading.local()
 
     def fetch(self) -> FetchResult:
         """获取电量数据
 
-        使用指数退避重试策略。
+        使用指数退避重试策略。配置了熔断器时，熔断期间直接失败；
+        冷却后的探测请求不重试。配置了重试预算时，预算耗尽后不再重试。
 
         Returns:
             FetchResult 对象，包含电量值或错误信息
+
+        Raises:
+            CircuitOpenError: 熔断器打开，未发出请求
+            ClientError: 重试后仍然失败
         """
+        room = RoomQuery(roomid=self.roomid, areaid=self.areaid, buildid=self.buildid)
+        return self._fetch_room(room)
+
+    def fetch_many(
+        self, rooms: Iterable[RoomQuery], max_workers: int = 4
+    ) -> dict[RoomQuery, FetchResult]:
+        """批量获取多个房间的电量
+
+        - 相同房间（roomid、areaid、buildid 均相同）只查询一次
+        - 按楼栋 (areaid, buildid) 分组，每组在一个线程内顺序查询并复用会话，
+          不同楼栋并行（并发与速率仍受限流器约束）
+        - 单个房间失败不影响其他房间，以 success=False 的结果返回
+
+        Args:
+            rooms: 房间查询参数
+            max_workers: 并行查询的楼栋数
+
+        Returns:
+            查询参数 → 查询结果（按首次出现的顺序，结果中含各房间的耗时）
+        """
+        # dict.fromkeys 去重并保留首次出现的顺序
+        unique = list(dict.fromkeys(rooms))
+
+        buildings: dict[tuple[str, str], list[RoomQuery]] = {}
+        for room in unique:
+            buildings.setdefault(room.building, []).append(room)
+
+        results: dict[RoomQuery, FetchResult] = {}
+
+        def fetch_building(members: list[RoomQuery]) -> None:
+            for room in members:
+                results[room] = self._fetch_or_failure(room)
+
+        with span("client.fetch_many"):
+            workers = max(1, min(max_workers, len(buildings)))
+            with ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="emon-fetch"
+            ) as pool:
+                # list() 使线程中的异常在这里抛出
+                list(pool.map(fetch_building, buildings.values()))
+
+        return {room: results[room] for room in unique}
+
+    def _fetch_or_failure(self, room: RoomQuery) -> FetchResult:
+        """查询单个房间，失败时返回 success=False 的结果"""
+        start = time.perf_counter()
+        try:
+            return self._fetch_room(room)
+        except ClientError as e:
+            return FetchResult(
+                power=0.0,
+                timestamp=datetime.now(),
+                source=self.base_url,
+                success=False,
+                error_message=str(e),
+                elapsed_seconds=time.perf_counter() - start,
+            )
+
+    def _fetch_room(self, room: RoomQuery) -> FetchResult:
+        """查询单个房间
+
+        依次尝试磁盘缓存、与其他任务合并，最后才实际发出请求。
+        """
+        key = (self.base_url, self.sysid, room.areaid, room.buildid, room.roomid)
+        if self.cache is not None:
+            cached = self.cache.get(room.roomid, key)
+            if cached is not None:
+                FETCH_CACHE_HITS.inc(room=room.roomid)
+                return cached
+
+        if self.coalescer is None:
+            result = self._fetch_uncoalesced(room)
+        else:
+            result = self.coalescer.run(
+                key, lambda: self._fetch_uncoalesced(room), room=room.roomid
+            )
+
+        if self.cache is not None:
+            self.cache.put(room.roomid, key, result)
+        return result
+
+    @timed("client.fetch")
+    def _fetch_uncoalesced(self, room: RoomQuery) -> FetchResult:
+        """实际发出请求（含熔断、重试与限流）"""
+        start = time.perf_counter()
         last_exception: Exception | None = None
         last_response_text: str | None = None
 
-        for attempt in range(self.max_retries + 1):
-            try:
-                logger.debug(
-                    f"尝试获取电量数据 (第 {attempt + 1}/{self.max_retries + 1} 次)"
-                )
-
-                # 构造请求参数
-                params = {
-                    "sysid": self.sysid,
-                    "roomid": self.roomid,
-                    "areaid": self.areaid,
-                    "buildid": self.buildid,
-                }
-
-                # 发送 GET 请求
-                response = requests.get(
-                    ELECTRICITY_API_URL,
-                    params=params,
-                    timeout=self.timeout,
-                )
-                response.raise_for_status()
-                last_response_text = response.text
-
-                # 解析 HTML
-                power = self._parse_power_from_html(response.text)
-
-                # 验证电量值
-                from .analytics import validate_power_value
-
-                validate_power_value(power)
-
-                # 成功返回
-                logger.info(f"成功获取电量: {power} 度")
-                return FetchResult(
-                    power=power,
-                    timestamp=datetime.now(),
-                    source=ELECTRICITY_API_URL,
-                    raw_response=response.text[:500],  # 只保存前500字符
-                    success=True,
-                )
-
-            except (requests.RequestException, ValidationError, ValueError) as e:
-                last_exception = e
-                logger.warning(f"获取电量失败 (第 {attempt + 1} 次): {e}")
-
-                # 如果还有重试机会，等待后重试
-                if attempt < self.max_retries:
-                    wait_time = self.backoff_factor * (2**attempt)
-                    logger.debug(f"等待 {wait_time:.1f} 秒后重试...")
-                    time.sleep(wait_time)
-                else:
-                    # 所有重试都失败，返回失败结果
-                    logger.error(
-                        f"获取电量失败，已达最大重试次数 ({self.max_retries + 1})"
+        roomid = room.roomid
+        breaker = self.breaker
+
+        # 熔断期间快速失败，不发出请求
+        if breaker is not None and not breaker.allow_request():
+            FETCH_SHORT_CIRCUITED.inc(room=roomid)
+            raise CircuitOpenError(message="熔断器已打开，跳过本次查询")
+
+        # 半开状态的探测请求只发一次，由它决定是否恢复
+        max_retries = self.max_retries
+        if breaker is not None and breaker.state == "half_open":
+            max_retries = 0
+
+        if self.retry_budget is not None:
+            self.retry_budget.record_request()
+
+        # 任何退出路径（包括限流器、归档等抛出的意外异常）都要向熔断器
+        # 反馈结果，否则半开状态的探测资格不会释放，熔断器一直拒绝请求
+        outcome_recorded = False
+        try:
+            for attempt in range(max_retries + 1):
+                FETCH_ATTEMPTS.inc(room=roomid)
+                if attempt > 0:
+                    FETCH_RETRIES.inc(room=roomid)
+
+                try:
+                    logger.debug(
+                        f"尝试获取电量数据 (第 {attempt + 1}/{max_retries + 1} 次)"
+                    )
+
+                    # 构造请求参数
+                    params = {
+                        "sysid": self.sysid,
+                        "roomid": room.roomid,
+                        "areaid": room.areaid,
+                        "buildid": room.buildid,
+                    }
+
+                    # 发送 GET 请求（每次尝试都先经过限流器排队）
+                    with self._rate_limited():
+                        request_start = time.perf_counter()
+                        try:
+                            with span("client.http"):
+                                response = self._session().get(
+                                    self.base_url,
+                                    params=params,
+                                    timeout=self.timeout,
+                                )
+                        finally:
+                            FETCH_LATENCY.observe(
+                                time.perf_counter() - request_start, room=roomid
+                            )
+                    response.raise_for_status()
+                    last_response_text = response.text
+                    fetched_at = datetime.now()
+                    self._archive_response(room.roomid, fetched_at, response)
+
+                    # 解析 HTML
+                    parse_start = time.perf_counter()
+                    with span("client.parse"):
+                        power = self._parse_power_from_html(response.text)
+                    PARSE_TIME.observe(time.perf_counter() - parse_start)
+
+                    # 验证电量值
+                    from .analytics import validate_power_value
+
+                    with span("client.validate"):
+                        validate_power_value(power)
+
+                    # 成功返回
+                    logger.info(f"成功获取电量: {power} 度")
+                    FETCH_SUCCESSES.inc(room=roomid)
+                    outcome_recorded = True
+                    if breaker is not None:
+                        breaker.record_success()
+                    return FetchResult(
+                        power=power,
+                        timestamp=fetched_at,
+                        source=self.base_url,
+                        raw_response=response.text[:500],  # 只保存前500字符
+                        success=True,
+                        elapsed_seconds=time.perf_counter() - start,
                     )
-                    raise ClientError(
-                        message=f"获取电量失败: {last_exception}",
-                        retry_count=self.max_retries + 1,
-                        original_exception=last_exception,
-                        response_text=last_response_text,
-                    ) from last_exception
-
-        # 理论上不会到达这里
-        raise ClientError(
-            message="未知错误",
-            retry_count=self.max_retries + 1,
-        )
-
-    def _parse_power_from_html(self, html: str) -> float:
+
+                except (requests.RequestException, ValidationError, ValueError) as e:
+                    last_exception = e
+                    logger.warning(f"获取电量失败 (第 {attempt + 1} 次): {e}")
+
+                    # 如果还有重试机会，等待后重试
+                    if attempt < max_retries and self._may_retry(roomid):
+                        wait_time = self.backoff_factor * (2**attempt)
+                        logger.debug(f"等待 {wait_time:.1f} 秒后重试...")
+                        with span("client.backoff"):
+                            time.sleep(wait_time)
+                    else:
+                        # 放弃重试，返回失败结果
+                        FETCH_FAILURES.inc(room=roomid)
+                        logger.error(f"获取电量失败，共尝试 {attempt + 1} 次")
+                        outcome_recorded = True
+                        self._record_breaker_outcome(last_exception)
+                        raise ClientError(
+                            message=f"获取电量失败: {last_exception}",
+                            retry_count=attempt + 1,
+                            original_exception=last_exception,
+                            response_text=last_response_text,
+                        ) from last_exception
+
+            # 理论上不会到达这里
+            raise ClientError(
+                message="未知错误",
+                retry_count=max_retries + 1,
+            )
+        finally:
+            if breaker is not None and not outcome_recorded:
+                breaker.record_failure()
+
+    def _archive_response(
+        self, roomid: str, fetched_at: datetime, response: requests.Response
+    ) -> None:
+        """归档完整页面（包括解析失败的页面；归档失败不影响查询）"""
+        if self.archive is None:
+            return
+        try:
+            self.archive.append(
+                roomid,
+                fetched_at,
+                response.text,
+                url=self.base_url,
+                status=response.status_code,
+            )
+        except OSError as e:
+            logger.warning(f"归档响应失败: {e}")
+
+    def _session(self) -> requests.Session:
+        """当前线程访问接口主机所用的会话（复用连接）"""
+        sessions = getattr(self._local, "sessions", None)
+        if sessions is None:
+            sessions = self._local.sessions = {}
+        host = urlsplit(self.base_url).netloc
+        session = sessions.get(host)
+        if session is None:
+            session = sessions[host] = requests.Session()
+        return session
+
+    def _rate_limited(self) -> AbstractContextManager:
+        """限流许可（未配置限流器时不等待）"""
+        if self.limiter is None:
+            return nullcontext()
+        return self.limiter.acquire()
+
+    def _may_retry(self, roomid: str) -> bool:
+        """是否还可以重试（熔断器未被其他房间打开，且重试预算充足）"""
+        if self.breaker is not None and self.breaker.state == "open":
+            logger.debug("熔断器已打开，放弃重试")
+            return False
+        if self.retry_budget is not None and not self.retry_budget.try_spend():
+            RETRY_BUDGET_EXHAUSTED.inc(room=roomid)
+            logger.warning("重试预算已耗尽，放弃重试")
+            return False
+        return True
+
+    def _record_breaker_outcome(self, exception: Exception) -> None:
+        """把最终失败反馈给熔断器
+
+        只有网络错误和 HTTP 错误状态说明接口不可用；
+        页面解析或数值校验失败说明接口可达，不计入熔断。
+        """
+        if self.breaker is None:
+            return
+        if isinstance(exception, requests.RequestException):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    @staticmethod
+    def _parse_power_from_html(html: str) -> float:
         """从 HTML 中解析电量值
 
         Args:
@@ -0,0 +1,109 @@
+"""请求合并模块
+
+职责：
+- 同一房间正在进行中的查询只发一次，其余调用方等待同一结果
+- 查询成功后在短 TTL 内直接复用结果（多个任务先后查询同一房间时只请求一次）
+
+同一进程中的多个 ElectricityClient 应共享同一实例。
+失败结果不缓存：等待中的调用方收到同一个异常，之后的调用会重新请求。
+"""
+
+import threading
+import time
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+
+from .metrics import FETCH_COALESCED
+from .models import FetchResult
+
+
+@dataclass
+class _Entry:
+    """一次查询（进行中或已完成）"""
+
+    future: Future = field(default_factory=Future)
+    finished_at: float | None = None
+
+
+class RequestCoalescer:
+    """按键合并查询请求"""
+
+    def __init__(
+        self,
+        ttl_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """初始化请求合并器
+
+        Args:
+            ttl_seconds: 成功结果的复用时间（秒，0 表示只合并进行中的请求）
+            clock: 单调时钟（测试时可替换）
+        """
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: dict[Hashable, _Entry] = {}
+
+    def run(
+        self, key: Hashable, fetch: Callable[[], FetchResult], room: str = ""
+    ) -> FetchResult:
+        """执行查询或复用已有结果
+
+        Args:
+            key: 请求键（相同键视为同一请求）
+            fetch: 实际发出请求的函数
+            room: 房间标识（用于指标标签）
+
+        Returns:
+            查询结果
+
+        Raises:
+            Exception: fetch 抛出的异常（等待中的调用方收到同一个异常）
+        """
+        with self._lock:
+            self._expire()
+            existing = self._entries.get(key)
+            if existing is None:
+                entry = self._entries[key] = _Entry()
+
+        if existing is not None:
+            FETCH_COALESCED.inc(room=room)
+            return existing.future.result()
+
+        try:
+            result = fetch()
+        except BaseException as e:
+            with self._lock:
+                self._entries.pop(key, None)
+            entry.future.set_exception(e)
+            raise
+
+        with self._lock:
+            if self.ttl_seconds > 0:
+                entry.finished_at = self._clock()
+            else:
+                self._entries.pop(key, None)
+        entry.future.set_result(result)
+        return result
+
+    def clear(self) -> None:
+        """清空已完成的结果（进行中的请求不受影响）"""
+        with self._lock:
+            self._entries = {
+                key: entry
+                for key, entry in self._entries.items()
+                if entry.finished_at is None
+            }
+
+    def _expire(self) -> None:
+        """移除超过 TTL 的结果（调用方持有锁）"""
+        now = self._clock()
+        expired = [
+            key
+            for key, entry in self._entries.items()
+            if entry.finished_at is not None
+            and now - entry.finished_at >= self.ttl_seconds
+        ]
+        for key in expired:
+            del self._entries[key]
@@ -5,19 +5,29 @@
 
 from .alert import alert_command
 from .base import console, version_callback
+from .bench import bench_command
+from .export import export_command
+from .fake_server import fake_server_command
 from .fetch import fetch_command
 from .info import info_command
 from .init import init_command
+from .reparse import reparse_command
 from .report import report_command
 from .schedule import schedule_command
+from .status import status_command
 
 __all__ = [
     "alert_command",
+    "bench_command",
     "console",
+    "export_command",
+    "fake_server_command",
     "fetch_command",
     "info_command",
     "init_command",
+    "reparse_command",
     "report_command",
     "schedule_command",
+    "status_command",
     "version_callback",
 ]
@@ -7,9 +7,7 @@ from typing import Annotated
 
 import typer
 
-from ..analytics import PowerAnalyzer
 from ..config import config
-from ..models import AlertContext
 from ..notifiers import NotificationManager
 from ..storage import CSVRepository
 from .base import console
@@ -26,15 +24,15 @@ def alert_command(
 ) -> None:
     """检查电量并发送告警"""
     try:
-        # 读取历史数据
+        # 读取增量分析状态（无需扫描历史）
         storage = CSVRepository(config.storage.csv_path)
-        records = storage.find_recent(days=7)
+        state = storage.analytics()
+        current_record = state.latest
 
-        if not records:
+        if current_record is None:
             console.print("[yellow]⚠ 没有历史数据，请先运行 `emon fetch`[/yellow]")
             return
 
-        current_record = records[0]
         alert_threshold = threshold or config.app.alert_threshold_kwh
 
         # 检查是否需要告警
@@ -46,19 +44,7 @@ def alert_command(
             return  # ✅ 改为 return
 
         # 计算告警上下文
-        analyzer = PowerAnalyzer(records)
-        trend = analyzer.calculate_trend()
-        daily_consumption = analyzer.calculate_daily_consumption()
-        estimated_days = analyzer.estimate_remaining_days()
-
-        alert_context = AlertContext(
-            current_record=current_record,
-            threshold=alert_threshold,
-            trend=trend,
-            history=records[:10],
-            daily_consumption=daily_consumption,
-            estimated_days_remaining=estimated_days,
-        )
+        alert_context = state.build_alert_context(alert_threshold)
 
         # 显示告警信息
         display_alert_info(alert_context)
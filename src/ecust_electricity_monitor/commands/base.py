@@ -3,19 +3,33 @@
 提供所有命令共享的基础功能：
 - Rich console 实例
 - 配置检查函数
+- 共享限流器、熔断器、重试预算、响应归档
+- 多房间数据库写入
 - 版本回调
 """
 
+from functools import cache
+
 import typer
 from rich.console import Console
 from rich.panel import Panel
 
 from .. import __version__
+from ..archive import ResponseArchive
 from ..config import ENV_FILE, config
+from ..exceptions import StorageError
+from ..logger import logger
+from ..models import ElectricityRecord
+from ..ratelimit import RateLimiter
+from ..resilience import CircuitBreaker, RetryBudget
+from ..storage import ElectricityRepository, SQLiteRoomRepository
 
 # 全局 Rich console 实例
 console = Console()
 
+# 命令行接受的时间格式
+DATETIME_FORMATS = ["%Y-%m-%d", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S"]
+
 
 def check_api_config() -> None:
     """检查 API 配置是否完整
@@ -47,6 +61,93 @@ def check_api_config() -> None:
         raise typer.Exit(1)
 
 
+def create_rate_limiter() -> RateLimiter | None:
+    """根据 [api] 配置创建限流器
+
+    Returns:
+        未限制速率和并发时返回 None
+    """
+    api = config.api
+    limiter = RateLimiter(
+        rate=api.rate_limit_per_second,
+        burst=api.rate_limit_burst,
+        max_concurrency=api.max_concurrency,
+        state_file=api.rate_limit_state_path,
+    )
+    return limiter if limiter.enabled else None
+
+
+@cache
+def shared_circuit_breaker() -> CircuitBreaker:
+    """根据 [api] 配置创建熔断器（每个进程一个实例，所有客户端共享）"""
+    return CircuitBreaker(
+        failure_threshold=config.api.breaker_failure_threshold,
+        recovery_seconds=config.api.breaker_recovery_seconds,
+    )
+
+
+@cache
+def shared_retry_budget() -> RetryBudget:
+    """根据 [api] 配置创建重试预算（每个进程一个实例，所有客户端共享）"""
+    return RetryBudget(
+        ratio=config.api.retry_budget_ratio, burst=config.api.retry_budget_burst
+    )
+
+
+def create_response_archive() -> ResponseArchive | None:
+    """根据 [archive] 配置创建响应归档
+
+    Returns:
+        未启用归档时返回 None
+    """
+    archive = config.archive
+    if not archive.enabled:
+        return None
+    return ResponseArchive(
+        archive.path,
+        compression=None if archive.compression == "auto" else archive.compression,
+        max_segment_bytes=int(archive.max_segment_mb * 1024 * 1024),
+        max_total_bytes=int(archive.max_total_mb * 1024 * 1024),
+    )
+
+
+def default_room_name() -> str:
+    """默认房间（[api]）在多房间数据库中的标识
+
+    [[rooms]] 中有相同 roomid 的房间时使用其名称，否则使用 roomid。
+    """
+    for room in config.rooms:
+        if room.roomid == config.api.roomid:
+            return room.name
+    return config.api.roomid or ""
+
+
+def update_room_database(
+    repository: SQLiteRoomRepository,
+    room_id: str,
+    storage: ElectricityRepository,
+    record: ElectricityRecord | None = None,
+) -> None:
+    """把房间的读数写入多房间数据库
+
+    房间第一次出现时先由其 CSV 补入全部历史（见 SQLiteRoomRepository.sync_room），
+    此时 record 已随历史补入，不再单独写入。多房间数据库是 CSV 之外的汇总视图，
+    写入失败只记录警告，不影响 CSV。
+
+    Args:
+        repository: 多房间数据库
+        room_id: 房间标识
+        storage: 该房间的 CSV 仓储（已包含 record）
+        record: 本次新保存的读数（None 表示只补入历史）
+    """
+    try:
+        synced = repository.sync_room(room_id, storage)
+        if record is not None and not synced:
+            repository.save(room_id, record)
+    except StorageError as e:
+        logger.warning(f"写入多房间数据库失败: {e}")
+
+
 def version_callback(value: bool) -> None:
     """显示版本信息回调
 
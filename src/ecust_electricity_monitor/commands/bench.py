@@ -0,0 +1,146 @@
+"""bench 命令模块
+
+职责：在合成数据上运行基准测试，输出 JSON 并与基线对比
+"""
+
+import json
+from pathlib import Path
+from typing import Annotated
+
+import typer
+from rich.table import Table
+
+from ..bench import compare_results, run_suite
+from ..bench.suite import (
+    DEFAULT_REPEAT,
+    DEFAULT_ROWS,
+    FULL_ROWS,
+    REPORT_ROWS,
+    THROUGHPUT_CASES,
+)
+from .base import console
+
+
+def bench_command(
+    rows: Annotated[
+        list[int] | None,
+        typer.Option("--rows", "-n", help="合成历史的记录数（可重复指定）"),
+    ] = None,
+    full: Annotated[
+        bool,
+        typer.Option("--full", help="使用完整规模 10k/100k/1M（未指定 --rows 时生效）"),
+    ] = False,
+    repeat: Annotated[
+        int, typer.Option("--repeat", "-r", min=1, help="每个用例的重复次数")
+    ] = DEFAULT_REPEAT,
+    only: Annotated[
+        str | None,
+        typer.Option("--only", help="只运行名称以此开头的用例，如 storage"),
+    ] = None,
+    report_rows: Annotated[
+        int,
+        typer.Option(
+            "--report-rows", min=0, help="报告用例额外测量的记录数（0 表示不额外测量）"
+        ),
+    ] = REPORT_ROWS,
+    output: Annotated[
+        Path | None, typer.Option("--output", "-o", help="结果 JSON 输出路径")
+    ] = None,
+    baseline: Annotated[
+        Path | None,
+        typer.Option("--compare", "-c", help="与此前保存的 JSON 结果对比"),
+    ] = None,
+    threshold: Annotated[
+        float,
+        typer.Option(
+            "--threshold", help="中位数变慢超过此比例视为回退（配合 --compare）"
+        ),
+    ] = 0.2,
+) -> None:
+    """运行性能基准测试"""
+    try:
+        previous = None
+        if baseline is not None:
+            previous = json.loads(baseline.read_text(encoding="utf-8"))
+
+        console.print("[yellow]正在运行基准测试...[/yellow]")
+        result = run_suite(
+            rows=rows or (FULL_ROWS if full else DEFAULT_ROWS),
+            repeat=repeat,
+            only=only,
+            report_rows=report_rows or None,
+        )
+
+        if output is not None:
+            output.parent.mkdir(parents=True, exist_ok=True)
+            output.write_text(
+                json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8"
+            )
+
+        comparisons = compare_results(previous, result, threshold) if previous else []
+
+    except Exception as e:
+        console.print(f"[red]✗ 基准测试失败: {e}[/red]")
+        raise typer.Exit(1) from e
+
+    _print_results(result, comparisons)
+    if output is not None:
+        console.print(f"[green]✓ 结果已保存: {output}[/green]")
+
+    # 有性能回退时以非零状态退出，便于在部署前拦截
+    regressions = [c for c in comparisons if c["regression"]]
+    if regressions:
+        console.print(f"[red]✗ {len(regressions)} 个用例变慢超过 {threshold:.0%}[/red]")
+        raise typer.Exit(1)
+
+
+def _print_results(result: dict, comparisons: list[dict]) -> None:
+    """以表格显示结果（有基线时附带变化比例）"""
+    changes = {(c["name"], c["rows"]): c for c in comparisons}
+
+    table = Table(
+        title=f"基准测试（{result['version']}，分析后端 {result['analytics_backend']}）"
+    )
+    table.add_column("用例", style="cyan", no_wrap=True)
+    table.add_column("记录数", justify="right")
+    table.add_column("中位数 ms", justify="right")
+    table.add_column("最小 ms", justify="right")
+    table.add_column("行/秒", justify="right")
+    table.add_column("输出 KB", justify="right")
+    if comparisons:
+        table.add_column("变化", justify="right")
+
+    for r in result["results"]:
+        row = [
+            r["name"],
+            f"{r['rows']:,}" if r["rows"] else "-",
+            f"{r['median'] * 1000:.3f}",
+            f"{r['min'] * 1000:.3f}",
+            _throughput(r),
+            _output_size(r),
+        ]
+        if comparisons:
+            c = changes.get((r["name"], r["rows"]))
+            if c is None:
+                row.append("[dim]新增[/dim]")
+            else:
+                color = "red" if c["regression"] else "green"
+                row.append(f"[{color}]{c['change']:+.1%}[/{color}]")
+        table.add_row(*row)
+
+    console.print(table)
+
+
+def _throughput(result: dict) -> str:
+    """全量读取用例的吞吐量（行/秒），其他用例为 -"""
+    if result["name"] not in THROUGHPUT_CASES or result["median"] <= 0:
+        return "-"
+    return f"{result['rows'] / result['median']:,.0f}"
+
+
+def _output_size(result: dict) -> str:
+    """报告用例的产出文件大小（KB），其他用例为 -"""
+    size = result.get("output_bytes")
+    if size is None:
+        return "-"
+    return f"{size / 1024:,.1f}"
@@ -3,11 +3,14 @@
 提供格式化输出函数：
 - 电量结果显示
 - 告警信息显示
+- 阶段耗时表
 """
 
 from rich.panel import Panel
+from rich.table import Table
 
 from ..models import AlertContext, ElectricityRecord
+from ..timing import StageTiming
 from .base import console
 
 
@@ -70,4 +73,46 @@ def display_alert_info(context: AlertContext) -> None:
         days_color = "red" if days < 3 else "yellow"
         info_lines.append(f"预计可用: [{days_color}]{days} 天[/{days_color}]")
 
+    if context.last_recharge is not None:
+        recharge = context.last_recharge
+        info_lines.append(
+            f"最近充值: {recharge.amount:.2f} 度 "
+            f"@ {recharge.timestamp.strftime('%Y-%m-%d %H:%M')}"
+        )
+
     console.print(Panel("\n".join(info_lines), title="⚠️ 告警信息"))
+
+
+def display_timings(stages: list[StageTiming], wall_seconds: float) -> None:
+    """显示各阶段耗时表
+
+    Args:
+        stages: 各阶段耗时汇总
+        wall_seconds: 命令总耗时（秒），用于计算占比
+    """
+    if not stages:
+        console.print("[dim]未记录到耗时数据[/dim]")
+        return
+
+    table = Table(title=f"阶段耗时（总计 {wall_seconds * 1000:.1f} ms）")
+    table.add_column("阶段", style="cyan", no_wrap=True)
+    table.add_column("次数", justify="right")
+    table.add_column("总耗时 ms", justify="right")
+    table.add_column("自身 ms", justify="right")
+    table.add_column("平均 ms", justify="right")
+    table.add_column("最大 ms", justify="right")
+    table.add_column("自身占比", justify="right")
+
+    for stage in stages:
+        share = stage.self_time / wall_seconds if wall_seconds > 0 else 0.0
+        table.add_row(
+            stage.name,
+            str(stage.calls),
+            f"{stage.total * 1000:.1f}",
+            f"{stage.self_time * 1000:.1f}",
+            f"{stage.mean * 1000:.2f}",
+            f"{stage.max * 1000:.2f}",
+            f"{share:.1%}",
+        )
+
+    console.print(table)
@@ -0,0 +1,80 @@
+"""export 命令模块
+
+职责：把电量历史导出为 JSON Lines / Parquet / Arrow / 紧凑二进制
+"""
+
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Annotated
+
+import typer
+
+from ..config import ROOT_DIR, config
+from ..export import (
+    EXTENSIONS,
+    ExportFormat,
+    ExportKind,
+    Granularity,
+    export_data,
+    get_writer,
+    resolve_format,
+)
+from ..storage import CSVRepository
+from .base import DATETIME_FORMATS, console
+
+
+def export_command(
+    fmt: Annotated[
+        ExportFormat,
+        typer.Option(
+            "--format",
+            "-f",
+            help="导出格式（columnar：有 pyarrow 时为 parquet，否则为 binary）",
+        ),
+    ] = "jsonl",
+    granularity: Annotated[
+        Granularity,
+        typer.Option("--granularity", "-g", help="raw 原始记录 / day / hour 汇总"),
+    ] = "raw",
+    start: Annotated[
+        datetime | None,
+        typer.Option("--start", help="开始时间（包含）", formats=DATETIME_FORMATS),
+    ] = None,
+    end: Annotated[
+        datetime | None,
+        typer.Option("--end", help="结束时间（包含）", formats=DATETIME_FORMATS),
+    ] = None,
+    output: Annotated[
+        Path | None,
+        typer.Option("--output", "-o", help="输出文件路径（默认 output/exports/）"),
+    ] = None,
+) -> None:
+    """导出电量历史数据"""
+    try:
+        resolved = resolve_format(fmt)
+        if output is None:
+            output = (
+                ROOT_DIR / "output" / "exports" / f"electricity_{granularity}"
+            ).with_suffix(EXTENSIONS[resolved])
+
+        storage = CSVRepository(
+            config.storage.csv_path,
+            parallel_threshold_bytes=config.storage.parallel_threshold_bytes,
+            parallel_workers=config.storage.parallel_load_workers or None,
+        )
+        kind: ExportKind = "records" if granularity == "raw" else "rollups"
+
+        started = time.perf_counter()
+        with get_writer(resolved, output, kind=kind) as writer:
+            count = export_data(storage, writer, granularity, start, end)
+        elapsed = time.perf_counter() - started
+
+        console.print(
+            f"[green]✓ 已导出 {count} 行（{resolved}，{granularity}）到 {output}"
+            f"，耗时 {elapsed:.2f}s[/green]"
+        )
+
+    except Exception as e:
+        console.print(f"[red]✗ 导出失败: {e}[/red]")
+        raise typer.Exit(1) from e
@@ -0,0 +1,97 @@
+"""fake-server 命令模块
+
+职责：启动本地模拟 ECUST 查询服务器，用于离线测试抓取、重试和调度
+"""
+
+from typing import Annotated
+
+import typer
+from rich.panel import Panel
+
+from ..bench.fake_server import (
+    LAYOUTS,
+    ROOM_ID_BASE,
+    FakeECUSTServer,
+    FakeServerOptions,
+)
+from .base import console
+
+
+def fake_server_command(
+    port: Annotated[int, typer.Option("--port", "-p", help="监听端口")] = 8765,
+    host: Annotated[str, typer.Option("--host", help="监听地址")] = "127.0.0.1",
+    rooms: Annotated[
+        int, typer.Option("--rooms", "-n", min=1, help="合成房间数量")
+    ] = 1000,
+    latency_ms: Annotated[
+        float, typer.Option("--latency-ms", min=0, help="固定响应延迟（毫秒）")
+    ] = 0.0,
+    jitter_ms: Annotated[
+        float, typer.Option("--jitter-ms", min=0, help="额外随机延迟上限（毫秒）")
+    ] = 0.0,
+    error_rate: Annotated[
+        float,
+        typer.Option("--error-rate", min=0, max=1, help="返回 HTTP 500/503 的比例"),
+    ] = 0.0,
+    malformed_rate: Annotated[
+        float,
+        typer.Option("--malformed-rate", min=0, max=1, help="返回不含电量的页面的比例"),
+    ] = 0.0,
+    layouts: Annotated[
+        list[str] | None,
+        typer.Option(
+            "--layout",
+            help=f"使用的 HTML 版式（可重复指定，默认全部）：{' / '.join(LAYOUTS)}",
+        ),
+    ] = None,
+    seed: Annotated[int, typer.Option("--seed", help="随机种子")] = 0,
+) -> None:
+    """启动本地模拟 ECUST 查询服务器"""
+    unknown = set(layouts or ()) - set(LAYOUTS)
+    if unknown:
+        console.print(f"[red]✗ 未知版式: {', '.join(sorted(unknown))}[/red]")
+        raise typer.Exit(1)
+    # 按指定顺序取出对应的版式（已确认均为已知版式）
+    selected = (
+        tuple(LAYOUTS[LAYOUTS.index(name)] for name in layouts) if layouts else LAYOUTS
+    )
+
+    options = FakeServerOptions(
+        rooms=rooms,
+        latency_ms=latency_ms,
+        jitter_ms=jitter_ms,
+        error_rate=error_rate,
+        malformed_rate=malformed_rate,
+        layouts=selected,
+        seed=seed,
+    )
+
+    try:
+        server = FakeECUSTServer(options, host=host, port=port)
+    except OSError as e:
+        console.print(f"[red]✗ 无法监听 {host}:{port}: {e}[/red]")
+        raise typer.Exit(1) from e
+
+    console.print(
+        Panel.fit(
+            f"[bold green]模拟服务器已启动[/bold green]\n\n"
+            f"接口地址: [cyan]{server.url}[/cyan]\n"
+            f"房间号: [cyan]{ROOM_ID_BASE}[/cyan] ~ "
+            f"[cyan]{ROOM_ID_BASE + rooms - 1}[/cyan]\n\n"
+            f"[dim]使用方式：[/dim]\n"
+            f"  export API__BASE_URL={server.url}\n"
+            f"  export API__ROOMID={ROOM_ID_BASE}\n\n"
+            f"按 [red]Ctrl+C[/red] 停止",
+            title="⚡ emon fake-server",
+        )
+    )
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        console.print(
+            f"\n[yellow]✓ 模拟服务器已停止（共处理 {server.requests_served} 个请求）"
+            "[/yellow]"
+        )
+    finally:
+        server.stop()
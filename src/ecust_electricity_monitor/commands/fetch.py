@@ -1,19 +1,33 @@
 """fetch 命令模块
 
-职责：获取当前电量
+职责：获取当前电量（默认房间，或按楼栋批量获取全部房间）
 """
 
 from typing import Annotated
 
 import typer
+from rich.markup import escape
+from rich.table import Table
 
 from ..client import ElectricityClient
+from ..coalesce import RequestCoalescer
 from ..config import config
 from ..exceptions import ClientError
+from ..fetch_cache import FetchCache
 from ..logger import logger
-from ..models import ElectricityRecord
-from ..storage import CSVRepository
-from .base import check_api_config, console
+from ..metrics import registry, update_room_gauges
+from ..models import ElectricityRecord, FetchResult
+from ..storage import CSVRepository, SQLiteRoomRepository
+from .base import (
+    check_api_config,
+    console,
+    create_rate_limiter,
+    create_response_archive,
+    default_room_name,
+    shared_circuit_breaker,
+    shared_retry_budget,
+    update_room_database,
+)
 from .display import display_power_result
 
 
@@ -24,6 +38,13 @@ def fetch_command(
     verbose: Annotated[
         bool, typer.Option("--verbose", "-v", help="显示详细信息")
     ] = False,
+    all_rooms: Annotated[
+        bool,
+        typer.Option("--all-rooms", help="批量获取配置中的全部房间（按楼栋合并请求）"),
+    ] = False,
+    refresh: Annotated[
+        bool, typer.Option("--refresh", help="忽略本地查询缓存，重新请求接口")
+    ] = False,
 ) -> None:
     """获取当前电量"""
     # 检查配置
@@ -38,8 +59,21 @@ def fetch_command(
             buildid=config.api.buildid,
             timeout=config.api.timeout_seconds,
             max_retries=config.api.max_retries,
+            base_url=config.api.base_url,
+            breaker=shared_circuit_breaker(),
+            retry_budget=shared_retry_budget(),
+            limiter=create_rate_limiter(),
+            archive=create_response_archive(),
+            coalescer=RequestCoalescer(ttl_seconds=config.api.coalesce_ttl_seconds),
+            cache=_create_cache(refresh),
         )
 
+        if all_rooms:
+            failed = _fetch_all_rooms(client, save)
+            if failed:
+                raise typer.Exit(1)
+            return
+
         console.print("[yellow]正在获取电量数据...[/yellow]")
 
         # 获取数据
@@ -56,15 +90,39 @@ def fetch_command(
             alert_sent=False,
         )
 
+        if result.from_cache:
+            console.print("[dim]ℹ 使用本地缓存的查询结果（--refresh 重新请求）[/dim]")
+
         # 保存到 CSV
         if save:
             storage = CSVRepository(config.storage.csv_path)
-            storage.save(record)
-            console.print("[green]✓ 数据已保存到 CSV[/green]")
+            saved: ElectricityRecord | None = None
+            if _already_saved(storage, result):
+                console.print("[dim]ℹ 该读数已保存过，跳过[/dim]")
+            else:
+                storage.save(record)
+                console.print("[green]✓ 数据已保存到 CSV[/green]")
+                saved = record
+            # 只在配置了 [[rooms]] 时写入多房间数据库：单房间部署只用 CSV，
+            # 避免每次运行都由 CSV 全量补入数据库
+            if config.rooms:
+                update_room_database(
+                    SQLiteRoomRepository(config.storage.rooms_db_path),
+                    default_room_name(),
+                    storage,
+                    saved,
+                )
+            update_room_gauges(
+                client.roomid,
+                record.power,
+                storage.analytics().estimate_remaining_days(),
+            )
 
         # 显示结果
         display_power_result(record, verbose)
 
+    except typer.Exit:
+        raise
     except ClientError as e:
         console.print(f"[red]✗ 获取电量失败: {e}[/red]")
         if verbose:
@@ -75,3 +133,93 @@ def fetch_command(
         if verbose:
             logger.exception("详细错误信息:")
         raise typer.Exit(1) from e
+    finally:
+        # cron 模式：成功或失败都写出本次运行的指标
+        textfile = config.metrics.textfile_path
+        if textfile is not None:
+            try:
+                registry.write_textfile(textfile)
+            except OSError as e:
+                logger.warning(f"写入指标文件失败: {e}")
+
+
+def _create_cache(refresh: bool) -> FetchCache | None:
+    """根据配置创建查询结果缓存（TTL 为 0 时不缓存）"""
+    if config.api.cache_ttl_seconds <= 0:
+        return None
+    return FetchCache(
+        config.storage.fetch_cache_dir,
+        ttl_seconds=config.api.cache_ttl_seconds,
+        refresh=refresh,
+    )
+
+
+def _already_saved(storage: CSVRepository, result: FetchResult) -> bool:
+    """缓存的结果是否已由之前的 fetch 保存（避免重复写入同一读数）"""
+    if not result.from_cache:
+        return False
+    latest = storage.analytics().latest
+    # CSV 中的时间戳精确到秒
+    reading_time = result.timestamp.replace(microsecond=0)
+    return latest is not None and latest.timestamp >= reading_time
+
+
+def _fetch_all_rooms(client: ElectricityClient, save: bool) -> int:
+    """批量获取全部房间并分别保存
+
+    Returns:
+        失败的房间数
+    """
+    if not config.rooms:
+        console.print(
+            "[yellow]⚠ 未配置房间列表，请在 config.toml 中添加 "
+            f"{escape('[[rooms]]')}[/yellow]"
+        )
+        return 1
+
+    console.print(f"[yellow]正在获取 {len(config.rooms)} 个房间的电量...[/yellow]")
+    queries = {room.name: config.api.room_query(room) for room in config.rooms}
+    results = client.fetch_many(queries.values())
+
+    table = Table(title="房间电量")
+    table.add_column("房间", style="cyan")
+    table.add_column("电量", justify="right")
+    table.add_column("耗时", justify="right")
+    table.add_column("状态")
+
+    # 所有房间的读数同时写入多房间数据库，楼栋级别的查询无需逐个打开 CSV
+    room_repository = (
+        SQLiteRoomRepository(config.storage.rooms_db_path) if save else None
+    )
+
+    failed = 0
+    for room in config.rooms:
+        result = results[queries[room.name]]
+        elapsed = (
+            "-" if result.elapsed_seconds is None else f"{result.elapsed_seconds:.2f}s"
+        )
+        if not result.success:
+            failed += 1
+            message = escape(result.error_message or "未知错误")
+            table.add_row(room.name, "-", elapsed, f"[red]✗ {message}[/red]")
+            continue
+
+        status = "[green]✓ 缓存[/green]" if result.from_cache else "[green]✓[/green]"
+        if room_repository is not None:
+            record = ElectricityRecord(timestamp=result.timestamp, power=result.power)
+            storage = CSVRepository(config.storage.room_csv_path(room))
+            saved: ElectricityRecord | None = None
+            if not _already_saved(storage, result):
+                storage.save(record)
+                saved = record
+                status = "[green]✓ 已保存[/green]"
+            update_room_database(room_repository, room.name, storage, saved)
+            update_room_gauges(
+                room.roomid,
+                record.power,
+                storage.analytics().estimate_remaining_days(),
+            )
+        table.add_row(room.name, f"{result.power:.2f}", elapsed, status)
+
+    console.print(table)
+    return failed
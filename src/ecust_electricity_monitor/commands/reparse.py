@@ -0,0 +1,160 @@
+"""reparse 命令模块
+
+职责：把归档的原始响应重新解析为电量记录（页面版式变化后重建或修复历史）
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Annotated
+
+import typer
+from rich.table import Table
+
+from ..analytics import validate_power_value
+from ..archive import ResponseArchive
+from ..client import ElectricityClient
+from ..config import config
+from ..exceptions import ValidationError
+from ..models import ElectricityRecord
+from ..storage import CSVRepository
+from .base import DATETIME_FORMATS, console
+
+# 每个房间最多展示的解析错误数
+MAX_SAMPLE_ERRORS = 3
+
+
+@dataclass
+class ReparseStats:
+    """单个房间的重新解析结果"""
+
+    total: int = 0
+    records: list[ElectricityRecord] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+
+    @property
+    def failed(self) -> int:
+        """解析失败的响应数"""
+        return self.total - len(self.records)
+
+
+def reparse_command(
+    room: Annotated[
+        str | None, typer.Option("--room", "-r", help="只处理该房间ID")
+    ] = None,
+    since: Annotated[
+        datetime | None,
+        typer.Option("--since", help="开始时间（包含）", formats=DATETIME_FORMATS),
+    ] = None,
+    until: Annotated[
+        datetime | None,
+        typer.Option("--until", help="结束时间（包含）", formats=DATETIME_FORMATS),
+    ] = None,
+    output: Annotated[
+        Path | None,
+        typer.Option("--output", "-o", help="把解析结果写入新的 CSV（需指定 --room）"),
+    ] = None,
+    repair: Annotated[
+        bool,
+        typer.Option("--repair", help="把缺失的读数补入已配置房间的 CSV"),
+    ] = False,
+) -> None:
+    """重新解析归档的原始响应（默认只统计，不写入）"""
+    if output is not None and room is None:
+        console.print("[red]✗ 使用 --output 时需要指定 --room[/red]")
+        raise typer.Exit(1)
+
+    try:
+        archive = ResponseArchive(config.archive.path)
+        if not archive.segments():
+            console.print(f"[yellow]⚠ 归档为空: {config.archive.path}[/yellow]")
+            return
+
+        stats = reparse_archive(archive, room, since, until)
+        _print_summary(stats)
+
+        if output is not None:
+            records = stats[room].records if room in stats else []
+            added = CSVRepository(output).merge(records)
+            console.print(f"[green]✓ 已写入 {added} 条记录到 {output}[/green]")
+
+        if repair:
+            _repair(stats)
+
+    except typer.Exit:
+        raise
+    except Exception as e:
+        console.print(f"[red]✗ 重新解析失败: {e}[/red]")
+        raise typer.Exit(1) from e
+
+
+def reparse_archive(
+    archive: ResponseArchive,
+    room: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> dict[str, ReparseStats]:
+    """流式读取归档并逐条解析
+
+    Args:
+        archive: 响应归档
+        room: 只处理该房间ID
+        since: 开始时间（包含）
+        until: 结束时间（包含）
+
+    Returns:
+        房间ID -> 解析结果
+    """
+    stats: dict[str, ReparseStats] = {}
+    for entry in archive.iter_responses(room, since, until):
+        room_stats = stats.setdefault(entry.room, ReparseStats())
+        room_stats.total += 1
+        try:
+            power = ElectricityClient._parse_power_from_html(entry.body)
+            validate_power_value(power)
+        except (ValueError, ValidationError) as e:
+            if len(room_stats.errors) < MAX_SAMPLE_ERRORS:
+                room_stats.errors.append(f"{entry.timestamp:%Y-%m-%d %H:%M:%S} {e}")
+            continue
+        room_stats.records.append(
+            ElectricityRecord(timestamp=entry.timestamp, power=power)
+        )
+    return stats
+
+
+def _print_summary(stats: dict[str, ReparseStats]) -> None:
+    """打印每个房间的解析统计和错误示例"""
+    table = Table(title="重新解析结果")
+    table.add_column("房间", style="cyan")
+    table.add_column("响应", justify="right")
+    table.add_column("成功", justify="right", style="green")
+    table.add_column("失败", justify="right", style="red")
+    for roomid, room_stats in stats.items():
+        table.add_row(
+            roomid,
+            str(room_stats.total),
+            str(len(room_stats.records)),
+            str(room_stats.failed),
+        )
+    console.print(table)
+
+    for roomid, room_stats in stats.items():
+        for error in room_stats.errors:
+            console.print(f"[dim]{roomid}: {error}[/dim]")
+
+
+def _repair(stats: dict[str, ReparseStats]) -> None:
+    """把解析成功的读数补入已配置房间的 CSV（已有的时间戳不变）"""
+    targets: dict[str, Path] = {}
+    if config.api.roomid:
+        targets[config.api.roomid] = config.storage.csv_path
+    for room in config.rooms:
+        targets.setdefault(room.roomid, config.storage.room_csv_path(room))
+
+    for roomid, room_stats in stats.items():
+        path = targets.get(roomid)
+        if path is None:
+            console.print(f"[yellow]⚠ 房间 {roomid} 未配置，跳过[/yellow]")
+            continue
+        added = CSVRepository(path).merge(room_stats.records)
+        console.print(f"[green]✓ {roomid}: 补入 {added} 条记录到 {path}[/green]")
@@ -1,17 +1,24 @@
 """report 命令模块
 
-职责：生成电量分析报告
+职责：生成电量分析报告（单房间或全部房间）
 """
 
 from pathlib import Path
 from typing import Annotated
 
 import typer
+from rich.markup import escape
+from rich.table import Table
 
-from ..analytics import PowerAnalyzer
 from ..config import config
-from ..models import ReportData
-from ..reporter import HTMLReporter
+from ..report_builder import (
+    RoomReportJob,
+    build_all_room_reports,
+    build_report_data,
+    write_index,
+)
+from ..report_cache import ReportCache
+from ..reporter import HTMLReporter, PlotlyJSMode
 from ..storage import CSVRepository
 from .base import console
 
@@ -21,44 +28,43 @@ def report_command(
     output: Annotated[
         Path | None, typer.Option("--output", "-o", help="输出文件路径")
     ] = None,
+    plotlyjs: Annotated[
+        PlotlyJSMode | None,
+        typer.Option(
+            "--plotlyjs",
+            help="plotly.js 引用方式：cdn / shared / inline（默认取配置）",
+        ),
+    ] = None,
+    force: Annotated[
+        bool, typer.Option("--force", "-f", help="忽略缓存，强制重新生成")
+    ] = False,
+    all_rooms: Annotated[
+        bool,
+        typer.Option("--all-rooms", help="为配置中的全部房间并行生成报告和索引页"),
+    ] = False,
+    workers: Annotated[
+        int | None,
+        typer.Option(
+            "--workers", "-w", help="--all-rooms 的并行进程数（默认 CPU 核数）"
+        ),
+    ] = None,
     open_browser: Annotated[
         bool, typer.Option("--open/--no-open", help="生成后是否打开浏览器")
     ] = True,
 ) -> None:
     """生成电量分析报告"""
-    try:
-        # 读取数据
-        storage = CSVRepository(config.storage.csv_path)
-        records = storage.find_recent(days=days)
-
-        if not records:
-            console.print("[yellow]⚠ 没有数据，请先运行 `emon fetch`[/yellow]")
-            raise typer.Exit(0)
-
-        console.print(
-            f"[yellow]正在分析最近 {days} 天的数据 ({len(records)} 条记录)...[/yellow]"
-        )
+    reporter_options = {
+        "max_points": config.report.max_chart_points,
+        "show_envelope": config.report.show_envelope,
+        "webgl_threshold": config.report.webgl_threshold,
+        "plotlyjs": plotlyjs or config.report.plotlyjs,
+    }
 
-        # 准备报告数据
-        analyzer = PowerAnalyzer(records)
-        statistics = analyzer.get_statistics()
-
-        report_data = ReportData(
-            records=records,
-            statistics=statistics,
-            metadata={
-                "threshold": str(config.app.alert_threshold_kwh),
-                "analysis_period": str(days),
-            },
-        )
-
-        # 生成报告
-        reporter = HTMLReporter(config.report.output_path)
-
-        filename = output.name if output else None
-        report_path = reporter.generate(report_data, filename=filename)
-
-        console.print(f"[green]✓ 报告已生成: {report_path}[/green]")
+    try:
+        if all_rooms:
+            report_path = _report_all_rooms(days, force, workers, reporter_options)
+        else:
+            report_path = _report_single(days, output, force, reporter_options)
 
         # 打开浏览器
         if open_browser:
@@ -66,6 +72,111 @@ def report_command(
 
             webbrowser.open(report_path.as_uri())
 
+    except typer.Exit:
+        raise
     except Exception as e:
         console.print(f"[red]✗ 生成报告失败: {e}[/red]")
         raise typer.Exit(1) from e
+
+
+def _report_single(
+    days: int, output: Path | None, force: bool, reporter_options: dict
+) -> Path:
+    """生成默认房间的报告"""
+    # 读取数据
+    storage = CSVRepository(
+        config.storage.csv_path,
+        parallel_threshold_bytes=config.storage.parallel_threshold_bytes,
+        parallel_workers=config.storage.parallel_load_workers or None,
+    )
+    report_data = build_report_data(
+        storage,
+        days=days,
+        threshold=config.app.alert_threshold_kwh,
+        rollup_after_days=config.report.rollup_after_days,
+    )
+
+    if report_data is None:
+        console.print("[yellow]⚠ 没有数据，请先运行 `emon fetch`[/yellow]")
+        raise typer.Exit(0)
+
+    console.print(
+        f"[yellow]正在分析最近 {days} 天的数据 "
+        f"({report_data.total_records} 条记录)...[/yellow]"
+    )
+
+    # 生成报告
+    cache = ReportCache(config.report.output_path)
+    reporter = HTMLReporter(config.report.output_path, cache=cache, **reporter_options)
+
+    # 输入未变化时复用已有报告
+    filename = output.name if output else None
+    digest = reporter.input_fingerprint(report_data)
+    report_path = None if force else cache.find_report(digest, filename)
+
+    if report_path is not None:
+        console.print(f"[green]✓ 数据未变化，复用已有报告: {report_path}[/green]")
+    else:
+        report_path = reporter.generate(report_data, filename=filename)
+        cache.record(report_path, digest)
+        console.print(f"[green]✓ 报告已生成: {report_path}[/green]")
+
+    return report_path
+
+
+def _report_all_rooms(
+    days: int, force: bool, workers: int | None, reporter_options: dict
+) -> Path:
+    """并行生成全部房间的报告和索引页"""
+    if not config.rooms:
+        console.print(
+            "[yellow]⚠ 未配置房间列表，请在 config.toml 中添加 "
+            f"{escape('[[rooms]]')}[/yellow]"
+        )
+        raise typer.Exit(1)
+
+    output_dir = config.report.output_path
+    threshold = config.app.alert_threshold_kwh
+    jobs = [
+        RoomReportJob(
+            room=room.name,
+            csv_path=config.storage.room_csv_path(room),
+            output_dir=output_dir,
+            days=days,
+            threshold=threshold,
+            rollup_after_days=config.report.rollup_after_days,
+            reporter_options=reporter_options,
+            force=force,
+        )
+        for room in config.rooms
+    ]
+
+    console.print(f"[yellow]正在为 {len(jobs)} 个房间生成报告...[/yellow]")
+    summaries = build_all_room_reports(jobs, max_workers=workers)
+
+    # 每个房间的耗时
+    table = Table(title="房间报告")
+    table.add_column("房间", style="cyan")
+    table.add_column("记录数", justify="right")
+    table.add_column("剩余天数", justify="right")
+    table.add_column("耗时", justify="right")
+    table.add_column("状态")
+    for s in summaries:
+        if s.error:
+            status = f"[red]✗ {escape(s.error)}[/red]"
+        elif s.cached:
+            status = "[dim]未变化，已复用[/dim]"
+        else:
+            status = "[green]✓ 已生成[/green]"
+        table.add_row(
+            s.room,
+            str(s.record_count),
+            "-" if s.days_remaining is None else str(s.days_remaining),
+            f"{s.elapsed_seconds:.2f}s",
+            status,
+        )
+    console.print(table)
+
+    index_path = write_index(summaries, output_dir, threshold)
+    console.print(f"[green]✓ 索引页已生成: {index_path}[/green]")
+    return index_path
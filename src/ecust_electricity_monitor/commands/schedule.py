@@ -8,16 +8,27 @@ from typing import Annotated
 import typer
 from rich.panel import Panel
 
-from ..analytics import PowerAnalyzer
 from ..client import ElectricityClient
+from ..coalesce import RequestCoalescer
 from ..config import config
+from ..exceptions import CircuitOpenError
 from ..health import HealthMonitor
 from ..logger import logger
-from ..models import AlertContext, ElectricityRecord
+from ..metrics import registry, serve_metrics, update_room_gauges
+from ..models import ElectricityRecord
 from ..notifiers import NotificationManager
 from ..scheduler import SchedulerService
-from ..storage import CSVRepository
-from .base import check_api_config, console
+from ..storage import CSVRepository, SQLiteRoomRepository
+from .base import (
+    check_api_config,
+    console,
+    create_rate_limiter,
+    create_response_archive,
+    default_room_name,
+    shared_circuit_breaker,
+    shared_retry_budget,
+    update_room_database,
+)
 
 
 def schedule_command(
@@ -27,6 +38,10 @@ def schedule_command(
     daemon: Annotated[
         bool, typer.Option("--daemon", "-d", help="后台运行（需配合 nohup 等工具）")
     ] = False,
+    metrics_port: Annotated[
+        int | None,
+        typer.Option("--metrics-port", help="启动 /metrics 端点的端口（覆盖配置）"),
+    ] = None,
 ) -> None:
     """启动定时监控任务"""
     # 检查配置
@@ -35,18 +50,32 @@ def schedule_command(
     try:
         check_interval = interval or config.app.check_interval_seconds
 
+        # 指标端点（在调度器进程内的后台线程运行）
+        metrics_line = ""
+        if metrics_port is not None or config.metrics.enabled:
+            port = config.metrics.port if metrics_port is None else metrics_port
+            server = serve_metrics(registry, config.metrics.host, port)
+            metrics_line = (
+                f"指标端点: [cyan]http://{config.metrics.host}:"
+                f"{server.server_port}/metrics[/cyan]\n"
+            )
+
         console.print(
             Panel.fit(
                 f"[bold green]电量监控任务已启动[/bold green]\n\n"
                 f"检查间隔: [cyan]{check_interval}[/cyan] 秒\n"
                 f"告警阈值: [cyan]{config.app.alert_threshold_kwh}[/cyan] 度\n"
-                f"数据存储: [cyan]{config.storage.csv_path}[/cyan]\n\n"
+                f"数据存储: [cyan]{config.storage.csv_path}[/cyan]\n"
+                f"{metrics_line}\n"
                 f"按 [red]Ctrl+C[/red] 停止",
                 title="⚡ emon scheduler",
             )
         )
 
         # 创建组件
+        health_monitor = HealthMonitor(max_consecutive_failures=5)
+        breaker = shared_circuit_breaker()
+        breaker.add_listener(health_monitor.on_breaker_state_change)
         client = ElectricityClient(
             sysid=config.api.sysid,
             roomid=config.api.roomid,
@@ -54,10 +83,20 @@ def schedule_command(
             buildid=config.api.buildid,
             timeout=config.api.timeout_seconds,
             max_retries=config.api.max_retries,
+            base_url=config.api.base_url,
+            breaker=breaker,
+            retry_budget=shared_retry_budget(),
+            limiter=create_rate_limiter(),
+            archive=create_response_archive(),
+            coalescer=RequestCoalescer(ttl_seconds=config.api.coalesce_ttl_seconds),
         )
         storage = CSVRepository(config.storage.csv_path)
+        # 只在配置了 [[rooms]] 时写入多房间数据库（同 fetch）
+        room_repository = (
+            SQLiteRoomRepository(config.storage.rooms_db_path) if config.rooms else None
+        )
+        room_name = default_room_name()
         notifier = NotificationManager(config.notification)
-        health_monitor = HealthMonitor(max_consecutive_failures=5)
 
         def monitoring_task() -> None:
             """监控任务：获取、存储、告警"""
@@ -78,22 +117,21 @@ def schedule_command(
 
                     # 存储
                     storage.save(record)
+                    if room_repository is not None:
+                        update_room_database(
+                            room_repository, room_name, storage, record
+                        )
+
+                    # 增量分析状态已随 save() 更新，无需读取历史
+                    state = storage.analytics()
+                    update_room_gauges(
+                        client.roomid, record.power, state.estimate_remaining_days()
+                    )
 
                     # 检查告警
                     if record.power < config.app.alert_threshold_kwh:
-                        records = storage.find_recent(days=7)
-                        analyzer = PowerAnalyzer(records)
-                        trend = analyzer.calculate_trend()
-                        daily = analyzer.calculate_daily_consumption()
-                        days_left = analyzer.estimate_remaining_days()
-
-                        alert_ctx = AlertContext(
-                            current_record=record,
-                            threshold=config.app.alert_threshold_kwh,
-                            trend=trend,
-                            history=records[:10],
-                            daily_consumption=daily,
-                            estimated_days_remaining=days_left,
+                        alert_ctx = state.build_alert_context(
+                            config.app.alert_threshold_kwh, current_record=record
                         )
 
                         if (
@@ -115,6 +153,9 @@ def schedule_command(
                         )
                         health_monitor.mark_alert_sent()
 
+            except CircuitOpenError:
+                logger.info("接口熔断中，跳过本次查询")
+                health_monitor.record_failure()
             except Exception as e:
                 logger.error(f"监控任务失败: {e}")
                 health_monitor.record_failure()
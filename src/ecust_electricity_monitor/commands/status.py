@@ -0,0 +1,111 @@
+"""status 命令模块
+
+职责：显示最新读数与预估剩余天数（默认房间，或全部房间按紧迫程度排序）
+"""
+
+from typing import Annotated
+
+import typer
+from rich.table import Table
+
+from ..config import config
+from ..models import RoomSnapshot
+from ..storage import CSVRepository, SQLiteRoomRepository
+from .base import console, default_room_name
+
+
+def status_command(
+    all_rooms: Annotated[
+        bool,
+        typer.Option(
+            "--all", "-a", help="显示多房间数据库中的全部房间（按紧迫程度排序）"
+        ),
+    ] = False,
+    limit: Annotated[
+        int | None,
+        typer.Option("--limit", "-n", min=1, help="只显示最紧迫的 N 个房间"),
+    ] = None,
+) -> None:
+    """显示最新电量与预估剩余天数"""
+    try:
+        if all_rooms:
+            # 只读取：数据库不存在时不创建
+            db_path = config.storage.rooms_db_path
+            snapshots = (
+                SQLiteRoomRepository(db_path).find_snapshots()
+                if db_path.exists()
+                else []
+            )
+            if not snapshots:
+                console.print(
+                    "[yellow]⚠ 没有数据，请先运行 `emon fetch --all-rooms`[/yellow]"
+                )
+                raise typer.Exit(0)
+            snapshots.sort(key=lambda s: s.urgency)
+            missing = sorted(
+                {room.name for room in config.rooms} - {s.room for s in snapshots}
+            )
+        else:
+            state = CSVRepository(config.storage.csv_path).analytics()
+            if state.latest is None:
+                console.print("[yellow]⚠ 没有数据，请先运行 `emon fetch`[/yellow]")
+                raise typer.Exit(0)
+            snapshots = [
+                RoomSnapshot(
+                    room=default_room_name() or "-",
+                    timestamp=state.latest.timestamp,
+                    power=state.latest.power,
+                    alert_sent=state.latest.alert_sent,
+                    daily_consumption=state.daily_consumption,
+                    days_remaining=state.estimate_remaining_days(),
+                )
+            ]
+            missing = []
+
+        if limit is not None:
+            # 只看最紧迫的房间时不列出无数据的房间
+            snapshots, missing = snapshots[:limit], []
+
+        console.print(_status_table(snapshots, missing))
+
+    except typer.Exit:
+        raise
+    except Exception as e:
+        console.print(f"[red]✗ 读取状态失败: {e}[/red]")
+        raise typer.Exit(1) from e
+
+
+def _status_table(snapshots: list[RoomSnapshot], missing: list[str]) -> Table:
+    """房间状态表（missing 为配置中有、数据库中没有读数的房间）"""
+    threshold = config.app.alert_threshold_kwh
+
+    table = Table(title="房间状态")
+    table.add_column("房间", style="cyan")
+    table.add_column("电量", justify="right")
+    table.add_column("日均消耗", justify="right")
+    table.add_column("剩余天数", justify="right")
+    table.add_column("最新时间")
+    table.add_column("状态")
+
+    for snapshot in snapshots:
+        if snapshot.power < threshold * 0.5:
+            status = "[red]🔴 紧急[/red]"
+        elif snapshot.power < threshold:
+            status = "[yellow]🟡 低电量[/yellow]"
+        else:
+            status = "[green]🟢 正常[/green]"
+        table.add_row(
+            snapshot.room,
+            f"{snapshot.power:.2f}",
+            "-"
+            if snapshot.daily_consumption is None
+            else f"{snapshot.daily_consumption:.2f}",
+            "-" if snapshot.days_remaining is None else str(snapshot.days_remaining),
+            snapshot.timestamp.strftime("%Y-%m-%d %H:%M"),
+            status,
+        )
+
+    for room in missing:
+        table.add_row(room, "-", "-", "-", "-", "[dim]无数据[/dim]")
+
+    return table
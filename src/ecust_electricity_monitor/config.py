@@ -30,6 +30,7 @@
 """
 
 from pathlib import Path
+from typing import Literal
 
 from pydantic import BaseModel, Field
 from pydantic_settings import (
@@ -39,7 +40,8 @@ from pydantic_settings import (
     TomlConfigSettingsSource,
 )
 
-from .constants import DEFAULT_ALERT_THRESHOLD, MAX_RETRIES
+from .constants import DEFAULT_ALERT_THRESHOLD, ELECTRICITY_API_URL, MAX_RETRIES
+from .models import RoomQuery
 
 # 项目根目录
 if __package__:  # 已安装的包
@@ -68,12 +70,44 @@ class StorageConfig(BaseModel):
 
     data_dir: str = Field(default="data", description="数据目录")
     csv_filename: str = Field(default="electricity.csv", description="CSV文件名")
+    parallel_load_threshold_mb: float = Field(
+        default=64.0,
+        ge=0,
+        description="CSV 达到此大小（MB）时 report / export 多进程解析（0 表示不启用）",
+    )
+    parallel_load_workers: int = Field(
+        default=0, ge=0, description="多进程解析的进程数（0 表示 CPU 核数）"
+    )
+    rooms_db_filename: str = Field(
+        default="rooms.db", description="多房间数据库文件名（[[rooms]] 的读数同时写入）"
+    )
 
     @property
     def csv_path(self) -> Path:
         """完整的CSV文件路径"""
         return ROOT_DIR / self.data_dir / self.csv_filename
 
+    @property
+    def parallel_threshold_bytes(self) -> int | None:
+        """多进程解析的文件大小阈值（字节，未启用时为 None）"""
+        if not self.parallel_load_threshold_mb:
+            return None
+        return int(self.parallel_load_threshold_mb * 1024 * 1024)
+
+    @property
+    def rooms_db_path(self) -> Path:
+        """多房间数据库路径"""
+        return ROOT_DIR / self.data_dir / self.rooms_db_filename
+
+    def room_csv_path(self, room: "RoomConfig") -> Path:
+        """指定房间的 CSV 文件路径（默认 <房间名>.csv）"""
+        return ROOT_DIR / self.data_dir / (room.csv_filename or f"{room.name}.csv")
+
+    @property
+    def fetch_cache_dir(self) -> Path:
+        """查询结果缓存目录"""
+        return ROOT_DIR / self.data_dir / ".cache" / "fetch"
+
 
 class ApiConfig(BaseModel):
     """电量 API 配置"""
@@ -84,12 +118,77 @@ class ApiConfig(BaseModel):
     buildid: str | None = Field(default=None, description="建筑ID")
     timeout_seconds: int = Field(default=10, description="请求超时（秒）")
     max_retries: int = Field(default=MAX_RETRIES, description="最大重试次数")
+    base_url: str = Field(
+        default=ELECTRICITY_API_URL,
+        description="查询接口地址（测试时可指向 emon fake-server）",
+    )
+    breaker_failure_threshold: int = Field(
+        default=5, ge=1, description="熔断：连续失败多少次后暂停请求"
+    )
+    breaker_recovery_seconds: float = Field(
+        default=300.0, gt=0, description="熔断：暂停多久后发送一次探测请求（秒）"
+    )
+    retry_budget_ratio: float = Field(
+        default=0.2, ge=0, description="重试预算：每次请求积累的重试额度"
+    )
+    retry_budget_burst: int = Field(default=10, ge=0, description="重试预算：额度上限")
+    rate_limit_per_second: float = Field(
+        default=0.0, ge=0, description="限流：每秒请求数（0 表示不限）"
+    )
+    rate_limit_burst: int = Field(default=1, ge=1, description="限流：允许的突发请求数")
+    max_concurrency: int = Field(
+        default=0, ge=0, description="限流：同时进行的请求数上限（0 表示不限）"
+    )
+    rate_limit_state_file: str | None = Field(
+        default=None,
+        description="限流状态文件（设置后通过文件锁在多个 emon 进程之间共享）",
+    )
+    coalesce_ttl_seconds: float = Field(
+        default=30.0, ge=0, description="同一房间的查询结果在多少秒内直接复用"
+    )
+    cache_ttl_seconds: float = Field(
+        default=300.0,
+        ge=0,
+        description="emon fetch 的磁盘结果缓存有效期（秒，0 表示不缓存）",
+    )
+
+    @property
+    def rate_limit_state_path(self) -> Path | None:
+        """限流状态文件路径（相对路径基于项目根目录）"""
+        if not self.rate_limit_state_file:
+            return None
+        return ROOT_DIR / self.rate_limit_state_file
 
     @property
     def is_configured(self) -> bool:
         """检查是否已配置所有必需字段"""
         return all([self.sysid, self.roomid, self.areaid, self.buildid])
 
+    def room_query(self, room: "RoomConfig") -> RoomQuery:
+        """指定房间的查询参数（未填写的 areaid / buildid 使用本节的值）"""
+        return RoomQuery(
+            roomid=room.roomid,
+            areaid=room.areaid or self.areaid or "",
+            buildid=room.buildid or self.buildid or "",
+        )
+
+
+class RoomConfig(BaseModel):
+    """房间配置（多房间监控）
+
+    未填写的 areaid / buildid 使用 [api] 中的值。
+    """
+
+    name: str = Field(
+        pattern=r"^[^/\\]+$", description="房间名称（同时用于数据和报告文件名）"
+    )
+    roomid: str = Field(description="房间ID")
+    areaid: str | None = Field(default=None, description="区域ID")
+    buildid: str | None = Field(default=None, description="建筑ID")
+    csv_filename: str | None = Field(
+        default=None, description="CSV文件名（默认 <name>.csv）"
+    )
+
 
 class NotificationConfig(BaseModel):
     """通知配置"""
@@ -143,6 +242,22 @@ class ReportConfig(BaseModel):
 
     days_to_analyze: int = Field(default=30, description="生成报告的数据天数")
     output_dir: str = Field(default="output/reports", description="报告输出目录")
+    rollup_after_days: int = Field(
+        default=31, description="报告天数超过此值时使用按天汇总绘图"
+    )
+    max_chart_points: int = Field(
+        default=2000, ge=0, description="每条曲线的最大点数（LTTB 降采样，0 表示不限）"
+    )
+    show_envelope: bool = Field(
+        default=True, description="降采样时绘制最小/最大值包络带"
+    )
+    webgl_threshold: int = Field(
+        default=5000, ge=0, description="曲线点数超过此值时使用 WebGL 渲染"
+    )
+    plotlyjs: Literal["cdn", "shared", "inline"] = Field(
+        default="shared",
+        description="plotly.js 引用方式：cdn / shared（共享 assets 目录）/ inline",
+    )
 
     @property
     def output_path(self) -> Path:
@@ -150,6 +265,44 @@ class ReportConfig(BaseModel):
         return ROOT_DIR / self.output_dir
 
 
+class MetricsConfig(BaseModel):
+    """指标导出配置（Prometheus 文本格式）"""
+
+    enabled: bool = Field(
+        default=False, description="schedule 模式下是否启动 /metrics 端点"
+    )
+    host: str = Field(default="127.0.0.1", description="/metrics 监听地址")
+    port: int = Field(default=9108, ge=0, le=65535, description="/metrics 监听端口")
+    textfile: str | None = Field(
+        default=None,
+        description="node-exporter textfile 路径（cron 模式下 fetch 结束后写入）",
+    )
+
+    @property
+    def textfile_path(self) -> Path | None:
+        """textfile 路径（相对路径基于项目根目录）"""
+        if not self.textfile:
+            return None
+        return ROOT_DIR / self.textfile
+
+
+class ArchiveConfig(BaseModel):
+    """原始响应归档配置"""
+
+    enabled: bool = Field(default=False, description="是否归档接口返回的完整页面")
+    dir: str = Field(default="data/archive", description="归档目录")
+    compression: Literal["auto", "zstd", "gzip"] = Field(
+        default="auto", description="压缩格式（auto：有 zstd 时用 zstd，否则 gzip）"
+    )
+    max_segment_mb: float = Field(default=16, gt=0, description="单个分段上限（MB）")
+    max_total_mb: float = Field(default=512, gt=0, description="归档总大小上限（MB）")
+
+    @property
+    def path(self) -> Path:
+        """归档目录路径（相对路径基于项目根目录）"""
+        return ROOT_DIR / self.dir
+
+
 class Settings(BaseSettings):
     """全局配置 - 遵循 Pydantic Settings 最佳实践
 
@@ -171,6 +324,9 @@ class Settings(BaseSettings):
     api: ApiConfig = Field(default_factory=ApiConfig)
     notification: NotificationConfig = Field(default_factory=NotificationConfig)
     report: ReportConfig = Field(default_factory=ReportConfig)
+    metrics: MetricsConfig = Field(default_factory=MetricsConfig)
+    archive: ArchiveConfig = Field(default_factory=ArchiveConfig)
+    rooms: list[RoomConfig] = Field(default_factory=list, description="多房间列表")
 
     model_config = SettingsConfigDict(
         # 配置文件源（只在顶层配置一次）
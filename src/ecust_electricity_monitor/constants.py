@@ -28,6 +28,9 @@ DEFAULT_LOG_DIR = Path("logs")
 # 告警配置
 DEFAULT_ALERT_THRESHOLD = 10.0  # 度
 
+# 充值识别：相邻两次读数电量上升超过此值视为充值（度）
+RECHARGE_THRESHOLD_KWH = 1.0
+
 # 重试配置
 MAX_RETRIES = 3
 RETRY_BACKOFF_FACTOR = 2  # 指数退避因子
@@ -32,6 +32,12 @@ class ClientError(ElectricityMonitorError):
         return base_msg
 
 
+class CircuitOpenError(ClientError):
+    """熔断器打开，请求被直接拒绝"""
+
+    pass
+
+
 class StorageError(ElectricityMonitorError):
     """CSV 存储失败异常"""
 
@@ -0,0 +1,144 @@
+"""数据导出模块
+
+把电量历史以流式方式导出，供下游分析使用：
+- JsonLinesWriter: JSON Lines（始终可用）
+- ParquetWriter / ArrowWriter: Parquet / Arrow IPC 列式文件（安装 pyarrow 后可用）
+- PackedBinaryWriter: 紧凑定长二进制（无依赖，作为列式格式的后备）
+
+使用示例:
+    from ecust_electricity_monitor.export import export_data, get_writer
+
+    with get_writer("parquet", path, kind="records") as writer:
+        count = export_data(repository, writer)
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import Literal
+
+from ..storage import ElectricityRepository
+from .base import SCHEMAS, ExportKind, ExportWriter, record_row, rollup_row
+from .binary import PackedBinaryWriter, read_packed, read_packed_header
+from .jsonl import JsonLinesWriter
+
+try:
+    from .arrow import ArrowWriter, ParquetWriter
+
+    PYARROW_AVAILABLE = True
+except ImportError:  # pyarrow 未安装
+    PYARROW_AVAILABLE = False
+
+# 导出粒度：原始记录或按天/按小时汇总
+Granularity = Literal["raw", "day", "hour"]
+
+# 导出格式（columnar 在有 pyarrow 时为 Parquet，否则为紧凑二进制）
+ExportFormat = Literal["jsonl", "parquet", "arrow", "binary", "columnar"]
+
+# 实际写入的格式（columnar 解析后）
+WriterFormat = Literal["jsonl", "parquet", "arrow", "binary"]
+
+# 各格式的默认文件扩展名
+EXTENSIONS: dict[WriterFormat, str] = {
+    "jsonl": ".jsonl",
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+    "binary": ".bin",
+}
+
+
+def available_formats() -> list[str]:
+    """当前环境可用的导出格式"""
+    formats = [JsonLinesWriter.name, PackedBinaryWriter.name]
+    if PYARROW_AVAILABLE:
+        formats += [ParquetWriter.name, ArrowWriter.name]
+    return formats
+
+
+def resolve_format(fmt: ExportFormat) -> WriterFormat:
+    """解析 columnar 为实际格式，其他格式原样返回"""
+    if fmt == "columnar":
+        return "parquet" if PYARROW_AVAILABLE else "binary"
+    return fmt
+
+
+def get_writer(
+    fmt: ExportFormat, path: Path, kind: ExportKind = "records"
+) -> ExportWriter:
+    """创建导出写入器
+
+    Args:
+        fmt: "jsonl"、"parquet"、"arrow"、"binary"，或 "columnar"
+            （有 pyarrow 时为 Parquet，否则为紧凑二进制）
+        path: 输出文件路径
+        kind: 数据种类（records / rollups）
+
+    Returns:
+        导出写入器
+
+    Raises:
+        ValueError: 未知格式或格式不可用
+    """
+    resolved = resolve_format(fmt)
+    if resolved == "jsonl":
+        return JsonLinesWriter(path, kind)
+    if resolved == "binary":
+        return PackedBinaryWriter(path, kind)
+    if resolved in ("parquet", "arrow"):
+        if not PYARROW_AVAILABLE:
+            raise ValueError(f"{resolved} 格式不可用，请安装 pyarrow")
+        if resolved == "parquet":
+            return ParquetWriter(path, kind)
+        return ArrowWriter(path, kind)
+    raise ValueError(f"未知的导出格式: {resolved}")
+
+
+def export_data(
+    repository: ElectricityRepository,
+    writer: ExportWriter,
+    granularity: Granularity = "raw",
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> int:
+    """把仓储中的数据流式写入写入器
+
+    原始记录通过 repository.scan_rows() 逐行读取；汇总数据来自
+    repository.find_rollups()（每个周期一行，数据量很小）。
+
+    Args:
+        repository: 数据仓储
+        writer: 导出写入器（kind 需与粒度匹配）
+        granularity: raw / day / hour
+        start: 开始时间（包含）
+        end: 结束时间（包含）
+
+    Returns:
+        写入的行数
+    """
+    if granularity == "raw":
+        for row in repository.scan_rows(start, end):
+            writer.write(row)
+    else:
+        for rollup in repository.find_rollups(granularity, start, end):
+            writer.write(rollup_row(rollup))
+    return writer.rows_written
+
+
+__all__ = [
+    "EXTENSIONS",
+    "PYARROW_AVAILABLE",
+    "SCHEMAS",
+    "ExportWriter",
+    "JsonLinesWriter",
+    "PackedBinaryWriter",
+    "available_formats",
+    "export_data",
+    "get_writer",
+    "read_packed",
+    "read_packed_header",
+    "resolve_format",
+    "record_row",
+    "rollup_row",
+]
+
+if PYARROW_AVAILABLE:
+    __all__ += ["ArrowWriter", "ParquetWriter"]
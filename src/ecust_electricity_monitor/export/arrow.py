@@ -0,0 +1,71 @@
+"""Arrow / Parquet 导出（需要 pyarrow）
+
+按批（默认 10,000 行）转换为列式数据写出，内存占用与历史总量无关。
+"""
+
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .base import ExportKind, ExportWriter, Row
+
+# 每批行数
+DEFAULT_BATCH_SIZE = 10_000
+
+# 字段类型对应的 Arrow 类型
+_ARROW_TYPES = {
+    "timestamp": pa.timestamp("us"),
+    "float": pa.float64(),
+    "int": pa.int64(),
+    "bool": pa.bool_(),
+}
+
+
+class ArrowWriter(ExportWriter):
+    """Arrow IPC 文件写入器"""
+
+    name = "arrow"
+    extension = ".arrow"
+
+    def __init__(
+        self, path: Path, kind: ExportKind, batch_size: int = DEFAULT_BATCH_SIZE
+    ):
+        super().__init__(path, kind)
+        self.schema = pa.schema(
+            [(name, _ARROW_TYPES[type_]) for name, type_ in self.fields]
+        )
+        self.batch_size = batch_size
+        self._columns: list[list] = [[] for _ in self.fields]
+        self._writer = self._open_writer()
+
+    def _open_writer(self):
+        return pa.ipc.new_file(str(self.path), self.schema)
+
+    def write(self, row: Row) -> None:
+        for column, value in zip(self._columns, row, strict=True):
+            column.append(value)
+        self.rows_written += 1
+        if len(self._columns[0]) >= self.batch_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._columns[0]:
+            return
+        batch = pa.record_batch(self._columns, schema=self.schema)
+        self._writer.write_batch(batch)
+        self._columns = [[] for _ in self.fields]
+
+    def close(self) -> None:
+        self._flush()
+        self._writer.close()
+
+
+class ParquetWriter(ArrowWriter):
+    """Parquet 文件写入器"""
+
+    name = "parquet"
+    extension = ".parquet"
+
+    def _open_writer(self):
+        return pq.ParquetWriter(str(self.path), self.schema)
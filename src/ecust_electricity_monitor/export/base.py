@@ -0,0 +1,105 @@
+"""导出写入器抽象接口
+
+写入器逐行接收数据并流式写出，调用方不需要把全部历史载入内存。
+每行是按字段顺序排列的元组，字段定义见 SCHEMAS。
+"""
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Literal
+
+from ..models import ElectricityRecord, PowerRollup
+
+# 导出的数据种类：原始记录或按天/按小时汇总
+ExportKind = Literal["records", "rollups"]
+
+# 字段定义：(字段名, 类型)，类型为 timestamp / float / int / bool
+SCHEMAS: dict[str, list[tuple[str, str]]] = {
+    "records": [
+        ("timestamp", "timestamp"),
+        ("power", "float"),
+        ("alert_sent", "bool"),
+    ],
+    "rollups": [
+        ("period_start", "timestamp"),
+        ("first_power", "float"),
+        ("last_power", "float"),
+        ("min_power", "float"),
+        ("consumed_kwh", "float"),
+        ("sample_count", "int"),
+    ],
+}
+
+Row = tuple
+
+
+def record_row(record: ElectricityRecord) -> Row:
+    """电量记录转换为导出行"""
+    return (record.timestamp, record.power, record.alert_sent)
+
+
+def rollup_row(rollup: PowerRollup) -> Row:
+    """汇总转换为导出行"""
+    return (
+        rollup.period_start,
+        rollup.first_power,
+        rollup.last_power,
+        rollup.min_power,
+        rollup.consumed_kwh,
+        rollup.sample_count,
+    )
+
+
+class ExportWriter(ABC):
+    """导出写入器抽象基类
+
+    使用方式:
+        with JsonLinesWriter(path, "records") as writer:
+            for record in repository.iter_records():
+                writer.write(record_row(record))
+    """
+
+    # 格式名称及默认文件扩展名
+    name: str = ""
+    extension: str = ""
+
+    def __init__(self, path: Path, kind: ExportKind):
+        """初始化写入器
+
+        Args:
+            path: 输出文件路径
+            kind: 数据种类
+        """
+        if kind not in SCHEMAS:
+            raise ValueError(f"不支持的导出数据种类: {kind}")
+        self.path = Path(path)
+        self.kind = kind
+        self.fields = SCHEMAS[kind]
+        self.rows_written = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    @abstractmethod
+    def write(self, row: Row) -> None:
+        """写入一行
+
+        Args:
+            row: 按字段顺序排列的元组
+        """
+
+    @abstractmethod
+    def close(self) -> None:
+        """完成写入并关闭文件"""
+
+    def __enter__(self) -> "ExportWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def to_json_value(value) -> object:
+    """行内的值转换为 JSON 可序列化的值"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
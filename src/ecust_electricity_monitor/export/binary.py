@@ -0,0 +1,106 @@
+"""紧凑二进制导出（无第三方依赖）
+
+文件格式：
+- 8 字节魔数 b"EMONPK1\n"
+- 4 字节小端无符号整数 N，随后 N 字节 UTF-8 JSON 头：
+  {"kind": ..., "fields": [[名称, 类型], ...], "struct": 每行的 struct 格式}
+- 定长行，按 struct 格式小端打包；时间为距 1970-01-01 的整数微秒（本地时间）
+
+可用 read_packed() 逐行读回，或用 numpy.fromfile 按头中的格式直接映射。
+"""
+
+import json
+import struct
+from collections.abc import Iterator
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from .base import ExportKind, ExportWriter, Row
+
+MAGIC = b"EMONPK1\n"
+
+# 字段类型对应的 struct 格式
+_STRUCT_CODES = {"timestamp": "q", "float": "d", "int": "q", "bool": "?"}
+
+# 时间编码的原点与单位
+_EPOCH = datetime(1970, 1, 1)
+_ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+def _row_struct(fields: list[tuple[str, str]]) -> struct.Struct:
+    return struct.Struct("<" + "".join(_STRUCT_CODES[t] for _, t in fields))
+
+
+class PackedBinaryWriter(ExportWriter):
+    """紧凑二进制写入器"""
+
+    name = "binary"
+    extension = ".bin"
+
+    def __init__(self, path, kind: ExportKind):
+        super().__init__(path, kind)
+        self._struct = _row_struct(self.fields)
+        self._timestamp_columns = [
+            i for i, (_, t) in enumerate(self.fields) if t == "timestamp"
+        ]
+
+        header = json.dumps(
+            {"kind": kind, "fields": self.fields, "struct": self._struct.format}
+        ).encode("utf-8")
+        self._file = open(self.path, "wb")  # noqa: SIM115
+        self._file.write(MAGIC)
+        self._file.write(struct.pack("<I", len(header)))
+        self._file.write(header)
+
+    def write(self, row: Row) -> None:
+        values = list(row)
+        for i in self._timestamp_columns:
+            values[i] = (values[i] - _EPOCH) // _ONE_MICROSECOND
+        self._file.write(self._struct.pack(*values))
+        self.rows_written += 1
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def _read_header(f) -> dict:
+    """读取并校验文件头"""
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError(f"不是有效的导出文件: {f.name}")
+    (length,) = struct.unpack("<I", f.read(4))
+    return json.loads(f.read(length).decode("utf-8"))
+
+
+def read_packed_header(path: Path) -> dict:
+    """读取紧凑二进制文件的 JSON 头
+
+    Raises:
+        ValueError: 文件格式不正确
+    """
+    with open(path, "rb") as f:
+        return _read_header(f)
+
+
+def read_packed(path: Path) -> Iterator[Row]:
+    """逐行读取紧凑二进制文件
+
+    Args:
+        path: 文件路径
+
+    Yields:
+        按字段顺序排列的元组；时间字段还原为 datetime
+
+    Raises:
+        ValueError: 文件格式不正确
+    """
+    with open(path, "rb") as f:
+        header = _read_header(f)
+        row_struct = struct.Struct(header["struct"])
+        timestamp_columns = [
+            i for i, (_, t) in enumerate(header["fields"]) if t == "timestamp"
+        ]
+        while chunk := f.read(row_struct.size):
+            values = list(row_struct.unpack(chunk))
+            for i in timestamp_columns:
+                values[i] = _EPOCH + values[i] * _ONE_MICROSECOND
+            yield tuple(values)
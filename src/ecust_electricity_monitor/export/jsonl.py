@@ -0,0 +1,32 @@
+"""JSON Lines 导出
+
+每行一个 JSON 对象，时间使用 ISO 8601 字符串。
+"""
+
+import json
+
+from .base import ExportKind, ExportWriter, Row, to_json_value
+
+
+class JsonLinesWriter(ExportWriter):
+    """JSON Lines 写入器"""
+
+    name = "jsonl"
+    extension = ".jsonl"
+
+    def __init__(self, path, kind: ExportKind):
+        super().__init__(path, kind)
+        self._names = [name for name, _ in self.fields]
+        self._file = open(self.path, "w", encoding="utf-8")  # noqa: SIM115
+
+    def write(self, row: Row) -> None:
+        obj = {
+            name: to_json_value(value)
+            for name, value in zip(self._names, row, strict=True)
+        }
+        self._file.write(json.dumps(obj, ensure_ascii=False))
+        self._file.write("\n")
+        self.rows_written += 1
+
+    def close(self) -> None:
+        self._file.close()
@@ -0,0 +1,99 @@
+"""查询结果缓存模块
+
+职责：
+- 在磁盘上保存每个房间最近一次成功的查询结果
+- TTL 内再次查询时直接返回缓存（例如连续运行 emon fetch 时不重复请求接口）
+
+每个房间一个 JSON 文件，写入使用“临时文件 + 原子替换”，多个进程可以安全共享；
+文件损坏或过期时视为未命中。失败的查询不缓存。
+"""
+
+import hashlib
+import re
+import time
+from collections.abc import Callable, Hashable
+from pathlib import Path
+
+from .logger import logger
+from .models import FetchResult
+from .storage.sidecar import read_json, write_json_atomic
+
+# 缓存文件名中房间号允许的字符
+_UNSAFE_CHARS = re.compile(r"[^0-9A-Za-z_-]")
+
+
+class FetchCache:
+    """查询结果的磁盘缓存"""
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        ttl_seconds: float = 300.0,
+        refresh: bool = False,
+        clock: Callable[[], float] = time.time,
+    ):
+        """初始化查询结果缓存
+
+        Args:
+            cache_dir: 缓存目录
+            ttl_seconds: 缓存有效期（秒）
+            refresh: 为 True 时忽略已有缓存（仍写入新的结果）
+            clock: 时钟（跨进程共享，使用系统时间）
+        """
+        self.cache_dir = Path(cache_dir)
+        self.ttl_seconds = ttl_seconds
+        self.refresh = refresh
+        self._clock = clock
+
+    def path_for(self, roomid: str, key: Hashable) -> Path:
+        """房间对应的缓存文件路径
+
+        Args:
+            roomid: 房间ID（用于文件名，便于排查）
+            key: 完整的请求键（接口地址、sysid、楼栋等，取哈希）
+
+        Returns:
+            缓存文件路径
+        """
+        digest = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()[:16]
+        return self.cache_dir / f"{_UNSAFE_CHARS.sub('_', roomid)}-{digest}.json"
+
+    def get(self, roomid: str, key: Hashable) -> FetchResult | None:
+        """读取未过期的缓存结果
+
+        Returns:
+            缓存结果（from_cache=True），未命中时返回 None
+        """
+        if self.refresh:
+            return None
+
+        data = read_json(self.path_for(roomid, key))
+        if data is None:
+            return None
+        try:
+            cached_at = float(data["cached_at"])
+            result = FetchResult.model_validate(data["result"])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+        # 时钟回拨（age < 0）时同样视为过期
+        age = self._clock() - cached_at
+        if not 0 <= age < self.ttl_seconds:
+            return None
+        logger.debug(f"使用缓存的查询结果（{age:.0f} 秒前）")
+        return result.model_copy(update={"from_cache": True})
+
+    def put(self, roomid: str, key: Hashable, result: FetchResult) -> None:
+        """写入查询结果（失败的结果不写入；写入失败只记录警告）"""
+        if not result.success or result.from_cache:
+            return
+        try:
+            write_json_atomic(
+                self.path_for(roomid, key),
+                {
+                    "cached_at": self._clock(),
+                    "result": result.model_dump(mode="json"),
+                },
+            )
+        except OSError as e:
+            logger.warning(f"写入查询结果缓存失败: {e}")
@@ -4,6 +4,7 @@
 - 追踪系统运行状态
 - 监控连续失败次数
 - 判断是否需要发送告警
+- 接收熔断器状态变化
 
 遵循 SOLID 原则：
 - 单一职责：只负责健康状态监控
@@ -13,6 +14,7 @@
 from datetime import datetime
 
 from .logger import logger
+from .metrics import CONSECUTIVE_FAILURES, HEALTHY, LAST_SUCCESS
 
 
 class HealthMonitor:
@@ -35,6 +37,8 @@ class HealthMonitor:
         self.last_success_time: datetime | None = None
         self.last_failure_time: datetime | None = None
         self._alert_sent = False
+        self.breaker_state = "closed"
+        self._export_metrics()
 
     def record_success(self) -> None:
         """记录成功事件
@@ -44,6 +48,7 @@ class HealthMonitor:
         self.consecutive_failures = 0
         self.last_success_time = datetime.now()
         self._alert_sent = False
+        self._export_metrics()
 
         logger.debug("健康检查：成功，重置失败计数")
 
@@ -54,12 +59,28 @@ class HealthMonitor:
         """
         self.consecutive_failures += 1
         self.last_failure_time = datetime.now()
+        self._export_metrics()
 
         logger.warning(
             f"健康检查：失败 "
             f"({self.consecutive_failures}/{self.max_consecutive_failures})"
         )
 
+    def on_breaker_state_change(self, old: str, new: str) -> None:
+        """熔断器状态变化回调（通过 CircuitBreaker.add_listener 注册）
+
+        Args:
+            old: 旧状态
+            new: 新状态
+        """
+        self.breaker_state = new
+        self._export_metrics()
+
+        if new == "open":
+            logger.warning("健康检查：接口熔断，暂停请求")
+        elif new == "closed" and old != "closed":
+            logger.info("健康检查：接口恢复，熔断器已关闭")
+
     def should_send_health_alert(self) -> bool:
         """判断是否应该发送健康告警
 
@@ -84,9 +105,12 @@ class HealthMonitor:
         """系统是否健康
 
         Returns:
-            如果连续失败次数小于阈值，返回 True
+            如果连续失败次数小于阈值且熔断器未打开，返回 True
         """
-        return self.consecutive_failures < self.max_consecutive_failures
+        return (
+            self.consecutive_failures < self.max_consecutive_failures
+            and self.breaker_state != "open"
+        )
 
     @property
     def status(self) -> dict:
@@ -106,8 +130,16 @@ class HealthMonitor:
             if self.last_failure_time
             else None,
             "alert_sent": self._alert_sent,
+            "breaker_state": self.breaker_state,
         }
 
+    def _export_metrics(self) -> None:
+        """同步健康状态到指标注册表"""
+        HEALTHY.set(1 if self.is_healthy else 0)
+        CONSECUTIVE_FAILURES.set(self.consecutive_failures)
+        if self.last_success_time is not None:
+            LAST_SUCCESS.set(self.last_success_time.timestamp())
+
     def get_uptime_hours(self) -> float | None:
         """获取距离上次成功的小时数
 
@@ -0,0 +1,365 @@
+"""指标模块
+
+职责：
+- 提供进程内指标注册表（计数器、仪表、直方图），线程安全
+- 按 Prometheus 文本格式（OpenMetrics 兼容子集）输出
+- 调度器进程通过本地 HTTP /metrics 暴露；cron 模式写入 node-exporter 文本文件
+
+无第三方依赖。模块级 registry 及预定义指标供各组件直接使用：
+
+    from .metrics import FETCH_ATTEMPTS
+    FETCH_ATTEMPTS.inc(room="1234")
+"""
+
+import math
+import os
+import threading
+from abc import ABC, abstractmethod
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import TypeVar
+
+from .logger import logger
+
+# Prometheus 文本格式的 Content-Type
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 默认直方图分桶（秒），覆盖本地解析到慢速网络请求
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    """格式化样本值"""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    """转义标签值"""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: LabelValues) -> str:
+    """格式化标签，如 {room="1234"}"""
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)
+    )
+    return "{" + pairs + "}"
+
+
+class _Metric(ABC):
+    """指标基类"""
+
+    type_name = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        """标签字典转换为有序的标签值元组"""
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"指标 {self.name} 需要标签 {self.labelnames}，实际为 {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abstractmethod
+    def _samples(self) -> list[tuple[str, str, float]]:
+        """(后缀, 标签串, 值) 列表"""
+        pass
+
+    def render(self) -> str:
+        """输出本指标的文本格式"""
+        lines = [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        lines += [
+            f"{self.name}{suffix}{labels} {_format_value(value)}"
+            for suffix, labels, value in self._samples()
+        ]
+        return "\n".join(lines) + "\n"
+
+
+class Counter(_Metric):
+    """计数器（只增不减）"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """增加计数"""
+        if amount < 0:
+            raise ValueError("计数器只能增加")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        """当前计数"""
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> list[tuple[str, str, float]]:
+        with self._lock:
+            return [
+                ("", _format_labels(self.labelnames, key), value)
+                for key, value in sorted(self._values.items())
+            ]
+
+
+class Gauge(_Metric):
+    """仪表（可任意设置）"""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        """设置当前值"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def remove(self, **labels: str) -> None:
+        """移除一组标签的样本（值未知时使用）"""
+        key = self._key(labels)
+        with self._lock:
+            self._values.pop(key, None)
+
+    def value(self, **labels: str) -> float | None:
+        """当前值，未设置时返回 None"""
+        with self._lock:
+            return self._values.get(self._key(labels))
+
+    def _samples(self) -> list[tuple[str, str, float]]:
+        with self._lock:
+            return [
+                ("", _format_labels(self.labelnames, key), value)
+                for key, value in sorted(self._values.items())
+            ]
+
+
+class Histogram(_Metric):
+    """直方图（累计分桶 + 总和 + 计数）"""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 每组标签：[各桶计数..., 总和, 总数]
+        self._values: dict[LabelValues, list[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """记录一次观测值"""
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def count(self, **labels: str) -> int:
+        """观测次数"""
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return int(state[-1]) if state else 0
+
+    def _samples(self) -> list[tuple[str, str, float]]:
+        samples = []
+        with self._lock:
+            for key, state in sorted(self._values.items()):
+                for bound, count in zip(self.buckets, state, strict=False):
+                    labels = _format_labels(
+                        (*self.labelnames, "le"), (*key, _format_value(bound))
+                    )
+                    samples.append(("_bucket", labels, count))
+                labels = _format_labels((*self.labelnames, "le"), (*key, "+Inf"))
+                samples.append(("_bucket", labels, state[-1]))
+                plain = _format_labels(self.labelnames, key)
+                samples.append(("_sum", plain, state[-2]))
+                samples.append(("_count", plain, state[-1]))
+        return samples
+
+
+MetricT = TypeVar("MetricT", bound=_Metric)
+
+
+class MetricsRegistry:
+    """指标注册表"""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: MetricT) -> MetricT:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"指标已注册: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(
+        self, name: str, help_text: str, labelnames: tuple[str, ...] = ()
+    ) -> Counter:
+        """注册计数器"""
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(
+        self, name: str, help_text: str, labelnames: tuple[str, ...] = ()
+    ) -> Gauge:
+        """注册仪表"""
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """注册直方图"""
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def render(self) -> str:
+        """按 Prometheus 文本格式输出全部指标"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "".join(metric.render() for metric in metrics)
+
+    def write_textfile(self, path: Path) -> None:
+        """写入 node-exporter textfile collector 文件（原子替换）
+
+        Args:
+            path: 目标文件路径（应以 .prom 结尾）
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(self.render(), encoding="utf-8")
+        os.replace(tmp_path, path)
+        logger.debug(f"指标已写入: {path}")
+
+
+def serve_metrics(
+    registry: "MetricsRegistry", host: str = "127.0.0.1", port: int = 9108
+) -> ThreadingHTTPServer:
+    """在后台线程中启动 /metrics HTTP 端点
+
+    Args:
+        registry: 指标注册表
+        host: 监听地址（默认只监听本机）
+        port: 监听端口（0 表示随机端口）
+
+    Returns:
+        HTTP 服务器（调用 shutdown() 停止）
+    """
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802 - http.server 约定的方法名
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:
+            logger.debug(f"metrics: {format % args}")
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    logger.info(f"指标端点已启动: http://{host}:{server.server_port}/metrics")
+    return server
+
+
+# 全局注册表及预定义指标
+registry = MetricsRegistry()
+
+FETCH_ATTEMPTS = registry.counter(
+    "emon_fetch_attempts_total", "电量查询请求次数（含重试）", ("room",)
+)
+FETCH_SUCCESSES = registry.counter(
+    "emon_fetch_success_total", "电量查询成功次数", ("room",)
+)
+FETCH_FAILURES = registry.counter(
+    "emon_fetch_failures_total", "电量查询失败次数（重试耗尽）", ("room",)
+)
+FETCH_RETRIES = registry.counter(
+    "emon_fetch_retries_total", "电量查询重试次数", ("room",)
+)
+FETCH_LATENCY = registry.histogram(
+    "emon_fetch_duration_seconds", "单次 HTTP 请求耗时（秒）", ("room",)
+)
+FETCH_SHORT_CIRCUITED = registry.counter(
+    "emon_fetch_short_circuited_total", "熔断期间被直接拒绝的查询次数", ("room",)
+)
+RETRY_BUDGET_EXHAUSTED = registry.counter(
+    "emon_retry_budget_exhausted_total", "因重试预算耗尽而放弃重试的次数", ("room",)
+)
+FETCH_COALESCED = registry.counter(
+    "emon_fetch_coalesced_total", "与其他任务合并、未单独发出的查询次数", ("room",)
+)
+FETCH_CACHE_HITS = registry.counter(
+    "emon_fetch_cache_hits_total", "命中本地查询缓存、未请求接口的次数", ("room",)
+)
+CIRCUIT_STATE = registry.gauge(
+    "emon_circuit_breaker_state", "熔断器状态（0 关闭 / 1 半开 / 2 打开）"
+)
+RATE_LIMIT_WAIT = registry.histogram(
+    "emon_ratelimit_wait_seconds", "请求在限流器中排队等待的时间（秒）"
+)
+PARSE_TIME = registry.histogram("emon_parse_duration_seconds", "HTML 解析耗时（秒）")
+STORAGE_WRITE_TIME = registry.histogram(
+    "emon_storage_write_duration_seconds", "保存一条记录的耗时（秒，含派生数据）"
+)
+POWER = registry.gauge("emon_power_kwh", "当前剩余电量（度）", ("room",))
+DAYS_REMAINING = registry.gauge("emon_days_remaining", "预估剩余天数", ("room",))
+HEALTHY = registry.gauge("emon_healthy", "系统是否健康（1 健康 / 0 异常）")
+CONSECUTIVE_FAILURES = registry.gauge("emon_consecutive_failures", "连续失败次数")
+LAST_SUCCESS = registry.gauge(
+    "emon_last_success_timestamp_seconds", "最后一次成功的 Unix 时间戳"
+)
+
+
+def update_room_gauges(room: str, power: float, days_remaining: int | None) -> None:
+    """更新房间的电量与剩余天数仪表
+
+    Args:
+        room: 房间标识
+        power: 当前剩余电量
+        days_remaining: 预估剩余天数（无法估算时移除该样本）
+    """
+    POWER.set(power, room=room)
+    if days_remaining is None:
+        DAYS_REMAINING.remove(room=room)
+    else:
+        DAYS_REMAINING.set(days_remaining, room=room)
@@ -1,5 +1,6 @@
 """数据模型 - Data Models using Pydantic"""
 
+import math
 from datetime import datetime
 
 from pydantic import BaseModel, ConfigDict, Field, field_validator
@@ -46,6 +47,10 @@ class FetchResult(BaseModel):
     raw_response: str | None = Field(default=None, description="原始响应（调试用）")
     success: bool = Field(default=True, description="是否成功")
     error_message: str | None = Field(default=None, description="错误消息")
+    elapsed_seconds: float | None = Field(
+        default=None, description="本次查询耗时（秒，含重试与限流等待）"
+    )
+    from_cache: bool = Field(default=False, description="是否来自本地查询缓存")
 
     @field_validator("power")
     @classmethod
@@ -58,6 +63,113 @@ class FetchResult(BaseModel):
         return round(v, 2)
 
 
+class RoomQuery(BaseModel):
+    """单个房间的查询参数（sysid 与接口地址由客户端提供）
+
+    不可变、可哈希：不同楼栋可能有相同的 roomid，批量查询以整个查询参数为键。
+    """
+
+    roomid: str = Field(description="房间ID")
+    areaid: str = Field(description="区域ID")
+    buildid: str = Field(description="建筑ID")
+
+    model_config = ConfigDict(frozen=True)
+
+    @property
+    def building(self) -> tuple[str, str]:
+        """所属楼栋 (areaid, buildid)"""
+        return self.areaid, self.buildid
+
+
+class RechargeEvent(BaseModel):
+    """充值事件模型"""
+
+    timestamp: datetime = Field(description="充值后首次读数时间")
+    power_before: float = Field(description="充值前电量（度）")
+    power_after: float = Field(description="充值后电量（度）")
+
+    @property
+    def amount(self) -> float:
+        """充值电量（度）"""
+        return round(self.power_after - self.power_before, 2)
+
+
+class ConsumptionSegment(BaseModel):
+    """消耗区段模型（两次充值之间的连续用电区间）"""
+
+    start_time: datetime = Field(description="区段开始时间")
+    end_time: datetime = Field(description="区段结束时间")
+    start_power: float = Field(description="区段开始电量（度）")
+    end_power: float = Field(description="区段结束电量（度）")
+    sample_count: int = Field(description="区段内记录数")
+
+    @property
+    def duration_days(self) -> float:
+        """区段时长（天）"""
+        return (self.end_time - self.start_time).total_seconds() / 86400
+
+    @property
+    def consumed_kwh(self) -> float:
+        """区段内消耗电量（度）"""
+        return round(self.start_power - self.end_power, 2)
+
+    @property
+    def rate(self) -> float | None:
+        """区段日均消耗（度/天），时长为 0 时返回 None"""
+        if self.duration_days <= 0:
+            return None
+        return self.consumed_kwh / self.duration_days
+
+
+class SegmentationResult(BaseModel):
+    """充值感知的消耗分段结果"""
+
+    segments: list[ConsumptionSegment] = Field(
+        default_factory=list, description="消耗区段（按时间正序）"
+    )
+    recharges: list[RechargeEvent] = Field(
+        default_factory=list, description="充值事件（按时间正序）"
+    )
+
+    @property
+    def total_consumed_kwh(self) -> float:
+        """总消耗电量（度）"""
+        return round(sum(s.consumed_kwh for s in self.segments), 2)
+
+    @property
+    def total_purchased_kwh(self) -> float:
+        """总充值电量（度）"""
+        return round(sum(r.amount for r in self.recharges), 2)
+
+    @property
+    def covered_days(self) -> float:
+        """区段覆盖的总时长（天），不含充值间隔"""
+        return sum(s.duration_days for s in self.segments)
+
+    @property
+    def average_rate(self) -> float | None:
+        """全部区段的日均消耗（度/天）"""
+        if self.covered_days <= 0:
+            return None
+        return self.total_consumed_kwh / self.covered_days
+
+    @property
+    def last_recharge(self) -> RechargeEvent | None:
+        """最近一次充值"""
+        return self.recharges[-1] if self.recharges else None
+
+
+class PowerRollup(BaseModel):
+    """电量汇总模型（按天或按小时聚合）"""
+
+    period_start: datetime = Field(description="周期开始时间")
+    first_power: float = Field(description="周期内首次读数（度）")
+    last_power: float = Field(description="周期内最后读数（度）")
+    min_power: float = Field(description="周期内最低电量（度）")
+    consumed_kwh: float = Field(description="周期内消耗电量（度，不含充值）")
+    sample_count: int = Field(description="周期内记录数")
+
+
 class AlertContext(BaseModel):
     """告警上下文模型"""
 
@@ -71,6 +183,9 @@ class AlertContext(BaseModel):
     estimated_days_remaining: float | None = Field(
         default=None, description="预估剩余天数"
     )
+    last_recharge: RechargeEvent | None = Field(
+        default=None, description="最近一次充值"
+    )
 
     @property
     def is_critical(self) -> bool:
@@ -91,6 +206,9 @@ class ReportData(BaseModel):
     """报告数据模型"""
 
     records: list[ElectricityRecord] = Field(description="电量记录列表")
+    rollups: list[PowerRollup] = Field(
+        default_factory=list, description="按天汇总（长周期报告用于绘图）"
+    )
     statistics: dict[str, float] = Field(default_factory=dict, description="统计数据")
     metadata: dict[str, str] = Field(default_factory=dict, description="元数据")
     start_date: datetime | None = Field(default=None, description="开始日期")
@@ -121,3 +239,44 @@ class ReportData(BaseModel):
         if not self.records:
             return 0.0
         return max(r.power for r in self.records)
+
+
+class RoomReportSummary(BaseModel):
+    """单个房间的报告生成结果（多房间索引页使用）"""
+
+    room: str = Field(description="房间名称")
+    report_file: str | None = Field(default=None, description="报告文件名")
+    record_count: int = Field(default=0, description="报告包含的记录数")
+    current_power: float | None = Field(default=None, description="当前电量（度）")
+    daily_consumption: float | None = Field(default=None, description="日均消耗")
+    days_remaining: int | None = Field(default=None, description="预估剩余天数")
+    sparkline: list[float] = Field(
+        default_factory=list, description="近期每日电量（迷你趋势图）"
+    )
+    cached: bool = Field(default=False, description="是否复用了已有报告")
+    elapsed_seconds: float = Field(default=0.0, description="生成耗时（秒）")
+    error: str | None = Field(default=None, description="错误信息")
+
+
+class RoomSnapshot(BaseModel):
+    """房间最新读数快照（楼栋级别的看板与告警巡检使用）"""
+
+    room: str = Field(description="房间名称")
+    timestamp: datetime = Field(description="最新读数时间")
+    power: float = Field(description="最新电量（度）")
+    alert_sent: bool = Field(default=False, description="是否已发送告警")
+    daily_consumption: float | None = Field(default=None, description="日均消耗")
+    days_remaining: int | None = Field(default=None, description="预估剩余天数")
+
+    @property
+    def record(self) -> ElectricityRecord:
+        """最新读数对应的电量记录"""
+        return ElectricityRecord(
+            timestamp=self.timestamp, power=self.power, alert_sent=self.alert_sent
+        )
+
+    @property
+    def urgency(self) -> tuple[float, float]:
+        """紧迫程度排序键（越小越紧迫）：先按剩余天数，无法估算的排在后面，再按电量"""
+        days = math.inf if self.days_remaining is None else self.days_remaining
+        return days, self.power
@@ -160,6 +160,7 @@ class EmailNotifier(BaseNotifier):
             "daily_consumption": context.daily_consumption,
             "estimated_days": context.estimated_days_remaining,
             "days_color": days_color,
+            "last_recharge": context.last_recharge,
             "history": context.history[:5],  # 最近5条记录
             "is_critical": context.is_critical,
         }
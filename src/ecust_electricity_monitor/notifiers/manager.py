@@ -8,6 +8,7 @@ from datetime import datetime, timedelta
 from ..config import NotificationConfig
 from ..logger import logger
 from ..models import AlertContext
+from ..timing import span
 from .base import BaseNotifier
 from .email import EmailNotifier
 from .serverchan import ServerChanNotifier
@@ -141,7 +142,9 @@ class NotificationManager:
         # 并发发送到所有已配置的通知器
         for notifier in self._notifiers:
             try:
-                if notifier.send_power_alert(context):
+                with span(f"notify.{type(notifier).__name__}"):
+                    sent = notifier.send_power_alert(context)
+                if sent:
                     success_count += 1
                 else:
                     fail_count += 1
@@ -182,7 +185,11 @@ class NotificationManager:
         # 并发发送到所有已配置的通知器
         for notifier in self._notifiers:
             try:
-                if notifier.send_system_alert(consecutive_failures, last_success_time):
+                with span(f"notify.{type(notifier).__name__}"):
+                    sent = notifier.send_system_alert(
+                        consecutive_failures, last_success_time
+                    )
+                if sent:
                     success_count += 1
                 else:
                     fail_count += 1
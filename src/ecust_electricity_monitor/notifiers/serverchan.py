@@ -90,6 +90,14 @@ class ServerChanNotifier(BaseNotifier):
                 f"⏱️ **预计剩余：** {context.estimated_days_remaining} 天"
             )
 
+        # 添加最近充值
+        if context.last_recharge:
+            recharge = context.last_recharge
+            content_parts.append(
+                f"🔋 **最近充值：** {recharge.amount:.1f} 度 "
+                f"({recharge.timestamp.strftime('%Y-%m-%d %H:%M')})"
+            )
+
         # 添加提示信息
         if context.is_critical:
             content_parts.extend(["", "---", "**⚠️ 请及时充值，避免断电！**"])
@@ -0,0 +1,237 @@
+"""限流模块
+
+职责：
+- 令牌桶：限制每秒请求数，允许少量突发
+- 并发上限：限制同时进行的请求数
+- 在同一进程的所有客户端之间共享；配置状态文件后通过文件锁在多个进程之间共享
+  （例如 cron 触发的 emon fetch 与常驻的 emon schedule）
+
+令牌桶采用预约方式：每个请求取走一个令牌，令牌不足时余额记为负数，
+请求按预约顺序等待 (欠额 / 速率) 秒，因此等待时间即排队时间。
+"""
+
+import asyncio
+import json
+import threading
+import time
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+from typing import IO
+
+from .logger import logger
+from .metrics import RATE_LIMIT_WAIT
+from .timing import span
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
+
+# 跨进程并发槽位的轮询间隔（秒）
+_SLOT_POLL_SECONDS = 0.01
+
+
+def available_file_lock() -> bool:
+    """当前平台是否支持跨进程共享（需要 fcntl.flock）"""
+    return fcntl is not None
+
+
+class RateLimiter:
+    """令牌桶限流器 + 并发上限
+
+    线程安全；同一进程内的多个 ElectricityClient 应共享同一实例。
+    """
+
+    def __init__(
+        self,
+        rate: float = 0.0,
+        burst: int = 1,
+        max_concurrency: int = 0,
+        state_file: Path | str | None = None,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """初始化限流器
+
+        Args:
+            rate: 每秒请求数（0 表示不限速）
+            burst: 令牌桶容量（允许的突发请求数）
+            max_concurrency: 同时进行的请求数上限（0 表示不限）
+            state_file: 跨进程共享状态的文件（None 表示只在进程内共享）
+            clock: 时钟（跨进程共享时各进程须一致，默认使用系统时间）
+            sleep: 等待函数（测试时可替换）
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_concurrency = max_concurrency
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated_at = clock()
+        self._semaphore = (
+            threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        )
+
+        self.state_file: Path | None = None
+        if state_file is not None:
+            if available_file_lock():
+                self.state_file = Path(state_file)
+                self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            else:
+                logger.warning("当前平台不支持文件锁，限流只在进程内生效")
+
+    @property
+    def enabled(self) -> bool:
+        """是否限制了速率或并发"""
+        return self.rate > 0 or self.max_concurrency > 0
+
+    @contextmanager
+    def acquire(self) -> Iterator[float]:
+        """获取一次请求许可（阻塞），退出时释放并发槽位
+
+        Yields:
+            排队等待的时间（秒）
+        """
+        start = time.perf_counter()
+        with span("ratelimit.wait"):
+            slot = self._enter_slot()
+            try:
+                wait = self._reserve()
+                if wait > 0:
+                    self._sleep(wait)
+            except BaseException:
+                self._release_slot(slot)
+                raise
+        waited = time.perf_counter() - start
+        RATE_LIMIT_WAIT.observe(waited)
+
+        try:
+            yield waited
+        finally:
+            self._release_slot(slot)
+
+    @asynccontextmanager
+    async def acquire_async(self) -> AsyncIterator[float]:
+        """acquire() 的异步版本：等待期间不阻塞事件循环
+
+        Yields:
+            排队等待的时间（秒）
+        """
+        start = time.perf_counter()
+        with span("ratelimit.wait"):
+            slot = await asyncio.to_thread(self._enter_slot)
+            try:
+                wait = await asyncio.to_thread(self._reserve)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            except BaseException:
+                self._release_slot(slot)
+                raise
+        waited = time.perf_counter() - start
+        RATE_LIMIT_WAIT.observe(waited)
+
+        try:
+            yield waited
+        finally:
+            self._release_slot(slot)
+
+    # ------------------------------------------------------------------
+    # 令牌桶
+    # ------------------------------------------------------------------
+
+    def _reserve(self) -> float:
+        """预约一个令牌，返回需要等待的时间（秒）"""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            if self.state_file is None:
+                self._tokens, self._updated_at, wait = self._take(
+                    self._tokens, self._updated_at
+                )
+                return wait
+            return self._reserve_shared(self.state_file)
+
+    def _take(self, tokens: float, updated_at: float) -> tuple[float, float, float]:
+        """补充令牌并取走一个，返回 (新余额, 更新时间, 等待时间)"""
+        now = self._clock()
+        # 时钟回拨时不补充
+        elapsed = max(0.0, now - updated_at)
+        tokens = min(float(self.burst), tokens + elapsed * self.rate) - 1
+        wait = -tokens / self.rate if tokens < 0 else 0.0
+        return tokens, max(now, updated_at), wait
+
+    def _reserve_shared(self, path: Path) -> float:
+        """在文件锁保护下读写共享的令牌桶状态"""
+        with open(path, "a+", encoding="utf-8") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                tokens, updated_at = self._read_state(f)
+                tokens, updated_at, wait = self._take(tokens, updated_at)
+                f.seek(0)
+                f.truncate()
+                json.dump({"tokens": tokens, "updated_at": updated_at}, f)
+                f.flush()
+                return wait
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _read_state(self, f: IO[str]) -> tuple[float, float]:
+        """读取共享状态（文件为空或损坏时视为满桶）"""
+        f.seek(0)
+        try:
+            state = json.loads(f.read())
+            return float(state["tokens"]), float(state["updated_at"])
+        except (ValueError, KeyError, TypeError):
+            return float(self.burst), self._clock()
+
+    # ------------------------------------------------------------------
+    # 并发槽位
+    # ------------------------------------------------------------------
+
+    def _enter_slot(self) -> IO[bytes] | None:
+        """阻塞直到获得并发槽位
+
+        Returns:
+            跨进程共享时为持有锁的槽位文件，否则为 None
+        """
+        if self._semaphore is None:
+            return None
+        self._semaphore.acquire()
+        if self.state_file is None:
+            return None
+        try:
+            return self._lock_slot_file(self.state_file)
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+    def _release_slot(self, slot: IO[bytes] | None) -> None:
+        """释放并发槽位"""
+        if self._semaphore is None:
+            return
+        if slot is not None:
+            fcntl.flock(slot, fcntl.LOCK_UN)
+            slot.close()
+        self._semaphore.release()
+
+    def _lock_slot_file(self, path: Path) -> IO[bytes]:
+        """轮询 max_concurrency 个槽位文件，对第一个空闲的加排他锁
+
+        flock 随文件描述符关闭（包括进程退出）自动释放，不会残留死锁。
+        """
+        while True:
+            for index in range(self.max_concurrency):
+                slot_path = path.with_name(f"{path.name}.slot{index}")
+                f = open(slot_path, "ab")  # noqa: SIM115 - 锁持有期间保持打开
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    f.close()
+                    continue
+                except BaseException:
+                    f.close()
+                    raise
+                return f
+            time.sleep(_SLOT_POLL_SECONDS)
@@ -0,0 +1,227 @@
+"""报告构建模块
+
+职责：
+- 从仓储准备报告数据（单房间与多房间共用）
+- 在进程池中并行生成各房间的 HTML 报告（Plotly 构图是 CPU 密集型）
+- 生成轻量索引页：内联 SVG 迷你趋势图 + 按剩余天数排序的表格
+"""
+
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import NamedTuple
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from .analytics import PowerAnalyzer
+from .logger import logger
+from .models import ReportData, RoomReportSummary
+from .report_cache import ReportCache
+from .reporter import HTMLReporter
+from .storage import CSVRepository, ElectricityRepository
+
+# 索引页迷你趋势图覆盖的天数
+SPARKLINE_DAYS = 30
+
+# 索引页文件名（输出文件与模板同名）
+INDEX_FILENAME = "index.html"
+
+# 迷你趋势图尺寸（像素）
+_SPARKLINE_WIDTH = 120
+_SPARKLINE_HEIGHT = 28
+
+
+class RoomReportJob(NamedTuple):
+    """单个房间的报告任务（可跨进程传递）"""
+
+    room: str
+    csv_path: Path
+    output_dir: Path
+    days: int
+    threshold: float
+    rollup_after_days: int
+    reporter_options: dict
+    force: bool = False
+
+
+def build_report_data(
+    storage: ElectricityRepository,
+    days: int,
+    threshold: float,
+    rollup_after_days: int,
+) -> ReportData | None:
+    """准备报告数据
+
+    Args:
+        storage: 数据仓储
+        days: 分析最近 N 天
+        threshold: 告警阈值
+        rollup_after_days: 超过此天数时附带按天汇总用于绘图
+
+    Returns:
+        报告数据，没有记录时返回 None
+    """
+    records = storage.find_recent(days=days)
+    if not records:
+        return None
+
+    statistics = PowerAnalyzer(records).get_statistics()
+
+    # 长周期报告使用按天汇总绘图，避免把全部原始读数写入图表
+    rollups = []
+    if days > rollup_after_days:
+        rollups = storage.find_rollups(
+            "day", start=datetime.now() - timedelta(days=days)
+        )
+
+    return ReportData(
+        records=records,
+        rollups=rollups,
+        statistics=statistics,
+        metadata={
+            "threshold": str(threshold),
+            "analysis_period": str(days),
+        },
+    )
+
+
+def build_room_report(job: RoomReportJob) -> RoomReportSummary:
+    """生成单个房间的报告（在工作进程中运行）
+
+    任何错误都记录在返回结果中，不影响其他房间。
+
+    Args:
+        job: 报告任务
+
+    Returns:
+        报告生成结果及索引页所需的摘要
+    """
+    start = time.perf_counter()
+    summary = RoomReportSummary(room=job.room)
+
+    try:
+        storage = CSVRepository(job.csv_path)
+        data = build_report_data(
+            storage, job.days, job.threshold, job.rollup_after_days
+        )
+        if data is None:
+            summary.error = "没有数据"
+        else:
+            state = storage.analytics()
+            summary.record_count = len(data.records)
+            summary.current_power = state.latest.power if state.latest else None
+            summary.daily_consumption = state.daily_consumption
+            summary.days_remaining = state.estimate_remaining_days()
+            summary.sparkline = [
+                r.last_power for r in storage.find_rollups("day")[-SPARKLINE_DAYS:]
+            ]
+
+            cache = ReportCache(job.output_dir, namespace=job.room)
+            reporter = HTMLReporter(job.output_dir, cache=cache, **job.reporter_options)
+            filename = f"room_{job.room}.html"
+            digest = reporter.input_fingerprint(data)
+            report_path = None if job.force else cache.find_report(digest, filename)
+            summary.cached = report_path is not None
+            if report_path is None:
+                report_path = reporter.generate(data, filename=filename)
+                cache.record(report_path, digest)
+            summary.report_file = report_path.name
+    except Exception as e:
+        logger.error(f"房间 {job.room} 报告生成失败: {e}")
+        summary.error = str(e)
+
+    summary.elapsed_seconds = time.perf_counter() - start
+    return summary
+
+
+def build_all_room_reports(
+    jobs: list[RoomReportJob], max_workers: int | None = None
+) -> list[RoomReportSummary]:
+    """并行生成多个房间的报告
+
+    Args:
+        jobs: 报告任务列表
+        max_workers: 最大进程数（None 表示 CPU 核数，1 表示在当前进程顺序执行）
+
+    Returns:
+        各房间结果（按剩余天数升序，无法估算的排在最后）
+    """
+    if max_workers == 1 or len(jobs) <= 1:
+        summaries = [build_room_report(job) for job in jobs]
+    else:
+        # spawn：不继承父进程的线程和锁，各平台行为一致
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers, mp_context=context) as executor:
+            summaries = list(executor.map(build_room_report, jobs))
+
+    return sort_by_days_remaining(summaries)
+
+
+def sort_by_days_remaining(
+    summaries: list[RoomReportSummary],
+) -> list[RoomReportSummary]:
+    """按剩余天数升序排序（最需要充值的房间在前）"""
+    return sorted(
+        summaries,
+        key=lambda s: (s.days_remaining is None, s.days_remaining or 0, s.room),
+    )
+
+
+def sparkline_points(
+    values: list[float],
+    width: int = _SPARKLINE_WIDTH,
+    height: int = _SPARKLINE_HEIGHT,
+) -> str:
+    """迷你趋势图的 SVG polyline 坐标
+
+    Args:
+        values: 数据（至少 2 个）
+        width: 图宽（像素）
+        height: 图高（像素）
+
+    Returns:
+        "x1,y1 x2,y2 ..." 格式的坐标串
+    """
+    low, high = min(values), max(values)
+    span = (high - low) or 1.0
+    step = width / (len(values) - 1)
+    return " ".join(
+        f"{i * step:.1f},{height - (v - low) / span * height:.1f}"
+        for i, v in enumerate(values)
+    )
+
+
+def write_index(
+    summaries: list[RoomReportSummary], output_dir: Path, threshold: float
+) -> Path:
+    """生成多房间索引页
+
+    Args:
+        summaries: 各房间结果（按展示顺序）
+        output_dir: 报告输出目录
+        threshold: 告警阈值（低于阈值的房间高亮）
+
+    Returns:
+        索引页路径
+    """
+    env = Environment(
+        loader=FileSystemLoader(Path(__file__).parent / "templates"),
+        autoescape=select_autoescape(["html", "xml"]),
+    )
+    template = env.get_template(INDEX_FILENAME)
+    html = template.render(
+        summaries=summaries,
+        threshold=threshold,
+        generation_time=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        sparkline_days=SPARKLINE_DAYS,
+        sparkline=sparkline_points,
+        width=_SPARKLINE_WIDTH,
+        height=_SPARKLINE_HEIGHT,
+    )
+
+    output_path = Path(output_dir) / INDEX_FILENAME
+    output_path.write_text(html, encoding="utf-8")
+    logger.info(f"索引页已生成: {output_path}")
+    return output_path
@@ -0,0 +1,118 @@
+"""报告缓存模块
+
+职责：
+- 为报告输入计算指纹（数据范围、最新记录、告警阈值、模板哈希、绘图设置），
+  指纹未变化时跳过重新生成
+- 缓存按天的图表片段（降采样后的曲线点），新增一天只需计算新的片段
+
+缓存文件保存在报告输出目录的 .cache/ 下，删除后自动重建。
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+from .__version__ import __version__
+from .logger import logger
+from .storage.sidecar import read_json, write_json_atomic
+
+# 缓存目录（相对报告输出目录）
+CACHE_DIR = ".cache"
+
+
+def template_hashes(template_dir: Path) -> dict[str, str]:
+    """计算模板目录下各文件的内容哈希
+
+    Args:
+        template_dir: 模板目录（不存在时返回空字典）
+
+    Returns:
+        {相对路径: sha256}
+    """
+    if not template_dir.is_dir():
+        return {}
+    return {
+        path.relative_to(template_dir).as_posix(): hashlib.sha256(
+            path.read_bytes()
+        ).hexdigest()
+        for path in sorted(template_dir.rglob("*"))
+        if path.is_file()
+    }
+
+
+def fingerprint(inputs: dict) -> str:
+    """计算报告输入的指纹
+
+    Args:
+        inputs: 可 JSON 序列化的输入描述（datetime 等使用 str 序列化）
+
+    Returns:
+        sha256 十六进制字符串（包含程序版本）
+    """
+    payload = json.dumps(
+        {"version": __version__, **inputs},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ReportCache:
+    """报告缓存
+
+    使用方式:
+        cache = ReportCache(output_dir)
+        existing = cache.find_report(digest, filename)
+        if existing is None:
+            path = reporter.generate(data, filename)
+            cache.record(path, digest)
+    """
+
+    def __init__(self, output_dir: Path, namespace: str = ""):
+        """初始化报告缓存
+
+        Args:
+            output_dir: 报告输出目录
+            namespace: 缓存命名空间（多房间并行生成时每个房间独立，避免互相覆盖）
+        """
+        suffix = f"-{namespace}" if namespace else ""
+        self.cache_dir = Path(output_dir) / CACHE_DIR
+        self.index_path = self.cache_dir / f"reports{suffix}.json"
+        self.fragments_path = self.cache_dir / f"fragments{suffix}.json"
+
+    def find_report(self, digest: str, filename: str | None = None) -> Path | None:
+        """查找与指纹一致且仍然存在的报告
+
+        Args:
+            digest: 报告输入指纹
+            filename: 指定文件名时只检查该文件；否则查找任意同指纹报告
+
+        Returns:
+            已存在的报告路径，没有则返回 None
+        """
+        reports = (read_json(self.index_path) or {}).get("reports", {})
+        candidates = [filename] if filename else list(reports)
+        for name in candidates:
+            path = self.cache_dir.parent / name
+            if reports.get(name) == digest and path.exists():
+                return path
+        return None
+
+    def record(self, report_path: Path, digest: str) -> None:
+        """记录报告对应的输入指纹"""
+        index = read_json(self.index_path) or {}
+        reports = index.get("reports", {})
+        reports[Path(report_path).name] = digest
+        write_json_atomic(self.index_path, {"reports": reports})
+
+    def load_fragments(self) -> dict[str, dict]:
+        """读取按天的图表片段缓存"""
+        return (read_json(self.fragments_path) or {}).get("days", {})
+
+    def save_fragments(self, fragments: dict[str, dict]) -> None:
+        """写入按天的图表片段缓存（只保留本次报告用到的日期）"""
+        try:
+            write_json_atomic(self.fragments_path, {"days": fragments})
+        except OSError as e:
+            logger.warning(f"写入图表片段缓存失败: {e}")
@@ -11,40 +11,121 @@
 - 依赖倒置：依赖 ReportData 抽象模型
 """
 
+import hashlib
+import os
 from datetime import datetime
+from functools import cache
 from pathlib import Path
+from typing import Literal
 
 import plotly.graph_objects as go
 from jinja2 import Environment, FileSystemLoader, select_autoescape
+from plotly.offline import get_plotlyjs
 from plotly.subplots import make_subplots
 
+from .analytics import PowerAnalyzer, histogram_bins, lttb, min_max_envelope
+from .analytics.downsample import DEFAULT_MAX_POINTS
 from .exceptions import StorageError
 from .logger import logger
 from .models import ReportData
+from .report_cache import ReportCache, fingerprint, template_hashes
+from .timing import span, timed
+
+# plotly.js 引用方式：
+# - cdn: 从 CDN 加载（报告最小，需要外网）
+# - shared: 写入 output_dir/assets/ 下带内容哈希的共享文件，多份报告复用
+# - inline: 内嵌到报告中（单文件，适合邮件附件）
+PlotlyJSMode = Literal["cdn", "shared", "inline"]
+
+# 共享静态资源目录（相对报告输出目录）
+ASSETS_DIR = "assets"
+
+
+@cache
+def _plotlyjs_bundle() -> tuple[str, str]:
+    """plotly.js 源码及带内容哈希的文件名（每个进程只计算一次）"""
+    source = get_plotlyjs()
+    digest = hashlib.sha256(source.encode("utf-8")).hexdigest()[:12]
+    return source, f"plotly-{digest}.min.js"
+
+
+def plotlyjs_asset_ref() -> str:
+    """共享 plotly.js 相对报告输出目录的引用路径（如 assets/plotly-<hash>.min.js）"""
+    return f"{ASSETS_DIR}/{_plotlyjs_bundle()[1]}"
+
+
+def ensure_plotlyjs_asset(output_dir: Path) -> str:
+    """确保共享的 plotly.js 文件存在
+
+    文件名包含内容哈希，已存在时直接复用；plotly 升级后生成新文件。
+
+    Args:
+        output_dir: 报告输出目录
+
+    Returns:
+        相对报告输出目录的引用路径（同 plotlyjs_asset_ref()）
+    """
+    source, name = _plotlyjs_bundle()
+    asset_dir = Path(output_dir) / ASSETS_DIR
+    asset_path = asset_dir / name
+
+    if not asset_path.exists():
+        asset_dir.mkdir(parents=True, exist_ok=True)
+        # 临时文件名带进程号，多进程同时生成报告时互不干扰
+        tmp_path = asset_dir / f".{name}.{os.getpid()}.tmp"
+        tmp_path.write_text(source, encoding="utf-8")
+        os.replace(tmp_path, asset_path)
+        logger.info(f"已写入 plotly.js: {asset_path}")
+
+    return f"{ASSETS_DIR}/{name}"
 
 
 class HTMLReporter:
     """HTML 报告生成器
 
     使用 Plotly 生成交互式可视化报告，使用 Jinja2 渲染模板。
+
+    数据点超过 max_points 时使用 LTTB 降采样（可附带最小/最大值包络），
+    超过 webgl_threshold 时改用 WebGL（Scattergl）渲染。
+
+    plotly.js 的引用方式见 PlotlyJSMode。
     """
 
-    def __init__(self, output_dir: Path):
+    def __init__(
+        self,
+        output_dir: Path,
+        max_points: int = DEFAULT_MAX_POINTS,
+        show_envelope: bool = True,
+        webgl_threshold: int = 5000,
+        plotlyjs: PlotlyJSMode = "cdn",
+        cache: ReportCache | None = None,
+    ):
         """初始化报告生成器
 
         Args:
             output_dir: 报告输出目录
+            max_points: 每条曲线的最大点数（0 表示不降采样）
+            show_envelope: 降采样时是否绘制最小/最大值包络带
+            webgl_threshold: 曲线点数超过此值时使用 Scattergl
+            plotlyjs: plotly.js 引用方式（cdn / shared / inline）
+            cache: 报告缓存（提供时按天缓存降采样后的图表片段）
         """
         self.output_dir = Path(output_dir)
+        self.max_points = max_points
+        self.show_envelope = show_envelope
+        self.webgl_threshold = webgl_threshold
+        self.plotlyjs = plotlyjs
+        self.cache = cache
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
         # 初始化 Jinja2 环境
-        template_dir = Path(__file__).parent / "templates"
+        self.template_dir = Path(__file__).parent / "templates"
         self.jinja_env = Environment(
-            loader=FileSystemLoader(template_dir),
+            loader=FileSystemLoader(self.template_dir),
             autoescape=select_autoescape(["html", "xml"]),
         )
 
+    @timed("report.generate")
     def generate(
         self,
         data: ReportData,
@@ -71,7 +152,8 @@ class HTMLReporter:
             output_path = self.output_dir / filename
 
             # 创建图表
-            fig = self._create_charts(data)
+            with span("report.charts"):
+                fig = self._create_charts(data)
 
             # 添加标题和样式
             title = f"电量监控报告 - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
@@ -88,10 +170,14 @@ class HTMLReporter:
             )
 
             # 生成 HTML
-            html = self._build_html(fig, data)
+            with span("report.html"):
+                html = self._build_html(fig, data)
 
-            # 写入文件
-            output_path.write_text(html, encoding="utf-8")
+            # 写入文件（页面渲染成功后才写入共享的 plotly.js，失败时不留下文件）
+            with span("report.write"):
+                if self.plotlyjs == "shared":
+                    ensure_plotlyjs_asset(self.output_dir)
+                output_path.write_text(html, encoding="utf-8")
 
             logger.info(f"报告已生成: {output_path}")
             return output_path
@@ -100,6 +186,36 @@ class HTMLReporter:
             logger.error(f"生成报告失败: {e}")
             raise StorageError(f"生成报告失败: {e}") from e
 
+    def input_fingerprint(self, data: ReportData) -> str:
+        """计算报告输入指纹
+
+        包含数据范围、记录数、最新记录时间、元数据（告警阈值等）、
+        模板哈希和绘图设置；指纹相同的报告内容相同，可以跳过生成。
+
+        Args:
+            data: 报告数据
+
+        Returns:
+            指纹字符串
+        """
+        timestamps = [r.timestamp for r in data.records]
+        return fingerprint(
+            {
+                "first_record": min(timestamps, default=None),
+                "last_record": max(timestamps, default=None),
+                "record_count": len(timestamps),
+                "rollup_count": len(data.rollups),
+                "metadata": data.metadata,
+                "templates": template_hashes(self.template_dir),
+                "settings": {
+                    "max_points": self.max_points,
+                    "show_envelope": self.show_envelope,
+                    "webgl_threshold": self.webgl_threshold,
+                    "plotlyjs": self.plotlyjs,
+                },
+            }
+        )
+
     def _create_charts(self, data: ReportData) -> go.Figure:
         """创建图表
 
@@ -111,6 +227,7 @@ class HTMLReporter:
         """
         # 按时间正序排列（用于绘图）
         records = sorted(data.records, key=lambda r: r.timestamp)
+        analyzer = PowerAnalyzer(records)
 
         timestamps = [r.timestamp for r in records]
         powers = [r.power for r in records]
@@ -128,22 +245,11 @@ class HTMLReporter:
             row_heights=[0.4, 0.3, 0.3],
         )
 
-        # 1. 电量趋势折线图
-        fig.add_trace(
-            go.Scatter(
-                x=timestamps,
-                y=powers,
-                mode="lines+markers",
-                name="剩余电量",
-                line={"color": "royalblue", "width": 2},
-                marker={"size": 6},
-                hovertemplate=(
-                    "<b>时间:</b> %{x}<br><b>电量:</b> %{y:.2f} 度<extra></extra>"
-                ),
-            ),
-            row=1,
-            col=1,
-        )
+        # 1. 电量趋势折线图（长周期报告使用按天汇总）
+        if data.rollups:
+            self._add_rollup_trend(fig, data)
+        else:
+            self._add_power_trend(fig, timestamps, powers)
 
         # 添加阈值线（如果有统计信息）
         if "threshold" in data.metadata:
@@ -157,27 +263,41 @@ class HTMLReporter:
                 col=1,
             )
 
-        # 2. 日消耗量趋势（计算相邻两点之间的差值）
-        if len(records) >= 2:
-            consumption_dates = []
-            daily_consumption = []
-
-            for i in range(1, len(records)):
-                prev_record = records[i - 1]
-                curr_record = records[i]
-
-                # 计算时间差（天）
-                time_diff = (
-                    curr_record.timestamp - prev_record.timestamp
-                ).total_seconds() / 86400
-
-                if time_diff > 0:
-                    # 计算消耗（注意是减少）
-                    consumption = (prev_record.power - curr_record.power) / time_diff
-
-                    consumption_dates.append(curr_record.timestamp)
-                    daily_consumption.append(abs(consumption))
+        # 标记充值事件
+        segmentation = analyzer.segmentation
+        if segmentation.recharges:
+            fig.add_trace(
+                go.Scatter(
+                    x=[e.timestamp for e in segmentation.recharges],
+                    y=[e.power_after for e in segmentation.recharges],
+                    mode="markers",
+                    name="充值",
+                    marker={"color": "seagreen", "size": 12, "symbol": "triangle-up"},
+                    customdata=[e.amount for e in segmentation.recharges],
+                    hovertemplate=(
+                        "<b>充值时间:</b> %{x}<br>"
+                        "<b>充值电量:</b> %{customdata:.2f} 度<extra></extra>"
+                    ),
+                ),
+                row=1,
+                col=1,
+            )
 
+        # 2. 日消耗量趋势
+        if data.rollups:
+            # 每日消耗电量（不含充值）
+            consumption_dates = [r.period_start for r in data.rollups]
+            daily_consumption = [r.consumed_kwh for r in data.rollups]
+        elif len(records) >= 2:
+            # 相邻两点之间的消耗速率，跳过充值区间
+            consumption_dates, daily_consumption = analyzer.calculate_step_rates()
+            indices = self._downsample(consumption_dates, daily_consumption)
+            consumption_dates = [consumption_dates[i] for i in indices]
+            daily_consumption = [daily_consumption[i] for i in indices]
+        else:
+            consumption_dates, daily_consumption = [], []
+
+        if consumption_dates:
             fig.add_trace(
                 go.Bar(
                     x=consumption_dates,
@@ -193,20 +313,26 @@ class HTMLReporter:
                 col=1,
             )
 
-        # 3. 电量分布直方图
-        fig.add_trace(
-            go.Histogram(
-                x=powers,
-                name="电量分布",
-                nbinsx=20,
-                marker_color="lightseagreen",
-                hovertemplate=(
-                    "<b>电量范围:</b> %{x}<br><b>次数:</b> %{y}<extra></extra>"
+        # 3. 电量分布直方图（按天汇总时使用每日最后读数）
+        if data.rollups:
+            powers = [r.last_power for r in data.rollups]
+        if powers:
+            # 预先分箱，图表中只包含各箱计数而非全部原始值
+            centers, counts, width = histogram_bins(powers, bins=20)
+            fig.add_trace(
+                go.Bar(
+                    x=centers,
+                    y=counts,
+                    width=width,
+                    name="电量分布",
+                    marker_color="lightseagreen",
+                    hovertemplate=(
+                        "<b>电量范围:</b> %{x:.2f}<br><b>次数:</b> %{y}<extra></extra>"
+                    ),
                 ),
-            ),
-            row=3,
-            col=1,
-        )
+                row=3,
+                col=1,
+            )
 
         # 更新坐标轴标签
         fig.update_xaxes(title_text="时间", row=1, col=1)
@@ -220,6 +346,208 @@ class HTMLReporter:
 
         return fig
 
+    def _downsample(self, xs: list[datetime], ys: list[float]) -> list[int]:
+        """按 max_points 选出要绘制的点（LTTB）
+
+        Returns:
+            选中点的下标列表
+        """
+        if not self.max_points or len(xs) <= self.max_points:
+            return list(range(len(xs)))
+        seconds = [(x - xs[0]).total_seconds() for x in xs]
+        return lttb(seconds, ys, self.max_points)
+
+    def _trend_series(
+        self, timestamps: list[datetime], powers: list[float]
+    ) -> tuple[list[datetime], list[float], tuple | None]:
+        """电量趋势要绘制的点
+
+        Returns:
+            (时间, 电量, 包络)，包络为 (时间, 最小值, 最大值)，未降采样时为 None
+        """
+        if not self.max_points or len(timestamps) <= self.max_points:
+            return timestamps, powers, None
+        if self.cache is not None:
+            return self._trend_series_by_day(self.cache, timestamps, powers)
+
+        indices = self._downsample(timestamps, powers)
+        band = None
+        if self.show_envelope:
+            starts, lows, highs = min_max_envelope(powers, len(indices) // 2)
+            band = ([timestamps[i] for i in starts], lows, highs)
+        return [timestamps[i] for i in indices], [powers[i] for i in indices], band
+
+    def _trend_series_by_day(
+        self, cache: ReportCache, timestamps: list[datetime], powers: list[float]
+    ) -> tuple[list[datetime], list[float], tuple | None]:
+        """按天分片降采样，复用缓存中未变化的日期
+
+        点数预算按天平均分配；每天的片段以记录数、首尾时间和电量之和为键，
+        只有内容变化（通常只有最新一天）的片段需要重新计算。
+        """
+        # 按日期切分（timestamps 已正序）
+        bounds = [0]
+        for i in range(1, len(timestamps)):
+            if timestamps[i].date() != timestamps[i - 1].date():
+                bounds.append(i)
+        bounds.append(len(timestamps))
+
+        budget = max(3, self.max_points // (len(bounds) - 1))
+        cached = cache.load_fragments()
+        fragments: dict[str, dict] = {}
+        rebuilt = 0
+
+        xs: list[datetime] = []
+        ys: list[float] = []
+        band_x: list[datetime] = []
+        lows: list[float] = []
+        highs: list[float] = []
+        for start, end in zip(bounds, bounds[1:], strict=False):
+            day_times, day_powers = timestamps[start:end], powers[start:end]
+            key = (
+                f"{end - start}:{day_times[0]}:{day_times[-1]}:"
+                f"{round(sum(day_powers), 2)}:{budget}:{self.show_envelope}"
+            )
+            day = day_times[0].date().isoformat()
+            fragment = cached.get(day)
+            if not fragment or fragment.get("key") != key:
+                fragment = self._day_fragment(day_times, day_powers, budget)
+                fragment["key"] = key
+                rebuilt += 1
+            fragments[day] = fragment
+
+            xs.extend(map(datetime.fromisoformat, fragment["x"]))
+            ys.extend(fragment["y"])
+            band_x.extend(map(datetime.fromisoformat, fragment["band_x"]))
+            lows.extend(fragment["lows"])
+            highs.extend(fragment["highs"])
+
+        cache.save_fragments(fragments)
+        logger.debug(f"图表片段: {len(fragments)} 天，重新计算 {rebuilt} 天")
+
+        band = (band_x, lows, highs) if self.show_envelope else None
+        return xs, ys, band
+
+    def _day_fragment(
+        self, timestamps: list[datetime], powers: list[float], budget: int
+    ) -> dict:
+        """计算一天的图表片段（可 JSON 序列化）"""
+        seconds = [(t - timestamps[0]).total_seconds() for t in timestamps]
+        indices = lttb(seconds, powers, budget)
+        fragment = {
+            "x": [timestamps[i].isoformat() for i in indices],
+            "y": [powers[i] for i in indices],
+            "band_x": [],
+            "lows": [],
+            "highs": [],
+        }
+        if self.show_envelope:
+            starts, lows, highs = min_max_envelope(powers, max(1, budget // 2))
+            fragment["band_x"] = [timestamps[i].isoformat() for i in starts]
+            fragment["lows"] = lows
+            fragment["highs"] = highs
+        return fragment
+
+    def _add_power_trend(
+        self, fig: go.Figure, timestamps: list[datetime], powers: list[float]
+    ) -> None:
+        """绘制原始读数的电量趋势（必要时降采样并附带包络）
+
+        Args:
+            fig: Plotly 图表对象
+            timestamps: 时间（正序）
+            powers: 电量
+        """
+        xs, ys, band = self._trend_series(timestamps, powers)
+        downsampled = len(xs) < len(timestamps)
+
+        if band is not None:
+            band_x, lows, highs = band
+            fig.add_trace(
+                go.Scatter(
+                    x=band_x,
+                    y=lows,
+                    mode="lines",
+                    line={"width": 0},
+                    showlegend=False,
+                    hoverinfo="skip",
+                ),
+                row=1,
+                col=1,
+            )
+            fig.add_trace(
+                go.Scatter(
+                    x=band_x,
+                    y=highs,
+                    mode="lines",
+                    name="电量范围",
+                    line={"width": 0},
+                    fill="tonexty",
+                    fillcolor="rgba(65, 105, 225, 0.15)",
+                    hoverinfo="skip",
+                ),
+                row=1,
+                col=1,
+            )
+
+        scatter = go.Scattergl if len(xs) > self.webgl_threshold else go.Scatter
+        fig.add_trace(
+            scatter(
+                x=xs,
+                y=ys,
+                mode="lines" if downsampled else "lines+markers",
+                name="剩余电量",
+                line={"color": "royalblue", "width": 2},
+                marker={"size": 6},
+                hovertemplate=(
+                    "<b>时间:</b> %{x}<br><b>电量:</b> %{y:.2f} 度<extra></extra>"
+                ),
+            ),
+            row=1,
+            col=1,
+        )
+
+    def _add_rollup_trend(self, fig: go.Figure, data: ReportData) -> None:
+        """由按天汇总绘制电量趋势（每日最后读数及最低电量）
+
+        Args:
+            fig: Plotly 图表对象
+            data: 报告数据（包含 rollups）
+        """
+        days = [r.period_start for r in data.rollups]
+
+        fig.add_trace(
+            go.Scatter(
+                x=days,
+                y=[r.last_power for r in data.rollups],
+                mode="lines+markers",
+                name="剩余电量（日末）",
+                line={"color": "royalblue", "width": 2},
+                marker={"size": 4},
+                customdata=[r.sample_count for r in data.rollups],
+                hovertemplate=(
+                    "<b>日期:</b> %{x}<br><b>日末电量:</b> %{y:.2f} 度<br>"
+                    "<b>记录数:</b> %{customdata}<extra></extra>"
+                ),
+            ),
+            row=1,
+            col=1,
+        )
+        fig.add_trace(
+            go.Scatter(
+                x=days,
+                y=[r.min_power for r in data.rollups],
+                mode="lines",
+                name="当日最低电量",
+                line={"color": "lightsteelblue", "width": 1, "dash": "dot"},
+                hovertemplate=(
+                    "<b>日期:</b> %{x}<br><b>最低电量:</b> %{y:.2f} 度<extra></extra>"
+                ),
+            ),
+            row=1,
+            col=1,
+        )
+
     def _build_html(self, fig: go.Figure, data: ReportData) -> str:
         """构建完整的 HTML 报告
 
@@ -232,7 +560,7 @@ class HTMLReporter:
         """
         # 获取图表 HTML（不包含完整的 HTML 结构）
         chart_html = fig.to_html(
-            include_plotlyjs="cdn",
+            include_plotlyjs=self._plotlyjs_include(),
             full_html=False,
             config={"responsive": True},
         )
@@ -253,6 +581,14 @@ class HTMLReporter:
         template = self.jinja_env.get_template("report.html")
         return template.render(**template_data)
 
+    def _plotlyjs_include(self) -> str | bool:
+        """fig.to_html 的 include_plotlyjs 参数"""
+        if self.plotlyjs == "shared":
+            return plotlyjs_asset_ref()
+        if self.plotlyjs == "inline":
+            return True
+        return "cdn"
+
     def _format_metadata_dict(self, metadata: dict) -> dict:
         """格式化元数据为显示友好的字典
 
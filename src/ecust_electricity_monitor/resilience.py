@@ -0,0 +1,173 @@
+"""容错模块
+
+职责：
+- 熔断器：接口连续失败后快速失败，冷却后只放行一个探测请求决定是否恢复
+- 重试预算：所有房间共享的重试额度，故障期间限制重试总量
+
+两者都是线程安全的，同一进程中的多个 ElectricityClient 应共享同一实例。
+"""
+
+import threading
+import time
+from collections.abc import Callable
+from typing import Literal
+
+from .logger import logger
+from .metrics import CIRCUIT_STATE
+
+BreakerState = Literal["closed", "open", "half_open"]
+
+# 指标中的状态编码
+_STATE_CODES: dict[BreakerState, int] = {"closed": 0, "half_open": 1, "open": 2}
+
+StateListener = Callable[[BreakerState, BreakerState], None]
+
+
+class CircuitBreaker:
+    """熔断器
+
+    - closed：正常放行；连续失败达到阈值后进入 open
+    - open：直接拒绝；冷却时间过后进入 half_open
+    - half_open：只放行一个探测请求，成功则 closed，失败则重新 open
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_seconds: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """初始化熔断器
+
+        Args:
+            failure_threshold: 进入 open 状态的连续失败次数
+            recovery_seconds: open 状态持续多久后允许探测（秒）
+            clock: 单调时钟（测试时可替换）
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state: BreakerState = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._listeners: list[StateListener] = []
+        CIRCUIT_STATE.set(_STATE_CODES["closed"])
+
+    @property
+    def state(self) -> BreakerState:
+        """当前状态（open 冷却结束后在下一次 allow_request 时转为 half_open）"""
+        return self._state
+
+    def add_listener(self, listener: StateListener) -> None:
+        """注册状态变化回调
+
+        Args:
+            listener: 回调函数，参数为 (旧状态, 新状态)
+        """
+        self._listeners.append(listener)
+
+    def allow_request(self) -> bool:
+        """是否放行本次请求
+
+        half_open 状态下只有第一个调用者获得探测资格，
+        探测结束（record_success / record_failure）前其余请求均被拒绝。
+
+        Returns:
+            放行返回 True
+        """
+        with self._lock:
+            if self._state == "closed":
+                return True
+            if self._state == "open":
+                if self._clock() - self._opened_at < self.recovery_seconds:
+                    return False
+                transition = self._transition("half_open")
+            else:
+                transition = None
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+
+        self._notify(transition)
+        return True
+
+    def record_success(self) -> None:
+        """记录成功：重置失败计数并关闭熔断器"""
+        with self._lock:
+            self._failures = 0
+            self._probe_in_flight = False
+            transition = self._transition("closed") if self._state != "closed" else None
+        self._notify(transition)
+
+    def record_failure(self) -> None:
+        """记录失败：探测失败或连续失败达到阈值时打开熔断器"""
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            transition = None
+            if self._state == "half_open" or (
+                self._state == "closed" and self._failures >= self.failure_threshold
+            ):
+                self._opened_at = self._clock()
+                transition = self._transition("open")
+        self._notify(transition)
+
+    def _transition(self, new: BreakerState) -> tuple[BreakerState, BreakerState]:
+        """切换状态（调用方持有锁），返回 (旧状态, 新状态)"""
+        old, self._state = self._state, new
+        return old, new
+
+    def _notify(self, transition: tuple[BreakerState, BreakerState] | None) -> None:
+        """在锁外通知状态变化"""
+        if transition is None:
+            return
+        old, new = transition
+        CIRCUIT_STATE.set(_STATE_CODES[new])
+        logger.warning(f"熔断器状态: {old} → {new}")
+        for listener in self._listeners:
+            listener(old, new)
+
+
+class RetryBudget:
+    """共享重试预算
+
+    每次请求存入 ratio 个令牌（上限 burst），每次重试消耗 1 个。
+    正常情况下偶发失败可以立即重试；持续故障时重试总量被限制在
+    请求量的 ratio 倍左右，避免每个房间都跑满完整的退避重试。
+    """
+
+    def __init__(self, ratio: float = 0.2, burst: int = 10):
+        """初始化重试预算
+
+        Args:
+            ratio: 每次请求存入的重试额度
+            burst: 额度上限（也是初始额度）
+        """
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens = float(burst)
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> float:
+        """当前剩余额度"""
+        return self._tokens
+
+    def record_request(self) -> None:
+        """记录一次请求（非重试），存入额度"""
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        """尝试消耗一次重试额度
+
+        Returns:
+            额度充足时返回 True
+        """
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
@@ -5,6 +5,8 @@
 架构设计：
 - ElectricityRepository: 抽象仓储接口，定义标准操作
 - CSVRepository: CSV 文件存储实现
+- RoomRepository: 多房间仓储接口，按 (房间, 时间) 索引
+- SQLiteRoomRepository: 多房间 SQLite 存储实现
 - get_repository: 工厂函数，动态创建仓储实例
 
 SOLID 原则：
@@ -24,13 +26,20 @@ SOLID 原则：
     # 或使用工厂函数
     from ecust_electricity_monitor.storage import get_repository
     repo = get_repository("csv", csv_path=csv_path)
+
+    # 多房间存储
+    from ecust_electricity_monitor.storage import SQLiteRoomRepository
+    rooms = SQLiteRoomRepository(db_path)
+    rooms.save("A101", record)
+    latest = rooms.find_latest_per_room()
 """
 
 from pathlib import Path
 from typing import Literal
 
-from .base import ElectricityRepository
+from .base import ElectricityRepository, RoomRepository
 from .csv_repository import CSVRepository
+from .sqlite_repository import SQLiteRoomRepository
 
 
 def get_repository(
@@ -63,5 +72,7 @@ def get_repository(
 __all__ = [
     "ElectricityRepository",
     "CSVRepository",
+    "RoomRepository",
+    "SQLiteRoomRepository",
     "get_repository",
 ]
@@ -5,9 +5,11 @@
 """
 
 from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator
 from datetime import datetime
+from typing import Literal
 
-from ..models import ElectricityRecord
+from ..models import ElectricityRecord, PowerRollup, RoomSnapshot
 
 
 class ElectricityRepository(ABC):
@@ -29,6 +31,20 @@ class ElectricityRepository(ABC):
         """
         pass
 
+    def save_many(self, records: Iterable[ElectricityRecord]) -> None:
+        """批量保存电量记录
+
+        默认逐条调用 save()，具体实现可以合并为一次写入。
+
+        Args:
+            records: 电量记录（按时间正序）
+
+        Raises:
+            StorageError: 保存失败
+        """
+        for record in records:
+            self.save(record)
+
     @abstractmethod
     def find_latest(self) -> ElectricityRecord | None:
         """获取最新的电量记录
@@ -63,6 +79,48 @@ class ElectricityRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    def iter_records(
+        self,
+        start_time: datetime | None = None,
+        end_time: datetime | None = None,
+    ) -> Iterator[ElectricityRecord]:
+        """逐条读取电量记录（流式，不整体载入内存）
+
+        Args:
+            start_time: 开始时间（包含）
+            end_time: 结束时间（包含）
+
+        Yields:
+            电量记录（按存储顺序，通常为时间正序）
+
+        Raises:
+            StorageError: 读取失败
+        """
+        pass
+
+    def scan_rows(
+        self,
+        start_time: datetime | None = None,
+        end_time: datetime | None = None,
+    ) -> Iterator[tuple[datetime, float, bool]]:
+        """逐行读取 (timestamp, power, alert_sent)，不要求构造记录对象
+
+        默认由 iter_records() 转换，具体实现可以提供更快的解析。
+
+        Args:
+            start_time: 开始时间（包含）
+            end_time: 结束时间（包含）
+
+        Yields:
+            (timestamp, power, alert_sent)，按存储顺序
+
+        Raises:
+            StorageError: 读取失败
+        """
+        for record in self.iter_records(start_time, end_time):
+            yield record.timestamp, record.power, record.alert_sent
+
     @abstractmethod
     def find_recent(self, days: int) -> list[ElectricityRecord]:
         """获取最近 N 天的记录
@@ -104,3 +162,172 @@ class ElectricityRepository(ABC):
             StorageError: 删除失败
         """
         pass
+
+    @abstractmethod
+    def find_rollups(
+        self,
+        granularity: Literal["day", "hour"],
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> list[PowerRollup]:
+        """查询按天/按小时汇总
+
+        每个周期包含首次/最后/最低电量、消耗电量（不含充值）和记录数，
+        区间消耗计入区间终点记录所在的周期。
+
+        Args:
+            granularity: 汇总粒度，"day" 或 "hour"
+            start: 开始时间（包含 start 所在周期）
+            end: 结束时间（包含）
+
+        Returns:
+            汇总列表（按时间正序）
+
+        Raises:
+            ValueError: 不支持的汇总粒度
+            StorageError: 查询失败
+        """
+        pass
+
+
+class RoomRepository(ABC):
+    """多房间电量数据仓储抽象接口
+
+    所有房间的记录存放在同一个存储中，按 (房间, 时间) 索引，
+    楼栋级别的查询无需逐个打开房间文件。
+    """
+
+    @abstractmethod
+    def save(self, room_id: str, record: ElectricityRecord) -> None:
+        """保存一个房间的一条电量记录
+
+        Args:
+            room_id: 房间标识
+            record: 电量记录对象
+
+        Raises:
+            StorageError: 保存失败
+        """
+        pass
+
+    def save_many(self, room_id: str, records: Iterable[ElectricityRecord]) -> None:
+        """批量保存一个房间的电量记录
+
+        默认逐条调用 save()，具体实现可以合并为一次写入。
+
+        Args:
+            room_id: 房间标识
+            records: 电量记录（按时间正序）
+
+        Raises:
+            StorageError: 保存失败
+        """
+        for record in records:
+            self.save(room_id, record)
+
+    @abstractmethod
+    def find_all(
+        self,
+        room_id: str,
+        start_time: datetime | None = None,
+        end_time: datetime | None = None,
+        limit: int | None = None,
+    ) -> list[ElectricityRecord]:
+        """查询一个房间的电量记录
+
+        Args:
+            room_id: 房间标识
+            start_time: 开始时间（包含）
+            end_time: 结束时间（包含）
+            limit: 返回记录数量限制
+
+        Returns:
+            电量记录列表（按时间降序）
+
+        Raises:
+            StorageError: 查询失败
+        """
+        pass
+
+    def find_latest(self, room_id: str) -> ElectricityRecord | None:
+        """获取一个房间最新的电量记录
+
+        Args:
+            room_id: 房间标识
+
+        Returns:
+            最新记录，如果没有记录则返回 None
+
+        Raises:
+            StorageError: 查询失败
+        """
+        records = self.find_all(room_id, limit=1)
+        return records[0] if records else None
+
+    def find_latest_per_room(self) -> dict[str, ElectricityRecord]:
+        """获取每个房间最新的电量记录
+
+        默认由 find_snapshots() 转换。
+
+        Returns:
+            房间标识 -> 最新记录（按房间标识排序）
+
+        Raises:
+            StorageError: 查询失败
+        """
+        return {snapshot.room: snapshot.record for snapshot in self.find_snapshots()}
+
+    @abstractmethod
+    def find_snapshots(self) -> list[RoomSnapshot]:
+        """获取每个房间的最新读数快照（含日均消耗与预估剩余天数）
+
+        Returns:
+            快照列表（按房间标识排序）
+
+        Raises:
+            StorageError: 查询失败
+        """
+        pass
+
+    @abstractmethod
+    def rooms(self) -> list[str]:
+        """列出有记录的房间
+
+        Returns:
+            房间标识列表（排序）
+
+        Raises:
+            StorageError: 查询失败
+        """
+        pass
+
+    @abstractmethod
+    def count(self, room_id: str | None = None) -> int:
+        """统计记录数
+
+        Args:
+            room_id: 房间标识（None 表示全部房间）
+
+        Returns:
+            记录数
+
+        Raises:
+            StorageError: 查询失败
+        """
+        pass
+
+    @abstractmethod
+    def delete_before(self, timestamp: datetime, room_id: str | None = None) -> int:
+        """删除指定时间之前的记录
+
+        Args:
+            timestamp: 时间戳
+            room_id: 房间标识（None 表示全部房间）
+
+        Returns:
+            删除的记录数
+
+        Raises:
+            StorageError: 删除失败
+        """
+        pass
@@ -4,31 +4,78 @@
 """
 
 import csv
+import io
+import os
+import time
+from collections.abc import Iterable, Iterator
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import BinaryIO
 
+from .. import timing
+from ..analytics.incremental import IncrementalAnalytics
 from ..constants import TIMESTAMP_FORMAT, CSVColumn
 from ..exceptions import StorageError
 from ..logger import logger
-from ..models import ElectricityRecord
+from ..metrics import STORAGE_WRITE_TIME
+from ..models import ElectricityRecord, PowerRollup
 from .base import ElectricityRepository
+from .locking import lock_for
+from .parallel import load_columns
+from .rollups import Granularity, RollupStore
+from .scanner import BATCH_ROWS, RecordColumns, RecordRow, batch_columns, scan_file
+from .sidecar import read_json, sidecar_path, write_json_atomic
 
 
 class CSVRepository(ElectricityRepository):
     """CSV 文件存储实现
 
     实现 ElectricityRepository 接口，使用 CSV 文件作为存储后端。
+
+    每次 save() 同时增量更新分析状态旁路文件（<name>.analytics.json），
+    旁路文件记录对应的 CSV 文件大小，文件被外部修改后自动重建。
+    按天、按小时的汇总表（<name>.day.csv、<name>.hour.csv）同样随 save()
+    增量维护，记录数保存在 <name>.count.json 中，count() 无需扫描文件。
+
+    多个进程可以同时使用同一个 CSV：读取持有共享锁，追加与重写持有排他锁
+    （见 storage.locking）。
+
+    设置 parallel_threshold_bytes 后，文件达到该大小时 find_all() 与
+    scan_rows() 改用多进程解析（见 storage.parallel）。
     """
 
-    def __init__(self, csv_path: Path):
+    def __init__(
+        self,
+        csv_path: Path,
+        parallel_threshold_bytes: int | None = None,
+        parallel_workers: int | None = None,
+    ):
         """初始化 CSV 存储
 
         Args:
             csv_path: CSV 文件路径
+            parallel_threshold_bytes: 文件达到此大小时多进程解析（None 表示不启用）
+            parallel_workers: 多进程解析的进程数（None 表示 CPU 核数）
         """
         self.csv_path = Path(csv_path)
+        self.parallel_threshold_bytes = parallel_threshold_bytes
+        self.parallel_workers = parallel_workers
+        self._analytics: IncrementalAnalytics | None = None
+        self._analytics_size: int | None = None
+        self.rollups = RollupStore(self.csv_path)
+        self._lock = lock_for(self.csv_path)
         self._ensure_file_exists()
 
+    @property
+    def analytics_path(self) -> Path:
+        """增量分析状态旁路文件路径"""
+        return sidecar_path(self.csv_path, ".analytics.json")
+
+    @property
+    def count_path(self) -> Path:
+        """记录数旁路文件路径"""
+        return sidecar_path(self.csv_path, ".count.json")
+
     def _ensure_file_exists(self) -> None:
         """确保 CSV 文件和目录存在
 
@@ -37,22 +84,26 @@ class CSVRepository(ElectricityRepository):
         try:
             # 创建父目录
             self.csv_path.parent.mkdir(parents=True, exist_ok=True)
-
-            # 如果文件不存在，创建并写入表头
-            if not self.csv_path.exists():
-                with open(self.csv_path, "w", newline="", encoding="utf-8") as f:
-                    writer = csv.writer(f)
-                    writer.writerow(
-                        [
-                            CSVColumn.TIMESTAMP.value,
-                            CSVColumn.POWER.value,
-                            CSVColumn.ALERT_SENT.value,
-                        ]
-                    )
-                logger.info(f"创建新的 CSV 文件: {self.csv_path}")
+            if self.csv_path.exists():
+                return
+
+            # 如果文件不存在，创建并写入表头（加锁，避免两个进程各写一次表头）
+            with self._lock.exclusive():
+                if not self.csv_path.exists():
+                    with open(self.csv_path, "w", newline="", encoding="utf-8") as f:
+                        writer = csv.writer(f)
+                        writer.writerow(
+                            [
+                                CSVColumn.TIMESTAMP.value,
+                                CSVColumn.POWER.value,
+                                CSVColumn.ALERT_SENT.value,
+                            ]
+                        )
+                    logger.info(f"创建新的 CSV 文件: {self.csv_path}")
         except Exception as e:
             raise StorageError(f"创建 CSV 文件失败: {e}") from e
 
+    @timing.timed("storage.save")
     def save(self, record: ElectricityRecord) -> None:
         """保存一条电量记录
 
@@ -62,20 +113,68 @@ class CSVRepository(ElectricityRepository):
         Raises:
             StorageError: 写入失败
         """
+        self._save([record])
+        logger.debug(f"记录已保存: {record.power} 度 @ {record.timestamp}")
+
+    @timing.timed("storage.save_many")
+    def save_many(self, records: Iterable[ElectricityRecord]) -> None:
+        """批量保存电量记录（一次追加写入，派生数据只更新一次）
+
+        Args:
+            records: 电量记录（应按时间正序，乱序时派生数据全量重建）
+
+        Raises:
+            StorageError: 写入失败
+        """
+        records = list(records)
+        if records:
+            self._save(records)
+            logger.debug(f"批量保存了 {len(records)} 条记录")
+
+    def _save(self, records: list[ElectricityRecord]) -> None:
+        """追加记录并增量更新派生数据"""
+        start = time.perf_counter()
+        with self._lock.exclusive():
+            state = self._current_analytics()
+            rollups_current = self.rollups.is_current(self._file_size())
+            count = self._cached_count()
+
+            try:
+                self._append_lines(records)
+            except Exception as e:
+                raise StorageError(f"写入 CSV 文件失败: {e}") from e
+
+            self._update_analytics(state, records)
+            self._update_rollups(rollups_current, records)
+            if count is not None:
+                self._store_count(count + len(records))
+        STORAGE_WRITE_TIME.observe(time.perf_counter() - start)
+
+    def _append_lines(self, records: list[ElectricityRecord]) -> None:
+        """以一次 write() 追加全部行
+
+        单行远小于 PIPE_BUF，O_APPEND 下一次写入不会与其他进程的写入交错；
+        进程在写入中途被杀死时也不会留下半行。
+        """
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(
+            [
+                record.timestamp.strftime(TIMESTAMP_FORMAT),
+                record.power,
+                record.alert_sent,
+            ]
+            for record in records
+        )
+        data = buffer.getvalue().encode("utf-8")
+
+        fd = os.open(self.csv_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
         try:
-            with open(self.csv_path, "a", newline="", encoding="utf-8") as f:
-                writer = csv.writer(f)
-                writer.writerow(
-                    [
-                        record.timestamp.strftime(TIMESTAMP_FORMAT),
-                        record.power,
-                        record.alert_sent,
-                    ]
-                )
-            logger.debug(f"记录已保存: {record.power} 度 @ {record.timestamp}")
-        except Exception as e:
-            raise StorageError(f"写入 CSV 文件失败: {e}") from e
+            if os.write(fd, data) != len(data):
+                raise OSError(f"写入不完整: {self.csv_path}")
+        finally:
+            os.close(fd)
 
+    @timing.timed("storage.find_latest")
     def find_latest(self) -> ElectricityRecord | None:
         """获取最新的电量记录
 
@@ -88,6 +187,7 @@ class CSVRepository(ElectricityRepository):
         records = self.find_all(limit=1)
         return records[0] if records else None
 
+    @timing.timed("storage.find_all")
     def find_all(
         self,
         start_time: datetime | None = None,
@@ -107,14 +207,64 @@ class CSVRepository(ElectricityRepository):
         Raises:
             StorageError: 查询失败
         """
-        records = []
-
         try:
-            if not self.csv_path.exists():
-                return records
+            columns = self._load_parallel(start_time, end_time)
+            if columns is None:
+                records = list(self.iter_records(start_time, end_time))
+            else:
+                # 扫描器已按模型的规则校验、取整，无需再次校验
+                records = [
+                    ElectricityRecord.model_construct(
+                        timestamp=timestamp, power=power, alert_sent=alert
+                    )
+                    for timestamp, power, alert in columns.rows()
+                ]
+
+            # 按时间降序排序
+            records.sort(key=lambda r: r.timestamp, reverse=True)
+
+            # 应用数量限制
+            if limit:
+                records = records[:limit]
+
+            logger.debug(f"读取了 {len(records)} 条记录")
+            return records
 
-            with open(self.csv_path, encoding="utf-8") as f:
-                reader = csv.DictReader(f)
+        except StorageError:
+            raise
+        except Exception as e:
+            raise StorageError(f"读取 CSV 文件失败: {e}") from e
+
+    def iter_records(
+        self,
+        start_time: datetime | None = None,
+        end_time: datetime | None = None,
+    ) -> Iterator[ElectricityRecord]:
+        """逐条读取电量记录（流式，不整体载入内存）
+
+        Args:
+            start_time: 开始时间（包含）
+            end_time: 结束时间（包含）
+
+        Yields:
+            电量记录（按文件写入顺序，通常为时间正序）
+
+        Raises:
+            StorageError: 读取失败
+        """
+        snapshot = self._open_snapshot()
+        if snapshot is None:
+            return
+        f, end = snapshot
+
+        # 逐行进入计时区段开销过大，模型校验耗时在本地累计后一次性记录
+        measure = timing.is_enabled()
+        validate_seconds = 0.0
+        validated = 0
+
+        try:
+            with f:
+                reader = csv.DictReader(_decoded_lines(f, end))
 
                 for row in reader:
                     try:
@@ -130,31 +280,114 @@ class CSVRepository(ElectricityRepository):
                             continue
 
                         # 创建记录对象
+                        if measure:
+                            validate_start = time.perf_counter()
                         record = ElectricityRecord(
                             timestamp=timestamp,
                             power=float(row[CSVColumn.POWER.value]),
                             alert_sent=row[CSVColumn.ALERT_SENT.value].lower()
                             == "true",
                         )
-                        records.append(record)
+                        if measure:
+                            validate_seconds += time.perf_counter() - validate_start
+                            validated += 1
 
-                    except (ValueError, KeyError) as e:
+                    except (ValueError, KeyError, AttributeError) as e:
                         logger.warning(f"跳过无效记录: {row} - {e}")
                         continue
 
-            # 按时间降序排序
-            records.sort(key=lambda r: r.timestamp, reverse=True)
+                    yield record
 
-            # 应用数量限制
-            if limit:
-                records = records[:limit]
+        except OSError as e:
+            raise StorageError(f"读取 CSV 文件失败: {e}") from e
+        finally:
+            if measure and validated:
+                timing.record("storage.validate", validate_seconds, calls=validated)
 
-            logger.debug(f"读取了 {len(records)} 条记录")
-            return records
+    def scan_rows(
+        self,
+        start_time: datetime | None = None,
+        end_time: datetime | None = None,
+    ) -> Iterator[RecordRow]:
+        """快速逐行扫描，不构造 ElectricityRecord（见 storage.scanner）
 
-        except Exception as e:
+        Args:
+            start_time: 开始时间（包含）
+            end_time: 结束时间（包含）
+
+        Yields:
+            (timestamp, power, alert_sent)，按文件写入顺序
+
+        Raises:
+            StorageError: 读取失败
+        """
+        columns = self._load_parallel(start_time, end_time)
+        if columns is not None:
+            yield from columns.rows()
+            return
+
+        snapshot = self._open_snapshot()
+        if snapshot is None:
+            return
+        f, end = snapshot
+        with f:
+            yield from scan_file(f, start_time, end_time, end_offset=end)
+
+    def scan_columns(
+        self,
+        start_time: datetime | None = None,
+        end_time: datetime | None = None,
+        batch_rows: int = BATCH_ROWS,
+    ) -> Iterator[RecordColumns]:
+        """快速扫描为列式数据批次（见 storage.scanner）
+
+        Yields:
+            列式数据批次（非空），按文件写入顺序
+
+        Raises:
+            StorageError: 读取失败
+        """
+        return batch_columns(self.scan_rows(start_time, end_time), batch_rows)
+
+    def _open_snapshot(self) -> tuple[BinaryIO, int] | None:
+        """打开 CSV 并确定读取范围（文件不存在时返回 None）
+
+        在共享锁内打开文件并记录大小：之后的追加不会读到半行，重写替换的是
+        新文件，已打开的旧文件保持不变，因此读取期间无需持锁。
+        """
+        try:
+            with self._lock.shared():
+                f = open(self.csv_path, "rb")  # noqa: SIM115 - 由调用方关闭
+                return f, os.fstat(f.fileno()).st_size
+        except FileNotFoundError:
+            return None
+        except OSError as e:
             raise StorageError(f"读取 CSV 文件失败: {e}") from e
 
+    def _load_parallel(
+        self,
+        start_time: datetime | None,
+        end_time: datetime | None,
+    ) -> RecordColumns | None:
+        """文件达到 parallel_threshold_bytes 时多进程解析，否则返回 None
+
+        工作进程各自按路径打开文件，解析期间持有共享锁，保证文件不会被重写替换。
+        """
+        if self.parallel_threshold_bytes is None:
+            return None
+        with self._lock.shared():
+            size = self._file_size()
+            if not size or size < self.parallel_threshold_bytes:
+                return None
+            logger.debug(f"CSV 大小 {size} 字节，使用多进程解析")
+            return load_columns(
+                self.csv_path,
+                start_time,
+                end_time,
+                end_offset=size,
+                max_workers=self.parallel_workers,
+            )
+
     def find_recent(self, days: int) -> list[ElectricityRecord]:
         """获取最近 N 天的记录
 
@@ -170,11 +403,16 @@ class CSVRepository(ElectricityRepository):
         start_time = datetime.now() - timedelta(days=days)
         return self.find_all(start_time=start_time)
 
+    @timing.timed("storage.count")
     def count(self) -> int:
         """统计总记录数
 
+        优先使用记录数旁路文件（CSV 的大小和修改时间与旁路文件一致时）；
+        否则分块统计非空行数并写回旁路文件。统计时不解析各行，外部写入的
+        格式错误行也计入，此时结果大于 len(find_all())（find_all 跳过这些行）。
+
         Returns:
-            记录总数
+            数据行数（不含表头和空行）
 
         Raises:
             StorageError: 查询失败
@@ -183,13 +421,18 @@ class CSVRepository(ElectricityRepository):
             if not self.csv_path.exists():
                 return 0
 
-            with open(self.csv_path, encoding="utf-8") as f:
-                # 减 1 是因为有表头行
-                return sum(1 for _ in f) - 1
+            # 持有共享锁期间没有追加，统计结果与写回时的文件状态一致
+            with self._lock.shared():
+                count = self._cached_count()
+                if count is None:
+                    # 减 1 是因为有表头行
+                    count = max(_count_nonblank_lines(self.csv_path) - 1, 0)
+                    self._store_count(count)
+                return count
         except Exception as e:
-            logger.error(f"统计记录数失败: {e}")
-            return 0
+            raise StorageError(f"统计记录数失败: {e}") from e
 
+    @timing.timed("storage.delete_before")
     def delete_before(self, timestamp: datetime) -> int:
         """删除指定时间之前的记录
 
@@ -203,39 +446,304 @@ class CSVRepository(ElectricityRepository):
             StorageError: 删除失败
         """
         try:
-            # 读取所有记录
-            all_records = self.find_all()
-
-            # 过滤出要保留的记录
-            records_to_keep = [r for r in all_records if r.timestamp >= timestamp]
-
-            deleted_count = len(all_records) - len(records_to_keep)
-
-            if deleted_count > 0:
-                # 重写文件
-                with open(self.csv_path, "w", newline="", encoding="utf-8") as f:
-                    writer = csv.writer(f)
-                    # 写入表头
-                    writer.writerow(
-                        [
-                            CSVColumn.TIMESTAMP.value,
-                            CSVColumn.POWER.value,
-                            CSVColumn.ALERT_SENT.value,
-                        ]
-                    )
-                    # 写入保留的记录
-                    for record in records_to_keep:
-                        writer.writerow(
-                            [
-                                record.timestamp.strftime(TIMESTAMP_FORMAT),
-                                record.power,
-                                record.alert_sent,
-                            ]
-                        )
+            # 读取与重写之间持有排他锁，期间其他进程追加的记录不会丢失
+            with self._lock.exclusive():
+                # 读取所有记录
+                all_records = self.find_all()
 
-                logger.info(f"删除了 {deleted_count} 条记录（{timestamp} 之前）")
+                # 过滤出要保留的记录
+                records_to_keep = [r for r in all_records if r.timestamp >= timestamp]
+
+                deleted_count = len(all_records) - len(records_to_keep)
+
+                if deleted_count > 0:
+                    records_to_keep.reverse()
+                    self._rewrite(records_to_keep)
+                    logger.info(f"删除了 {deleted_count} 条记录（{timestamp} 之前）")
 
             return deleted_count
 
         except Exception as e:
             raise StorageError(f"删除记录失败: {e}") from e
+
+    @timing.timed("storage.merge")
+    def merge(self, records: list[ElectricityRecord]) -> int:
+        """合并记录：补入文件中不存在的时间戳（按秒比较），整体按时间重写
+
+        用于由归档重新解析后修复缺失的历史读数；已有时间戳的记录保持不变。
+
+        Args:
+            records: 待合并的记录（顺序不限）
+
+        Returns:
+            新增的记录数
+
+        Raises:
+            StorageError: 写入失败
+        """
+        try:
+            with self._lock.exclusive():
+                existing = list(reversed(self.find_all()))
+                seen = {r.timestamp.replace(microsecond=0) for r in existing}
+
+                added: list[ElectricityRecord] = []
+                for record in records:
+                    key = record.timestamp.replace(microsecond=0)
+                    if key not in seen:
+                        seen.add(key)
+                        added.append(record.model_copy(update={"timestamp": key}))
+
+                if added:
+                    merged = sorted([*existing, *added], key=lambda r: r.timestamp)
+                    self._rewrite(merged)
+                    logger.info(f"合并了 {len(added)} 条记录")
+
+            return len(added)
+
+        except Exception as e:
+            raise StorageError(f"合并记录失败: {e}") from e
+
+    def analytics(self) -> IncrementalAnalytics:
+        """获取增量分析状态
+
+        优先使用内存缓存或旁路文件；旁路文件缺失或与 CSV 不一致时
+        全量扫描重建一次并写回。
+
+        Returns:
+            与当前 CSV 内容一致的增量分析状态
+
+        Raises:
+            StorageError: 读取 CSV 失败
+        """
+        state = self._current_analytics()
+        if state is None:
+            # 重建期间排他，保证写回的文件大小与扫描到的内容一致
+            with self._lock.exclusive():
+                state = self._current_analytics()
+                if state is None:
+                    state = self._rebuild_analytics(reversed(self.find_all()))
+                    self._store_analytics(state)
+        return state
+
+    @timing.timed("storage.find_rollups")
+    def find_rollups(
+        self,
+        granularity: Granularity,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> list[PowerRollup]:
+        """查询按天/按小时汇总
+
+        汇总表缺失或与 CSV 不一致时先全量重建。
+
+        Args:
+            granularity: 汇总粒度，"day" 或 "hour"
+            start: 开始时间（包含 start 所在周期）
+            end: 结束时间（包含）
+
+        Returns:
+            汇总列表（按时间正序）
+
+        Raises:
+            ValueError: 不支持的汇总粒度
+            StorageError: 读取失败
+        """
+        try:
+            with self._lock.shared():
+                if self.rollups.is_current(self._file_size()):
+                    return self.rollups.find(granularity, start, end)
+
+            with self._lock.exclusive():
+                size = self._file_size()
+                if not self.rollups.is_current(size):
+                    self.rollups.rebuild(list(reversed(self.find_all())), size)
+                return self.rollups.find(granularity, start, end)
+        except (ValueError, StorageError):
+            raise
+        except Exception as e:
+            raise StorageError(f"读取汇总表失败: {e}") from e
+
+    def _rewrite(self, records: list[ElectricityRecord]) -> None:
+        """用按时间正序的记录重写 CSV（临时文件 + 原子替换），并重建派生数据
+
+        调用方需持有排他锁。
+        """
+        tmp_path = self.csv_path.with_name(f".{self.csv_path.name}.tmp")
+        with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(
+                [
+                    CSVColumn.TIMESTAMP.value,
+                    CSVColumn.POWER.value,
+                    CSVColumn.ALERT_SENT.value,
+                ]
+            )
+            for record in records:
+                writer.writerow(
+                    [
+                        record.timestamp.strftime(TIMESTAMP_FORMAT),
+                        record.power,
+                        record.alert_sent,
+                    ]
+                )
+        os.replace(tmp_path, self.csv_path)
+
+        self._store_count(len(records))
+        self._store_analytics(self._rebuild_analytics(records))
+        self.rollups.rebuild(records, self._file_size())
+
+    def _file_size(self) -> int:
+        """CSV 文件当前大小（字节）"""
+        try:
+            return os.stat(self.csv_path).st_size
+        except FileNotFoundError:
+            return 0
+
+    def _cached_count(self) -> int | None:
+        """读取与 CSV 一致的记录数（大小或修改时间不一致时返回 None）"""
+        data = read_json(self.count_path)
+        if not data:
+            return None
+        try:
+            stat = os.stat(self.csv_path)
+        except FileNotFoundError:
+            return None
+        if data.get("offset") != stat.st_size or data.get("mtime_ns") != (
+            stat.st_mtime_ns
+        ):
+            return None
+        count = data.get("count")
+        return count if isinstance(count, int) else None
+
+    def _store_count(self, count: int) -> None:
+        """写入记录数旁路文件（派生数据，写入失败只记录警告）"""
+        try:
+            stat = os.stat(self.csv_path)
+            write_json_atomic(
+                self.count_path,
+                {
+                    "count": count,
+                    "offset": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                },
+            )
+        except OSError as e:
+            logger.warning(f"更新记录数失败: {e}")
+
+    def _current_analytics(self) -> IncrementalAnalytics | None:
+        """加载与 CSV 一致的分析状态，不一致或损坏时返回 None"""
+        size = self._file_size()
+        if self._analytics is not None and self._analytics_size == size:
+            return self._analytics
+
+        data = read_json(self.analytics_path)
+        if not data or data.get("source_size") != size:
+            return None
+
+        try:
+            state = IncrementalAnalytics.from_dict(data["state"])
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"分析状态无效，将重建: {e}")
+            return None
+
+        self._analytics, self._analytics_size = state, size
+        return state
+
+    def _update_analytics(
+        self, state: IncrementalAnalytics | None, records: list[ElectricityRecord]
+    ) -> None:
+        """保存记录后更新分析状态
+
+        分析状态是派生数据，更新失败只记录警告，不影响记录保存。
+        """
+        try:
+            if state is None:
+                state = self._rebuild_analytics(reversed(self.find_all()))
+            else:
+                try:
+                    for record in records:
+                        state.update(record)
+                except ValueError:
+                    # 乱序写入：无法增量更新，全量重建
+                    state = self._rebuild_analytics(reversed(self.find_all()))
+            self._store_analytics(state)
+        except Exception as e:
+            self._analytics = self._analytics_size = None
+            logger.warning(f"更新分析状态失败: {e}")
+
+    def _update_rollups(self, current: bool, records: list[ElectricityRecord]) -> None:
+        """保存记录后更新汇总表
+
+        汇总表缺失、过期或遇到乱序写入时不在保存时全量扫描，只标记为过期，
+        由 find_rollups() 按需重建（fetch 等只写入的命令无需读取全部历史）。
+        汇总表是派生数据，更新失败只记录警告，不影响记录保存。
+        """
+        if not current:
+            return
+        try:
+            size = self._file_size()
+            for record in records:
+                self.rollups.update(record, size)
+        except ValueError:
+            # 乱序写入：无法增量更新
+            self.rollups.invalidate()
+        except Exception as e:
+            self.rollups.invalidate()
+            logger.warning(f"更新汇总表失败: {e}")
+
+    @staticmethod
+    def _rebuild_analytics(records) -> IncrementalAnalytics:
+        """由按时间正序的记录全量构建分析状态"""
+        state = IncrementalAnalytics()
+        for record in records:
+            try:
+                state.update(record)
+            except ValueError:
+                # 重复时间戳的记录跳过
+                continue
+        return state
+
+    def _store_analytics(self, state: IncrementalAnalytics) -> None:
+        """写入分析状态旁路文件并更新内存缓存"""
+        size = self._file_size()
+        write_json_atomic(
+            self.analytics_path, {"source_size": size, "state": state.to_dict()}
+        )
+        self._analytics, self._analytics_size = state, size
+
+
+def _decoded_lines(f: BinaryIO, end: int) -> Iterator[str]:
+    """逐行解码文件前 end 个字节（end 之后追加的内容不读取）"""
+    consumed = 0
+    for line in f:
+        consumed += len(line)
+        if consumed > end:
+            return
+        yield line.decode("utf-8")
+
+
+# 统计行数时每次读取的块大小
+_COUNT_CHUNK = 1024 * 1024
+
+
+def _count_nonblank_lines(path: Path) -> int:
+    """分块统计非空行数（bytes.count，不逐行解码）
+
+    每块补读到行尾，块首即行首；连续的换行先合并，再统计换行符个数。
+    只看换行、不解析内容，格式错误的行同样计入。
+    """
+    lines = 0
+    with open(path, "rb") as f:
+        while chunk := f.read(_COUNT_CHUNK):
+            chunk = (chunk + f.readline()).replace(b"\r\n", b"\n")
+            # 空行极少出现，通常不进入循环
+            while b"\n\n" in chunk:
+                chunk = chunk.replace(b"\n\n", b"\n")
+            lines += chunk.count(b"\n")
+            if chunk.startswith(b"\n"):
+                # 块首的空行
+                lines -= 1
+            if not chunk.endswith(b"\n"):
+                # 最后一行没有换行符
+                lines += 1
+    return lines
@@ -0,0 +1,110 @@
+"""数据文件锁
+
+cron 触发的 emon fetch、常驻的 emon schedule 与手动执行的命令可能同时读写
+同一个 CSV，使用 fcntl.flock 建议锁协调：
+- 读取：共享锁（只在打开文件、确定读取范围时持有）
+- 追加与重写：排他锁
+
+锁加在单独的 <name>.lock 文件上而不是 CSV 本身：重写通过 os.replace 替换
+CSV，锁在旧文件上的进程会写入已被替换的文件。
+
+同一线程内可重入：持有排他锁时再请求共享锁或排他锁直接通过；持有共享锁时
+不能升级为排他锁。Windows 上没有 fcntl，锁退化为空操作。
+"""
+
+import os
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from .sidecar import sidecar_path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
+
+_SHARED = "shared"
+_EXCLUSIVE = "exclusive"
+
+# 同一文件在进程内共享一个锁对象，使不同仓储实例之间的嵌套加锁可重入
+_locks: dict[Path, "FileLock"] = {}
+_locks_guard = threading.Lock()
+
+
+def available_file_lock() -> bool:
+    """当前平台是否支持跨进程文件锁（需要 fcntl.flock）"""
+    return fcntl is not None
+
+
+def lock_for(data_path: Path) -> "FileLock":
+    """数据文件对应的锁（同一路径返回同一对象）
+
+    Args:
+        data_path: 数据文件路径，如 data/electricity.csv
+
+    Returns:
+        锁文件为 data/electricity.lock 的文件锁
+    """
+    path = sidecar_path(Path(data_path).absolute(), ".lock")
+    with _locks_guard:
+        lock = _locks.get(path)
+        if lock is None:
+            lock = _locks[path] = FileLock(path)
+        return lock
+
+
+class FileLock:
+    """基于 fcntl.flock 的读写锁（跨进程，同一线程可重入）"""
+
+    def __init__(self, path: Path):
+        """初始化文件锁
+
+        Args:
+            path: 锁文件路径（不存在时自动创建）
+        """
+        self.path = Path(path)
+        self._local = threading.local()
+
+    @contextmanager
+    def shared(self) -> Iterator[None]:
+        """持有共享锁（与其他共享锁兼容，与排他锁互斥）"""
+        with self._hold(_SHARED):
+            yield
+
+    @contextmanager
+    def exclusive(self) -> Iterator[None]:
+        """持有排他锁
+
+        Raises:
+            RuntimeError: 当前线程已持有共享锁（不支持升级）
+        """
+        with self._hold(_EXCLUSIVE):
+            yield
+
+    @contextmanager
+    def _hold(self, mode: str) -> Iterator[None]:
+        held = getattr(self._local, "mode", None)
+        if held is not None:
+            if held == _SHARED and mode == _EXCLUSIVE:
+                raise RuntimeError(f"持有共享锁时不能升级为排他锁: {self.path}")
+            yield
+            return
+
+        if fcntl is None:
+            yield
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_SH if mode == _SHARED else fcntl.LOCK_EX)
+            self._local.mode = mode
+            try:
+                yield
+            finally:
+                self._local.mode = None
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
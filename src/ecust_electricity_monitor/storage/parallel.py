@@ -0,0 +1,145 @@
+"""多进程并行解析 CSV
+
+多年、多房间的历史文件全量解析时单核是瓶颈。并行加载把数据区按字节切成
+若干段（边界对齐到换行），在进程池中各自 mmap 并用扫描器解析为列式数据
+（RecordColumns，array 存储，进程间传输开销小），再按文件顺序拼接。
+
+进程启动有固定开销，只在文件较大时使用（由 CSVRepository 的
+parallel_threshold_bytes 控制）。
+"""
+
+import mmap
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple
+
+from ..exceptions import StorageError
+from .scanner import RecordColumns, _data_start, _parse_range, batch_columns
+
+# 每段的最小字节数（段太小时进程间传输和调度开销超过解析本身）
+MIN_CHUNK_BYTES = 4 * 1024 * 1024
+
+# 每个进程分到的段数（段数多于进程数，解析快慢不均时负载更均衡）
+_CHUNKS_PER_WORKER = 4
+
+
+class _Chunk(NamedTuple):
+    """一段待解析的字节范围（可跨进程传递）"""
+
+    path: Path
+    begin: int
+    stop: int
+    start_time: datetime | None
+    end_time: datetime | None
+
+
+def load_columns(
+    path: Path,
+    start_time: datetime | None = None,
+    end_time: datetime | None = None,
+    end_offset: int | None = None,
+    max_workers: int | None = None,
+    min_chunk_bytes: int = MIN_CHUNK_BYTES,
+) -> RecordColumns:
+    """并行解析 CSV 为列式数据
+
+    Args:
+        path: CSV 文件路径
+        start_time: 开始时间（包含）
+        end_time: 结束时间（包含）
+        end_offset: 只读取前 end_offset 个字节（默认整个文件）
+        max_workers: 最大进程数（None 表示 CPU 核数）
+        min_chunk_bytes: 每段的最小字节数
+
+    Returns:
+        全部数据（按文件顺序）
+
+    Raises:
+        StorageError: 读取失败或表头不是预期的三列
+    """
+    workers = max_workers or os.cpu_count() or 1
+    chunks = [
+        _Chunk(path, begin, stop, start_time, end_time)
+        for begin, stop in split_ranges(
+            path, workers * _CHUNKS_PER_WORKER, end_offset, min_chunk_bytes
+        )
+    ]
+
+    result = RecordColumns()
+    if len(chunks) <= 1 or workers == 1:
+        for chunk in chunks:
+            result.extend(_parse_chunk(chunk))
+        return result
+
+    # spawn：不继承父进程的线程和锁，各平台行为一致
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(min(workers, len(chunks)), mp_context=context) as executor:
+        for columns in executor.map(_parse_chunk, chunks):
+            result.extend(columns)
+    return result
+
+
+def split_ranges(
+    path: Path,
+    parts: int,
+    end_offset: int | None = None,
+    min_chunk_bytes: int = MIN_CHUNK_BYTES,
+) -> list[tuple[int, int]]:
+    """把数据区（表头之后）切成边界对齐到换行的字节范围
+
+    Args:
+        path: CSV 文件路径
+        parts: 期望的段数
+        end_offset: 只切分前 end_offset 个字节（默认整个文件）
+        min_chunk_bytes: 每段的最小字节数（决定实际段数的上限）
+
+    Returns:
+        [(begin, stop), ...]，首尾相接、覆盖整个数据区；没有数据时为空
+
+    Raises:
+        StorageError: 读取失败或表头不是预期的三列
+    """
+    try:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if end_offset is not None:
+                size = min(size, end_offset)
+            if not size:
+                return []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                begin = _data_start(buffer, str(path))
+                if begin >= size:
+                    return []
+
+                parts = max(1, min(parts, (size - begin) // max(min_chunk_bytes, 1)))
+                step = (size - begin) / parts
+                bounds = [begin]
+                for i in range(1, parts):
+                    newline = buffer.find(b"\n", max(begin + int(step * i), bounds[-1]))
+                    if newline < 0 or newline + 1 >= size:
+                        break
+                    bounds.append(newline + 1)
+                bounds.append(size)
+    except OSError as e:
+        raise StorageError(f"读取 CSV 文件失败: {e}") from e
+
+    return [
+        (bounds[i], bounds[i + 1])
+        for i in range(len(bounds) - 1)
+        if bounds[i] < bounds[i + 1]
+    ]
+
+
+def _parse_chunk(chunk: _Chunk) -> RecordColumns:
+    """解析一段字节范围（在工作进程中运行）"""
+    with (
+        open(chunk.path, "rb") as f,
+        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer,
+    ):
+        rows = _parse_range(
+            buffer, chunk.begin, chunk.stop, chunk.start_time, chunk.end_time
+        )
+        return next(batch_columns(rows, batch_rows=chunk.stop), RecordColumns())
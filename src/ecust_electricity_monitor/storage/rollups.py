@@ -0,0 +1,288 @@
+"""汇总表（rollup）
+
+按天、按小时维护的物化汇总表，随 save() 增量更新：
+- 每个周期一行：首次/最后/最低电量、消耗电量（不含充值）、记录数
+- 新记录落在最后一个周期时只改写文件最后一行，否则追加一行
+- 汇总表记录对应的 CSV 文件大小，不一致时由仓储全量重建
+
+汇总表以 CSV 旁路文件保存：<name>.day.csv、<name>.hour.csv。
+"""
+
+import os
+from collections.abc import Iterable
+from datetime import datetime
+from pathlib import Path
+from typing import Literal
+
+from ..analytics.segments import split_step
+from ..constants import TIMESTAMP_FORMAT
+from ..models import ElectricityRecord, PowerRollup
+from .sidecar import read_json, sidecar_path, write_json_atomic
+
+Granularity = Literal["day", "hour"]
+
+GRANULARITIES: tuple[Granularity, ...] = ("day", "hour")
+
+ROLLUP_HEADER = (
+    "period_start,first_power,last_power,min_power,consumed_kwh,"
+    "sample_count,last_timestamp\n"
+)
+
+# 读取文件末尾时的块大小（一行汇总远小于此值）
+_TAIL_CHUNK = 4096
+
+
+def period_start(timestamp: datetime, granularity: Granularity) -> datetime:
+    """记录所属周期的开始时间"""
+    if granularity == "day":
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    raise ValueError(f"不支持的汇总粒度: {granularity}")
+
+
+class _RollupRow:
+    """汇总表中的一行（可变，便于原地累加）"""
+
+    __slots__ = (
+        "period_start",
+        "first_power",
+        "last_power",
+        "min_power",
+        "consumed_kwh",
+        "sample_count",
+        "last_timestamp",
+    )
+
+    def __init__(self, start: datetime, record: ElectricityRecord):
+        self.period_start = start
+        self.first_power = record.power
+        self.last_power = record.power
+        self.min_power = record.power
+        self.consumed_kwh = 0.0
+        self.sample_count = 1
+        self.last_timestamp = record.timestamp
+
+    def add(self, record: ElectricityRecord, consumed: float) -> None:
+        """把同一周期的新记录计入本行"""
+        self.last_power = record.power
+        self.min_power = min(self.min_power, record.power)
+        self.consumed_kwh = round(self.consumed_kwh + consumed, 2)
+        self.sample_count += 1
+        self.last_timestamp = record.timestamp
+
+    def to_line(self) -> str:
+        return (
+            f"{self.period_start.strftime(TIMESTAMP_FORMAT)},{self.first_power},"
+            f"{self.last_power},{self.min_power},{self.consumed_kwh},"
+            f"{self.sample_count},{self.last_timestamp.isoformat()}\n"
+        )
+
+    @classmethod
+    def from_line(cls, line: str) -> "_RollupRow":
+        fields = line.rstrip("\r\n").split(",")
+        row = cls.__new__(cls)
+        row.period_start = datetime.strptime(fields[0], TIMESTAMP_FORMAT)
+        row.first_power = float(fields[1])
+        row.last_power = float(fields[2])
+        row.min_power = float(fields[3])
+        row.consumed_kwh = float(fields[4])
+        row.sample_count = int(fields[5])
+        row.last_timestamp = datetime.fromisoformat(fields[6])
+        return row
+
+    def to_model(self) -> PowerRollup:
+        return PowerRollup(
+            period_start=self.period_start,
+            first_power=self.first_power,
+            last_power=self.last_power,
+            min_power=self.min_power,
+            consumed_kwh=self.consumed_kwh,
+            sample_count=self.sample_count,
+        )
+
+
+class RollupTable:
+    """单一粒度的汇总表文件"""
+
+    def __init__(self, path: Path, granularity: Granularity):
+        """初始化汇总表
+
+        Args:
+            path: 汇总表文件路径
+            granularity: 汇总粒度
+        """
+        self.path = Path(path)
+        self.granularity = granularity
+
+    def _read_last_row(self) -> tuple[int, _RollupRow | None]:
+        """读取最后一行
+
+        Returns:
+            (最后一行在文件中的字节偏移, 最后一行)；只有表头时行为 None
+        """
+        with open(self.path, "rb") as f:
+            size = f.seek(0, os.SEEK_END)
+            f.seek(max(0, size - _TAIL_CHUNK))
+            tail = f.read()
+
+        body = tail.rstrip(b"\n")
+        line_start = body.rfind(b"\n") + 1
+        offset = size - len(tail) + line_start
+        line = body[line_start:].decode("utf-8")
+        if offset == 0 or line + "\n" == ROLLUP_HEADER:
+            return size, None
+        return offset, _RollupRow.from_line(line)
+
+    def update(self, record: ElectricityRecord) -> None:
+        """计入一条新记录
+
+        Args:
+            record: 电量记录，时间必须晚于表中最后一条记录
+
+        Raises:
+            ValueError: 记录乱序（需要全量重建）
+        """
+        if not self.path.exists():
+            self.write([])
+
+        offset, last = self._read_last_row()
+        start = period_start(record.timestamp, self.granularity)
+
+        if last is None:
+            row = _RollupRow(start, record)
+        elif record.timestamp <= last.last_timestamp:
+            raise ValueError(
+                f"记录时间 {record.timestamp} 不晚于汇总表最新记录 "
+                f"{last.last_timestamp}"
+            )
+        else:
+            consumed = split_step(last.last_power, record.power)[0]
+            if start == last.period_start:
+                last.add(record, consumed)
+                row = last
+            else:
+                offset = self.path.stat().st_size
+                row = _RollupRow(start, record)
+                row.consumed_kwh = round(consumed, 2)
+
+        # 只改写最后一行：截断到该行开头再写入
+        with open(self.path, "r+b") as f:
+            f.truncate(offset)
+            f.seek(offset)
+            f.write(row.to_line().encode("utf-8"))
+
+    def rebuild(self, records: Iterable[ElectricityRecord]) -> None:
+        """由按时间正序的记录全量重建汇总表"""
+        rows: list[_RollupRow] = []
+        last: ElectricityRecord | None = None
+
+        for record in records:
+            if last is not None and record.timestamp <= last.timestamp:
+                # 重复时间戳的记录跳过，与增量更新保持一致
+                continue
+            start = period_start(record.timestamp, self.granularity)
+            consumed = split_step(last.power, record.power)[0] if last else 0.0
+            if rows and rows[-1].period_start == start:
+                rows[-1].add(record, consumed)
+            else:
+                row = _RollupRow(start, record)
+                row.consumed_kwh = round(consumed, 2)
+                rows.append(row)
+            last = record
+
+        self.write(rows)
+
+    def write(self, rows: list[_RollupRow]) -> None:
+        """写入整张汇总表（原子替换）"""
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+            f.write(ROLLUP_HEADER)
+            f.writelines(row.to_line() for row in rows)
+        os.replace(tmp_path, self.path)
+
+    def find(
+        self, start: datetime | None = None, end: datetime | None = None
+    ) -> list[PowerRollup]:
+        """查询汇总行
+
+        Args:
+            start: 开始时间（包含 start 所在周期）
+            end: 结束时间（包含）
+
+        Returns:
+            汇总列表（按时间正序）
+        """
+        if not self.path.exists():
+            return []
+
+        first = period_start(start, self.granularity) if start else None
+        result = []
+        with open(self.path, encoding="utf-8") as f:
+            next(f, None)  # 跳过表头
+            for line in f:
+                if not line.strip():
+                    continue
+                row = _RollupRow.from_line(line)
+                if first and row.period_start < first:
+                    continue
+                if end and row.period_start > end:
+                    break
+                result.append(row.to_model())
+        return result
+
+
+class RollupStore:
+    """按天、按小时两张汇总表及其一致性标记"""
+
+    def __init__(self, csv_path: Path):
+        """初始化汇总表集合
+
+        Args:
+            csv_path: 原始数据 CSV 文件路径
+        """
+        self.meta_path = sidecar_path(csv_path, ".rollups.json")
+        self.tables: dict[Granularity, RollupTable] = {
+            g: RollupTable(sidecar_path(csv_path, f".{g}.csv"), g)
+            for g in GRANULARITIES
+        }
+
+    def is_current(self, source_size: int) -> bool:
+        """汇总表是否与给定大小的 CSV 文件一致"""
+        meta = read_json(self.meta_path)
+        return bool(
+            meta
+            and meta.get("source_size") == source_size
+            and all(t.path.exists() for t in self.tables.values())
+        )
+
+    def update(self, record: ElectricityRecord, source_size: int) -> None:
+        """计入一条新记录
+
+        Raises:
+            ValueError: 记录乱序（需要全量重建）
+        """
+        for table in self.tables.values():
+            table.update(record)
+        write_json_atomic(self.meta_path, {"source_size": source_size})
+
+    def invalidate(self) -> None:
+        """标记为过期（下次查询时全量重建）"""
+        self.meta_path.unlink(missing_ok=True)
+
+    def rebuild(self, records: list[ElectricityRecord], source_size: int) -> None:
+        """由按时间正序的记录全量重建全部汇总表"""
+        for table in self.tables.values():
+            table.rebuild(records)
+        write_json_atomic(self.meta_path, {"source_size": source_size})
+
+    def find(
+        self,
+        granularity: Granularity,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> list[PowerRollup]:
+        """查询指定粒度的汇总行"""
+        if granularity not in self.tables:
+            raise ValueError(f"不支持的汇总粒度: {granularity}")
+        return self.tables[granularity].find(start, end)
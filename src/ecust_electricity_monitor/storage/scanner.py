@@ -0,0 +1,253 @@
+"""CSV 快速扫描
+
+全量读取历史时，csv.DictReader 为每行构造字典、ElectricityRecord 再做一次
+模型校验，开销远大于解析本身。扫描器把文件 mmap 进内存，分块按换行切分，
+按固定列位置解析三列（timestamp,power,alert_sent），不构造中间对象：
+- scan_rows() / scan_file(): 逐行返回 (timestamp, power, alert_sent) 元组
+- scan_columns() / batch_columns(): 分批返回列式数据（array 存储，占用小、
+  可直接 pickle）
+
+时间列是定长的 "YYYY-MM-DD HH:MM:SS"，按字节比较即可按时间范围过滤，
+范围外的行不解析。无效行（列数不对、时间或电量无法解析、电量超出范围）
+与 CSVRepository.iter_records() 一样跳过并记录警告。
+"""
+
+import mmap
+import os
+from array import array
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import BinaryIO
+
+from ..constants import MAX_POWER_VALUE, MIN_POWER_VALUE, TIMESTAMP_FORMAT
+from ..exceptions import StorageError
+from ..logger import logger
+
+# (timestamp, power, alert_sent)
+RecordRow = tuple[datetime, float, bool]
+
+# scan_columns() 每批的行数
+BATCH_ROWS = 65_536
+
+# 每次从映射中切分的字节数
+_CHUNK_BYTES = 4 * 1024 * 1024
+
+# 时间列宽度（TIMESTAMP_FORMAT 格式化后的长度）
+_TIMESTAMP_WIDTH = 19
+
+_EXPECTED_HEADER = b"timestamp,power,alert_sent"
+
+# 列式数据中时间的编码：距 1970-01-01 的整数秒（本地时间，CSV 只精确到秒）
+_EPOCH_ORDINAL = datetime(1970, 1, 1).toordinal()
+_EPOCH = datetime(1970, 1, 1)
+
+
+@dataclass
+class RecordColumns:
+    """列式记录（按文件顺序）"""
+
+    seconds: array = field(default_factory=lambda: array("q"))
+    powers: array = field(default_factory=lambda: array("d"))
+    alert_sent: array = field(default_factory=lambda: array("b"))
+
+    def __len__(self) -> int:
+        return len(self.powers)
+
+    def extend(self, other: "RecordColumns") -> None:
+        """追加另一批数据"""
+        self.seconds.extend(other.seconds)
+        self.powers.extend(other.powers)
+        self.alert_sent.extend(other.alert_sent)
+
+    def timestamps(self) -> list[datetime]:
+        """时间列还原为 datetime"""
+        return [_EPOCH + timedelta(seconds=s) for s in self.seconds]
+
+    def rows(self) -> Iterator[RecordRow]:
+        """逐行返回 (timestamp, power, alert_sent)"""
+        for seconds, power, alert in zip(
+            self.seconds, self.powers, self.alert_sent, strict=True
+        ):
+            yield _EPOCH + timedelta(seconds=seconds), power, bool(alert)
+
+
+def scan_rows(
+    path: Path,
+    start_time: datetime | None = None,
+    end_time: datetime | None = None,
+    end_offset: int | None = None,
+) -> Iterator[RecordRow]:
+    """逐行扫描 CSV
+
+    Args:
+        path: CSV 文件路径
+        start_time: 开始时间（包含）
+        end_time: 结束时间（包含）
+        end_offset: 只读取前 end_offset 个字节（默认整个文件）
+
+    Yields:
+        (timestamp, power, alert_sent)，按文件顺序
+
+    Raises:
+        StorageError: 读取失败或表头不是预期的三列
+    """
+    try:
+        f = open(path, "rb")  # noqa: SIM115 - 在下方 with 中关闭
+    except OSError as e:
+        raise StorageError(f"读取 CSV 文件失败: {e}") from e
+    with f:
+        yield from scan_file(f, start_time, end_time, end_offset)
+
+
+def scan_file(
+    f: BinaryIO,
+    start_time: datetime | None = None,
+    end_time: datetime | None = None,
+    end_offset: int | None = None,
+) -> Iterator[RecordRow]:
+    """逐行扫描已打开的 CSV（调用方负责关闭文件）
+
+    参数和返回值同 scan_rows()。
+    """
+    try:
+        size = os.fstat(f.fileno()).st_size
+        if end_offset is not None:
+            size = min(size, end_offset)
+        if not size:
+            return
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except OSError as e:
+        raise StorageError(f"读取 CSV 文件失败: {e}") from e
+
+    with buffer:
+        begin = _data_start(buffer, getattr(f, "name", "?"))
+        yield from _parse_range(buffer, begin, size, start_time, end_time)
+
+
+def scan_columns(
+    path: Path,
+    start_time: datetime | None = None,
+    end_time: datetime | None = None,
+    end_offset: int | None = None,
+    batch_rows: int = BATCH_ROWS,
+) -> Iterator[RecordColumns]:
+    """分批扫描 CSV 为列式数据
+
+    参数同 scan_rows()；batch_rows 为每批的最大行数。
+
+    Yields:
+        列式数据批次（非空），按文件顺序
+    """
+    return batch_columns(scan_rows(path, start_time, end_time, end_offset), batch_rows)
+
+
+def batch_columns(
+    rows: Iterable[RecordRow], batch_rows: int = BATCH_ROWS
+) -> Iterator[RecordColumns]:
+    """把逐行数据分批转换为列式数据
+
+    Args:
+        rows: (timestamp, power, alert_sent) 序列
+        batch_rows: 每批的最大行数
+
+    Yields:
+        列式数据批次（非空）
+    """
+    batch = RecordColumns()
+    append_second = batch.seconds.append
+    append_power = batch.powers.append
+    append_alert = batch.alert_sent.append
+
+    for timestamp, power, alert in rows:
+        append_second(
+            (timestamp.toordinal() - _EPOCH_ORDINAL) * 86_400
+            + timestamp.hour * 3600
+            + timestamp.minute * 60
+            + timestamp.second
+        )
+        append_power(power)
+        append_alert(alert)
+        if len(batch) >= batch_rows:
+            yield batch
+            batch = RecordColumns()
+            append_second = batch.seconds.append
+            append_power = batch.powers.append
+            append_alert = batch.alert_sent.append
+
+    if len(batch):
+        yield batch
+
+
+def _data_start(buffer: mmap.mmap, path: str) -> int:
+    """校验表头，返回第一行数据的起始位置"""
+    newline = buffer.find(b"\n")
+    end = len(buffer) if newline < 0 else newline
+    header = bytes(buffer[:end]).rstrip(b"\r")
+    if header != _EXPECTED_HEADER:
+        raise StorageError(f"CSV 表头不是预期的三列: {path} - {header[:80]!r}")
+    return end + 1
+
+
+def _time_key(value: datetime | None) -> bytes | None:
+    """时间过滤条件转换为可与时间列按字节比较的键（截断到秒）"""
+    return None if value is None else value.strftime(TIMESTAMP_FORMAT).encode()
+
+
+def _parse_range(
+    buffer: mmap.mmap,
+    begin: int,
+    stop: int,
+    start_time: datetime | None,
+    end_time: datetime | None,
+) -> Iterator[RecordRow]:
+    """解析 [begin, stop) 内的行
+
+    每次从映射中取约 _CHUNK_BYTES 字节（延伸到行尾）整块按换行切分，
+    内存占用与文件大小无关。
+    """
+    start_key, end_key = _time_key(start_time), _time_key(end_time)
+    parse_time = datetime.fromisoformat
+    width = _TIMESTAMP_WIDTH
+
+    pos = begin
+    while pos < stop:
+        cut = min(pos + _CHUNK_BYTES, stop)
+        if cut < stop:
+            newline = buffer.find(b"\n", cut, stop)
+            cut = stop if newline < 0 else newline + 1
+        lines = buffer[pos:cut].split(b"\n")
+        pos = cut
+
+        for line in lines:
+            if len(line) <= 1:
+                # 空行（可能只剩 \r）
+                continue
+
+            stamp = line[:width]
+            # 截断到秒的键：小于开始键一定早于开始时间，大于结束键一定晚于结束时间
+            if start_key is not None and stamp < start_key:
+                continue
+            if end_key is not None and stamp > end_key:
+                continue
+
+            try:
+                if line[width] != 0x2C:  # ,
+                    raise ValueError("时间列宽度不正确")
+                power_field, alert_field = line[width + 1 :].split(b",")
+                timestamp = parse_time(stamp.decode("ascii"))
+                power = float(power_field)
+                if not MIN_POWER_VALUE <= power <= MAX_POWER_VALUE:
+                    raise ValueError(f"电量超出范围: {power}")
+            except (ValueError, IndexError, UnicodeDecodeError) as e:
+                logger.warning(f"跳过无效记录: {line[:80]!r} - {e}")
+                continue
+
+            if start_time is not None and timestamp < start_time:
+                continue
+            yield (
+                timestamp,
+                round(power, 2),
+                alert_field.rstrip(b"\r").lower() == b"true",
+            )
@@ -0,0 +1,65 @@
+"""旁路文件工具
+
+存储层的派生数据（分析状态等）以 JSON 旁路文件形式保存在数据文件旁边。
+写入使用“临时文件 + 原子替换”，读取失败时返回 None 交由调用方重建。
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from ..logger import logger
+
+
+def sidecar_path(data_path: Path, suffix: str) -> Path:
+    """数据文件对应的旁路文件路径
+
+    Args:
+        data_path: 数据文件路径，如 data/electricity.csv
+        suffix: 旁路文件后缀，如 ".analytics.json"
+
+    Returns:
+        旁路文件路径，如 data/electricity.analytics.json
+    """
+    return data_path.with_name(data_path.stem + suffix)
+
+
+def write_json_atomic(path: Path, data: dict) -> None:
+    """原子写入 JSON 文件
+
+    先写同目录临时文件再 os.replace，读者不会看到写了一半的文件。
+
+    Args:
+        path: 目标文件路径
+        data: 要写入的数据
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def read_json(path: Path) -> dict | None:
+    """读取 JSON 文件
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        解析后的字典；文件不存在或内容损坏时返回 None
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"旁路文件损坏，将重建: {path} - {e}")
+        return None
+    return data if isinstance(data, dict) else None
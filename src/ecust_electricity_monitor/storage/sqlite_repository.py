@@ -0,0 +1,456 @@
+"""SQLite 多房间存储实现
+
+CSV 没有房间列，每个房间需要单独的文件；楼栋级别的看板和告警巡检要逐个
+打开数百个文件。SQLiteRoomRepository 把所有房间的记录存放在一个数据库中：
+
+    records(room, timestamp, power, alert_sent)
+    PRIMARY KEY (room, timestamp)  -- 聚簇索引（WITHOUT ROWID）
+
+按房间、时间范围的查询只读取索引中对应的区间。时间以 TIMESTAMP_FORMAT
+文本存储（与 CSV 一致，精确到秒，按字节顺序即时间顺序）。
+
+latest 表为每个房间保存一行最新读数快照（电量、日均消耗、预估剩余天数及
+增量分析状态），在写入记录的同一事务中 O(1) 更新；楼栋级别的巡检只需读取
+latest，与历史记录数无关。
+
+使用 WAL 日志模式：读取不阻塞写入，多个 emon 进程可以同时读写。
+"""
+
+import json
+import sqlite3
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from .. import timing
+from ..analytics.incremental import IncrementalAnalytics
+from ..constants import TIMESTAMP_FORMAT
+from ..exceptions import StorageError
+from ..logger import logger
+from ..metrics import STORAGE_WRITE_TIME
+from ..models import ElectricityRecord, RoomSnapshot
+from .base import ElectricityRepository, RoomRepository
+
+# 数据库结构版本（PRAGMA user_version）
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    room TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    power REAL NOT NULL,
+    alert_sent INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (room, timestamp)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS latest (
+    room TEXT PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    power REAL NOT NULL,
+    alert_sent INTEGER NOT NULL DEFAULT 0,
+    daily_consumption REAL,
+    days_remaining INTEGER,
+    analytics TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+# 同一房间同一秒的记录只保留一条，后写入的覆盖先写入的
+_UPSERT = """
+INSERT INTO records (room, timestamp, power, alert_sent) VALUES (?, ?, ?, ?)
+ON CONFLICT (room, timestamp) DO UPDATE
+SET power = excluded.power, alert_sent = excluded.alert_sent
+"""
+
+# 等待其他进程释放写锁的最长时间（秒）
+_BUSY_TIMEOUT = 30.0
+
+
+class SQLiteRoomRepository(RoomRepository):
+    """SQLite 多房间存储实现
+
+    实现 RoomRepository 接口。每次操作使用独立的连接（用完即关），
+    实例可以在线程之间共享。
+    """
+
+    def __init__(self, db_path: Path):
+        """初始化 SQLite 存储（数据库不存在时自动创建）
+
+        Args:
+            db_path: 数据库文件路径
+
+        Raises:
+            StorageError: 数据库无法打开或结构版本不受支持
+        """
+        self.db_path = Path(db_path)
+        self._ensure_schema()
+
+    def _ensure_schema(self) -> None:
+        """创建表并检查结构版本"""
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            with self._connect() as conn:
+                version = conn.execute("PRAGMA user_version").fetchone()[0]
+                if version > SCHEMA_VERSION:
+                    raise StorageError(
+                        f"数据库结构版本 {version} 高于支持的版本 "
+                        f"{SCHEMA_VERSION}: {self.db_path}"
+                    )
+                conn.execute("PRAGMA journal_mode = WAL")
+                conn.executescript(_SCHEMA)
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        except (OSError, sqlite3.Error) as e:
+            raise StorageError(f"初始化数据库失败: {e}") from e
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """打开连接；正常退出时提交，异常时回滚，最后关闭"""
+        conn = sqlite3.connect(self.db_path, timeout=_BUSY_TIMEOUT)
+        try:
+            # WAL 下 NORMAL 只在检查点时同步，断电最多丢失最近的提交，不会损坏
+            conn.execute("PRAGMA synchronous = NORMAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def save(self, room_id: str, record: ElectricityRecord) -> None:
+        """保存一个房间的一条电量记录
+
+        Args:
+            room_id: 房间标识
+            record: 电量记录对象
+
+        Raises:
+            StorageError: 保存失败
+        """
+        self.save_many(room_id, [record])
+
+    @timing.timed("room_storage.save_many")
+    def save_many(self, room_id: str, records: Iterable[ElectricityRecord]) -> None:
+        """在一个事务中批量保存一个房间的电量记录，并更新该房间的快照
+
+        同一房间同一秒的记录只保留一条（后写入的覆盖先写入的）。
+        记录晚于快照中的最新读数时增量更新快照，否则由该房间的历史重建。
+
+        Args:
+            room_id: 房间标识
+            records: 电量记录（按时间正序）
+
+        Raises:
+            StorageError: 保存失败
+        """
+        records = [_truncate(record) for record in records]
+        if not records:
+            return
+        rows = [_to_row(room_id, record) for record in records]
+
+        start = time.perf_counter()
+        try:
+            with self._connect() as conn:
+                # 先写入记录（取得写锁），再读取快照，并发写入同一房间时不会丢失更新
+                conn.executemany(_UPSERT, rows)
+                _advance_snapshot(conn, room_id, records)
+        except sqlite3.Error as e:
+            raise StorageError(f"写入数据库失败: {e}") from e
+        STORAGE_WRITE_TIME.observe(time.perf_counter() - start)
+        logger.debug(f"房间 {room_id} 保存了 {len(rows)} 条记录")
+
+    def merge(self, room_id: str, records: Iterable[ElectricityRecord]) -> int:
+        """合并记录：只补入不存在的时间戳（按秒比较），已有记录保持不变
+
+        用于从房间 CSV 或归档导入历史读数。
+
+        Args:
+            room_id: 房间标识
+            records: 待合并的记录（顺序不限）
+
+        Returns:
+            新增的记录数
+
+        Raises:
+            StorageError: 写入失败
+        """
+        rows = [_to_row(room_id, record) for record in records]
+        try:
+            with self._connect() as conn:
+                before = conn.total_changes
+                conn.executemany(
+                    "INSERT OR IGNORE INTO records "
+                    "(room, timestamp, power, alert_sent) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                added = conn.total_changes - before
+                if added:
+                    _refresh_snapshot(conn, room_id)
+        except sqlite3.Error as e:
+            raise StorageError(f"合并记录失败: {e}") from e
+
+        if added:
+            logger.info(f"房间 {room_id} 合并了 {added} 条记录")
+        return added
+
+    def has_room(self, room_id: str) -> bool:
+        """房间在数据库中是否已有记录
+
+        Raises:
+            StorageError: 查询失败
+        """
+        rows = self._query(
+            "SELECT EXISTS (SELECT 1 FROM records WHERE room = ?)", [room_id]
+        )
+        return bool(rows[0][0])
+
+    def sync_room(self, room_id: str, source: ElectricityRepository) -> int:
+        """房间在数据库中还没有记录时，由 source（通常是该房间的 CSV）补入全部历史
+
+        多房间数据库晚于各房间 CSV 启用时，第一次写入该房间前调用，
+        使快照中的日均消耗与剩余天数基于完整历史。
+
+        Args:
+            room_id: 房间标识
+            source: 该房间已有数据的仓储
+
+        Returns:
+            补入的记录数（房间已有记录时为 0）
+
+        Raises:
+            StorageError: 读取或写入失败
+        """
+        if self.has_room(room_id):
+            return 0
+        return self.merge(room_id, source.iter_records())
+
+    @timing.timed("room_storage.find_all")
+    def find_all(
+        self,
+        room_id: str,
+        start_time: datetime | None = None,
+        end_time: datetime | None = None,
+        limit: int | None = None,
+    ) -> list[ElectricityRecord]:
+        """查询一个房间的电量记录
+
+        Args:
+            room_id: 房间标识
+            start_time: 开始时间（包含）
+            end_time: 结束时间（包含）
+            limit: 返回记录数量限制
+
+        Returns:
+            电量记录列表（按时间降序）
+
+        Raises:
+            StorageError: 查询失败
+        """
+        sql = "SELECT timestamp, power, alert_sent FROM records WHERE room = ?"
+        params: list[object] = [room_id]
+        if start_time is not None:
+            sql += " AND timestamp >= ?"
+            params.append(_start_key(start_time))
+        if end_time is not None:
+            sql += " AND timestamp <= ?"
+            params.append(end_time.strftime(TIMESTAMP_FORMAT))
+        sql += " ORDER BY timestamp DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        rows = self._query(sql, params)
+        records = [_to_record(*row) for row in rows]
+        logger.debug(f"房间 {room_id} 读取了 {len(records)} 条记录")
+        return records
+
+    @timing.timed("room_storage.find_snapshots")
+    def find_snapshots(self) -> list[RoomSnapshot]:
+        """获取每个房间的最新读数快照（只读取 latest，与历史记录数无关）
+
+        Returns:
+            快照列表（按房间标识排序）
+
+        Raises:
+            StorageError: 查询失败
+        """
+        rows = self._query(
+            "SELECT room, timestamp, power, alert_sent, daily_consumption, "
+            "days_remaining FROM latest ORDER BY room"
+        )
+        return [
+            RoomSnapshot(
+                room=room,
+                timestamp=datetime.strptime(timestamp, TIMESTAMP_FORMAT),
+                power=power,
+                alert_sent=bool(alert_sent),
+                daily_consumption=daily,
+                days_remaining=days,
+            )
+            for room, timestamp, power, alert_sent, daily, days in rows
+        ]
+
+    def rooms(self) -> list[str]:
+        """列出有记录的房间
+
+        Returns:
+            房间标识列表（排序）
+
+        Raises:
+            StorageError: 查询失败
+        """
+        return [row[0] for row in self._query("SELECT room FROM latest ORDER BY room")]
+
+    def count(self, room_id: str | None = None) -> int:
+        """统计记录数
+
+        Args:
+            room_id: 房间标识（None 表示全部房间）
+
+        Returns:
+            记录数
+
+        Raises:
+            StorageError: 查询失败
+        """
+        if room_id is None:
+            rows = self._query("SELECT COUNT(*) FROM records")
+        else:
+            rows = self._query("SELECT COUNT(*) FROM records WHERE room = ?", [room_id])
+        return rows[0][0]
+
+    def delete_before(self, timestamp: datetime, room_id: str | None = None) -> int:
+        """删除指定时间之前的记录，并重建受影响房间的快照
+
+        Args:
+            timestamp: 时间戳
+            room_id: 房间标识（None 表示全部房间）
+
+        Returns:
+            删除的记录数
+
+        Raises:
+            StorageError: 删除失败
+        """
+        sql = "DELETE FROM records WHERE timestamp < ?"
+        params: list[object] = [_start_key(timestamp)]
+        if room_id is not None:
+            sql += " AND room = ?"
+            params.append(room_id)
+
+        try:
+            with self._connect() as conn:
+                rooms = [room_id] if room_id is not None else _distinct_rooms(conn)
+                deleted = conn.execute(sql, params).rowcount
+                if deleted:
+                    for room in rooms:
+                        _refresh_snapshot(conn, room)
+        except sqlite3.Error as e:
+            raise StorageError(f"删除记录失败: {e}") from e
+
+        logger.info(f"删除了 {deleted} 条记录")
+        return deleted
+
+    def _query(self, sql: str, params: Iterable[object] = ()) -> list[tuple]:
+        """执行查询并返回全部行"""
+        try:
+            with self._connect() as conn:
+                return conn.execute(sql, list(params)).fetchall()
+        except sqlite3.Error as e:
+            raise StorageError(f"查询数据库失败: {e}") from e
+
+
+def _distinct_rooms(conn: sqlite3.Connection) -> list[str]:
+    """records 中出现的全部房间"""
+    return [row[0] for row in conn.execute("SELECT DISTINCT room FROM records")]
+
+
+def _advance_snapshot(
+    conn: sqlite3.Connection, room_id: str, records: list[ElectricityRecord]
+) -> None:
+    """用新记录增量更新房间快照（无法增量更新时重建）"""
+    row = conn.execute(
+        "SELECT analytics FROM latest WHERE room = ?", [room_id]
+    ).fetchone()
+    if row is None:
+        _refresh_snapshot(conn, room_id)
+        return
+
+    try:
+        state = IncrementalAnalytics.from_dict(json.loads(row[0]))
+        for record in records:
+            state.update(record)
+    except ValueError:
+        # 记录不晚于最新读数（补写历史或同一秒覆盖）或状态版本不匹配
+        _refresh_snapshot(conn, room_id)
+        return
+    _store_snapshot(conn, room_id, state)
+
+
+def _refresh_snapshot(conn: sqlite3.Connection, room_id: str) -> None:
+    """由房间的全部历史记录重建快照"""
+    state = IncrementalAnalytics()
+    for row in conn.execute(
+        "SELECT timestamp, power, alert_sent FROM records "
+        "WHERE room = ? ORDER BY timestamp",
+        [room_id],
+    ):
+        state.update(_to_record(*row))
+    _store_snapshot(conn, room_id, state)
+
+
+def _store_snapshot(
+    conn: sqlite3.Connection, room_id: str, state: IncrementalAnalytics
+) -> None:
+    """写入房间快照（没有记录时删除）"""
+    latest = state.latest
+    if latest is None:
+        conn.execute("DELETE FROM latest WHERE room = ?", [room_id])
+        return
+
+    conn.execute(
+        "INSERT OR REPLACE INTO latest (room, timestamp, power, alert_sent, "
+        "daily_consumption, days_remaining, analytics) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [
+            *_to_row(room_id, latest),
+            state.daily_consumption,
+            state.estimate_remaining_days(),
+            json.dumps(state.to_dict()),
+        ],
+    )
+
+
+def _truncate(record: ElectricityRecord) -> ElectricityRecord:
+    """时间截断到秒（与数据库中保存的一致）"""
+    if not record.timestamp.microsecond:
+        return record
+    return record.model_copy(
+        update={"timestamp": record.timestamp.replace(microsecond=0)}
+    )
+
+
+def _to_row(room_id: str, record: ElectricityRecord) -> tuple[str, str, float, int]:
+    """记录转换为数据库行（时间截断到秒）"""
+    return (
+        room_id,
+        record.timestamp.strftime(TIMESTAMP_FORMAT),
+        record.power,
+        int(record.alert_sent),
+    )
+
+
+def _to_record(timestamp: str, power: float, alert_sent: int) -> ElectricityRecord:
+    """数据库行转换为记录"""
+    return ElectricityRecord(
+        timestamp=datetime.strptime(timestamp, TIMESTAMP_FORMAT),
+        power=power,
+        alert_sent=bool(alert_sent),
+    )
+
+
+def _start_key(value: datetime) -> str:
+    """下界时间转换为可按文本比较的键
+
+    数据库中的时间精确到秒，带微秒的下界向上取整到下一秒。
+    """
+    if value.microsecond:
+        value = value.replace(microsecond=0) + timedelta(seconds=1)
+    return value.strftime(TIMESTAMP_FORMAT)
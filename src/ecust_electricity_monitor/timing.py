@@ -0,0 +1,195 @@
+"""耗时统计模块
+
+职责：
+- 为热点路径提供轻量的计时区段（上下文管理器 / 装饰器）
+- 按阶段汇总调用次数、总耗时、自身耗时（扣除嵌套子区段）和最大耗时
+- 供 `emon --timings` 在退出时输出各阶段耗时表
+
+默认关闭。关闭时 span() 返回共享的空上下文、timed() 直接调用原函数，
+开销只有一次全局布尔判断：
+
+    with span("client.http"):
+        response = requests.get(...)
+
+    @timed("analyzer.statistics")
+    def get_statistics(self): ...
+"""
+
+import functools
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import ParamSpec, TypeVar
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+_enabled = False
+_lock = threading.Lock()
+_local = threading.local()
+
+
+@dataclass
+class StageTiming:
+    """单个阶段的耗时汇总"""
+
+    name: str
+    calls: int = 0
+    total: float = 0.0
+    self_time: float = 0.0
+    max: float = 0.0
+
+    @property
+    def mean(self) -> float:
+        """平均耗时（秒）"""
+        return self.total / self.calls if self.calls else 0.0
+
+
+_stages: dict[str, StageTiming] = {}
+
+
+def enable() -> None:
+    """开启耗时统计"""
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    """关闭耗时统计（已有数据保留）"""
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    """耗时统计是否开启"""
+    return _enabled
+
+
+def reset() -> None:
+    """清空已收集的数据"""
+    with _lock:
+        _stages.clear()
+
+
+def record(name: str, seconds: float, calls: int = 1) -> None:
+    """直接累加一段耗时
+
+    用于逐行循环等不适合逐次进入区段的场景：调用方自行累计后一次性记录。
+    耗时计入当前区段的子耗时。
+
+    Args:
+        name: 阶段名称
+        seconds: 累计耗时（秒）
+        calls: 调用次数
+    """
+    stack = _stack()
+    if stack:
+        stack[-1].children += seconds
+    _accumulate(name, seconds, seconds, calls)
+
+
+def _accumulate(name: str, seconds: float, self_time: float, calls: int) -> None:
+    """累加到阶段汇总"""
+    with _lock:
+        stage = _stages.get(name)
+        if stage is None:
+            stage = _stages[name] = StageTiming(name)
+        stage.calls += calls
+        stage.total += seconds
+        stage.self_time += self_time
+        stage.max = max(stage.max, seconds / calls)
+
+
+def _stack() -> list["_Span"]:
+    """当前线程的区段栈"""
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+class _Span:
+    """计时区段"""
+
+    __slots__ = ("name", "start", "children")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = 0.0
+        self.children = 0.0
+
+    def __enter__(self) -> "_Span":
+        _stack().append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        elapsed = time.perf_counter() - self.start
+        stack = _stack()
+        stack.pop()
+        if stack:
+            stack[-1].children += elapsed
+        _accumulate(self.name, elapsed, elapsed - self.children, 1)
+
+
+class _NullSpan:
+    """关闭时使用的空区段"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str) -> _Span | _NullSpan:
+    """计时区段（上下文管理器）
+
+    Args:
+        name: 阶段名称，建议使用 "模块.操作" 形式
+
+    Returns:
+        上下文管理器（关闭时为共享空对象）
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name)
+
+
+def timed(name: str) -> Callable[[Callable[P, R]], Callable[P, R]]:
+    """计时装饰器
+
+    Args:
+        name: 阶段名称
+
+    Returns:
+        装饰器
+    """
+
+    def decorator(func: Callable[P, R]) -> Callable[P, R]:
+        @functools.wraps(func)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def snapshot() -> list[StageTiming]:
+    """已收集的各阶段耗时（按总耗时降序）"""
+    with _lock:
+        stages = [
+            StageTiming(s.name, s.calls, s.total, s.self_time, s.max)
+            for s in _stages.values()
+        ]
+    return sorted(stages, key=lambda s: s.total, reverse=True)
@@ -0,0 +1,158 @@
+"""测试原始响应归档与重新解析"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from ecust_electricity_monitor.archive import (
+    ResponseArchive,
+    available_compressions,
+)
+from ecust_electricity_monitor.bench.fake_server import (
+    FakeECUSTServer,
+    FakeServerOptions,
+)
+from ecust_electricity_monitor.client import ElectricityClient
+from ecust_electricity_monitor.commands.reparse import reparse_archive
+from ecust_electricity_monitor.exceptions import ClientError
+from ecust_electricity_monitor.models import ElectricityRecord
+from ecust_electricity_monitor.storage import CSVRepository
+
+START = datetime(2026, 3, 1, 8)
+
+
+def _html(power: float) -> str:
+    return f'<html><input id="roomdef" left-degree="{power}"></html>'
+
+
+class TestResponseArchive:
+    """测试归档读写"""
+
+    @pytest.mark.parametrize("compression", available_compressions())
+    def test_round_trip(self, tmp_path, compression):
+        """测试写入后按写入顺序完整读回"""
+        archive = ResponseArchive(tmp_path, compression=compression)
+        body = _html(12.5) + "宿舍" * 1000
+        archive.append("101", START, body, url="http://x", status=200)
+        archive.append("102", START + timedelta(hours=1), _html(3))
+
+        entries = list(archive.iter_responses())
+        assert [e.room for e in entries] == ["101", "102"]
+        assert entries[0].body == body
+        assert entries[0].url == "http://x"
+        assert entries[0].timestamp == START
+        assert len(archive.segments()) == 1
+
+    def test_filters(self, tmp_path):
+        """测试按房间和时间过滤"""
+        archive = ResponseArchive(tmp_path)
+        for i in range(6):
+            archive.append(str(101 + i % 2), START + timedelta(hours=i), _html(i))
+
+        rooms = [e.room for e in archive.iter_responses(room="101")]
+        assert rooms == ["101"] * 3
+
+        times = [
+            e.timestamp
+            for e in archive.iter_responses(
+                since=START + timedelta(hours=2), until=START + timedelta(hours=4)
+            )
+        ]
+        assert times == [START + timedelta(hours=h) for h in (2, 3, 4)]
+
+    def test_rotation_and_total_cap(self, tmp_path):
+        """测试分段轮换，总大小超出上限时删除最旧的分段"""
+        archive = ResponseArchive(
+            tmp_path, compression="gzip", max_segment_bytes=400, max_total_bytes=1200
+        )
+        for i in range(40):
+            archive.append("101", START + timedelta(minutes=i), f"{i:04d}" * 50)
+
+        segments = archive.segments()
+        assert len(segments) > 1
+        assert archive.total_bytes() <= 1200
+        assert all(path.stat().st_size <= 400 for path in segments)
+
+        # 最新的响应保留，最旧的被删除
+        entries = list(archive.iter_responses())
+        assert entries[-1].timestamp == START + timedelta(minutes=39)
+        assert entries[0].timestamp > START
+
+    def test_corrupt_tail(self, tmp_path):
+        """测试分段末尾不完整时读回之前的条目"""
+        archive = ResponseArchive(tmp_path, compression="gzip")
+        archive.append("101", START, _html(1))
+        archive.append("101", START + timedelta(hours=1), _html(2))
+        segment = archive.segments()[0]
+        with open(segment, "ab") as f:
+            f.write(b"\x1f\x8b\x08\x00garbage")
+
+        entries = list(archive.iter_responses())
+        assert len(entries) == 2
+
+    def test_unavailable_compression(self, tmp_path, monkeypatch):
+        """测试指定不可用的压缩格式时报错"""
+        monkeypatch.setattr(
+            "ecust_electricity_monitor.archive.available_compressions",
+            lambda: ["gzip"],
+        )
+        with pytest.raises(ValueError, match="zstd"):
+            ResponseArchive(tmp_path, compression="zstd")
+
+
+class TestClientArchive:
+    """测试客户端归档响应"""
+
+    def test_full_response_archived(self, tmp_path):
+        """测试成功和解析失败的响应都完整归档"""
+        archive = ResponseArchive(tmp_path)
+        with FakeECUSTServer(FakeServerOptions(rooms=1)) as server:
+            roomid = server.room_ids()[0]
+            client = ElectricityClient(
+                sysid="secret",
+                roomid=roomid,
+                areaid="2",
+                buildid="3",
+                base_url=server.url,
+                max_retries=0,
+                archive=archive,
+            )
+            result = client.fetch()
+            client.roomid = "1"
+            with pytest.raises(ClientError):
+                client.fetch()
+
+        entries = list(archive.iter_responses())
+        assert [e.room for e in entries] == [roomid, "1"]
+        assert entries[0].timestamp == result.timestamp
+        assert entries[0].url == server.url
+        assert "secret" not in entries[0].url
+        assert len(entries[0].body) > 500
+
+
+class TestReparse:
+    """测试重新解析与修复"""
+
+    def test_reparse_and_merge(self, tmp_path):
+        """测试解析统计，补入缺失的读数且不改动已有读数"""
+        archive = ResponseArchive(tmp_path / "archive")
+        for i in range(4):
+            archive.append("101", START + timedelta(hours=i), _html(50 - i))
+        archive.append("101", START + timedelta(hours=4), "<html>new layout</html>")
+
+        stats = reparse_archive(archive)
+        assert stats["101"].total == 5
+        assert stats["101"].failed == 1
+        assert "roomdef" in stats["101"].errors[0]
+
+        storage = CSVRepository(tmp_path / "101.csv")
+        storage.save(ElectricityRecord(timestamp=START, power=99))
+        storage.save(ElectricityRecord(timestamp=START + timedelta(hours=5), power=40))
+
+        assert storage.merge(stats["101"].records) == 3
+        assert storage.merge(stats["101"].records) == 0
+
+        records = storage.find_all()
+        assert [r.power for r in records] == [40, 47, 48, 49, 99]
+        assert storage.analytics().latest.power == 40
+        assert storage.count() == 5
@@ -0,0 +1,101 @@
+"""测试分析后端（纯 Python 与 NumPy 结果一致性）"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from ecust_electricity_monitor.analytics import PowerAnalyzer
+from ecust_electricity_monitor.analytics.backends import get_backend
+from ecust_electricity_monitor.bench import generate_history
+from ecust_electricity_monitor.models import ElectricityRecord
+
+pytest.importorskip("numpy")
+
+
+@pytest.fixture(scope="module")
+def history():
+    """带充值、不规则间隔和重复时间戳的合成历史"""
+    records = generate_history(24 * 90, interval_minutes=60, seed=7)
+    # 不规则间隔：去掉一部分记录，并加入带微秒的时间戳和重复时间戳
+    records = [r for i, r in enumerate(records) if i % 7 != 3]
+    records.insert(
+        5,
+        records[5].model_copy(
+            update={"timestamp": records[5].timestamp + timedelta(microseconds=123)}
+        ),
+    )
+    records.insert(20, records[20].model_copy(update={"power": records[20].power}))
+    return records
+
+
+def _analyzers(records):
+    return (
+        PowerAnalyzer(records, backend="python"),
+        PowerAnalyzer(records, backend="numpy"),
+    )
+
+
+class TestBackendParity:
+    """测试两种后端结果完全一致"""
+
+    def test_statistics(self, history):
+        py, np_ = _analyzers(history)
+        assert py.get_statistics() == np_.get_statistics()
+
+    def test_daily_consumption(self, history):
+        py, np_ = _analyzers(history)
+        for days in (1, 7, 30, 365):
+            assert py.calculate_daily_consumption(days) == (
+                np_.calculate_daily_consumption(days)
+            )
+
+    def test_step_rates(self, history):
+        py, np_ = _analyzers(history)
+        assert py.calculate_step_rates() == np_.calculate_step_rates()
+
+    def test_percentiles(self, history):
+        py, np_ = _analyzers(history)
+        quantiles = [0.0, 0.01, 0.25, 0.5, 0.75, 0.99, 1.0]
+        assert py.backend.percentiles(py.columns, quantiles) == (
+            np_.backend.percentiles(np_.columns, quantiles)
+        )
+
+    def test_resample_daily(self, history):
+        py, np_ = _analyzers(history)
+        assert py.resample_daily() == np_.resample_daily()
+
+    def test_small_inputs(self):
+        record = ElectricityRecord(timestamp=datetime(2026, 3, 1), power=10.0)
+        py, np_ = _analyzers([record])
+        assert py.get_statistics() == np_.get_statistics()
+        assert py.calculate_daily_consumption() is None
+        assert np_.calculate_daily_consumption() is None
+        assert py.calculate_step_rates() == np_.calculate_step_rates() == ([], [])
+
+
+class TestBackendSemantics:
+    """测试后端计算语义"""
+
+    def test_percentiles_match_numpy(self, history):
+        import numpy as np
+
+        analyzer = PowerAnalyzer(history, backend="python")
+        powers = [r.power for r in history]
+        for q in (0.1, 0.5, 0.9):
+            assert analyzer.backend.percentiles(analyzer.columns, [q])[0] == (
+                pytest.approx(float(np.percentile(powers, q * 100)))
+            )
+
+    def test_resample_daily_totals(self, history):
+        analyzer = PowerAnalyzer(history, backend="python")
+        daily = analyzer.resample_daily()
+
+        assert sum(d.sample_count for d in daily) == len(history)
+        assert sum(d.consumed_kwh for d in daily) == pytest.approx(
+            analyzer.segmentation.total_consumed_kwh
+        )
+        assert daily[0].period_start.time() == datetime.min.time()
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            get_backend("fortran")
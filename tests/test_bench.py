@@ -0,0 +1,71 @@
+"""测试基准测试套件"""
+
+import json
+
+from ecust_electricity_monitor.bench import compare_results, run_suite
+
+
+class TestBenchSuite:
+    """测试基准测试套件"""
+
+    def test_run_suite(self):
+        """测试结果结构与用例覆盖"""
+        result = run_suite(rows=[200], repeat=1, report_rows=None)
+
+        names = {r["name"] for r in result["results"]}
+        assert {
+            "storage.save",
+            "storage.find_latest",
+            "storage.find_recent",
+            "storage.count",
+            "storage.delete_before",
+            "analyzer.get_statistics",
+            "analyzer.calculate_trend_cached",
+            "backend.python.statistics",
+            "report.generate",
+            "report.generate_raw",
+            "client.parse_html",
+            "client.fetch_many",
+        } <= names
+        assert all(r["min"] <= r["median"] for r in result["results"])
+        # 报告用例记录产出文件大小，其他用例不记录
+        for r in result["results"]:
+            assert (r["output_bytes"] is not None) == r["name"].startswith("report.")
+            assert r["output_bytes"] is None or r["output_bytes"] > 0
+        # 结果可直接序列化为 JSON
+        assert json.loads(json.dumps(result))["schema"] == result["schema"]
+
+    def test_only_prefix(self):
+        """测试按前缀筛选用例"""
+        result = run_suite(rows=[100], repeat=1, only="analyzer.get")
+        assert [r["name"] for r in result["results"]] == ["analyzer.get_statistics"]
+
+    def test_report_rows(self):
+        """测试报告用例额外运行大数据规模"""
+        result = run_suite(rows=[100], repeat=1, only="report.", report_rows=300)
+
+        sizes = {(r["name"], r["rows"]): r["output_bytes"] for r in result["results"]}
+        assert {name for name, _ in sizes} == {
+            "report.generate",
+            "report.generate_raw",
+            "report.generate_no_envelope",
+        }
+        assert {rows for _, rows in sizes} == {100, 300}
+        # 不降采样时数据点全部写入页面
+        assert sizes["report.generate_raw", 300] > sizes["report.generate_raw", 100]
+
+    def test_compare_results(self):
+        """测试与基线对比"""
+
+        def run(median: float) -> dict:
+            return {
+                "results": [{"name": "storage.count", "rows": 10, "median": median}]
+            }
+
+        (same,) = compare_results(run(1.0), run(1.1), threshold=0.2)
+        (slower,) = compare_results(run(1.0), run(1.5), threshold=0.2)
+
+        assert not same["regression"]
+        assert slower["regression"]
+        assert slower["change"] == 0.5
+        assert compare_results(run(1.0), {"results": []}) == []
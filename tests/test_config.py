@@ -4,7 +4,12 @@ from __future__ import annotations
 
 from pydantic_settings import SettingsConfigDict
 
-from ecust_electricity_monitor.config import NotificationConfig, Settings
+from ecust_electricity_monitor.config import (
+    ApiConfig,
+    NotificationConfig,
+    RoomConfig,
+    Settings,
+)
 
 
 def test_settings_priority_env_over_dotenv_over_toml(tmp_path, monkeypatch):
@@ -61,3 +66,9 @@ NOTIFICATION__SMTP_STARTTLS=true
 def test_notification_channels_normalize():
     config = NotificationConfig(channels=["Email", " serverchan "])
     assert config.enabled_channels == ["email", "serverchan"]
+
+
+def test_room_query_falls_back_to_api():
+    api = ApiConfig(sysid="s", roomid="r", areaid="a", buildid="b")
+    query = api.room_query(RoomConfig(name="B-512", roomid="512", buildid="x"))
+    assert (query.roomid, query.areaid, query.buildid) == ("512", "a", "x")
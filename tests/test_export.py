@@ -0,0 +1,102 @@
+"""测试数据导出"""
+
+import json
+from datetime import datetime
+
+import pytest
+
+from ecust_electricity_monitor.bench import generate_history
+from ecust_electricity_monitor.constants import TIMESTAMP_FORMAT
+from ecust_electricity_monitor.export import (
+    export_data,
+    get_writer,
+    read_packed,
+    read_packed_header,
+    resolve_format,
+)
+from ecust_electricity_monitor.storage import CSVRepository
+
+
+@pytest.fixture
+def storage(test_csv_path):
+    """包含 500 条记录的仓储（直接写入 CSV，汇总表在首次查询时重建）"""
+    repo = CSVRepository(test_csv_path)
+    records = generate_history(500, end_time=datetime(2026, 3, 20, 12), seed=5)
+    with open(test_csv_path, "a", encoding="utf-8") as f:
+        for r in reversed(records):
+            f.write(f"{r.timestamp.strftime(TIMESTAMP_FORMAT)},{r.power},False\n")
+    return repo
+
+
+class TestExport:
+    """测试导出写入器"""
+
+    def test_iter_records_streams_range(self, storage):
+        """测试仓储迭代器按时间范围流式读取"""
+        start, end = datetime(2026, 3, 10), datetime(2026, 3, 12)
+        iterator = storage.iter_records(start, end)
+
+        assert not isinstance(iterator, list)
+        records = list(iterator)
+        assert len(records) == 49
+        assert all(start <= r.timestamp <= end for r in records)
+
+    def test_jsonl(self, storage, tmp_path):
+        """测试 JSON Lines 导出"""
+        path = tmp_path / "out.jsonl"
+        with get_writer("jsonl", path) as writer:
+            count = export_data(storage, writer)
+
+        lines = path.read_text(encoding="utf-8").splitlines()
+        assert count == len(lines) == 500
+        first = json.loads(lines[0])
+        assert set(first) == {"timestamp", "power", "alert_sent"}
+        assert datetime.fromisoformat(first["timestamp"]) == min(
+            r.timestamp for r in storage.find_all()
+        )
+
+    def test_packed_binary_roundtrip(self, storage, tmp_path):
+        """测试紧凑二进制导出可以完整读回"""
+        path = tmp_path / "out.bin"
+        with get_writer("binary", path) as writer:
+            export_data(storage, writer)
+
+        rows = list(read_packed(path))
+        expected = [
+            (r.timestamp, r.power, r.alert_sent) for r in storage.iter_records()
+        ]
+        assert rows == expected
+        assert read_packed_header(path)["kind"] == "records"
+
+    def test_rollup_export(self, storage, tmp_path):
+        """测试按天汇总导出"""
+        path = tmp_path / "daily.bin"
+        with get_writer("binary", path, kind="rollups") as writer:
+            count = export_data(storage, writer, granularity="day")
+
+        rows = list(read_packed(path))
+        assert count == len(rows) == len(storage.find_rollups("day"))
+        assert sum(row[5] for row in rows) == 500
+
+    def test_parquet(self, storage, tmp_path):
+        """测试 Parquet 分批导出"""
+        pq = pytest.importorskip("pyarrow.parquet")
+        assert resolve_format("columnar") == "parquet"
+
+        path = tmp_path / "out.parquet"
+        writer = get_writer("parquet", path)
+        writer.batch_size = 64
+        with writer:
+            export_data(storage, writer)
+
+        table = pq.read_table(path)
+        assert table.num_rows == 500
+        assert table.column_names == ["timestamp", "power", "alert_sent"]
+        assert table.column("power").to_pylist() == [
+            r.power for r in storage.iter_records()
+        ]
+
+    def test_unknown_format(self, tmp_path):
+        """测试未知格式"""
+        with pytest.raises(ValueError):
+            get_writer("xml", tmp_path / "out.xml")
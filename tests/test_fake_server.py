@@ -0,0 +1,79 @@
+"""测试本地模拟服务器"""
+
+from datetime import datetime, timedelta
+
+import pytest
+import requests
+
+from ecust_electricity_monitor.bench.fake_server import (
+    LAYOUTS,
+    FakeECUSTServer,
+    FakeServerOptions,
+)
+from ecust_electricity_monitor.client import ElectricityClient
+from ecust_electricity_monitor.exceptions import ClientError
+
+
+def _client(server: FakeECUSTServer, roomid: str, **kwargs) -> ElectricityClient:
+    return ElectricityClient(
+        sysid="1",
+        roomid=roomid,
+        areaid="2",
+        buildid="3",
+        base_url=server.url,
+        backoff_factor=0,
+        **kwargs,
+    )
+
+
+class TestFakeServer:
+    """测试模拟服务器与客户端"""
+
+    def test_fetch_all_layouts(self):
+        """测试客户端能解析每种 HTML 版式"""
+        with FakeECUSTServer(FakeServerOptions(rooms=len(LAYOUTS))) as server:
+            for roomid in server.room_ids():
+                result = _client(server, roomid).fetch()
+                assert result.success
+                assert result.source == server.url
+                expected = server.power_at(roomid, result.timestamp)
+                assert result.power == pytest.approx(expected, abs=0.05)
+
+    def test_consumption_model(self):
+        """测试电量随时间下降，低于下限后充值"""
+        server = FakeECUSTServer(FakeServerOptions(rooms=1))
+        try:
+            roomid = server.room_ids()[0]
+            start = datetime(2026, 3, 1)
+            hourly = [
+                server.power_at(roomid, start + timedelta(hours=h))
+                for h in range(24 * 120)
+            ]
+            drops = sum(b < a for a, b in zip(hourly, hourly[1:], strict=False))
+            recharges = sum(b > a for a, b in zip(hourly, hourly[1:], strict=False))
+
+            assert drops > len(hourly) * 0.9
+            assert recharges >= 1
+            assert min(hourly) > 0
+            assert server.power_at("999", start) is None
+        finally:
+            server.stop()
+
+    def test_unknown_room_fails_after_retries(self):
+        """测试未知房间：页面不含电量，重试后失败"""
+        with FakeECUSTServer(FakeServerOptions(rooms=1)) as server:
+            with pytest.raises(ClientError):
+                _client(server, "1", max_retries=2).fetch()
+            assert server.requests_served == 3
+
+    def test_injected_errors(self):
+        """测试注入 HTTP 错误"""
+        options = FakeServerOptions(rooms=1, error_rate=1.0)
+        with FakeECUSTServer(options) as server:
+            response = requests.get(
+                server.url, params={"roomid": server.room_ids()[0]}, timeout=5
+            )
+            assert response.status_code in (500, 503)
+            assert server.errors_injected == 1
+
+            assert requests.get(server.url + "x", timeout=5).status_code == 404
@@ -0,0 +1,144 @@
+"""测试查询结果缓存"""
+
+import multiprocessing
+from datetime import datetime
+
+from ecust_electricity_monitor.bench.fake_server import (
+    FakeECUSTServer,
+    FakeServerOptions,
+)
+from ecust_electricity_monitor.client import ElectricityClient
+from ecust_electricity_monitor.fetch_cache import FetchCache
+from ecust_electricity_monitor.metrics import FETCH_CACHE_HITS
+from ecust_electricity_monitor.models import FetchResult
+
+KEY = ("http://example", "1", "2", "3", "101")
+
+
+class FakeClock:
+    """可手动推进的时钟"""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _result(power: float = 12.5, success: bool = True) -> FetchResult:
+    return FetchResult(power=power, timestamp=datetime(2026, 3, 1, 8), success=success)
+
+
+def _write_many(cache_dir: str, count: int) -> None:
+    """子进程：反复写入同一房间的缓存"""
+    cache = FetchCache(cache_dir, ttl_seconds=3600)
+    for i in range(count):
+        cache.put("101", KEY, _result(power=i % 500))
+
+
+class TestFetchCache:
+    """测试缓存读写"""
+
+    def test_round_trip_and_ttl(self, tmp_path):
+        """测试 TTL 内命中、过期后未命中"""
+        clock = FakeClock()
+        cache = FetchCache(tmp_path, ttl_seconds=300, clock=clock)
+        assert cache.get("101", KEY) is None
+
+        cache.put("101", KEY, _result())
+        hit = cache.get("101", KEY)
+        assert hit is not None
+        assert hit.from_cache
+        assert hit.power == 12.5
+        assert hit.timestamp == datetime(2026, 3, 1, 8)
+
+        clock.now += 299
+        assert cache.get("101", KEY) is not None
+        clock.now += 1
+        assert cache.get("101", KEY) is None
+
+    def test_keys_are_separate(self, tmp_path):
+        """测试不同楼栋 / 接口地址的同号房间互不影响"""
+        cache = FetchCache(tmp_path)
+        cache.put("101", KEY, _result())
+        assert cache.get("101", (*KEY[:3], "other", "101")) is None
+
+    def test_refresh_skips_read(self, tmp_path):
+        """测试 refresh 时不读取但仍写入"""
+        FetchCache(tmp_path).put("101", KEY, _result(power=1))
+        refreshing = FetchCache(tmp_path, refresh=True)
+        assert refreshing.get("101", KEY) is None
+
+        refreshing.put("101", KEY, _result(power=2))
+        assert FetchCache(tmp_path).get("101", KEY).power == 2
+
+    def test_failures_not_cached(self, tmp_path):
+        """测试失败结果不写入"""
+        cache = FetchCache(tmp_path)
+        cache.put("101", KEY, _result(success=False))
+        assert cache.get("101", KEY) is None
+        assert list(tmp_path.iterdir()) == []
+
+    def test_corrupt_file(self, tmp_path):
+        """测试缓存文件损坏时视为未命中"""
+        cache = FetchCache(tmp_path)
+        cache.path_for("101", KEY).write_text('{"cached_at": "x"')
+        assert cache.get("101", KEY) is None
+        cache.path_for("101", KEY).write_text('{"cached_at": 1, "result": {}}')
+        assert cache.get("101", KEY) is None
+
+    def test_concurrent_writers(self, tmp_path):
+        """测试多个进程同时写入时读者不会读到写了一半的文件"""
+        FetchCache(tmp_path).put("101", KEY, _result())
+        ctx = multiprocessing.get_context("spawn")
+        procs = [
+            ctx.Process(target=_write_many, args=(str(tmp_path), 300)) for _ in range(2)
+        ]
+        for p in procs:
+            p.start()
+
+        reader = FetchCache(tmp_path, ttl_seconds=3600)
+        misses = 0
+        while any(p.is_alive() for p in procs):
+            misses += reader.get("101", KEY) is None
+        for p in procs:
+            p.join()
+            assert p.exitcode == 0
+
+        assert misses == 0
+        assert [p.name for p in tmp_path.iterdir()] == [
+            reader.path_for("101", KEY).name
+        ]
+
+
+class TestClientCache:
+    """测试客户端使用缓存"""
+
+    def test_second_invocation_served_from_cache(self, tmp_path):
+        """测试连续两次 fetch（模拟两个进程）只请求一次接口"""
+        with FakeECUSTServer(FakeServerOptions(rooms=1)) as server:
+            roomid = server.room_ids()[0]
+
+            def fetch(refresh: bool = False) -> FetchResult:
+                return ElectricityClient(
+                    sysid="1",
+                    roomid=roomid,
+                    areaid="2",
+                    buildid="3",
+                    base_url=server.url,
+                    cache=FetchCache(tmp_path, refresh=refresh),
+                ).fetch()
+
+            before = FETCH_CACHE_HITS.value(room=roomid)
+            first = fetch()
+            second = fetch()
+            assert not first.from_cache
+            assert second.from_cache
+            assert second.power == first.power
+            assert second.timestamp == first.timestamp
+            assert server.requests_served == 1
+            assert FETCH_CACHE_HITS.value(room=roomid) == before + 1
+
+            third = fetch(refresh=True)
+            assert not third.from_cache
+            assert server.requests_served == 2
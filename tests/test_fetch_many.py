@@ -0,0 +1,201 @@
+"""测试批量查询与请求合并"""
+
+import threading
+
+import pytest
+
+from ecust_electricity_monitor.bench.fake_server import (
+    FakeECUSTServer,
+    FakeServerOptions,
+)
+from ecust_electricity_monitor.client import ElectricityClient
+from ecust_electricity_monitor.coalesce import RequestCoalescer
+from ecust_electricity_monitor.metrics import FETCH_COALESCED
+from ecust_electricity_monitor.models import FetchResult, RoomQuery
+
+
+class FakeClock:
+    """可手动推进的时钟"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _result(power: float = 10.0) -> FetchResult:
+    return FetchResult(power=power, timestamp="2026-01-01T00:00:00")
+
+
+def _client(server: FakeECUSTServer, **kwargs) -> ElectricityClient:
+    return ElectricityClient(
+        sysid="1",
+        roomid=server.room_ids()[0],
+        areaid="2",
+        buildid="3",
+        base_url=server.url,
+        backoff_factor=0,
+        **kwargs,
+    )
+
+
+class TestRequestCoalescer:
+    """测试请求合并器"""
+
+    def test_in_flight_requests_share_result(self):
+        """测试进行中的相同请求只执行一次"""
+        coalescer = RequestCoalescer(ttl_seconds=0)
+        started = threading.Event()
+        release = threading.Event()
+        calls = 0
+
+        def slow_fetch():
+            nonlocal calls
+            calls += 1
+            started.set()
+            release.wait(2)
+            return _result()
+
+        results = []
+        owner = threading.Thread(
+            target=lambda: results.append(coalescer.run("room", slow_fetch))
+        )
+        owner.start()
+        started.wait(2)
+
+        before = FETCH_COALESCED.value(room="r1")
+        waiters = [
+            threading.Thread(
+                target=lambda: results.append(
+                    coalescer.run("room", slow_fetch, room="r1")
+                )
+            )
+            for _ in range(3)
+        ]
+        for t in waiters:
+            t.start()
+        release.set()
+        for t in [owner, *waiters]:
+            t.join()
+
+        assert calls == 1
+        assert len(results) == 4
+        assert all(r is results[0] for r in results)
+        assert FETCH_COALESCED.value(room="r1") == before + 3
+
+        # TTL 为 0：完成后不复用
+        coalescer.run("room", slow_fetch)
+        assert calls == 2
+
+    def test_ttl(self):
+        """测试成功结果在 TTL 内复用，过期后重新请求"""
+        clock = FakeClock()
+        coalescer = RequestCoalescer(ttl_seconds=30, clock=clock)
+        calls = 0
+
+        def fetch():
+            nonlocal calls
+            calls += 1
+            return _result(calls)
+
+        assert coalescer.run("a", fetch).power == 1
+        clock.now = 29
+        assert coalescer.run("a", fetch).power == 1
+        assert coalescer.run("b", fetch).power == 2
+
+        clock.now = 30
+        assert coalescer.run("a", fetch).power == 3
+
+        coalescer.clear()
+        assert coalescer.run("a", fetch).power == 4
+
+    def test_failures_are_not_cached(self):
+        """测试失败不缓存"""
+        coalescer = RequestCoalescer(ttl_seconds=30)
+
+        def broken():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            coalescer.run("a", broken)
+        assert coalescer.run("a", _result).power == 10
+
+
+class TestFetchMany:
+    """测试批量查询"""
+
+    def test_results_per_room(self):
+        """测试按输入顺序返回每个房间的结果（含耗时），重复房间只查一次"""
+        options = FakeServerOptions(rooms=6)
+        with FakeECUSTServer(options) as server:
+            ids = server.room_ids()
+            rooms = [
+                RoomQuery(roomid=roomid, areaid="1", buildid=str(i % 2))
+                for i, roomid in enumerate(ids)
+            ]
+            results = _client(server).fetch_many([*rooms, rooms[0]])
+
+            assert list(results) == rooms
+            assert server.requests_served == len(ids)
+            for room, result in results.items():
+                assert result.success
+                assert result.elapsed_seconds is not None
+                assert result.elapsed_seconds > 0
+                expected = server.power_at(room.roomid, result.timestamp)
+                assert result.power == pytest.approx(expected, abs=0.05)
+
+    def test_session_reused_per_building(self):
+        """测试同一楼栋的房间复用连接"""
+        with FakeECUSTServer(FakeServerOptions(rooms=10)) as server:
+            rooms = [
+                RoomQuery(roomid=roomid, areaid="1", buildid="1")
+                for roomid in server.room_ids()
+            ]
+            _client(server).fetch_many(rooms)
+            assert server.requests_served == 10
+            assert server.connections_accepted == 1
+
+    def test_failures_do_not_abort_batch(self):
+        """测试单个房间失败时返回失败结果，其他房间不受影响"""
+        with FakeECUSTServer(FakeServerOptions(rooms=2)) as server:
+            rooms = [
+                RoomQuery(roomid=roomid, areaid="1", buildid="1")
+                for roomid in [*server.room_ids(), "1"]
+            ]
+            results = _client(server, max_retries=0).fetch_many(rooms)
+
+        *found, missing = rooms
+        assert results[missing].success is False
+        assert "roomdef" in results[missing].error_message
+        assert results[missing].elapsed_seconds is not None
+        assert all(results[room].success for room in found)
+
+    def test_same_roomid_in_different_buildings(self):
+        """测试不同楼栋的相同 roomid 分别查询、分别返回"""
+        with FakeECUSTServer(FakeServerOptions(rooms=1)) as server:
+            roomid = server.room_ids()[0]
+            rooms = [
+                RoomQuery(roomid=roomid, areaid="1", buildid=buildid)
+                for buildid in ["1", "2"]
+            ]
+            results = _client(server).fetch_many(rooms)
+
+            assert list(results) == rooms
+            assert server.requests_served == 2
+
+    def test_coalesced_across_clients(self):
+        """测试共享合并器的多个客户端在 TTL 内只请求一次"""
+        coalescer = RequestCoalescer(ttl_seconds=30)
+        with FakeECUSTServer(FakeServerOptions(rooms=3)) as server:
+            rooms = [
+                RoomQuery(roomid=roomid, areaid="2", buildid="3")
+                for roomid in server.room_ids()
+            ]
+            first = _client(server, coalescer=coalescer)
+            second = _client(server, coalescer=coalescer)
+
+            first.fetch_many(rooms)
+            second.fetch_many(rooms)
+            second.fetch()
+            assert server.requests_served == 3
@@ -0,0 +1,116 @@
+"""测试指标导出"""
+
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+import pytest
+
+from ecust_electricity_monitor.health import HealthMonitor
+from ecust_electricity_monitor.metrics import (
+    CONSECUTIVE_FAILURES,
+    HEALTHY,
+    STORAGE_WRITE_TIME,
+    MetricsRegistry,
+    serve_metrics,
+)
+from ecust_electricity_monitor.models import ElectricityRecord
+from ecust_electricity_monitor.storage import CSVRepository
+
+
+@pytest.fixture
+def registry():
+    """独立的指标注册表"""
+    return MetricsRegistry()
+
+
+class TestMetricsRegistry:
+    """测试指标注册表"""
+
+    def test_counter_and_gauge_render(self, registry):
+        """测试计数器与仪表的文本格式"""
+        attempts = registry.counter("emon_attempts_total", "请求次数", ("room",))
+        power = registry.gauge("emon_power_kwh", "剩余电量", ("room",))
+        attempts.inc(room="101")
+        attempts.inc(2, room="101")
+        power.set(42.5, room='a"b')
+
+        text = registry.render()
+        assert "# TYPE emon_attempts_total counter" in text
+        assert 'emon_attempts_total{room="101"} 3' in text
+        assert 'emon_power_kwh{room="a\\"b"} 42.5' in text
+        assert attempts.value(room="101") == 3
+
+    def test_histogram_buckets_are_cumulative(self, registry):
+        """测试直方图分桶累计计数"""
+        latency = registry.histogram("emon_latency_seconds", "耗时", buckets=(0.1, 1))
+        for value in (0.05, 0.5, 2):
+            latency.observe(value)
+
+        text = registry.render()
+        assert 'emon_latency_seconds_bucket{le="0.1"} 1' in text
+        assert 'emon_latency_seconds_bucket{le="1"} 2' in text
+        assert 'emon_latency_seconds_bucket{le="+Inf"} 3' in text
+        assert "emon_latency_seconds_sum 2.55" in text
+        assert "emon_latency_seconds_count 3" in text
+
+    def test_label_mismatch(self, registry):
+        """测试标签不匹配与重复注册"""
+        counter = registry.counter("emon_x_total", "x", ("room",))
+        with pytest.raises(ValueError):
+            counter.inc(building="1")
+        with pytest.raises(ValueError):
+            counter.inc(-1, room="1")
+        with pytest.raises(ValueError):
+            registry.gauge("emon_x_total", "重复")
+
+    def test_textfile(self, registry, tmp_path):
+        """测试写入 node-exporter textfile"""
+        registry.gauge("emon_up", "在线").set(1)
+        path = tmp_path / "textfile" / "emon.prom"
+
+        registry.write_textfile(path)
+
+        assert path.read_text(encoding="utf-8").endswith("emon_up 1\n")
+        assert [p.name for p in path.parent.iterdir()] == ["emon.prom"]
+
+    def test_http_endpoint(self, registry):
+        """测试 /metrics HTTP 端点"""
+        registry.counter("emon_hits_total", "命中").inc()
+        server = serve_metrics(registry, port=0)
+        base = f"http://127.0.0.1:{server.server_port}"
+        try:
+            with urllib.request.urlopen(f"{base}/metrics", timeout=5) as response:
+                body = response.read().decode("utf-8")
+                assert response.headers["Content-Type"].startswith("text/plain")
+            assert "emon_hits_total 1" in body
+
+            with pytest.raises(urllib.error.HTTPError):
+                urllib.request.urlopen(f"{base}/other", timeout=5)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+class TestInstrumentation:
+    """测试组件埋点"""
+
+    def test_health_monitor_gauges(self):
+        """测试健康监控同步到指标"""
+        monitor = HealthMonitor(max_consecutive_failures=2)
+        monitor.record_failure()
+        monitor.record_failure()
+        assert HEALTHY.value() == 0
+        assert CONSECUTIVE_FAILURES.value() == 2
+
+        monitor.record_success()
+        assert HEALTHY.value() == 1
+        assert CONSECUTIVE_FAILURES.value() == 0
+
+    def test_storage_write_time(self, test_csv_path):
+        """测试保存记录时记录写入耗时"""
+        before = STORAGE_WRITE_TIME.count()
+        CSVRepository(test_csv_path).save(
+            ElectricityRecord(timestamp=datetime(2026, 1, 1), power=100.0)
+        )
+        assert STORAGE_WRITE_TIME.count() == before + 1
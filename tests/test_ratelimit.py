@@ -0,0 +1,261 @@
+"""测试限流器"""
+
+import asyncio
+import multiprocessing
+import threading
+import time
+
+import pytest
+
+from ecust_electricity_monitor import timing
+from ecust_electricity_monitor.bench.fake_server import (
+    FakeECUSTServer,
+    FakeServerOptions,
+)
+from ecust_electricity_monitor.client import ElectricityClient
+from ecust_electricity_monitor.exceptions import ClientError
+from ecust_electricity_monitor.metrics import RATE_LIMIT_WAIT
+from ecust_electricity_monitor.ratelimit import RateLimiter, available_file_lock
+
+needs_flock = pytest.mark.skipif(
+    not available_file_lock(), reason="当前平台不支持 fcntl.flock"
+)
+
+
+class FakeClock:
+    """可手动推进的时钟（sleep 只记录等待时间，不推进）"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.slept.append(seconds)
+
+
+def _limiter(clock: FakeClock, **kwargs) -> RateLimiter:
+    return RateLimiter(clock=clock, sleep=clock.sleep, **kwargs)
+
+
+def _acquire_many(state_file: str, count: int) -> None:
+    """子进程：通过共享状态文件连续获取许可"""
+    limiter = RateLimiter(rate=50, burst=1, state_file=state_file)
+    for _ in range(count):
+        with limiter.acquire():
+            pass
+
+
+class TestTokenBucket:
+    """测试令牌桶"""
+
+    def test_burst_then_queue(self):
+        """测试突发额度用完后按预约顺序排队"""
+        clock = FakeClock()
+        limiter = _limiter(clock, rate=10, burst=2)
+        for _ in range(4):
+            with limiter.acquire():
+                pass
+        assert clock.slept == pytest.approx([0.1, 0.2])
+
+    def test_refill(self):
+        """测试令牌按速率补充且不超过容量"""
+        clock = FakeClock()
+        limiter = _limiter(clock, rate=10, burst=2)
+        for _ in range(2):
+            with limiter.acquire():
+                pass
+
+        clock.now += 60
+        for _ in range(2):
+            with limiter.acquire():
+                pass
+        assert clock.slept == []
+
+        with limiter.acquire():
+            pass
+        assert clock.slept == pytest.approx([0.1])
+
+    def test_unlimited(self):
+        """测试未配置时不等待"""
+        clock = FakeClock()
+        limiter = _limiter(clock)
+        assert not limiter.enabled
+        for _ in range(100):
+            with limiter.acquire() as waited:
+                assert waited < 0.05
+        assert clock.slept == []
+
+    def test_wait_metric(self):
+        """测试排队时间写入直方图"""
+        before = RATE_LIMIT_WAIT.count()
+        limiter = RateLimiter(rate=1000, burst=1)
+        for _ in range(3):
+            with limiter.acquire():
+                pass
+        assert RATE_LIMIT_WAIT.count() == before + 3
+
+
+class TestConcurrency:
+    """测试并发上限"""
+
+    def _peak(self, limiter: RateLimiter, workers: int) -> int:
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def work():
+            nonlocal active, peak
+            with limiter.acquire():
+                with lock:
+                    active += 1
+                    peak = max(peak, active)
+                time.sleep(0.02)
+                with lock:
+                    active -= 1
+
+        threads = [threading.Thread(target=work) for _ in range(workers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return peak
+
+    def test_in_process(self):
+        """测试进程内并发不超过上限"""
+        assert self._peak(RateLimiter(max_concurrency=2), workers=8) == 2
+
+    @needs_flock
+    def test_shared_slots(self, tmp_path):
+        """测试两个共享状态文件的限流器共用并发槽位"""
+        state_file = tmp_path / "ratelimit.state"
+        first = RateLimiter(max_concurrency=1, state_file=state_file)
+        second = RateLimiter(max_concurrency=1, state_file=state_file)
+
+        acquired = threading.Event()
+
+        def wait_for_slot():
+            with second.acquire():
+                acquired.set()
+
+        with first.acquire():
+            thread = threading.Thread(target=wait_for_slot)
+            thread.start()
+            assert not acquired.wait(0.1)
+        assert acquired.wait(2)
+        thread.join()
+
+
+@needs_flock
+class TestSharedState:
+    """测试跨进程共享令牌桶"""
+
+    def test_shared_bucket(self, tmp_path):
+        """测试两个实例共享同一个令牌桶"""
+        clock = FakeClock()
+        state_file = tmp_path / "ratelimit.state"
+        first = _limiter(clock, rate=10, burst=1, state_file=state_file)
+        second = _limiter(clock, rate=10, burst=1, state_file=state_file)
+
+        with first.acquire():
+            pass
+        with second.acquire():
+            pass
+        with first.acquire():
+            pass
+        assert clock.slept == pytest.approx([0.1, 0.2])
+
+    def test_corrupt_state_file(self, tmp_path):
+        """测试状态文件损坏时按满桶处理"""
+        clock = FakeClock()
+        state_file = tmp_path / "ratelimit.state"
+        state_file.write_text("not json")
+        with _limiter(clock, rate=10, state_file=state_file).acquire():
+            pass
+        assert clock.slept == []
+
+    def test_across_processes(self, tmp_path):
+        """测试多个进程合计不超过速率"""
+        state_file = str(tmp_path / "ratelimit.state")
+        ctx = multiprocessing.get_context("spawn")
+        start = time.perf_counter()
+        procs = [
+            ctx.Process(target=_acquire_many, args=(state_file, 10)) for _ in range(2)
+        ]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join(timeout=30)
+            assert p.exitcode == 0
+        # 20 个请求、速率 50/秒、突发 1：至少需要 19 / 50 秒
+        assert time.perf_counter() - start >= 19 / 50
+
+
+class TestAsync:
+    """测试异步接口"""
+
+    def test_acquire_async(self):
+        """测试异步获取按速率排队且遵守并发上限"""
+        limiter = RateLimiter(rate=20, burst=1, max_concurrency=1)
+        active = 0
+        peak = 0
+
+        async def work():
+            nonlocal active, peak
+            async with limiter.acquire_async():
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+
+        async def main():
+            await asyncio.gather(*(work() for _ in range(3)))
+
+        start = time.perf_counter()
+        timing.reset()
+        timing.enable()
+        try:
+            asyncio.run(main())
+            stages = {s.name: s for s in timing.snapshot()}
+        finally:
+            timing.disable()
+            timing.reset()
+        assert time.perf_counter() - start >= 0.1 * 0.9
+        assert peak == 1
+        # 与 acquire() 一样计入 ratelimit.wait 阶段
+        assert stages["ratelimit.wait"].calls == 3
+
+
+class TestClientRateLimit:
+    """测试客户端经过限流器"""
+
+    def test_every_attempt_is_limited(self):
+        """测试每次尝试（含重试）都经过限流器"""
+        limiter = RateLimiter(rate=1000, burst=10, max_concurrency=1)
+        before = RATE_LIMIT_WAIT.count()
+        with FakeECUSTServer(FakeServerOptions(rooms=1)) as server:
+            ok = ElectricityClient(
+                sysid="1",
+                roomid=server.room_ids()[0],
+                areaid="2",
+                buildid="3",
+                base_url=server.url,
+                limiter=limiter,
+            )
+            assert ok.fetch().success
+
+            bad = ElectricityClient(
+                sysid="1",
+                roomid="1",
+                areaid="2",
+                buildid="3",
+                base_url=server.url,
+                max_retries=2,
+                backoff_factor=0,
+                limiter=limiter,
+            )
+            with pytest.raises(ClientError):
+                bad.fetch()
+        assert RATE_LIMIT_WAIT.count() == before + 4
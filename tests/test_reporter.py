@@ -0,0 +1,193 @@
+"""测试报告生成"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from jinja2 import FileSystemLoader
+
+from ecust_electricity_monitor.analytics import PowerAnalyzer
+from ecust_electricity_monitor.bench import generate_history
+from ecust_electricity_monitor.exceptions import StorageError
+from ecust_electricity_monitor.models import ElectricityRecord, ReportData
+from ecust_electricity_monitor.report_builder import (
+    RoomReportJob,
+    build_all_room_reports,
+    write_index,
+)
+from ecust_electricity_monitor.report_cache import ReportCache
+from ecust_electricity_monitor.reporter import (
+    ASSETS_DIR,
+    HTMLReporter,
+    _plotlyjs_bundle,
+    ensure_plotlyjs_asset,
+    plotlyjs_asset_ref,
+)
+from ecust_electricity_monitor.storage import CSVRepository
+
+
+class TestHTMLReporter:
+    """测试 HTML 报告生成器"""
+
+    def test_charts_downsampled(self, tmp_path):
+        """测试大数据量时曲线被降采样并使用 WebGL"""
+        records = generate_history(5000, interval_minutes=10)
+        reporter = HTMLReporter(tmp_path, max_points=500, webgl_threshold=100)
+
+        fig = reporter._create_charts(ReportData(records=records))
+        traces = {t.name: t for t in fig.data}
+
+        assert len(traces["剩余电量"].x) == 500
+        assert traces["剩余电量"].type == "scattergl"
+        assert "电量范围" in traces
+        assert sum(traces["电量分布"].y) == 5000
+
+    def test_shared_plotlyjs_asset(self, tmp_path):
+        """测试共享 plotly.js 只写入一次并被引用"""
+        ref = ensure_plotlyjs_asset(tmp_path)
+        asset = tmp_path / ref
+        assert ref.startswith(f"{ASSETS_DIR}/plotly-")
+        assert asset.stat().st_size > 0
+
+        mtime = asset.stat().st_mtime_ns
+        assert ensure_plotlyjs_asset(tmp_path) == ref
+        assert asset.stat().st_mtime_ns == mtime
+
+        reporter = HTMLReporter(tmp_path, plotlyjs="shared")
+        assert reporter._plotlyjs_include() == ref == plotlyjs_asset_ref()
+
+    def test_generate(self, tmp_path):
+        """测试生成完整报告页面（统计信息与图表）"""
+        records = generate_history(500, interval_minutes=30)
+        data = ReportData(
+            records=records,
+            statistics=PowerAnalyzer(records).get_statistics(),
+            metadata={"threshold": "10", "analysis_period": "7"},
+        )
+
+        path = HTMLReporter(tmp_path).generate(data, filename="report.html")
+
+        html = path.read_text(encoding="utf-8")
+        assert "电量监控报告" in html
+        assert f"{records[0].power:.2f}" in html
+        assert "最近 7 天" in html
+        assert "cdn.plot.ly" in html
+        assert not (tmp_path / ASSETS_DIR).exists()
+
+    def test_generate_plotlyjs_modes(self, tmp_path):
+        """测试 shared / inline 模式生成的页面，以及渲染失败时不写入 plotly.js"""
+        data = ReportData(records=generate_history(200))
+
+        shared = HTMLReporter(tmp_path / "shared", plotlyjs="shared")
+        html = shared.generate(data, filename="r.html").read_text(encoding="utf-8")
+        ref = plotlyjs_asset_ref()
+        assert f'src="{ref}"' in html
+        assert (tmp_path / "shared" / ref).is_file()
+
+        inline = HTMLReporter(tmp_path / "inline", plotlyjs="inline")
+        html = inline.generate(data, filename="r.html").read_text(encoding="utf-8")
+        assert len(html) > len(_plotlyjs_bundle()[0])
+        assert not (tmp_path / "inline" / ASSETS_DIR).exists()
+
+        broken = HTMLReporter(tmp_path / "broken", plotlyjs="shared")
+        broken.template_dir = tmp_path / "missing"
+        broken.jinja_env.loader = FileSystemLoader(broken.template_dir)
+        with pytest.raises(StorageError):
+            broken.generate(data, filename="r.html")
+        assert not (tmp_path / "broken" / ASSETS_DIR).exists()
+
+    def test_input_fingerprint(self, tmp_path):
+        """测试指纹随数据和阈值变化"""
+        records = generate_history(100)
+        reporter = HTMLReporter(tmp_path)
+        base = reporter.input_fingerprint(
+            ReportData(records=records, metadata={"threshold": "10"})
+        )
+
+        assert base == reporter.input_fingerprint(
+            ReportData(records=list(records), metadata={"threshold": "10"})
+        )
+        assert base != reporter.input_fingerprint(
+            ReportData(records=records, metadata={"threshold": "20"})
+        )
+        newer = ElectricityRecord(
+            timestamp=records[0].timestamp + timedelta(hours=1), power=1.0
+        )
+        assert base != reporter.input_fingerprint(
+            ReportData(records=[newer, *records], metadata={"threshold": "10"})
+        )
+
+        cache = ReportCache(tmp_path)
+        report = tmp_path / "weekly.html"
+        report.write_text("<html></html>", encoding="utf-8")
+        cache.record(report, base)
+        assert cache.find_report(base, "weekly.html") == report
+        assert cache.find_report(base) == report
+        assert cache.find_report("other", "weekly.html") is None
+
+    def test_fragments_reused_by_day(self, tmp_path):
+        """测试按天图表片段只重新计算变化的日期"""
+        records = generate_history(
+            2000, interval_minutes=10, end_time=datetime(2026, 3, 10, 12)
+        )
+        cache = ReportCache(tmp_path)
+        reporter = HTMLReporter(tmp_path, max_points=300, cache=cache)
+
+        reporter._create_charts(ReportData(records=records))
+        first = cache.load_fragments()
+        assert len(first) > 1
+
+        newer = ElectricityRecord(
+            timestamp=records[0].timestamp + timedelta(minutes=1),
+            power=records[0].power,
+        )
+        fig = reporter._create_charts(ReportData(records=[newer, *records]))
+        second = cache.load_fragments()
+
+        last_day = max(second)
+        assert second[last_day] != first[last_day]
+        assert all(second[day] == first[day] for day in first if day != last_day)
+
+        trend = next(t for t in fig.data if t.name == "剩余电量")
+        assert len(trend.x) <= 300 + len(second) * 3
+
+
+class TestRoomReports:
+    """测试多房间报告"""
+
+    def test_all_rooms_index(self, tmp_path):
+        """测试并行生成多房间结果并按剩余天数排序写入索引页"""
+        jobs = []
+        for name, daily_kwh in [("A-101", 2.0), ("B-202", 8.0), ("C-303", 4.0)]:
+            csv_path = tmp_path / "data" / f"{name}.csv"
+            storage = CSVRepository(csv_path)
+            for record in reversed(
+                generate_history(200, daily_kwh=daily_kwh, recharge_below=0)
+            ):
+                storage.save(record)
+            jobs.append(
+                RoomReportJob(
+                    room=name,
+                    csv_path=csv_path,
+                    output_dir=tmp_path / "reports",
+                    days=30,
+                    threshold=10.0,
+                    rollup_after_days=31,
+                    reporter_options={"plotlyjs": "cdn"},
+                )
+            )
+        jobs.append(jobs[0]._replace(room="D-404", csv_path=tmp_path / "empty.csv"))
+
+        summaries = build_all_room_reports(jobs, max_workers=2)
+
+        assert [s.room for s in summaries] == ["B-202", "C-303", "A-101", "D-404"]
+        assert summaries[-1].error == "没有数据"
+        for summary in summaries[:-1]:
+            assert summary.error is None
+            assert (tmp_path / "reports" / summary.report_file).is_file()
+        assert all(s.elapsed_seconds > 0 for s in summaries)
+        assert len(summaries[0].sparkline) > 1
+
+        index = write_index(summaries, tmp_path / "reports", threshold=10.0)
+        html = index.read_text(encoding="utf-8")
+        assert html.index("B-202") < html.index("A-101")
+        assert "<polyline" in html
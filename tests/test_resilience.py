@@ -0,0 +1,257 @@
+"""测试熔断器与重试预算"""
+
+import pytest
+import typer
+
+from ecust_electricity_monitor.bench.fake_server import (
+    FakeECUSTServer,
+    FakeServerOptions,
+)
+from ecust_electricity_monitor.client import ElectricityClient
+from ecust_electricity_monitor.commands.base import shared_circuit_breaker
+from ecust_electricity_monitor.commands.fetch import fetch_command
+from ecust_electricity_monitor.config import RoomConfig, config
+from ecust_electricity_monitor.exceptions import CircuitOpenError, ClientError
+from ecust_electricity_monitor.health import HealthMonitor
+from ecust_electricity_monitor.metrics import CIRCUIT_STATE
+from ecust_electricity_monitor.resilience import CircuitBreaker, RetryBudget
+
+
+class FakeClock:
+    """可手动推进的时钟"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+class TestCircuitBreaker:
+    """测试熔断器状态机"""
+
+    def test_opens_after_threshold(self, clock):
+        """测试连续失败达到阈值后打开"""
+        breaker = CircuitBreaker(failure_threshold=3, clock=clock)
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.state == "closed"
+        assert breaker.allow_request()
+
+        breaker.record_failure()
+        assert breaker.state == "open"
+        assert not breaker.allow_request()
+        assert CIRCUIT_STATE.value() == 2
+
+    def test_success_resets_failures(self, clock):
+        """测试成功会重置连续失败计数"""
+        breaker = CircuitBreaker(failure_threshold=2, clock=clock)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == "closed"
+
+    def test_half_open_single_probe(self, clock):
+        """测试冷却后只放行一个探测请求"""
+        transitions = []
+        breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=60, clock=clock)
+        breaker.add_listener(lambda old, new: transitions.append((old, new)))
+        breaker.record_failure()
+
+        clock.now = 59
+        assert not breaker.allow_request()
+
+        clock.now = 60
+        assert breaker.allow_request()
+        assert breaker.state == "half_open"
+        assert not breaker.allow_request()
+
+        breaker.record_success()
+        assert breaker.state == "closed"
+        assert breaker.allow_request()
+        assert transitions == [
+            ("closed", "open"),
+            ("open", "half_open"),
+            ("half_open", "closed"),
+        ]
+
+    def test_failed_probe_reopens(self, clock):
+        """测试探测失败后重新打开并重新计时"""
+        breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=60, clock=clock)
+        breaker.record_failure()
+        clock.now = 60
+        assert breaker.allow_request()
+
+        breaker.record_failure()
+        assert breaker.state == "open"
+        clock.now = 100
+        assert not breaker.allow_request()
+        clock.now = 120
+        assert breaker.allow_request()
+
+
+class TestRetryBudget:
+    """测试重试预算"""
+
+    def test_exhaustion_and_refill(self):
+        """测试额度耗尽后需要新请求补充"""
+        budget = RetryBudget(ratio=0.5, burst=2)
+        assert budget.try_spend()
+        assert budget.try_spend()
+        assert not budget.try_spend()
+
+        budget.record_request()
+        assert not budget.try_spend()
+        budget.record_request()
+        assert budget.try_spend()
+
+    def test_capped_at_burst(self):
+        """测试额度不超过上限"""
+        budget = RetryBudget(ratio=1, burst=3)
+        for _ in range(10):
+            budget.record_request()
+        assert budget.available == 3
+
+
+class TestClientResilience:
+    """测试客户端与熔断器、重试预算的配合"""
+
+    def _client(self, server, roomid, **kwargs) -> ElectricityClient:
+        return ElectricityClient(
+            sysid="1",
+            roomid=roomid,
+            areaid="2",
+            buildid="3",
+            base_url=server.url,
+            backoff_factor=0,
+            **kwargs,
+        )
+
+    def test_fail_fast_when_open(self, clock):
+        """测试接口故障时熔断，之后不再发出请求"""
+        breaker = CircuitBreaker(failure_threshold=2, recovery_seconds=60, clock=clock)
+        health = HealthMonitor(max_consecutive_failures=5)
+        breaker.add_listener(health.on_breaker_state_change)
+
+        options = FakeServerOptions(rooms=3, error_rate=1.0)
+        with FakeECUSTServer(options) as server:
+            rooms = server.room_ids()
+            for roomid in rooms[:2]:
+                with pytest.raises(ClientError):
+                    self._client(server, roomid, max_retries=1, breaker=breaker).fetch()
+            assert breaker.state == "open"
+            served = server.requests_served
+
+            with pytest.raises(CircuitOpenError):
+                self._client(server, rooms[2], breaker=breaker).fetch()
+            assert server.requests_served == served
+
+            assert not health.is_healthy
+            assert health.status["breaker_state"] == "open"
+
+            # 冷却后探测请求只发一次
+            clock.now = 60
+            with pytest.raises(ClientError) as exc_info:
+                self._client(server, rooms[2], breaker=breaker).fetch()
+            assert exc_info.value.retry_count == 1
+            assert server.requests_served == served + 1
+            assert breaker.state == "open"
+
+    def test_probe_success_closes(self, clock):
+        """测试探测成功后恢复"""
+        breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=60, clock=clock)
+        breaker.record_failure()
+        clock.now = 60
+
+        with FakeECUSTServer(FakeServerOptions(rooms=1)) as server:
+            result = self._client(server, server.room_ids()[0], breaker=breaker).fetch()
+        assert result.success
+        assert breaker.state == "closed"
+
+    def test_unexpected_error_releases_probe(self, clock):
+        """测试探测请求因意外异常退出时释放探测资格，之后仍可恢复"""
+
+        class BrokenLimiter:
+            def acquire(self):
+                raise OSError("限流状态文件不可用")
+
+        breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=60, clock=clock)
+        breaker.record_failure()
+        clock.now = 60
+
+        with FakeECUSTServer(FakeServerOptions(rooms=1)) as server:
+            roomid = server.room_ids()[0]
+            with pytest.raises(OSError):
+                self._client(
+                    server, roomid, breaker=breaker, limiter=BrokenLimiter()
+                ).fetch()
+            assert breaker.state == "open"
+
+            clock.now = 120
+            result = self._client(server, roomid, breaker=breaker).fetch()
+        assert result.success
+        assert breaker.state == "closed"
+
+    def test_parse_errors_do_not_trip(self, clock):
+        """测试页面解析失败不计入熔断"""
+        breaker = CircuitBreaker(failure_threshold=1, clock=clock)
+        with (
+            FakeECUSTServer(FakeServerOptions(rooms=1)) as server,
+            pytest.raises(ClientError),
+        ):
+            self._client(server, "1", max_retries=0, breaker=breaker).fetch()
+        assert breaker.state == "closed"
+
+    def test_retry_budget_limits_retries(self):
+        """测试重试预算耗尽后不再重试"""
+        budget = RetryBudget(ratio=0, burst=1)
+        options = FakeServerOptions(rooms=1, error_rate=1.0)
+        with FakeECUSTServer(options) as server:
+            roomid = server.room_ids()[0]
+            with pytest.raises(ClientError) as exc_info:
+                self._client(server, roomid, max_retries=3, retry_budget=budget).fetch()
+            assert exc_info.value.retry_count == 2
+
+            with pytest.raises(ClientError) as exc_info:
+                self._client(server, roomid, max_retries=3, retry_budget=budget).fetch()
+            assert exc_info.value.retry_count == 1
+            assert server.requests_served == 3
+
+    def test_all_rooms_fail_fast_after_open(self, tmp_path, monkeypatch):
+        """测试 fetch --all-rooms 共享熔断器：熔断后其余房间不再发出请求"""
+        options = FakeServerOptions(rooms=6, error_rate=1.0)
+        with FakeECUSTServer(options) as server:
+            api = config.api.model_copy(
+                update={
+                    "sysid": "1",
+                    "roomid": server.room_ids()[0],
+                    "areaid": "2",
+                    "buildid": "3",
+                    "base_url": server.url,
+                    "max_retries": 0,
+                    "cache_ttl_seconds": 0,
+                    "breaker_failure_threshold": 2,
+                }
+            )
+            rooms = [
+                RoomConfig(name=f"R{i}", roomid=roomid)
+                for i, roomid in enumerate(server.room_ids())
+            ]
+            monkeypatch.setattr(config, "api", api)
+            monkeypatch.setattr(config, "rooms", rooms)
+            monkeypatch.setattr(config.storage, "data_dir", str(tmp_path))
+            shared_circuit_breaker.cache_clear()
+            try:
+                with pytest.raises(typer.Exit):
+                    fetch_command(save=False, all_rooms=True)
+                assert shared_circuit_breaker().state == "open"
+            finally:
+                shared_circuit_breaker.cache_clear()
+
+            # 只有熔断前的两个房间发出了请求
+            assert server.requests_served == 2
@@ -0,0 +1,244 @@
+"""测试多房间存储"""
+
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timedelta
+
+import pytest
+
+from ecust_electricity_monitor.bench.fake_server import FakeECUSTServer
+from ecust_electricity_monitor.commands.base import (
+    shared_circuit_breaker,
+    update_room_database,
+)
+from ecust_electricity_monitor.commands.fetch import fetch_command
+from ecust_electricity_monitor.config import RoomConfig, config
+from ecust_electricity_monitor.exceptions import StorageError
+from ecust_electricity_monitor.models import ElectricityRecord, RoomSnapshot
+from ecust_electricity_monitor.storage import CSVRepository, SQLiteRoomRepository
+
+START = datetime(2026, 3, 1)
+
+
+def _records(count, power=50.0):
+    return [
+        ElectricityRecord(timestamp=START + timedelta(hours=i), power=power - i)
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def repository(test_data_dir):
+    return SQLiteRoomRepository(test_data_dir / "rooms.db")
+
+
+class TestSQLiteRoomRepository:
+    """测试 SQLite 多房间存储"""
+
+    def test_save_and_find(self, repository):
+        """测试按房间保存、查询（降序、时间过滤、数量限制）"""
+        repository.save_many("A101", _records(5))
+        repository.save("B202", ElectricityRecord(timestamp=START, power=10))
+
+        records = repository.find_all("A101")
+        assert [r.power for r in records] == [46, 47, 48, 49, 50]
+        assert repository.find_all("A101", limit=2) == records[:2]
+        assert [
+            r.power
+            for r in repository.find_all(
+                "A101",
+                START + timedelta(hours=1, microseconds=1),
+                START + timedelta(hours=3, microseconds=999),
+            )
+        ] == [47, 48]
+        assert repository.find_all("C303") == []
+
+        assert repository.find_latest("A101") == records[0]
+        assert repository.find_latest("C303") is None
+        assert repository.rooms() == ["A101", "B202"]
+        assert repository.count() == 6
+        assert repository.count("A101") == 5
+
+    def test_find_latest_per_room(self, repository):
+        """测试每个房间的最新记录（与写入顺序无关）"""
+        repository.save_many("B202", _records(3, power=30))
+        repository.save_many("A101", list(reversed(_records(4))))
+
+        latest = repository.find_latest_per_room()
+        assert list(latest) == ["A101", "B202"]
+        assert latest["A101"].timestamp == START + timedelta(hours=3)
+        assert latest["A101"].power == 47
+        assert latest["B202"].power == 28
+
+    def test_same_second_upsert_and_merge(self, repository):
+        """测试同一秒的记录：save 覆盖，merge 保留已有记录"""
+        repository.save("A101", ElectricityRecord(timestamp=START, power=50))
+        repository.save(
+            "A101",
+            ElectricityRecord(
+                timestamp=START.replace(microsecond=500), power=49, alert_sent=True
+            ),
+        )
+        assert repository.find_all("A101") == [
+            ElectricityRecord(timestamp=START, power=49, alert_sent=True)
+        ]
+
+        added = repository.merge("A101", _records(3, power=10))
+        assert added == 2
+        assert repository.find_latest("A101").power == 8
+        assert repository.find_all("A101")[-1].power == 49
+
+    def test_delete_before(self, repository):
+        """测试按时间删除（单个房间、全部房间）"""
+        repository.save_many("A101", _records(5))
+        repository.save_many("B202", _records(5))
+
+        assert repository.delete_before(START + timedelta(hours=2), "A101") == 2
+        assert repository.count("A101") == 3
+        assert repository.count("B202") == 5
+
+        assert repository.delete_before(START + timedelta(hours=3)) == 4
+        assert repository.count() == 4
+
+    def test_sync_room_from_csv(self, repository, test_data_dir):
+        """测试房间第一次写入时由 CSV 补入历史，之后不再重复补入"""
+        storage = CSVRepository(test_data_dir / "A101.csv")
+        storage.save_many(_records(3))
+
+        assert not repository.has_room("A101")
+        assert repository.sync_room("A101", storage) == 3
+        assert repository.has_room("A101")
+
+        storage.save(ElectricityRecord(timestamp=START + timedelta(hours=3), power=40))
+        assert repository.sync_room("A101", storage) == 0
+        assert repository.count("A101") == 3
+        assert repository.find_snapshots()[0].daily_consumption == pytest.approx(24.0)
+
+    def test_persistence_and_schema_version(self, test_data_dir):
+        """测试重新打开后数据仍在；结构版本过高时报错"""
+        path = test_data_dir / "rooms.db"
+        SQLiteRoomRepository(path).save_many("A101", _records(2))
+        assert SQLiteRoomRepository(path).count() == 2
+
+        with closing(sqlite3.connect(path)) as conn:
+            conn.execute("PRAGMA user_version = 99")
+        with pytest.raises(StorageError):
+            SQLiteRoomRepository(path)
+
+
+class TestRoomSnapshots:
+    """测试每个房间的最新读数快照"""
+
+    def test_incremental_matches_rebuild(self, repository):
+        """测试逐条保存增量更新的快照与由全部历史重建的一致"""
+        for record in _records(48):
+            repository.save("A101", record)
+        repository.save_many("B202", _records(3, power=5))
+
+        snapshots = repository.find_snapshots()
+        assert [s.room for s in snapshots] == ["A101", "B202"]
+        a101 = snapshots[0]
+        assert a101.record == repository.find_latest("A101")
+        assert a101.daily_consumption == pytest.approx(24.0)
+        assert a101.days_remaining == 0
+        assert repository.find_latest_per_room()["B202"].power == 3
+
+        # 删除记录后快照由剩余历史重建
+        rebuilt = SQLiteRoomRepository(repository.db_path.with_name("rebuilt.db"))
+        rebuilt.save(
+            "A101", ElectricityRecord(timestamp=START - timedelta(hours=1), power=60)
+        )
+        rebuilt.save_many("A101", _records(48))
+        rebuilt.save_many("B202", _records(3, power=5))
+        assert rebuilt.delete_before(START, "A101") == 1
+        assert rebuilt.find_snapshots() == snapshots
+
+    def test_out_of_order_and_delete(self, repository):
+        """测试补写更早的记录、同一秒覆盖、删除后快照保持正确"""
+        records = _records(5)
+        repository.save_many("A101", records[2:])
+        repository.save("A101", records[0])
+        assert repository.find_snapshots()[0].power == 46
+
+        repository.save("A101", records[4].model_copy(update={"power": 40}))
+        assert repository.find_snapshots()[0].power == 40
+
+        repository.merge("A101", [records[1]])
+        assert repository.find_snapshots()[0].power == 40
+
+        repository.delete_before(START + timedelta(hours=10))
+        assert repository.find_snapshots() == []
+        assert repository.rooms() == []
+
+    def test_urgency_order(self):
+        """测试紧迫程度排序：剩余天数升序，无法估算的排在后面，再按电量"""
+        snapshots = [
+            RoomSnapshot(room=room, timestamp=START, power=power, days_remaining=days)
+            for room, power, days in [
+                ("A", 5, None),
+                ("B", 30, 3),
+                ("C", 20, 3),
+                ("D", 80, 10),
+                ("E", 1, None),
+            ]
+        ]
+        snapshots.sort(key=lambda s: s.urgency)
+        assert [s.room for s in snapshots] == ["C", "B", "D", "E", "A"]
+
+
+class TestUpdateRoomDatabase:
+    """测试命令写入多房间数据库"""
+
+    def test_sync_then_save(self, repository, test_data_dir, monkeypatch):
+        """测试第一次写入只由 CSV 补入历史，之后才单独写入新读数"""
+        saved = []
+        save = repository.save
+
+        def recording_save(room_id, record):
+            saved.append(record)
+            save(room_id, record)
+
+        monkeypatch.setattr(repository, "save", recording_save)
+        storage = CSVRepository(test_data_dir / "A101.csv")
+        storage.save_many(_records(3))
+
+        update_room_database(repository, "A101", storage, _records(3)[-1])
+        assert saved == []
+        assert repository.count("A101") == 3
+
+        record = ElectricityRecord(timestamp=START + timedelta(hours=3), power=40)
+        storage.save(record)
+        update_room_database(repository, "A101", storage, record)
+        assert saved == [record]
+        assert repository.find_latest("A101") == record
+
+    @pytest.mark.parametrize("multi_room", [False, True])
+    def test_single_room_fetch(self, multi_room, tmp_path, monkeypatch):
+        """测试单房间 fetch 只在配置了 [[rooms]] 时写入多房间数据库"""
+        with FakeECUSTServer() as server:
+            roomid = server.room_ids()[0]
+            api = config.api.model_copy(
+                update={
+                    "sysid": "1",
+                    "roomid": roomid,
+                    "areaid": "2",
+                    "buildid": "3",
+                    "base_url": server.url,
+                    "cache_ttl_seconds": 0,
+                }
+            )
+            rooms = [RoomConfig(name="A101", roomid=roomid)] if multi_room else []
+            monkeypatch.setattr(config, "api", api)
+            monkeypatch.setattr(config, "rooms", rooms)
+            monkeypatch.setattr(config.storage, "data_dir", str(tmp_path))
+            shared_circuit_breaker.cache_clear()
+            try:
+                fetch_command(save=True)
+            finally:
+                shared_circuit_breaker.cache_clear()
+
+        assert config.storage.csv_path.exists()
+        db_path = config.storage.rooms_db_path
+        assert db_path.exists() == multi_room
+        if multi_room:
+            assert SQLiteRoomRepository(db_path).count("A101") == 1
@@ -0,0 +1,140 @@
+"""测试 CSV 快速扫描"""
+
+import pickle
+from datetime import datetime, timedelta
+
+import pytest
+
+from ecust_electricity_monitor.bench import generate_history
+from ecust_electricity_monitor.exceptions import StorageError
+from ecust_electricity_monitor.models import ElectricityRecord
+from ecust_electricity_monitor.storage import CSVRepository
+from ecust_electricity_monitor.storage.parallel import load_columns, split_ranges
+from ecust_electricity_monitor.storage.scanner import scan_columns, scan_rows
+
+MESSY_CSV = (
+    "timestamp,power,alert_sent\r\n"
+    "2026-03-01 08:00:00,50.0,False\r\n"
+    "\r\n"
+    "2026-03-01 09:00:00,49.456,True\r\n"
+    "2026-03-01 10:00:00,not-a-number,False\r\n"
+    "2026-03-01 11:00,48.0,False\r\n"
+    "2026-03-01 12:00:00,-5,False\r\n"
+    "2026-03-01 13:00:00,47.0\r\n"
+    "2026-03-01 14:00:00,46.0,false"
+)
+
+
+def _rows(records):
+    return [(r.timestamp, r.power, r.alert_sent) for r in records]
+
+
+class TestScanner:
+    """测试扫描结果与 iter_records() 一致"""
+
+    def test_matches_iter_records(self, test_csv_path):
+        """测试正常文件逐行、列式结果与 iter_records 一致"""
+        storage = CSVRepository(test_csv_path)
+        storage.save_many(reversed(generate_history(500, seed=1)))
+        expected = _rows(storage.iter_records())
+
+        assert list(storage.scan_rows()) == expected
+
+        batches = list(storage.scan_columns(batch_rows=128))
+        assert [len(b) for b in batches] == [128, 128, 128, 116]
+        rows = [row for batch in batches for row in batch.rows()]
+        assert rows == expected
+
+        restored = pickle.loads(pickle.dumps(batches[0]))
+        assert list(restored.rows()) == expected[:128]
+        assert restored.timestamps() == [r[0] for r in expected[:128]]
+
+    def test_messy_file(self, test_csv_path):
+        """测试空行、CRLF、无效行和无换行的末行与 iter_records 处理一致"""
+        test_csv_path.write_text(MESSY_CSV, encoding="utf-8", newline="")
+        storage = CSVRepository(test_csv_path)
+
+        rows = list(scan_rows(test_csv_path))
+        assert rows == _rows(storage.iter_records())
+        assert [r[1] for r in rows] == [50.0, 49.46, 46.0]
+        assert [r[2] for r in rows] == [False, True, False]
+
+    def test_time_filters(self, test_csv_path):
+        """测试时间过滤（含微秒边界）"""
+        storage = CSVRepository(test_csv_path)
+        start = datetime(2026, 3, 1)
+        storage.save_many(
+            ElectricityRecord(timestamp=start + timedelta(hours=i), power=50 - i)
+            for i in range(10)
+        )
+
+        for since, until in [
+            (start + timedelta(hours=2), start + timedelta(hours=5)),
+            (start + timedelta(hours=2, microseconds=1), None),
+            (None, start + timedelta(hours=5, microseconds=999)),
+        ]:
+            assert list(storage.scan_rows(since, until)) == _rows(
+                storage.iter_records(since, until)
+            )
+
+    def test_empty_and_bad_header(self, tmp_path):
+        """测试空文件、只有表头和表头不符"""
+        path = tmp_path / "a.csv"
+        path.write_bytes(b"")
+        assert list(scan_rows(path)) == []
+        path.write_text("timestamp,power,alert_sent\n")
+        assert list(scan_columns(path)) == []
+
+        path.write_text("power,timestamp,alert_sent\n1,2026-03-01 00:00:00,False\n")
+        with pytest.raises(StorageError):
+            list(scan_rows(path))
+
+    def test_snapshot_excludes_later_appends(self, test_csv_path):
+        """测试扫描开始后的追加不会读到"""
+        storage = CSVRepository(test_csv_path)
+        storage.save(ElectricityRecord(timestamp=datetime(2026, 3, 1), power=50))
+        rows = storage.scan_rows()
+        first = next(rows)
+        storage.save(ElectricityRecord(timestamp=datetime(2026, 3, 2), power=49))
+        assert [first, *rows] == [(datetime(2026, 3, 1), 50.0, False)]
+
+
+class TestParallelLoad:
+    """测试多进程解析与顺序扫描一致"""
+
+    def test_split_ranges(self, test_csv_path):
+        """测试切分边界对齐到换行且覆盖整个数据区"""
+        test_csv_path.write_text(MESSY_CSV, encoding="utf-8", newline="")
+        data = test_csv_path.read_bytes()
+
+        ranges = split_ranges(test_csv_path, parts=4, min_chunk_bytes=1)
+        assert len(ranges) == 4
+        assert ranges[0][0] == data.index(b"\n") + 1
+        assert ranges[-1][1] == len(data)
+        for (_, stop), (begin, _) in zip(ranges, ranges[1:], strict=False):
+            assert stop == begin
+            assert data[begin - 1 : begin] == b"\n"
+
+    def test_matches_scan(self, test_csv_path):
+        """测试多段并行解析结果（含无效行、时间过滤）与顺序扫描一致"""
+        test_csv_path.write_text(MESSY_CSV, encoding="utf-8", newline="")
+        expected = list(scan_rows(test_csv_path))
+        columns = load_columns(test_csv_path, max_workers=2, min_chunk_bytes=1)
+        assert list(columns.rows()) == expected
+
+        since = datetime(2026, 3, 1, 9)
+        columns = load_columns(test_csv_path, since, max_workers=1, min_chunk_bytes=1)
+        assert list(columns.rows()) == list(scan_rows(test_csv_path, since))
+
+    def test_repository_threshold(self, test_csv_path):
+        """测试文件达到阈值时 find_all / scan_rows 使用并行解析且结果不变"""
+        serial = CSVRepository(test_csv_path)
+        serial.save_many(reversed(generate_history(300, seed=2)))
+        since = datetime.now() - timedelta(days=3)
+
+        parallel = CSVRepository(
+            test_csv_path, parallel_threshold_bytes=0, parallel_workers=2
+        )
+        assert parallel.find_all() == serial.find_all()
+        assert parallel.find_all(since, limit=5) == serial.find_all(since, limit=5)
+        assert list(parallel.scan_rows(since)) == list(serial.scan_rows(since))
@@ -1,9 +1,38 @@
 """测试 CSV 存储仓储"""
 
+import multiprocessing
 from datetime import datetime, timedelta
 
+import pytest
+
+from ecust_electricity_monitor.analytics import PowerAnalyzer
+from ecust_electricity_monitor.bench import generate_history
+from ecust_electricity_monitor.exceptions import StorageError
 from ecust_electricity_monitor.models import ElectricityRecord
-from ecust_electricity_monitor.storage import CSVRepository
+from ecust_electricity_monitor.storage import CSVRepository, csv_repository
+from ecust_electricity_monitor.storage.locking import available_file_lock, lock_for
+
+# 并发测试：每个写入进程保存的记录数
+WRITES_PER_PROCESS = 60
+WRITERS = 4
+OLD_ROWS = 40
+NEW_START = datetime(2026, 1, 1)
+OLD_START = datetime(2020, 1, 1)
+
+
+def _writer(path: str, index: int) -> None:
+    """子进程：保存一批时间戳互不重复的记录（各进程交错）"""
+    storage = CSVRepository(path)
+    for i in range(WRITES_PER_PROCESS):
+        timestamp = NEW_START + timedelta(minutes=i * WRITERS + index)
+        storage.save(ElectricityRecord(timestamp=timestamp, power=100 - i * 0.5))
+
+
+def _pruner(path: str) -> None:
+    """子进程：逐步删除旧记录（每次重写整个文件）"""
+    storage = CSVRepository(path)
+    for hour in range(1, OLD_ROWS + 1):
+        storage.delete_before(OLD_START + timedelta(hours=hour))
 
 
 class TestCSVRepository:
@@ -93,3 +122,242 @@ class TestCSVRepository:
 
         assert deleted == 1
         assert storage.count() == 1
+
+    def test_analytics_updated_on_save(self, test_csv_path):
+        """测试保存记录时增量更新分析状态"""
+        storage = CSVRepository(test_csv_path)
+        start = datetime(2026, 3, 1)
+
+        for i, power in enumerate([50.0, 40.0, 30.0]):
+            storage.save(
+                ElectricityRecord(
+                    timestamp=start + timedelta(days=i), power=power, alert_sent=False
+                )
+            )
+
+        assert storage.analytics_path.exists()
+
+        # 新实例从旁路文件加载，结果与内存状态一致
+        state = CSVRepository(test_csv_path).analytics()
+        assert state.count == 3
+        assert state.latest.power == 30.0
+        assert state.min_power == 30.0
+        assert state.max_power == 50.0
+        assert state.daily_consumption == pytest.approx(10.0)
+
+    def test_analytics_rebuilt_when_csv_changes(self, test_csv_path):
+        """测试 CSV 被外部修改后重建分析状态"""
+        storage = CSVRepository(test_csv_path)
+        storage.save(ElectricityRecord(timestamp=datetime(2026, 3, 1), power=50.0))
+
+        with open(test_csv_path, "a", encoding="utf-8") as f:
+            f.write("2026-03-02 00:00:00,45.0,False\n")
+
+        state = CSVRepository(test_csv_path).analytics()
+        assert state.count == 2
+        assert state.latest.power == 45.0
+
+    def test_analytics_out_of_order_save(self, test_csv_path):
+        """测试乱序写入触发重建"""
+        storage = CSVRepository(test_csv_path)
+        storage.save(ElectricityRecord(timestamp=datetime(2026, 3, 2), power=40.0))
+        storage.save(ElectricityRecord(timestamp=datetime(2026, 3, 1), power=50.0))
+
+        state = storage.analytics()
+        assert state.count == 2
+        assert state.latest.power == 40.0
+        assert state.daily_consumption == pytest.approx(10.0)
+
+    def test_rollups_match_resample(self, test_csv_path):
+        """测试增量维护的按天汇总与 PowerAnalyzer 重采样一致"""
+        records = generate_history(200, interval_minutes=90, seed=3)
+        storage = CSVRepository(test_csv_path)
+        for record in reversed(records):
+            storage.save(record)
+
+        expected = PowerAnalyzer(records, backend="python").resample_daily()
+        assert storage.find_rollups("day") == expected
+
+        hourly = storage.find_rollups("hour")
+        assert sum(r.sample_count for r in hourly) == len(records)
+        assert sum(r.consumed_kwh for r in hourly) == pytest.approx(
+            sum(r.consumed_kwh for r in expected)
+        )
+
+    def test_rollups_query_and_rebuild(self, test_csv_path):
+        """测试汇总查询范围、乱序写入与外部修改后的重建"""
+        storage = CSVRepository(test_csv_path)
+        storage.save(ElectricityRecord(timestamp=datetime(2026, 3, 1, 8), power=50.0))
+        storage.save(ElectricityRecord(timestamp=datetime(2026, 3, 1, 20), power=46.0))
+        storage.save(ElectricityRecord(timestamp=datetime(2026, 3, 3, 8), power=80.0))
+        # 乱序写入
+        storage.save(ElectricityRecord(timestamp=datetime(2026, 3, 2, 8), power=40.0))
+
+        days = storage.find_rollups("day")
+        assert [r.period_start.day for r in days] == [1, 2, 3]
+        assert [r.consumed_kwh for r in days] == [4.0, 6.0, 0.0]
+        assert days[0].first_power == 50.0
+        assert days[0].min_power == 46.0
+
+        ranged = storage.find_rollups(
+            "day", start=datetime(2026, 3, 2, 12), end=datetime(2026, 3, 2, 23)
+        )
+        assert [r.period_start.day for r in ranged] == [2]
+
+        with open(test_csv_path, "a", encoding="utf-8") as f:
+            f.write("2026-03-03 20:00:00,75.0,False\n")
+        last = CSVRepository(test_csv_path).find_rollups("day")[-1]
+        assert last.last_power == 75.0
+        assert last.consumed_kwh == 5.0
+
+        with pytest.raises(ValueError):
+            storage.find_rollups("week")
+
+    def test_save_skips_missing_rollups(self, test_csv_path, monkeypatch):
+        """测试汇总表缺失时 save() 不全量读取，由 find_rollups() 按需重建"""
+        storage = CSVRepository(test_csv_path)
+        storage.save(ElectricityRecord(timestamp=datetime(2026, 3, 1), power=50.0))
+        storage.analytics()
+        for suffix in (".day.csv", ".hour.csv", ".rollups.json"):
+            test_csv_path.with_suffix(suffix).unlink(missing_ok=True)
+
+        scans = []
+        original = CSVRepository.find_all
+        monkeypatch.setattr(
+            CSVRepository,
+            "find_all",
+            lambda self, *args, **kwargs: (
+                scans.append(args) or original(self, *args, **kwargs)
+            ),
+        )
+        storage = CSVRepository(test_csv_path)
+        storage.save(ElectricityRecord(timestamp=datetime(2026, 3, 2), power=49.0))
+        assert scans == []
+
+        days = storage.find_rollups("day")
+        assert [r.last_power for r in days] == [50.0, 49.0]
+        assert len(scans) == 1
+
+    def test_count_uses_sidecar(self, test_csv_path, monkeypatch):
+        """测试 count() 在 CSV 未变化时不扫描文件，外部修改后重新统计"""
+        storage = CSVRepository(test_csv_path)
+        storage.save(ElectricityRecord(timestamp=datetime(2026, 3, 1), power=50.0))
+        assert storage.count() == 1
+
+        scans = []
+        original = csv_repository._count_nonblank_lines
+        monkeypatch.setattr(
+            csv_repository,
+            "_count_nonblank_lines",
+            lambda path: scans.append(path) or original(path),
+        )
+        storage.save(ElectricityRecord(timestamp=datetime(2026, 3, 2), power=49.0))
+        assert storage.count() == 2
+        assert scans == []
+
+        # 外部追加（含空行）：重新统计，空行不计
+        with open(test_csv_path, "a", encoding="utf-8") as f:
+            f.write("\n2026-03-03 00:00:00,48.0,False\n\n\n")
+        assert storage.count() == 3
+        assert len(scans) == 1
+        assert storage.count() == 3
+        assert len(scans) == 1
+
+        storage.delete_before(datetime(2026, 3, 2))
+        assert storage.count() == 2
+        assert len(scans) == 1
+
+    def test_count_malformed_rows_and_errors(self, test_csv_path, monkeypatch):
+        """测试 count() 计入格式错误的行；统计失败时抛出 StorageError"""
+        storage = CSVRepository(test_csv_path)
+        storage.save(ElectricityRecord(timestamp=datetime(2026, 3, 1), power=50.0))
+        with open(test_csv_path, "a", encoding="utf-8") as f:
+            f.write("not-a-time,abc,False\n")
+
+        assert storage.count() == 2
+        assert len(storage.find_all()) == 1
+
+        def broken(path):
+            raise OSError("磁盘错误")
+
+        storage.count_path.unlink(missing_ok=True)
+        monkeypatch.setattr(csv_repository, "_count_nonblank_lines", broken)
+        with pytest.raises(StorageError, match="统计记录数失败"):
+            storage.count()
+
+    def test_save_many(self, test_csv_path):
+        """测试批量保存与逐条保存的结果一致"""
+        records = list(reversed(generate_history(50, seed=3)))
+        one_by_one = CSVRepository(test_csv_path)
+        for record in records:
+            one_by_one.save(record)
+
+        batch = CSVRepository(test_csv_path.with_name("batch.csv"))
+        batch.save_many(records[:10])
+        batch.save_many(records[10:])
+        batch.save_many([])
+
+        assert batch.count() == 50
+        assert batch.find_all() == one_by_one.find_all()
+        assert batch.analytics().to_dict() == one_by_one.analytics().to_dict()
+        assert batch.find_rollups("hour") == one_by_one.find_rollups("hour")
+        assert batch._current_analytics() is not None
+
+
+@pytest.mark.skipif(not available_file_lock(), reason="需要 fcntl.flock")
+class TestConcurrentAccess:
+    """测试多个进程同时读写同一个 CSV"""
+
+    def test_no_rows_lost_or_torn(self, test_csv_path):
+        """测试并发追加与重写时不丢行、不出现半行，派生数据一致"""
+        storage = CSVRepository(test_csv_path)
+        for hour in range(OLD_ROWS):
+            storage.save(
+                ElectricityRecord(
+                    timestamp=OLD_START + timedelta(hours=hour), power=10.0
+                )
+            )
+
+        ctx = multiprocessing.get_context("spawn")
+        procs = [
+            ctx.Process(target=_writer, args=(str(test_csv_path), i))
+            for i in range(WRITERS)
+        ]
+        procs.append(ctx.Process(target=_pruner, args=(str(test_csv_path),)))
+        for p in procs:
+            p.start()
+
+        # 读者：已写入的新记录只增不减
+        seen = 0
+        reader = CSVRepository(test_csv_path)
+        while any(p.is_alive() for p in procs):
+            new = sum(1 for r in reader.iter_records(start_time=NEW_START))
+            assert new >= seen
+            seen = new
+        for p in procs:
+            p.join()
+            assert p.exitcode == 0
+
+        lines = test_csv_path.read_text(encoding="utf-8").splitlines()
+        assert lines[0] == "timestamp,power,alert_sent"
+        assert all(len(line.split(",")) == 3 for line in lines[1:])
+
+        records = CSVRepository(test_csv_path).find_all()
+        timestamps = {r.timestamp for r in records}
+        assert len(records) == len(timestamps) == WRITERS * WRITES_PER_PROCESS
+        assert min(timestamps) == NEW_START
+
+        # 派生数据与 CSV 一致（不需要重建）
+        fresh = CSVRepository(test_csv_path)
+        assert fresh._current_analytics() is not None
+        assert fresh.analytics().count == len(records)
+        assert sum(r.sample_count for r in fresh.find_rollups("day")) == len(records)
+
+    def test_lock_reentrant(self, test_csv_path):
+        """测试同一线程嵌套加锁，共享锁不能升级"""
+        lock = lock_for(test_csv_path)
+        assert lock is lock_for(test_csv_path)
+        with lock.exclusive(), lock.shared(), lock.exclusive():
+            pass
+        with lock.shared(), pytest.raises(RuntimeError), lock.exclusive():
+            pass
@@ -0,0 +1,90 @@
+"""测试耗时统计"""
+
+import time
+from datetime import datetime
+
+import pytest
+
+from ecust_electricity_monitor import timing
+from ecust_electricity_monitor.analytics import PowerAnalyzer
+from ecust_electricity_monitor.bench import generate_history
+
+
+@pytest.fixture
+def timings():
+    """开启耗时统计，结束后关闭并清空"""
+    timing.reset()
+    timing.enable()
+    yield
+    timing.disable()
+    timing.reset()
+
+
+def _stages() -> dict[str, timing.StageTiming]:
+    return {s.name: s for s in timing.snapshot()}
+
+
+class TestTiming:
+    """测试计时区段"""
+
+    def test_disabled_is_noop(self):
+        """测试关闭时不记录数据"""
+        timing.reset()
+
+        @timing.timed("test.noop")
+        def work() -> int:
+            return 42
+
+        with timing.span("test.span"):
+            assert work() == 42
+
+        assert timing.snapshot() == []
+        assert timing.span("a") is timing.span("b")
+
+    def test_nested_self_time(self, timings):
+        """测试嵌套区段的自身耗时扣除子区段"""
+        with timing.span("outer"):
+            with timing.span("inner"):
+                time.sleep(0.02)
+            with timing.span("inner"):
+                time.sleep(0.02)
+
+        stages = _stages()
+        assert stages["inner"].calls == 2
+        assert stages["outer"].total >= stages["inner"].total >= 0.04
+        assert stages["outer"].self_time < 0.02
+
+    def test_decorator_and_record(self, timings):
+        """测试装饰器和批量累加"""
+
+        @timing.timed("test.batch")
+        def batch() -> None:
+            timing.record("test.rows", 0.5, calls=100)
+
+        batch()
+        stages = _stages()
+        assert stages["test.rows"].calls == 100
+        assert stages["test.rows"].mean == pytest.approx(0.005)
+        # 批量累加的耗时计入外层区段的子耗时
+        batch_stage = stages["test.batch"]
+        assert batch_stage.self_time == pytest.approx(batch_stage.total - 0.5)
+
+    def test_decorator_records_on_error(self, timings):
+        """测试抛出异常时仍然记录"""
+
+        @timing.timed("test.fail")
+        def fail() -> None:
+            raise ValueError
+
+        with pytest.raises(ValueError):
+            fail()
+        assert _stages()["test.fail"].calls == 1
+
+    def test_analyzer_stages(self, timings):
+        """测试分析器埋点"""
+        records = generate_history(200, end_time=datetime(2026, 3, 1), seed=2)
+        PowerAnalyzer(records).get_statistics()
+
+        stages = _stages()
+        assert stages["analyzer.statistics"].calls == 1
+        assert "analyzer.prepare" in stages
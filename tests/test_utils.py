@@ -4,7 +4,17 @@ from datetime import datetime, timedelta
 
 import pytest
 
-from ecust_electricity_monitor.analytics import PowerAnalyzer, validate_power_value
+from ecust_electricity_monitor.analytics import (
+    IncrementalAnalytics,
+    PowerAnalyzer,
+    RegressionSums,
+    TrendEngine,
+    histogram_bins,
+    lttb,
+    min_max_envelope,
+    segment_consumption,
+    validate_power_value,
+)
 from ecust_electricity_monitor.exceptions import ValidationError
 from ecust_electricity_monitor.models import ElectricityRecord
 
@@ -105,3 +115,209 @@ class TestPowerAnalyzer:
         assert stats["min_power"] == 30.0
         assert stats["max_power"] == 50.0
         assert stats["average_power"] == 40.0
+
+
+class TestTrendEngine:
+    """测试趋势计算引擎"""
+
+    @staticmethod
+    def _linear_records(
+        slope: float, days: int = 10, per_day: int = 24
+    ) -> list[ElectricityRecord]:
+        end = datetime(2026, 3, 1, 12, 0, 0)
+        records = []
+        for i in range(days * per_day):
+            hours = i * 24 / per_day
+            records.append(
+                ElectricityRecord(
+                    timestamp=end - timedelta(hours=hours),
+                    power=200.0 + slope * hours / 24,
+                    alert_sent=False,
+                )
+            )
+        return records
+
+    def test_least_squares_matches_linear_slope(self):
+        """测试最小二乘斜率"""
+        analyzer = PowerAnalyzer(self._linear_records(slope=5.0))
+        assert analyzer.calculate_trend() == pytest.approx(-5.0, abs=0.01)
+
+    def test_window_is_time_based(self):
+        """测试时间窗口（而非记录条数）"""
+        records = self._linear_records(slope=5.0)
+        # 最近 2 天改为每天消耗 10 度
+        latest = records[0].timestamp
+        for i, record in enumerate(records):
+            age = (latest - record.timestamp).total_seconds() / 86400
+            if age <= 2:
+                records[i] = record.model_copy(
+                    update={"power": 200.0 + 10 * age + 10.0}
+                )
+
+        analyzer = PowerAnalyzer(records)
+        assert analyzer.calculate_trend(window_days=2) == pytest.approx(-10.0, abs=0.1)
+
+    def test_theil_sen_ignores_outlier(self):
+        """测试 Theil–Sen 对单个异常读数的稳健性"""
+        records = self._linear_records(slope=5.0, days=3)
+        records[0] = records[0].model_copy(update={"power": 400.0})
+
+        engine = TrendEngine(records)
+        assert engine.theil_sen() == pytest.approx(-5.0, abs=0.1)
+        assert engine.least_squares() != pytest.approx(-5.0, abs=0.1)
+
+    def test_theil_sen_sample_cap(self):
+        """测试 Theil–Sen 采样上限"""
+        engine = TrendEngine(self._linear_records(slope=2.0, days=30, per_day=96))
+        assert engine.theil_sen(max_samples=50) == pytest.approx(-2.0, abs=0.01)
+
+    def test_window_sums_match_streaming_sums(self):
+        """测试前缀和与流式累积量一致"""
+        engine = TrendEngine(self._linear_records(slope=3.0, days=5))
+
+        sums = RegressionSums()
+        for t, p in zip(engine.times, engine.powers, strict=True):
+            sums.add(t, p)
+
+        assert engine.window_sums().slope == pytest.approx(sums.slope)
+
+    def test_insufficient_data(self):
+        """测试数据不足"""
+        analyzer = PowerAnalyzer(self._linear_records(slope=1.0, days=1, per_day=1))
+        assert analyzer.calculate_trend() is None
+        assert analyzer.calculate_trend(method="theil_sen") is None
+        assert PowerAnalyzer([]).calculate_trend() is None
+
+
+class TestSegmentation:
+    """测试充值感知的消耗分段"""
+
+    @staticmethod
+    def _records(powers: list[float]) -> list[ElectricityRecord]:
+        start = datetime(2026, 3, 1)
+        records = [
+            ElectricityRecord(
+                timestamp=start + timedelta(days=i), power=power, alert_sent=False
+            )
+            for i, power in enumerate(powers)
+        ]
+        records.reverse()
+        return records
+
+    def test_recharge_splits_segments(self):
+        """测试充值切分区段"""
+        result = segment_consumption(self._records([50, 40, 30, 130, 120, 110]))
+
+        assert len(result.segments) == 2
+        assert len(result.recharges) == 1
+        assert result.recharges[0].amount == 100.0
+        assert result.total_purchased_kwh == 100.0
+        assert result.total_consumed_kwh == 40.0
+        assert [s.rate for s in result.segments] == [10.0, 10.0]
+
+    def test_small_rise_is_not_recharge(self):
+        """测试小幅回升不算充值"""
+        result = segment_consumption(self._records([50, 40, 40.5, 30]))
+
+        assert result.recharges == []
+        assert result.total_consumed_kwh == 20.0
+
+    def test_daily_consumption_ignores_recharge(self):
+        """测试日均消耗不受充值影响"""
+        analyzer = PowerAnalyzer(self._records([50, 40, 30, 130, 120, 110]))
+
+        assert analyzer.calculate_daily_consumption(days=7) == pytest.approx(10.0)
+        assert analyzer.estimate_remaining_days() == 11
+
+    def test_trend_does_not_cross_recharge(self):
+        """测试趋势窗口不跨越充值"""
+        analyzer = PowerAnalyzer(self._records([50, 40, 30, 130, 120, 110]))
+        assert analyzer.calculate_trend() == pytest.approx(-10.0)
+
+
+class TestIncrementalAnalytics:
+    """测试增量分析状态"""
+
+    @staticmethod
+    def _feed(powers: list[float]) -> IncrementalAnalytics:
+        state = IncrementalAnalytics()
+        start = datetime(2026, 3, 1)
+        for i, power in enumerate(powers):
+            state.update(
+                ElectricityRecord(timestamp=start + timedelta(hours=6 * i), power=power)
+            )
+        return state
+
+    def test_running_statistics(self):
+        """测试增量统计量"""
+        state = self._feed([100.0, 98.5, 97.0, 95.5, 94.0])
+
+        assert state.count == 5
+        assert state.min_power == 94.0
+        assert state.max_power == 100.0
+        assert state.total_consumed_kwh == pytest.approx(6.0)
+        assert state.daily_consumption == pytest.approx(6.0)
+        assert state.trend == pytest.approx(-6.0)
+        assert state.estimate_remaining_days() == 15
+
+    def test_recharge_resets_trend(self):
+        """测试充值后趋势回归重置"""
+        state = self._feed([20.0, 18.5, 17.0, 117.0, 115.5, 114.0])
+
+        assert state.total_purchased_kwh == pytest.approx(100.0)
+        assert state.last_recharge is not None
+        assert state.trend == pytest.approx(-6.0)
+        assert state.daily_consumption == pytest.approx(6.0)
+
+    def test_out_of_order_rejected(self):
+        """测试乱序记录被拒绝"""
+        state = self._feed([50.0, 49.0])
+        with pytest.raises(ValueError):
+            state.update(ElectricityRecord(timestamp=datetime(2026, 1, 1), power=1.0))
+
+    def test_round_trip(self):
+        """测试序列化与恢复"""
+        state = self._feed([20.0, 18.5, 17.0, 117.0, 115.5])
+        restored = IncrementalAnalytics.from_dict(state.to_dict())
+
+        assert restored.to_dict() == state.to_dict()
+        context = restored.build_alert_context(threshold=200.0)
+        assert context.current_record.power == 115.5
+        assert len(context.history) == 5
+        assert context.last_recharge.amount == 100.0
+
+
+class TestDownsample:
+    """测试图表降采样"""
+
+    def test_lttb_keeps_endpoints_and_peaks(self):
+        """测试 LTTB 保留首尾点和尖峰"""
+        xs = [float(i) for i in range(1000)]
+        ys = [0.0] * 1000
+        ys[500] = 100.0
+
+        indices = lttb(xs, ys, 50)
+
+        assert len(indices) == 50
+        assert indices[0] == 0
+        assert indices[-1] == 999
+        assert indices == sorted(indices)
+        assert 500 in indices
+
+    def test_lttb_small_input(self):
+        """测试数据量不超过目标点数时不降采样"""
+        assert lttb([0.0, 1.0, 2.0], [1.0, 2.0, 3.0], 10) == [0, 1, 2]
+
+    def test_envelope_and_histogram(self):
+        """测试最小/最大值包络与直方图分箱"""
+        ys = [float(i % 10) for i in range(100)]
+
+        starts, lows, highs = min_max_envelope(ys, 10)
+        assert starts == list(range(0, 100, 10))
+        assert lows == [0.0] * 10
+        assert highs == [9.0] * 10
+
+        centers, counts, width = histogram_bins(ys, bins=10)
+        assert sum(counts) == 100
+        assert width == pytest.approx(0.9)
+        assert centers[0] == pytest.approx(0.45)